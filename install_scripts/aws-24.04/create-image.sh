@@ -482,6 +482,7 @@ chroot ${TARGET_DIR} /bin/bash -c "
         'flask<3' \
         flask_cors \
         flask_wtf \
+        flask_sock \
         pyserial \
         /tmp/tensorflow-2.17.1-cp312-cp312-linux_x86_64.whl \
         tensorboard \
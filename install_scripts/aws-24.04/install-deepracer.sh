@@ -65,6 +65,7 @@ pip3 install --break-system-packages \
     'flask<3' \
     flask_cors \
     flask_wtf \
+    flask_sock \
     pyserial \
     $DIR/dist/tensorflow-2.17.1-cp312-cp312-linux_x86_64.whl \
     tensorboard \
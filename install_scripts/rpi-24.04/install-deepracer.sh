@@ -62,6 +62,7 @@ pip3 install -U --break-system-packages \
     "flask<3" \
     flask_cors \
     flask_wtf \
+    flask_sock \
     pyserial \
     "tensorflow==2.17.1" \
     "tensorboard" \
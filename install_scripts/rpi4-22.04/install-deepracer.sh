@@ -74,6 +74,7 @@ pip3 install -U pyudev \
     "flask<3" \
     flask_cors \
     flask_wtf \
+    flask_sock \
     pam \
     networkx \
     unidecode \
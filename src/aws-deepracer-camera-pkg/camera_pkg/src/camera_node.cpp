@@ -24,6 +24,7 @@
 #endif
 #include "deepracer_interfaces_pkg/srv/video_state_srv.hpp"
 #include "deepracer_interfaces_pkg/msg/camera_msg.hpp"
+#include "deepracer_interfaces_pkg/msg/pipeline_stamp_msg.hpp"
 #include "opencv2/opencv.hpp"
 #include "image_transport/image_transport.hpp"
 
@@ -42,6 +43,7 @@ namespace MediaEng {
         const char* CAMERA_MSG_TOPIC = "video_mjpeg";
         const char* DISPLAY_MSG_TOPIC = "display_mjpeg";
         const char* ACTIVATE_CAMERA_SERVICE_NAME = "media_state";
+        const char* PIPELINE_TRACE_TOPIC = "/pipeline_trace";
 
         /// @param node_name Name of the node to be created.
         /// @param cameraIdxList List of camera indexes to iterate over to find the valid
@@ -87,6 +89,9 @@ namespace MediaEng {
             // image callback is blocked since it probably expects to send a frame which has been lost due to small publisher queue size of 1 earlier.
             if(enableDisplayPub_)
                 displayPub_ = image_transport_.advertise(DISPLAY_MSG_TOPIC, 10);
+
+            // Create a publisher to stamp the traced frames once published.
+            pipelineTracePub_ = this->create_publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>(PIPELINE_TRACE_TOPIC, 10);
             
             // Create a service to activate the publish of camera images.
             activateCameraService_ = this->create_service<deepracer_interfaces_pkg::srv::VideoStateSrv>(
@@ -212,6 +217,7 @@ namespace MediaEng {
                         if (enableDisplayPub_)
                             displayPub_.publish(displayMsg);
                         videoPub_->publish(cameraMsg);
+                        publishPipelineStamp(cameraMsg.images.front().header.stamp);
                     }
                 }
                     catch (const std::exception &ex) {
@@ -220,8 +226,25 @@ namespace MediaEng {
             }
         }
 
+        /// Publishes the time the camera stage finished processing a frame, if the frame
+        /// is traced and the pipeline trace topic has subscribers.
+        /// @param sourceStamp Capture timestamp of the frame.
+        void publishPipelineStamp(const builtin_interfaces::msg::Time &sourceStamp) {
+            if ((sourceStamp.nanosec / 1000) % deepracer_interfaces_pkg::msg::PipelineStampMsg::SAMPLE_RATE != 0
+                || pipelineTracePub_->get_subscription_count() == 0) {
+                return;
+            }
+            deepracer_interfaces_pkg::msg::PipelineStampMsg stampMsg;
+            stampMsg.source_stamp = sourceStamp;
+            stampMsg.stage = deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_CAMERA;
+            stampMsg.stamp = this->get_clock()->now();
+            pipelineTracePub_->publish(stampMsg);
+        }
+
         /// ROS publisher object to the publish camera images to camera message topic.
         rclcpp::Publisher<deepracer_interfaces_pkg::msg::CameraMsg>::SharedPtr videoPub_;
+        /// ROS publisher object to publish the pipeline stamps of the traced frames.
+        rclcpp::Publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>::SharedPtr pipelineTracePub_;
         /// Pointer to itself
         rclcpp::Node::SharedPtr node_handle_;
         /// Image transport object
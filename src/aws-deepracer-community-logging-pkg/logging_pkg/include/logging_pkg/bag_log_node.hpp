@@ -29,11 +29,15 @@
 #include "rosbag2_cpp/writer.hpp"
 #include "rosbag2_cpp/writers/sequential_writer.hpp"
 #include "rosbag2_storage/storage_options.hpp"
+#include "rosbag2_compression/compression_options.hpp"
+#include "rosbag2_compression/sequential_compression_writer.hpp"
 #include "std_msgs/msg/string.hpp"
 #include "std_srvs/srv/trigger.hpp"
 #include "deepracer_interfaces_pkg/srv/usb_file_system_subscribe_srv.hpp"
 #include "deepracer_interfaces_pkg/srv/usb_mount_point_manager_srv.hpp"
 #include "deepracer_interfaces_pkg/msg/usb_file_system_notification_msg.hpp"
+#include "logging_pkg/bag_write_queue.hpp"
+#include "logging_pkg/preroll_buffer.hpp"
 
 namespace logging_pkg {
 
@@ -55,6 +59,38 @@ namespace constants {
 
     // Naming
     const std::string DEFAULT_BAG_NAME = "deepracer";
+
+    // Bag splitting, a new bag file is started once one of the limits is reached (0 disables).
+    const int64_t DEFAULT_MAX_BAGFILE_SIZE = 256 * 1024 * 1024;  // bytes
+    const int64_t DEFAULT_MAX_BAGFILE_DURATION = 0;  // seconds
+
+    // Write cache per storage provider used when max_cache_size is 0.
+    const std::map<std::string, int64_t> STORAGE_DEFAULT_CACHE_SIZE = {
+        {"sqlite3", 1 * 1024 * 1024},
+        {"mcap", 4 * 1024 * 1024}
+    };
+
+    // Compression
+    const std::string DEFAULT_COMPRESSION_FORMAT = "zstd";
+    const uint64_t COMPRESSION_QUEUE_SIZE = 1;
+    const uint64_t COMPRESSION_THREADS = 1;
+
+    // Write queue between the subscriptions and the writer thread.
+    const int64_t WRITE_QUEUE_DEFAULT_SIZE = 30;  // messages per topic, one second of camera frames
+    const int64_t WRITE_QUEUE_DEFAULT_BATCH_SIZE = 64;  // messages written per batch
+    const std::chrono::milliseconds WRITE_QUEUE_FLUSH_INTERVAL{100};
+    // Time to write the queued messages when a bag is closed
+    const std::chrono::milliseconds WRITE_QUEUE_STOP_TIMEOUT{5000};
+    const std::vector<std::string> DEFAULT_DROP_POLICIES = {
+        "/ctrl_pkg/servo_msg=block", "/inference_pkg/rl_results=drop_oldest"};
+    const std::string DEFAULT_DROP_POLICY = "drop_oldest";
+
+    // Pre-roll buffer holding the messages received before a recording starts.
+    const double DEFAULT_PREROLL_DURATION = 5.0;  // seconds, 0 disables the pre-roll
+    const int64_t DEFAULT_PREROLL_MAX_SIZE = 1 * 1024 * 1024;  // bytes per topic
+    const std::vector<std::string> DEFAULT_PREROLL_TOPIC_MAX_SIZES = {
+        "/camera_pkg/display_mjpeg=33554432"};
+    const size_t PREROLL_MAX_MESSAGES = 1024;  // messages per topic
 }
 
 // Recording state enum
@@ -112,6 +148,12 @@ private:
     void stop_logging_cb(
         const std::shared_ptr<std_srvs::srv::Trigger::Request> request,
         std::shared_ptr<std_srvs::srv::Trigger::Response> response);
+    void write_queue_stats_cb(
+        const std::shared_ptr<std_srvs::srv::Trigger::Request> request,
+        std::shared_ptr<std_srvs::srv::Trigger::Response> response);
+
+    // Writes a batch of queued messages to the open bag, called from the writer thread
+    size_t write_batch(const std::vector<QueuedMessage>& batch);
     
     // State management
     void change_state();
@@ -135,6 +177,19 @@ private:
     int monitor_topic_timeout_;
     std::vector<std::string> log_topics_;
     std::string logging_provider_;
+    int64_t max_bagfile_size_;
+    int64_t max_bagfile_duration_;
+    int64_t max_cache_size_;
+    std::string storage_preset_profile_;
+    std::string compression_mode_;
+    std::string compression_format_;
+    int64_t write_queue_size_;
+    int64_t write_batch_size_;
+    std::map<std::string, DropPolicy> drop_policies_;
+    DropPolicy default_drop_policy_;
+    double preroll_duration_;
+    int64_t preroll_max_size_;
+    std::map<std::string, size_t> preroll_topic_max_sizes_;
     
     // Member variables - State
     std::atomic<RecordingState> target_edit_state_{RecordingState::STOPPED};
@@ -153,6 +208,8 @@ private:
     std::unique_ptr<rosbag2_cpp::Writer> bag_writer_;
     std::mutex bag_lock_;
     int topic_counter_{0};
+    std::unique_ptr<BagWriteQueue> write_queue_;
+    std::unique_ptr<PrerollBuffer> preroll_;
     
     // ROS members - Callback groups
     rclcpp::CallbackGroup::SharedPtr main_cbg_;
@@ -172,6 +229,7 @@ private:
     
     // ROS members - Services
     rclcpp::Service<std_srvs::srv::Trigger>::SharedPtr stop_logging_svc_;
+    rclcpp::Service<std_srvs::srv::Trigger>::SharedPtr write_queue_stats_svc_;
     
     // ROS members - Service clients
     rclcpp::Client<deepracer_interfaces_pkg::srv::USBFileSystemSubscribeSrv>::SharedPtr 
@@ -0,0 +1,143 @@
+//////////////////////////////////////////////////////////////////////////////////
+//   Copyright AWS DeepRacer Community. All Rights Reserved.                     //
+//                                                                               //
+//   Licensed under the Apache License, Version 2.0 (the "License").             //
+//   You may not use this file except in compliance with the License.            //
+//   You may obtain a copy of the License at                                     //
+//                                                                               //
+//       http://www.apache.org/licenses/LICENSE-2.0                              //
+//                                                                               //
+//   Unless required by applicable law or agreed to in writing, software         //
+//   distributed under the License is distributed on an "AS IS" BASIS,           //
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    //
+//   See the License for the specific language governing permissions and         //
+//   limitations under the License.                                              //
+//////////////////////////////////////////////////////////////////////////////////
+
+#ifndef BAG_WRITE_QUEUE_HPP
+#define BAG_WRITE_QUEUE_HPP
+
+#include <chrono>
+#include <condition_variable>
+#include <functional>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "rclcpp/rclcpp.hpp"
+
+namespace logging_pkg {
+
+// Handling of a message arriving while the write queue of its topic is full
+enum class DropPolicy {
+    DROP_OLDEST = 0,
+    DROP_NEWEST = 1,
+    BLOCK = 2
+};
+
+// Parses drop_oldest, drop_newest or block, throws std::invalid_argument otherwise.
+DropPolicy string_to_drop_policy(const std::string& policy_str);
+std::string drop_policy_to_string(DropPolicy policy);
+
+// Message waiting to be written, with its receive time in nanoseconds
+struct QueuedMessage {
+    std::string topic;
+    std::shared_ptr<rclcpp::SerializedMessage> data;
+    int64_t timestamp{0};
+};
+
+// Preallocated ring of the raw messages of one topic waiting to be written
+class TopicRing {
+public:
+    TopicRing(size_t capacity, DropPolicy policy);
+
+    bool is_full() const { return count_ == entries_.size(); }
+    size_t count() const { return count_; }
+    DropPolicy policy() const { return policy_; }
+
+    // Adds a message, overwriting the oldest one if the ring is full and the policy is
+    // DROP_OLDEST. Returns true if the message was added.
+    bool push(std::shared_ptr<rclcpp::SerializedMessage> data, int64_t timestamp);
+    // Drops all messages of the ring.
+    void clear();
+    // Moves up to limit of the oldest messages to the batch.
+    void pop_into(const std::string& topic, std::vector<QueuedMessage>& batch, size_t limit);
+
+    uint64_t queued{0};
+    uint64_t written{0};
+    uint64_t dropped{0};
+    size_t max_depth{0};
+
+private:
+    DropPolicy policy_;
+    std::vector<std::pair<std::shared_ptr<rclcpp::SerializedMessage>, int64_t>> entries_;
+    size_t head_{0};
+    size_t count_{0};
+};
+
+// Bounded per-topic write queue drained by a dedicated writer thread. The mutex of the
+// queue only protects the rings and counters; the storage is written by the writer
+// thread without holding it, so a slow SD card never blocks the subscription callbacks
+// of topics that are allowed to drop messages.
+class BagWriteQueue {
+public:
+    // Writes a batch of messages, returning the number of messages written.
+    using WriteCallback = std::function<size_t(const std::vector<QueuedMessage>&)>;
+
+    BagWriteQueue(rclcpp::Logger logger, WriteCallback write_cb, size_t capacity,
+                  size_t batch_size, std::map<std::string, DropPolicy> policies,
+                  DropPolicy default_policy, std::chrono::milliseconds flush_interval);
+    ~BagWriteQueue();
+
+    // Creates the ring of a topic.
+    void add_topic(const std::string& topic);
+    // Starts the writer thread.
+    void start();
+    // Writes the queued messages, up to the timeout, and stops the writer thread.
+    void stop(std::chrono::milliseconds timeout);
+    // Queues a message. Topics with the BLOCK policy wait for the writer while their ring
+    // is full. Returns true if the message was queued.
+    bool push(const std::string& topic, std::shared_ptr<rclcpp::SerializedMessage> data,
+              int64_t timestamp);
+    // Waits until all queued messages are written. Returns true if the queue is empty.
+    bool flush(std::chrono::milliseconds timeout);
+    // Drops all queued messages, counting them as dropped.
+    void discard();
+    // Counters per topic and the totals under "total", as JSON.
+    std::string get_stats_json();
+    // Totals of the counters, as JSON.
+    std::string get_total_stats_json();
+
+private:
+    std::vector<QueuedMessage> take_batch();
+    void writer_loop();
+    std::string format_total_stats();
+
+    rclcpp::Logger logger_;
+    WriteCallback write_cb_;
+    size_t capacity_;
+    size_t batch_size_;
+    std::map<std::string, DropPolicy> policies_;
+    DropPolicy default_policy_;
+    std::chrono::milliseconds flush_interval_;
+
+    std::map<std::string, TopicRing> rings_;
+    std::vector<std::string> ring_order_;
+    size_t next_ring_{0};
+    size_t depth_{0};
+    size_t max_depth_{0};
+    size_t in_flight_{0};
+    bool running_{false};
+    std::thread thread_;
+
+    std::mutex mutex_;
+    std::condition_variable not_empty_;
+    std::condition_variable not_full_;
+};
+
+}  // namespace logging_pkg
+
+#endif  // BAG_WRITE_QUEUE_HPP
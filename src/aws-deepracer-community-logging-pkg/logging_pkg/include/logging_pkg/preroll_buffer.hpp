@@ -0,0 +1,90 @@
+//////////////////////////////////////////////////////////////////////////////////
+//   Copyright AWS DeepRacer Community. All Rights Reserved.                     //
+//                                                                               //
+//   Licensed under the Apache License, Version 2.0 (the "License").             //
+//   You may not use this file except in compliance with the License.            //
+//   You may obtain a copy of the License at                                     //
+//                                                                               //
+//       http://www.apache.org/licenses/LICENSE-2.0                              //
+//                                                                               //
+//   Unless required by applicable law or agreed to in writing, software         //
+//   distributed under the License is distributed on an "AS IS" BASIS,           //
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    //
+//   See the License for the specific language governing permissions and         //
+//   limitations under the License.                                              //
+//////////////////////////////////////////////////////////////////////////////////
+
+#ifndef PREROLL_BUFFER_HPP
+#define PREROLL_BUFFER_HPP
+
+#include <deque>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include "rclcpp/rclcpp.hpp"
+#include "logging_pkg/bag_write_queue.hpp"
+
+namespace logging_pkg {
+
+// Most recent messages of one topic, bounded by size in bytes and by count. The received
+// serialized messages are held as they are, without copying them.
+class TopicPreroll {
+public:
+    TopicPreroll(size_t max_size, size_t max_messages);
+
+    size_t count() const { return messages_.size(); }
+
+    // Keeps a message, evicting the messages older than min_timestamp and as many of the
+    // oldest messages as needed to make room.
+    void push(std::shared_ptr<rclcpp::SerializedMessage> data, int64_t timestamp,
+              int64_t min_timestamp);
+    // Moves the messages received at or after min_timestamp to the batch, oldest first,
+    // and empties the buffer.
+    void drain_into(const std::string& topic, std::vector<QueuedMessage>& batch,
+                    int64_t min_timestamp);
+
+    uint64_t dropped{0};
+
+private:
+    void evict_oldest();
+
+    size_t max_size_;
+    size_t max_messages_;
+    size_t size_{0};
+    std::deque<std::pair<std::shared_ptr<rclcpp::SerializedMessage>, int64_t>> messages_;
+};
+
+// Pre-roll buffers of all recorded topics, holding the messages received while not recording
+class PrerollBuffer {
+public:
+    PrerollBuffer(double duration, size_t max_size, std::map<std::string, size_t> topic_max_sizes,
+                  size_t max_messages);
+
+    bool enabled() const { return duration_ns_ > 0; }
+
+    // Creates the buffer of a topic.
+    void add_topic(const std::string& topic);
+    // Keeps a message received while not recording.
+    void push(const std::string& topic, std::shared_ptr<rclcpp::SerializedMessage> data,
+              int64_t timestamp);
+    // Removes the messages received within the pre-roll duration before now, all topics
+    // merged in receive time order.
+    std::vector<QueuedMessage> drain(int64_t now);
+    // Number of messages that were larger than their buffer.
+    uint64_t get_dropped();
+
+private:
+    int64_t duration_ns_;
+    size_t max_size_;
+    std::map<std::string, size_t> topic_max_sizes_;
+    size_t max_messages_;
+    std::map<std::string, TopicPreroll> topics_;
+    std::mutex mutex_;
+};
+
+}  // namespace logging_pkg
+
+#endif  // PREROLL_BUFFER_HPP
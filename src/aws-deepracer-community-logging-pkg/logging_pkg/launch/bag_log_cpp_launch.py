@@ -33,7 +33,13 @@ def generate_launch_description():
                     'logging_mode': 'Always',
                     'monitor_topic_timeout': 15,
                     'disable_usb_monitor': False,
-                    'logging_provider': 'sqlite3'
+                    'logging_provider': 'sqlite3',
+                    'max_bagfile_size': 268435456,
+                    'max_bagfile_duration': 0,
+                    'max_cache_size': 0,
+                    'storage_preset_profile': '',
+                    'compression_mode': 'none',
+                    'compression_format': 'zstd'
             }]
         )
     ])
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright AWS DeepRacer Community. All Rights Reserved.                     #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+bag_exporter.py
+
+Command line exporter that converts the bags recorded by the bag_log_node into files that
+can be analysed without ROS. The bag is read sequentially with rosbag2_py and every message
+is converted as soon as it is read:
+
+    ServoCtrlMsg: One row per message with the angle, throttle and source stamp.
+    InferResultsArray: One row per inference result, the input images are exported as frames.
+    CameraMsg, sensor_msgs/CompressedImage: The images are exported as frames.
+    sensor_msgs/Image: The raw pixels are exported to an indexed frames file.
+
+The scalar columns are written as NumPy .npz or Parquet files. The compressed frames are
+written as-is, either to a directory of JPEG files or to one frames file per topic with
+an index of offsets. A directory holding several bags is exported with a process pool.
+
+Usage:
+    bag_exporter /opt/aws/deepracer/logs/deepracer-20240101-120000 -o /tmp/export
+    bag_exporter /media/usb/logs -o /tmp/export --format parquet --frames file --jobs 4
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+import numpy as np
+import yaml
+import rosbag2_py
+from rclpy.serialization import deserialize_message
+
+import logging_pkg.constants as constants
+
+
+class ColumnTable:
+    """
+    Columns of scalar values appended row by row into compact typed arrays.
+    """
+    def __init__(self, columns: Dict[str, str]):
+        """
+        Args:
+            columns (Dict[str, str]): Array typecode per column name, e.g. 'q' or 'd'.
+        """
+        self._columns = {name: array(typecode) for name, typecode in columns.items()}
+
+    def __len__(self):
+        return len(next(iter(self._columns.values())))
+
+    def append(self, *values):
+        for column, value in zip(self._columns.values(), values):
+            column.append(value)
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        return {name: np.frombuffer(column, dtype=column.typecode) if len(column) else
+                np.zeros(0, dtype=column.typecode)
+                for name, column in self._columns.items()}
+
+    def write(self, path: str, table_format: str):
+        """
+        Writes the table to path with the .npz or .parquet extension added.
+
+        Args:
+            path (str): The path of the file without extension.
+            table_format (str): 'npz' or 'parquet'.
+        """
+        if table_format == constants.EXPORT_FORMAT_PARQUET:
+            import pyarrow
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(pyarrow.table(self.to_numpy()), path + '.parquet')
+        else:
+            np.savez(path + '.npz', **self.to_numpy())
+
+
+class FrameSink:
+    """
+    Destination of the image frames of one topic. Compressed frames are written as single
+    files to a directory, or appended to one frames file whose offsets are kept in the index.
+    """
+    def __init__(self, directory: str, slug: str, frames_mode: str):
+        self._frames_mode = frames_mode
+        self._directory = os.path.join(directory, slug)
+        self._frames_file = None
+        self._directory_created = False
+        self._offset = 0
+        if frames_mode == constants.EXPORT_FRAMES_FILE:
+            self._frames_file = open(self._directory + '.frames', 'wb')
+        self.index = ColumnTable({'timestamp': 'q', 'message': 'q', 'camera': 'q',
+                                  'offset': 'q', 'length': 'q', 'width': 'q', 'height': 'q'})
+        self.formats = set()
+
+    def write(self, timestamp: int, message: int, camera: int, data, image_format: str,
+              width: int = 0, height: int = 0):
+        """
+        Exports one frame.
+
+        Args:
+            timestamp (int): The receive time of the message in nanoseconds.
+            message (int): The index of the message in its topic.
+            camera (int): The index of the image in the message.
+            data: The compressed image or the raw pixels.
+            image_format (str): The format of the compressed image or the raw encoding.
+            width (int, optional): Width of a raw image. Defaults to 0.
+            height (int, optional): Height of a raw image. Defaults to 0.
+        """
+        length = len(data)
+        self.formats.add(image_format)
+        if self._frames_file is not None or width:
+            if self._frames_file is None:
+                # Raw pixels have no file format of their own, keep them in a frames file.
+                self._frames_file = open(self._directory + '.frames', 'wb')
+            self._frames_file.write(data)
+            self.index.append(timestamp, message, camera, self._offset, length, width, height)
+            self._offset += length
+            return
+        if not self._directory_created:
+            os.makedirs(self._directory, exist_ok=True)
+            self._directory_created = True
+        extension = 'png' if 'png' in image_format else 'jpg'
+        with open(os.path.join(self._directory, '{:06d}_{}.{}'.format(message, camera, extension)),
+                  'wb') as frame_file:
+            frame_file.write(data)
+        self.index.append(timestamp, message, camera, 0, length, width, height)
+
+    def close(self):
+        if self._frames_file is not None:
+            self._frames_file.close()
+
+
+class TopicExporter:
+    """
+    Converts the messages of one topic to columns and frames.
+    """
+    def __init__(self, directory: str, topic: str, topic_type: str, frames_mode: str):
+        self.directory = directory
+        self.topic = topic
+        self.topic_type = topic_type
+        self.slug = topic.strip('/').replace('/', '__')
+        self.table = None
+        self.frames = None
+        self.count = 0
+        self._frames_mode = frames_mode
+
+    def frame_sink(self) -> FrameSink:
+        if self.frames is None:
+            self.frames = FrameSink(self.directory, self.slug, self._frames_mode)
+        return self.frames
+
+    def export_images(self, timestamp: int, images):
+        sink = self.frame_sink()
+        for camera, image in enumerate(images):
+            sink.write(timestamp, self.count, camera, image.data, image.format)
+
+    def add(self, msg, timestamp: int):
+        topic_type = self.topic_type
+        if topic_type == 'deepracer_interfaces_pkg/msg/ServoCtrlMsg':
+            if self.table is None:
+                self.table = ColumnTable({'timestamp': 'q', 'angle': 'd', 'throttle': 'd',
+                                          'source_stamp': 'q'})
+            self.table.append(timestamp, msg.angle, msg.throttle,
+                              msg.source_stamp.sec * 1000000000 + msg.source_stamp.nanosec)
+        elif topic_type == 'deepracer_interfaces_pkg/msg/InferResultsArray':
+            if self.table is None:
+                self.table = ColumnTable({'timestamp': 'q', 'message': 'q', 'class_label': 'q',
+                                          'class_prob': 'd', 'x_min': 'd', 'y_min': 'd',
+                                          'x_max': 'd', 'y_max': 'd'})
+            for result in msg.results:
+                self.table.append(timestamp, self.count, result.class_label, result.class_prob,
+                                  result.x_min, result.y_min, result.x_max, result.y_max)
+            self.export_images(timestamp, msg.images)
+        elif topic_type == 'deepracer_interfaces_pkg/msg/CameraMsg':
+            self.export_images(timestamp, msg.images)
+        elif topic_type == 'sensor_msgs/msg/CompressedImage':
+            self.export_images(timestamp, [msg])
+        elif topic_type == 'sensor_msgs/msg/Image':
+            self.frame_sink().write(timestamp, self.count, 0, msg.data, msg.encoding,
+                                    msg.width, msg.height)
+        self.count += 1
+
+    def close(self, table_format: str) -> List[str]:
+        """
+        Writes the tables of the topic.
+
+        Returns:
+            List[str]: The kinds of output written.
+        """
+        outputs = []
+        if self.table is not None:
+            self.table.write(os.path.join(self.directory, self.slug), table_format)
+            outputs.append('{} rows'.format(len(self.table)))
+        if self.frames is not None:
+            self.frames.close()
+            self.frames.index.write(os.path.join(self.directory, self.slug + '_frames'),
+                                    table_format)
+            outputs.append('{} frames ({})'.format(len(self.frames.index),
+                                                   ', '.join(sorted(self.frames.formats))))
+        return outputs
+
+
+def get_message_class(topic_type: str):
+    """
+    Imports the message class of a type name such as 'sensor_msgs/msg/Image'.
+    """
+    module_name, class_name = topic_type.replace('/', '.').rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def read_metadata(bag_path: str) -> dict:
+    with open(os.path.join(bag_path, 'metadata.yaml')) as metadata_file:
+        return yaml.safe_load(metadata_file)['rosbag2_bagfile_information']
+
+
+def open_reader(bag_path: str):
+    """
+    Opens a sequential reader on the bag, with decompression if the bag was recorded with
+    file or message compression.
+    """
+    metadata = read_metadata(bag_path)
+    if metadata.get('compression_format'):
+        reader = rosbag2_py.SequentialCompressionReader()
+    else:
+        reader = rosbag2_py.SequentialReader()
+    reader.open(rosbag2_py.StorageOptions(uri=bag_path,
+                                          storage_id=metadata['storage_identifier']),
+                rosbag2_py.ConverterOptions(input_serialization_format='cdr',
+                                            output_serialization_format='cdr'))
+    return reader
+
+
+def export_bag(bag_path: str, output_directory: str, table_format: str,
+               frames_mode: str) -> dict:
+    """
+    Exports one bag, reading and converting the messages one at a time.
+
+    Args:
+        bag_path (str): The directory of the bag.
+        output_directory (str): The directory where the directory of the bag is created.
+        table_format (str): 'npz' or 'parquet'.
+        frames_mode (str): 'jpeg' for a directory of images, 'file' for a frames file.
+
+    Returns:
+        dict: Summary with the bag, the exported topics and the time taken.
+    """
+    start = time.monotonic()
+    directory = os.path.join(output_directory, os.path.basename(os.path.normpath(bag_path)))
+    os.makedirs(directory, exist_ok=True)
+
+    reader = open_reader(bag_path)
+    topic_types = {topic.name: topic.type for topic in reader.get_all_topics_and_types()
+                   if topic.type in constants.EXPORT_MESSAGE_TYPES}
+    if not topic_types:
+        # An empty filter would let all topics through.
+        del reader
+        return {'bag': bag_path, 'directory': directory, 'topics': {}, 'messages': 0,
+                'bytes': 0, 'time': time.monotonic() - start}
+    reader.set_filter(rosbag2_py.StorageFilter(topics=list(topic_types)))
+    message_classes = {topic: get_message_class(topic_type)
+                       for topic, topic_type in topic_types.items()}
+    exporters = {topic: TopicExporter(directory, topic, topic_type, frames_mode)
+                 for topic, topic_type in topic_types.items()}
+
+    read_bytes = 0
+    while reader.has_next():
+        topic, data, timestamp = reader.read_next()
+        exporter = exporters.get(topic)
+        if exporter is None:
+            continue
+        read_bytes += len(data)
+        exporter.add(deserialize_message(data, message_classes[topic]), timestamp)
+    del reader
+
+    topics = {topic: exporter.close(table_format) for topic, exporter in exporters.items()
+              if exporter.count}
+    return {'bag': bag_path, 'directory': directory, 'topics': topics,
+            'messages': sum(exporter.count for exporter in exporters.values()),
+            'bytes': read_bytes, 'time': time.monotonic() - start}
+
+
+def find_bags(path: str) -> List[str]:
+    """
+    Returns the path itself if it is a bag, otherwise the bags directly inside it.
+    """
+    if os.path.isfile(os.path.join(path, 'metadata.yaml')):
+        return [path]
+    return sorted(os.path.join(path, name) for name in os.listdir(path)
+                  if os.path.isfile(os.path.join(path, name, 'metadata.yaml')))
+
+
+def export_bags(bag_paths: List[str], output_directory: str, table_format: str,
+                frames_mode: str, jobs: int, logger) -> List[dict]:
+    """
+    Exports the bags, in parallel worker processes if there is more than one.
+
+    Returns:
+        List[dict]: The summary of every exported bag.
+    """
+    if jobs <= 1 or len(bag_paths) <= 1:
+        return [export_bag(bag_path, output_directory, table_format, frames_mode)
+                for bag_path in bag_paths]
+
+    summaries = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(bag_paths))) as executor:
+        futures = {executor.submit(export_bag, bag_path, output_directory, table_format,
+                                   frames_mode): bag_path for bag_path in bag_paths}
+        for future in as_completed(futures):
+            try:
+                summaries.append(future.result())
+            except Exception as ex:
+                logger.error('Failed to export {}: {}'.format(futures[future], ex))
+    return summaries
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Export bags recorded by the bag_log_node.')
+    parser.add_argument('paths', nargs='+',
+                        help='Bag directories or directories containing bags.')
+    parser.add_argument('-o', '--output', default='.',
+                        help='Directory where a directory per bag is created.')
+    parser.add_argument('--format', choices=[constants.EXPORT_FORMAT_NPZ,
+                                             constants.EXPORT_FORMAT_PARQUET],
+                        default=constants.EXPORT_FORMAT_NPZ,
+                        help='Format of the scalar columns. Parquet needs pyarrow.')
+    parser.add_argument('--frames', choices=[constants.EXPORT_FRAMES_JPEG,
+                                             constants.EXPORT_FRAMES_FILE],
+                        default=constants.EXPORT_FRAMES_JPEG,
+                        help='Write the frames as single image files or to one frames file '
+                             'per topic.')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='Number of worker processes for several bags.')
+    parsed = parser.parse_args(args)
+
+    if parsed.format == constants.EXPORT_FORMAT_PARQUET:
+        try:
+            importlib.import_module('pyarrow.parquet')
+        except ImportError:
+            parser.error('The parquet format needs pyarrow, e.g. pip3 install pyarrow')
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger = logging.getLogger('bag_exporter')
+    bag_paths = [bag_path for path in parsed.paths for bag_path in find_bags(path)]
+    if not bag_paths:
+        parser.error('No bags found in {}'.format(', '.join(parsed.paths)))
+
+    start = time.monotonic()
+    summaries = export_bags(bag_paths, parsed.output, parsed.format, parsed.frames,
+                            parsed.jobs, logger)
+    for summary in summaries:
+        logger.info('{} -> {} ({} messages in {:.2f}s)'.format(
+            summary['bag'], summary['directory'], summary['messages'], summary['time']))
+        for topic, outputs in summary['topics'].items():
+            logger.info('  {}: {}'.format(topic, ', '.join(outputs)))
+    logger.info('Exported {} of {} bags in {:.2f}s'.format(
+        len(summaries), len(bag_paths), time.monotonic() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright AWS DeepRacer Community. All Rights Reserved.                     #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+
+"""
+bag_latency_report.py
+
+Command line report of the latency of every stage of the autonomous driving pipeline, from
+the PipelineStampMsg stamps recorded by the bag_log_node. Add the /pipeline_trace topic to
+the log_topics parameter to record them; the stages only publish their stamps while the
+topic has subscribers.
+
+The camera, sensor fusion, inference, navigation and servo stages stamp the time they
+finished processing a traced camera frame, identified by its capture timestamp. For every
+frame the latency of a stage is measured from the previous stamped stage of the frame, or
+from the capture for the first one, and the end-to-end latency from the capture to the last
+stamped stage. The report lists the number of samples, the mean, the exact 50th, 95th and
+99th percentiles and the maximum of every stage, in milliseconds, and the share of the
+end-to-end mean spent in each stage.
+
+Usage:
+    bag_latency_report /opt/aws/deepracer/logs/deepracer-20240101-120000
+    bag_latency_report /media/usb/logs --json
+"""
+
+import argparse
+import json
+import logging
+from array import array
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+import rosbag2_py
+from rclpy.serialization import deserialize_message
+
+import logging_pkg.constants as constants
+from logging_pkg.bag_exporter import find_bags, get_message_class, open_reader
+
+
+def stamp_to_ns(stamp) -> int:
+    return stamp.sec * 1000000000 + stamp.nanosec
+
+
+def read_frames(bag_path: str) -> Dict[int, Dict[str, int]]:
+    """
+    Reads the pipeline stamps of a bag.
+
+    Returns:
+        Dict[int, Dict[str, int]]: The stamp in nanoseconds of every stage per frame, keyed
+                                   by the capture timestamp of the frame in nanoseconds.
+    """
+    reader = open_reader(bag_path)
+    topics = [topic.name for topic in reader.get_all_topics_and_types()
+              if topic.type == constants.PIPELINE_STAMP_MESSAGE_TYPE]
+    frames = defaultdict(dict)
+    if not topics:
+        return frames
+    reader.set_filter(rosbag2_py.StorageFilter(topics=topics))
+    message_class = get_message_class(constants.PIPELINE_STAMP_MESSAGE_TYPE)
+    while reader.has_next():
+        _, data, _ = reader.read_next()
+        msg = deserialize_message(data, message_class)
+        frames[stamp_to_ns(msg.source_stamp)][msg.stage] = stamp_to_ns(msg.stamp)
+    return frames
+
+
+def summarize(name: str, latencies: array) -> dict:
+    """
+    Returns the statistics in milliseconds of the latencies of a stage.
+    """
+    values = np.frombuffer(latencies, dtype=np.float64) if len(latencies) else np.zeros(0)
+    summary = {'stage': name, 'count': len(values)}
+    if len(values):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary.update({'mean': float(values.mean()), 'p50': float(p50), 'p95': float(p95),
+                        'p99': float(p99), 'max': float(values.max())})
+    else:
+        summary.update({'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0})
+    return summary
+
+
+def compute_breakdown(frames: Dict[int, Dict[str, int]]) -> dict:
+    """
+    Computes the latency statistics of every stage and the end-to-end latency of the frames.
+
+    Args:
+        frames (Dict[int, Dict[str, int]]): The stamps per frame returned by read_frames.
+
+    Returns:
+        dict: The number of frames and of frames stamped by every stage, the statistics
+              per stage in the order of the pipeline and the end-to-end statistics.
+    """
+    seen_stages = {stage for stamps in frames.values() for stage in stamps}
+    # Stages unknown to this version are reported after the known ones.
+    stages = [stage for stage in constants.PIPELINE_STAGES if stage in seen_stages] + \
+        sorted(seen_stages.difference(constants.PIPELINE_STAGES))
+    latencies = {stage: array('d') for stage in stages}
+    end_to_end = array('d')
+    complete_frames = 0
+    for source_ns, stamps in frames.items():
+        previous_ns = source_ns
+        for stage in stages:
+            stamp_ns = stamps.get(stage)
+            if stamp_ns is None:
+                continue
+            latencies[stage].append(max(0, stamp_ns - previous_ns) / 1.0e6)
+            previous_ns = stamp_ns
+        end_to_end.append((previous_ns - source_ns) / 1.0e6)
+        if len(stamps) == len(stages):
+            complete_frames += 1
+
+    total = summarize('end_to_end', end_to_end)
+    breakdown = [summarize(stage, latencies[stage]) for stage in stages]
+    for summary in breakdown:
+        # Mean latency of the stage per frame, relative to the end-to-end mean.
+        summary['share'] = 100.0 * summary['mean'] * summary['count'] / \
+            (total['mean'] * total['count']) if total['mean'] else 0.0
+    return {'frames': len(frames), 'complete_frames': complete_frames,
+            'stages': breakdown, 'end_to_end': total}
+
+
+def format_breakdown(bag_path: str, breakdown: dict) -> List[str]:
+    """
+    Formats the breakdown of a bag as a text table.
+    """
+    lines = ['{}: {} traced frames, {} stamped by all {} stages'.format(
+        bag_path, breakdown['frames'], breakdown['complete_frames'], len(breakdown['stages']))]
+    if not breakdown['frames']:
+        return lines
+    row = '  {:<14} {:>7} {:>8} {:>8} {:>8} {:>8} {:>8} {:>7}'
+    lines.append(row.format('stage', 'count', 'mean', 'p50', 'p95', 'p99', 'max', 'share'))
+    for summary in breakdown['stages'] + [breakdown['end_to_end']]:
+        share = '{:.1f}%'.format(summary['share']) if 'share' in summary else ''
+        lines.append(row.format(summary['stage'], summary['count'],
+                                *['{:.2f}'.format(summary[key])
+                                  for key in ('mean', 'p50', 'p95', 'p99', 'max')],
+                                share))
+    return lines
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Report the per-stage pipeline latency of bags recorded by the '
+                    'bag_log_node.')
+    parser.add_argument('paths', nargs='+',
+                        help='Bag directories or directories containing bags.')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the breakdown of every bag as JSON.')
+    parsed = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger = logging.getLogger('bag_latency_report')
+    bag_paths = [bag_path for path in parsed.paths for bag_path in find_bags(path)]
+    if not bag_paths:
+        parser.error('No bags found in {}'.format(', '.join(parsed.paths)))
+
+    breakdowns = {}
+    for bag_path in bag_paths:
+        try:
+            breakdowns[bag_path] = compute_breakdown(read_frames(bag_path))
+        except Exception as ex:
+            logger.error('Failed to read {}: {}'.format(bag_path, ex))
+    if parsed.json:
+        print(json.dumps(breakdowns, indent=2))
+        return
+    for bag_path, breakdown in breakdowns.items():
+        for line in format_breakdown(bag_path, breakdown):
+            logger.info(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,7 @@
 
 import logging
 import importlib
+import json
 import sys
 import time
 import os
@@ -43,7 +44,11 @@ from deepracer_interfaces_pkg.srv import USBFileSystemSubscribeSrv, USBMountPoin
 from deepracer_interfaces_pkg.msg import USBFileSystemNotificationMsg
 
 import logging_pkg.constants as constants
-from logging_pkg.constants import RecordingState, NodeState, LoggingMode
+from logging_pkg.constants import (RecordingState, NodeState, LoggingMode, CompressionMode,
+                                   DropPolicy)
+from logging_pkg.bag_storage import BagStorageConfig, create_storage_options, create_writer
+from logging_pkg.bag_write_queue import BagWriteQueue
+from logging_pkg.preroll_buffer import PrerollBuffer
 
 
 class BagLogNode(Node):
@@ -62,6 +67,8 @@ class BagLogNode(Node):
         _topics_type_info (List[Tuple[str, TopicEndpointInfo]]): A list of topic names and their type information.
         _topics_to_scan (List[str]): A list of topics to scan for.
         _bag_lock (Lock): A lock to ensure thread safety when accessing the rosbag2 file.
+        _write_queue (BagWriteQueue): The queue between the subscriptions and the writer thread.
+        _preroll (PrerollBuffer): The messages received while not recording.
 
     """
     _shutdown = Event()
@@ -96,6 +103,32 @@ class BagLogNode(Node):
         - monitor_topic_timeout (int): The timeout duration for the monitor topic in seconds. Default is 1.
         - log_topics (list of str): The list of topics to log. Default is ['/ctrl_pkg/servo_msg'].
         - logging_provier (str): The logging provider to use. Default is 'sqlite3'.
+        - max_bagfile_size (int): Size in bytes after which a new bag file is started. Default is
+          defined in constants.DEFAULT_MAX_BAGFILE_SIZE, 0 disables splitting by size.
+        - max_bagfile_duration (int): Duration in seconds after which a new bag file is started.
+          Default is 0, which disables splitting by duration.
+        - max_cache_size (int): Size in bytes of the write cache. Default is 0, which selects the
+          provider default defined in constants.STORAGE_DEFAULT_CACHE_SIZE.
+        - storage_preset_profile (str): Preset of the storage provider, e.g. 'fastwrite'.
+          Default is ''.
+        - compression_mode (str): Compression of the bag, 'none', 'file' or 'message'.
+          Default is 'none'.
+        - compression_format (str): Compression plugin to use. Default is 'zstd'.
+        - write_queue_size (int): Number of messages queued per topic for the writer thread.
+          Default is defined in constants.WRITE_QUEUE_DEFAULT_SIZE.
+        - write_batch_size (int): Maximum number of messages written in one batch. Default is
+          defined in constants.WRITE_QUEUE_DEFAULT_BATCH_SIZE.
+        - drop_policies (list of str): Drop policy per topic as 'topic=policy', the policy
+          being 'drop_oldest', 'drop_newest' or 'block'. Default is defined in
+          constants.DEFAULT_DROP_POLICIES.
+        - default_drop_policy (str): Drop policy of the other topics. Default is 'drop_oldest'.
+        - preroll_duration (float): Seconds of messages received before the recording starts
+          that are written to the new bag. Default is defined in
+          constants.DEFAULT_PREROLL_DURATION, 0 disables the pre-roll.
+        - preroll_max_size (int): Size in bytes of the pre-roll buffer of each topic. Default is
+          defined in constants.DEFAULT_PREROLL_MAX_SIZE.
+        - preroll_topic_max_sizes (list of str): Size of the pre-roll buffer per topic as
+          'topic=bytes'. Default is defined in constants.DEFAULT_PREROLL_TOPIC_MAX_SIZES.
 
         Sets:
         - self._output_path (str): The resolved output path for logs.
@@ -108,6 +141,9 @@ class BagLogNode(Node):
         - self._monitor_last_received (Time): The timestamp of the last received monitor message.
         - self._log_topics (list of str): The resolved list of topics to log.
         - self._logging_provider (str): The resolved logging provider.
+        - self._storage_config (BagStorageConfig): The storage settings of the bags.
+        - self._write_queue (BagWriteQueue): The write queue of the subscribed topics.
+        - self._preroll (PrerollBuffer): The pre-roll buffer of the subscribed topics.
         - self._topics_to_scan (list of str): The list of topics to scan, excluding the monitor topic.
         - self._bag_name (str): The default bag name defined in constants.
         """
@@ -155,6 +191,75 @@ class BagLogNode(Node):
             ParameterDescriptor(type=ParameterType.PARAMETER_STRING))
         self._logging_provider = self.get_parameter('logging_provider').value
 
+        self.declare_parameter(
+            'max_bagfile_size', constants.DEFAULT_MAX_BAGFILE_SIZE,
+            ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter(
+            'max_bagfile_duration', constants.DEFAULT_MAX_BAGFILE_DURATION,
+            ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter(
+            'max_cache_size', 0,
+            ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter(
+            'storage_preset_profile', '',
+            ParameterDescriptor(type=ParameterType.PARAMETER_STRING))
+        self.declare_parameter(
+            'compression_mode', 'none',
+            ParameterDescriptor(type=ParameterType.PARAMETER_STRING))
+        self.declare_parameter(
+            'compression_format', constants.DEFAULT_COMPRESSION_FORMAT,
+            ParameterDescriptor(type=ParameterType.PARAMETER_STRING))
+        self._storage_config = BagStorageConfig(
+            storage_id=self._logging_provider,
+            max_bagfile_size=self.get_parameter('max_bagfile_size').value,
+            max_bagfile_duration=self.get_parameter('max_bagfile_duration').value,
+            max_cache_size=self.get_parameter('max_cache_size').value,
+            storage_preset_profile=self.get_parameter('storage_preset_profile').value,
+            compression_mode=CompressionMode(self.get_parameter('compression_mode').value),
+            compression_format=self.get_parameter('compression_format').value)
+
+        self.declare_parameter(
+            'write_queue_size', constants.WRITE_QUEUE_DEFAULT_SIZE,
+            ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter(
+            'write_batch_size', constants.WRITE_QUEUE_DEFAULT_BATCH_SIZE,
+            ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter(
+            'drop_policies', constants.DEFAULT_DROP_POLICIES,
+            ParameterDescriptor(type=ParameterType.PARAMETER_STRING_ARRAY))
+        self.declare_parameter(
+            'default_drop_policy', constants.DEFAULT_DROP_POLICY,
+            ParameterDescriptor(type=ParameterType.PARAMETER_STRING))
+        drop_policies = {}
+        for topic_policy in self.get_parameter('drop_policies').value:
+            topic, policy = topic_policy.rsplit('=', 1)
+            drop_policies[topic.strip()] = DropPolicy(policy.strip())
+        self._write_queue = BagWriteQueue(
+            self.get_logger(), self._write_batch,
+            capacity=self.get_parameter('write_queue_size').value,
+            batch_size=self.get_parameter('write_batch_size').value,
+            policies=drop_policies,
+            default_policy=DropPolicy(self.get_parameter('default_drop_policy').value),
+            flush_interval=constants.WRITE_QUEUE_FLUSH_INTERVAL)
+
+        self.declare_parameter(
+            'preroll_duration', constants.DEFAULT_PREROLL_DURATION,
+            ParameterDescriptor(type=ParameterType.PARAMETER_DOUBLE))
+        self.declare_parameter(
+            'preroll_max_size', constants.DEFAULT_PREROLL_MAX_SIZE,
+            ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter(
+            'preroll_topic_max_sizes', constants.DEFAULT_PREROLL_TOPIC_MAX_SIZES,
+            ParameterDescriptor(type=ParameterType.PARAMETER_STRING_ARRAY))
+        preroll_topic_max_sizes = {}
+        for topic_size in self.get_parameter('preroll_topic_max_sizes').value:
+            topic, size = topic_size.rsplit('=', 1)
+            preroll_topic_max_sizes[topic.strip()] = int(size)
+        self._preroll = PrerollBuffer(self.get_parameter('preroll_duration').value,
+                                      self.get_parameter('preroll_max_size').value,
+                                      preroll_topic_max_sizes,
+                                      constants.PREROLL_MAX_MESSAGES)
+
         self._topics_to_scan += self._log_topics
         if self._topics_to_scan.count(self._monitor_topic) > 0:
             self._topics_to_scan.remove(self._monitor_topic)
@@ -194,6 +299,7 @@ class BagLogNode(Node):
 
         self.get_logger().info('Node started. Mode \'{}\'. Provider \'{}\'. Monitor \'{}\'. Additionally logging {}.'
                                .format(self._logging_mode.name, self._logging_provider, self._monitor_topic, str(self._topics_to_scan)))
+        self.get_logger().info('Storage: {}.'.format(self._storage_config.describe()))
 
         # Create a subscription to the file name topic
         self._file_name_sub = self.create_subscription(String, self._file_name_topic,
@@ -202,6 +308,12 @@ class BagLogNode(Node):
         self._stop_logging_svc = self.create_service(Trigger, 'stop_logging',
                                                      self._stop_logging_cb, callback_group=self._main_cbg)
 
+        # Writer thread draining the write queue into the open bag.
+        self._write_queue.start()
+        self._write_queue_stats_svc = self.create_service(Trigger, 'write_queue_stats',
+                                                          self._write_queue_stats_cb,
+                                                          callback_group=self._main_cbg)
+
         if not self._disable_usb_monitor:
             # Client to USB File system subscription service that allows the node to add the "models"
             # folder to the watchlist. The usb_monitor_node will trigger notification if it finds
@@ -251,6 +363,7 @@ class BagLogNode(Node):
         The method performs the following actions:
         - Logs the reason for stopping the node.
         - Stops the bag recording if it is running.
+        - Stops the writer thread.
         - Sets the shutdown event.
         - Destroys the change_gc object.
         - Destroys the timeout check timer if it exists.
@@ -265,6 +378,7 @@ class BagLogNode(Node):
         try:
             if self._target_edit_state == RecordingState.Running:
                 self._stop_bag()
+            self._write_queue.stop(constants.WRITE_QUEUE_STOP_TIMEOUT)
 
             self._shutdown.set()
             self._change_gc.destroy()
@@ -371,6 +485,23 @@ class BagLogNode(Node):
             res.message = f"Failed to stop logging: {e}"
             return res
 
+    def _write_queue_stats_cb(self, req: Trigger.Request,
+                              res: Trigger.Response) -> Trigger.Response:
+        """
+        Callback function to handle the write queue statistics service request.
+
+        Args:
+            req (Trigger.Request): The request message.
+            res (Trigger.Response): The response message.
+
+        Returns:
+            res (Trigger.Response): The response message with the queued, written and dropped
+                                    messages and the maximum queue depth per topic as JSON.
+        """
+        res.success = True
+        res.message = json.dumps(self._write_queue.get_stats())
+        return res
+
 
     def _scan_for_topics_cb(self):
         """
@@ -464,22 +595,24 @@ class BagLogNode(Node):
             qos_profile=topic_sub_qos,
             callback_group=self._main_cbg, raw=True))
         self._topics_type_info.append((topic_name, topic_endpoint))
+        self._write_queue.add_topic(topic_name)
+        self._preroll.add_topic(topic_name)
 
     def _receive_topic_callback(self, msg, topic: str):
         """
         Callback function to handle incoming messages on subscribed topics.
 
         This function is called whenever a message is received on any of the subscribed topics.
-        It logs the reception of the message, updates the monitoring state, and writes the message
-        to the bag file if recording is active.
+        It logs the reception of the message, updates the monitoring state, and queues the message
+        for the writer thread if recording is active. Otherwise the message is kept in the
+        pre-roll buffer.
 
         Args:
             msg: The message received from the topic.
             topic (str): The name of the topic on which the message was received.
 
         Raises:
-            Exception: If an error occurs during the processing of the message, it logs the error
-                       and ensures that any acquired locks are released.
+            Exception: If an error occurs during the processing of the message, it logs the error.
         """
         try:
             if self.get_logger().is_enabled_for(LoggingSeverity.DEBUG):
@@ -501,16 +634,31 @@ class BagLogNode(Node):
 
             # Check that we are running and that bag is open.
             if self._target_edit_state == RecordingState.Running and self._bag_writer is not None:
-                self._bag_lock.acquire()
-                self._bag_writer.write(topic, msg, time_recv.nanoseconds)
-                self._bag_lock.release()
+                self._write_queue.push(topic, msg, time_recv.nanoseconds)
+            else:
+                self._preroll.push(topic, msg, time_recv.nanoseconds)
 
         except Exception as e:  # noqa E722
-            if self._bag_lock.locked():
-                self._bag_lock.release()
             self.get_logger().error(traceback.format_stack())
             self.get_logger().error("Exception occurred in _receive_topic_callback: {}".format(e))
 
+    def _write_batch(self, batch) -> int:
+        """
+        Writes a batch of queued messages to the open bag. Called from the writer thread.
+
+        Args:
+            batch (list of tuple): The (topic, serialized message, timestamp) entries.
+
+        Returns:
+            int: The number of messages written, 0 if no bag is open.
+        """
+        with self._bag_lock:
+            if self._bag_writer is None:
+                return 0
+            for topic, msg, timestamp in batch:
+                self._bag_writer.write(topic, msg, timestamp)
+            return len(batch)
+
     def _timeout_check_timer_cb(self):
         """
         Callback function for the timeout check timer.
@@ -565,6 +713,10 @@ class BagLogNode(Node):
         serialization and storage options, and opens a new bag file. It also creates topics 
         in the bag based on the provided topic type information.
 
+        The bag is split into several files according to the size and duration limits and
+        optionally compressed, as configured in the storage settings. The messages held in
+        the pre-roll buffer are written first, with their original receive times.
+
         Raises:
             Exception: If any error occurs during the process, it logs the error and releases 
                        the lock if it is held.
@@ -588,14 +740,22 @@ class BagLogNode(Node):
                 input_serialization_format=serialization_format,
                 output_serialization_format=serialization_format)
 
-            storage_options = rosbag2_py.StorageOptions(uri=bag_path, storage_id=self._logging_provider)
+            storage_options = create_storage_options(bag_path, self._storage_config)
 
-            self._bag_writer = rosbag2_py.SequentialWriter()
+            self._bag_writer = create_writer(self._storage_config)
             self._bag_writer.open(storage_options, converter_options)
 
             for topic_type_info in self._topics_type_info:
                 self.create_topic(self._bag_writer, topic_type_info[0], topic_type_info[1])
 
+            if self._preroll.enabled:
+                preroll_count = 0
+                now = self.get_clock().now().nanoseconds
+                for topic, msg, timestamp in self._preroll.drain(now):
+                    self._bag_writer.write(topic, msg, timestamp)
+                    preroll_count += 1
+                self.get_logger().info("Wrote {} pre-roll messages.".format(preroll_count))
+
             self._bag_lock.release()
         except:  # noqa E722
             self.get_logger().error("{} occurred in _start_bag.".format(sys.exc_info()[1]))
@@ -604,12 +764,19 @@ class BagLogNode(Node):
 
     def _stop_bag(self):
         """
-        Stops the bag logging process by setting the bag writer to None.
-        This effectively stops any further data from being written to the bag.
+        Stops the bag logging process by setting the bag writer to None once the queued
+        messages are written. This effectively stops any further data from being written
+        to the bag.
         """
+        if not self._write_queue.flush(constants.WRITE_QUEUE_STOP_TIMEOUT):
+            self.get_logger().warning("Timeout while writing the queued messages.")
+            self._write_queue.discard()
+
+        with self._bag_lock:
+            self._bag_writer = None
+            self._topic_counter = 0
 
-        self._bag_writer = None
-        self._topic_counter = 0
+        self.get_logger().info("Write queue: {}".format(self._write_queue.get_stats()['total']))
 
     def create_topic(self, writer, topic_name:str, topic_type_info: TopicEndpointInfo, serialization_format:str='cdr'):
         """
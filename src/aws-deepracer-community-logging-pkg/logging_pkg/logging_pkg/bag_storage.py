@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright AWS DeepRacer Community. All Rights Reserved.                     #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+bag_storage.py
+
+Helpers that build the rosbag2 writer used by the bag_log_node from its storage
+parameters: the storage provider, the bag splitting limits, the write cache size and
+the optional file or message compression.
+"""
+
+import rosbag2_py
+
+import logging_pkg.constants as constants
+from logging_pkg.constants import CompressionMode
+
+
+class BagStorageConfig:
+    """
+    Storage settings of the bags written by the bag_log_node.
+
+    Attributes:
+        storage_id (str): The rosbag2 storage plugin, `sqlite3` or `mcap`.
+        max_bagfile_size (int): Size in bytes after which a new bag file is started, 0 disables.
+        max_bagfile_duration (int): Duration in seconds after which a new bag file is started,
+                                    0 disables.
+        max_cache_size (int): Size in bytes of the write cache, 0 selects the provider default.
+        storage_preset_profile (str): Storage plugin preset, e.g. `fastwrite` for mcap.
+        compression_mode (CompressionMode): Compress nothing, every bag file or every message.
+        compression_format (str): The compression plugin, e.g. `zstd`.
+    """
+    def __init__(self, storage_id: str = 'sqlite3', max_bagfile_size: int = 0,
+                 max_bagfile_duration: int = 0, max_cache_size: int = 0,
+                 storage_preset_profile: str = '',
+                 compression_mode: CompressionMode = CompressionMode.Off,
+                 compression_format: str = constants.DEFAULT_COMPRESSION_FORMAT):
+        self.storage_id = storage_id
+        self.max_bagfile_size = max_bagfile_size
+        self.max_bagfile_duration = max_bagfile_duration
+        self.max_cache_size = max_cache_size
+        self.storage_preset_profile = storage_preset_profile
+        self.compression_mode = compression_mode
+        self.compression_format = compression_format
+
+    @property
+    def cache_size(self) -> int:
+        """
+        Returns the write cache size in bytes, resolving 0 to the default of the provider.
+        """
+        if self.max_cache_size > 0:
+            return self.max_cache_size
+        return constants.STORAGE_DEFAULT_CACHE_SIZE.get(self.storage_id, 0)
+
+    def describe(self) -> str:
+        """
+        Returns a short description of the storage settings for the log.
+        """
+        compression = 'uncompressed' if self.compression_mode == CompressionMode.Off else \
+            '{} {} compression'.format(self.compression_format, self.compression_mode.name.lower())
+        return '{}{}, split at {} bytes / {} s, {} bytes cache, {}'.format(
+            self.storage_id,
+            ' ({})'.format(self.storage_preset_profile) if self.storage_preset_profile else '',
+            self.max_bagfile_size, self.max_bagfile_duration, self.cache_size, compression)
+
+
+def create_storage_options(bag_path: str, config: BagStorageConfig) -> rosbag2_py.StorageOptions:
+    """
+    Creates the rosbag2 storage options for a new bag.
+
+    Args:
+        bag_path (str): The directory of the bag.
+        config (BagStorageConfig): The storage settings.
+
+    Returns:
+        rosbag2_py.StorageOptions: The storage options.
+    """
+    return rosbag2_py.StorageOptions(uri=bag_path,
+                                     storage_id=config.storage_id,
+                                     max_bagfile_size=config.max_bagfile_size,
+                                     max_bagfile_duration=config.max_bagfile_duration,
+                                     max_cache_size=config.cache_size,
+                                     storage_preset_profile=config.storage_preset_profile)
+
+
+def create_writer(config: BagStorageConfig):
+    """
+    Creates the sequential writer for the storage settings. A compression writer is
+    returned if file or message compression is enabled.
+
+    Args:
+        config (BagStorageConfig): The storage settings.
+
+    Returns:
+        rosbag2_py.SequentialWriter or rosbag2_py.SequentialCompressionWriter: The writer,
+            not yet opened.
+    """
+    if config.compression_mode == CompressionMode.Off:
+        return rosbag2_py.SequentialWriter()
+
+    mode = rosbag2_py.CompressionMode.FILE if config.compression_mode == CompressionMode.File \
+        else rosbag2_py.CompressionMode.MESSAGE
+    compression_options = rosbag2_py.CompressionOptions(
+        compression_format=config.compression_format,
+        compression_mode=mode,
+        compression_queue_size=constants.COMPRESSION_QUEUE_SIZE,
+        compression_threads=constants.COMPRESSION_THREADS)
+    return rosbag2_py.SequentialCompressionWriter(compression_options)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright AWS DeepRacer Community. All Rights Reserved.                     #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+bag_write_queue.py
+
+The write queue decouples the subscription callbacks of the bag_log_node from the storage.
+The callbacks push the raw serialized messages into a bounded ring per topic and return
+immediately; a dedicated writer thread drains the rings in batches and writes them to the
+bag. When a ring is full the drop policy of its topic decides whether the oldest message
+is overwritten, the new message is dropped or the callback waits for the writer.
+"""
+
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from logging_pkg.constants import DropPolicy
+
+
+class TopicRing:
+    """
+    Preallocated ring of the raw messages of one topic waiting to be written.
+
+    Attributes:
+        policy (DropPolicy): What to do when a message arrives while the ring is full.
+        queued (int): Number of messages accepted into the ring.
+        written (int): Number of messages written to the bag.
+        dropped (int): Number of messages dropped because the ring was full or no bag was open.
+        max_depth (int): Maximum number of messages waiting in the ring.
+    """
+    def __init__(self, capacity: int, policy: DropPolicy):
+        self.policy = policy
+        self._capacity = capacity
+        self._data = [None] * capacity
+        self._stamps = [0] * capacity
+        self._head = 0
+        self.count = 0
+
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def is_full(self) -> bool:
+        return self.count == self._capacity
+
+    def push(self, data, timestamp: int) -> bool:
+        """
+        Adds a message to the ring, overwriting the oldest one if the ring is full and the
+        policy is DropOldest.
+
+        Returns:
+            bool: True if the message was added.
+        """
+        if self.count == self._capacity:
+            if self.policy != DropPolicy.DropOldest:
+                self.dropped += 1
+                return False
+            self._data[self._head] = None
+            self._head = (self._head + 1) % self._capacity
+            self.count -= 1
+            self.dropped += 1
+
+        tail = (self._head + self.count) % self._capacity
+        self._data[tail] = data
+        self._stamps[tail] = timestamp
+        self.count += 1
+        self.queued += 1
+        if self.count > self.max_depth:
+            self.max_depth = self.count
+        return True
+
+    def clear(self):
+        """
+        Drops all messages of the ring.
+        """
+        self.dropped += self.count
+        self._data = [None] * self._capacity
+        self._head = 0
+        self.count = 0
+
+    def pop_into(self, topic: str, batch: List[Tuple[str, object, int]], limit: int):
+        """
+        Moves up to limit of the oldest messages to the batch.
+        """
+        for _ in range(min(limit, self.count)):
+            batch.append((topic, self._data[self._head], self._stamps[self._head]))
+            self._data[self._head] = None
+            self._head = (self._head + 1) % self._capacity
+            self.count -= 1
+
+
+class BagWriteQueue:
+    """
+    Bounded per-topic write queue drained by a dedicated writer thread.
+
+    The lock of the queue only protects the ring indices and counters; the storage is
+    written by the writer thread without holding it, so a slow SD card never blocks the
+    subscription callbacks of topics that are allowed to drop messages.
+    """
+    def __init__(self, logger, write_cb: Callable[[List[Tuple[str, object, int]]], int],
+                 capacity: int, batch_size: int, policies: Dict[str, DropPolicy],
+                 default_policy: DropPolicy, flush_interval: float):
+        """
+        Creates the write queue. The writer thread is started with start().
+
+        Args:
+            logger: The logger of the node.
+            write_cb (Callable): Function writing a batch of (topic, data, timestamp) entries,
+                                 returning the number of entries that were written.
+            capacity (int): Number of messages each topic ring can hold.
+            batch_size (int): Maximum number of messages written in one batch.
+            policies (Dict[str, DropPolicy]): Drop policy per topic name.
+            default_policy (DropPolicy): Drop policy of the topics not listed in policies.
+            flush_interval (float): Maximum time in seconds a message waits for a batch.
+        """
+        self._logger = logger
+        self._write_cb = write_cb
+        self._capacity = capacity
+        self._batch_size = batch_size
+        self._policies = policies
+        self._default_policy = default_policy
+        self._flush_interval = flush_interval
+
+        self._rings: Dict[str, TopicRing] = {}
+        self._ring_order: List[str] = []
+        self._next_ring = 0
+        self._depth = 0
+        self._max_depth = 0
+        self._in_flight = 0
+        self._running = False
+        self._thread = None
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def add_topic(self, topic: str):
+        """
+        Creates the ring of a topic.
+
+        Args:
+            topic (str): The name of the topic.
+        """
+        with self._lock:
+            if topic not in self._rings:
+                policy = self._policies.get(topic, self._default_policy)
+                self._rings[topic] = TopicRing(self._capacity, policy)
+                self._ring_order.append(topic)
+                self._logger.info('Write queue for {}: {} messages, {}.'
+                                  .format(topic, self._capacity, policy.name))
+
+    def start(self):
+        """
+        Starts the writer thread.
+        """
+        with self._lock:
+            self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name='bag_writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Writes the queued messages and stops the writer thread.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the queued messages to be
+                                       written in seconds. Defaults to None.
+        """
+        self.flush(timeout)
+        with self._lock:
+            self._running = False
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def push(self, topic: str, data, timestamp: int) -> bool:
+        """
+        Queues a raw serialized message. Topics with the Block policy wait for the writer
+        while their ring is full.
+
+        Args:
+            topic (str): The name of the topic.
+            data: The serialized message.
+            timestamp (int): The receive time in nanoseconds.
+
+        Returns:
+            bool: True if the message was queued.
+        """
+        with self._lock:
+            ring = self._rings.get(topic)
+            if ring is None:
+                return False
+            if ring.policy == DropPolicy.Block:
+                while ring.is_full() and self._running:
+                    self._not_full.wait()
+            depth = ring.count
+            if not ring.push(data, timestamp):
+                return False
+            # Overwriting the oldest message of a full ring does not change the depth.
+            self._depth += ring.count - depth
+            if self._depth == 1:
+                self._not_empty.notify()
+            if self._depth > self._max_depth:
+                self._max_depth = self._depth
+            return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until all queued messages are written.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None.
+
+        Returns:
+            bool: True if the queue is empty.
+        """
+        with self._lock:
+            self._not_empty.notify()
+            return self._not_full.wait_for(
+                lambda: (self._depth == 0 and self._in_flight == 0) or not self._running,
+                timeout)
+
+    def discard(self):
+        """
+        Drops all queued messages, counting them as dropped.
+        """
+        with self._lock:
+            for ring in self._rings.values():
+                ring.clear()
+            self._depth = 0
+            self._not_full.notify_all()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the counters of the queue.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Counters per topic and the totals under 'total'.
+        """
+        with self._lock:
+            stats = {topic: {'queued': ring.queued, 'written': ring.written,
+                             'dropped': ring.dropped, 'max_depth': ring.max_depth,
+                             'depth': ring.count, 'policy': ring.policy.name}
+                     for topic, ring in self._rings.items()}
+            stats['total'] = {
+                'queued': sum(ring.queued for ring in self._rings.values()),
+                'written': sum(ring.written for ring in self._rings.values()),
+                'dropped': sum(ring.dropped for ring in self._rings.values()),
+                'max_depth': self._max_depth,
+                'depth': self._depth}
+            return stats
+
+    def _take_batch(self) -> List[Tuple[str, object, int]]:
+        """
+        Moves the next batch out of the rings, starting with a different topic each time so
+        that a busy topic cannot starve the others. Must be called with the lock held.
+        """
+        batch = []
+        topic_count = len(self._ring_order)
+        for index in range(topic_count):
+            topic = self._ring_order[(self._next_ring + index) % topic_count]
+            self._rings[topic].pop_into(topic, batch, self._batch_size - len(batch))
+            if len(batch) == self._batch_size:
+                break
+        self._next_ring = (self._next_ring + 1) % max(topic_count, 1)
+        self._depth -= len(batch)
+        self._in_flight = len(batch)
+        return batch
+
+    def _writer_loop(self):
+        """
+        Body of the writer thread.
+        """
+        while True:
+            with self._lock:
+                if self._depth == 0 and self._running:
+                    self._not_empty.wait(self._flush_interval)
+                if self._depth == 0:
+                    if not self._running:
+                        return
+                    continue
+                batch = self._take_batch()
+                self._not_full.notify_all()
+
+            # Sort by time so that the batch of a slow and a fast topic stays in order.
+            batch.sort(key=lambda entry: entry[2])
+            try:
+                written = self._write_cb(batch)
+            except Exception as ex:
+                self._logger.error('Failed to write {} messages: {}'.format(len(batch), ex))
+                written = 0
+
+            with self._lock:
+                for topic, _, _ in batch[:written]:
+                    self._rings[topic].written += 1
+                for topic, _, _ in batch[written:]:
+                    self._rings[topic].dropped += 1
+                self._in_flight = 0
+                self._not_full.notify_all()
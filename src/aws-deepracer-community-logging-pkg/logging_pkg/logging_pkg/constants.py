@@ -35,6 +35,54 @@ PAUSE_AFTER_FORCE_STOP = 10.0
 # Naming
 DEFAULT_BAG_NAME = "deepracer"
 
+# Bag splitting, a new bag file is started once one of the limits is reached (0 disables).
+DEFAULT_MAX_BAGFILE_SIZE = 256 * 1024 * 1024  # bytes
+DEFAULT_MAX_BAGFILE_DURATION = 0  # seconds
+
+# Write cache per storage provider used when max_cache_size is 0. The cache batches the
+# sqlite3 inserts into one transaction and fills complete mcap chunks before writing.
+STORAGE_DEFAULT_CACHE_SIZE = {
+    "sqlite3": 1 * 1024 * 1024,
+    "mcap": 4 * 1024 * 1024
+}
+
+# Compression
+DEFAULT_COMPRESSION_FORMAT = "zstd"
+COMPRESSION_QUEUE_SIZE = 1
+COMPRESSION_THREADS = 1
+
+# Write queue between the subscriptions and the writer thread.
+WRITE_QUEUE_DEFAULT_SIZE = 30  # messages per topic, one second of camera frames
+WRITE_QUEUE_DEFAULT_BATCH_SIZE = 64  # messages written per batch
+WRITE_QUEUE_FLUSH_INTERVAL = 0.1  # seconds
+WRITE_QUEUE_STOP_TIMEOUT = 5.0  # seconds to write the queued messages when a bag is closed
+DEFAULT_DROP_POLICIES = ["/ctrl_pkg/servo_msg=block", "/inference_pkg/rl_results=drop_oldest"]
+DEFAULT_DROP_POLICY = "drop_oldest"
+
+# Pre-roll buffer holding the messages received before a recording starts.
+DEFAULT_PREROLL_DURATION = 5.0  # seconds, 0 disables the pre-roll
+DEFAULT_PREROLL_MAX_SIZE = 1 * 1024 * 1024  # bytes per topic
+DEFAULT_PREROLL_TOPIC_MAX_SIZES = ["/camera_pkg/display_mjpeg=33554432"]
+PREROLL_MAX_MESSAGES = 1024  # messages per topic
+
+# Bag exporter
+EXPORT_FORMAT_NPZ = "npz"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FRAMES_JPEG = "jpeg"
+EXPORT_FRAMES_FILE = "file"
+EXPORT_MESSAGE_TYPES = (
+    "deepracer_interfaces_pkg/msg/ServoCtrlMsg",
+    "deepracer_interfaces_pkg/msg/InferResultsArray",
+    "deepracer_interfaces_pkg/msg/CameraMsg",
+    "sensor_msgs/msg/CompressedImage",
+    "sensor_msgs/msg/Image"
+)
+
+# Bag latency report
+PIPELINE_STAMP_MESSAGE_TYPE = "deepracer_interfaces_pkg/msg/PipelineStampMsg"
+# Stages in the order of the pipeline, as the PipelineStampMsg STAGE_ values.
+PIPELINE_STAGES = ["camera", "sensor_fusion", "preprocess", "inference", "navigation", "servo"]
+
 class RecordingState(IntEnum):
     """ Color to RGB mapping
     Extends:
@@ -70,3 +118,37 @@ class LoggingMode(Enum):
         for member in cls:
             if member.name.lower() == name_.lower():
                 return member
+
+
+class CompressionMode(Enum):
+    """ Compression of the bag files
+    Extends:
+        Enum
+    """
+    Off = 0
+    File = 1
+    Message = 2
+
+    @classmethod
+    def _missing_(cls, name_):
+        if name_.lower() == "none":
+            return cls.Off
+        for member in cls:
+            if member.name.lower() == name_.lower():
+                return member
+
+
+class DropPolicy(Enum):
+    """ Handling of a message arriving while the write queue of its topic is full
+    Extends:
+        Enum
+    """
+    DropOldest = 0
+    DropNewest = 1
+    Block = 2
+
+    @classmethod
+    def _missing_(cls, name_):
+        for member in cls:
+            if member.name.lower() == name_.replace("_", "").lower():
+                return member
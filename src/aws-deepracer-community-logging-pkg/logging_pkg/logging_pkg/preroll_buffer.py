@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright AWS DeepRacer Community. All Rights Reserved.                     #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+preroll_buffer.py
+
+The pre-roll buffer keeps the last seconds of raw serialized messages of every recorded
+topic while the bag_log_node is not recording, so that a new bag starts with the messages
+received before the recording was triggered.
+
+The messages of a topic are copied into one bytearray allocated when the topic is added,
+with their offsets, lengths and timestamps in preallocated integer arrays. Holding a
+camera pre-roll therefore does not allocate a Python object per frame.
+"""
+
+from array import array
+from threading import Lock
+from typing import Dict, Iterator, Tuple
+
+
+class TopicPreroll:
+    """
+    Circular byte arena holding the most recent messages of one topic.
+    """
+    def __init__(self, max_size: int, max_messages: int):
+        """
+        Allocates the arena and the index of the messages.
+
+        Args:
+            max_size (int): Size in bytes of the arena.
+            max_messages (int): Maximum number of messages held.
+        """
+        self._arena = bytearray(max_size)
+        self._view = memoryview(self._arena)
+        self._offsets = array('q', bytes(8 * max_messages))
+        self._lengths = array('q', bytes(8 * max_messages))
+        self._stamps = array('q', bytes(8 * max_messages))
+        self._max_messages = max_messages
+        self._head = 0
+        self._count = 0
+        self._write_pos = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._count
+
+    def _evict_oldest(self):
+        self._head = (self._head + 1) % self._max_messages
+        self._count -= 1
+        if self._count == 0:
+            self._write_pos = 0
+
+    def _find_space(self, length: int) -> int:
+        """
+        Returns the offset where a message of the given length fits without overwriting a
+        held message, or -1. Messages are never split, the unused end of the arena is
+        skipped when the write position wraps around.
+        """
+        if self._count == 0:
+            return 0
+        oldest = self._offsets[self._head]
+        if self._write_pos > oldest:
+            # Held messages in [oldest, write_pos), free space at the end and the start.
+            if self._write_pos + length <= len(self._arena):
+                return self._write_pos
+            return 0 if length <= oldest else -1
+        # Wrapped, held messages in [oldest, end) and [0, write_pos).
+        return self._write_pos if self._write_pos + length <= oldest else -1
+
+    def push(self, data, timestamp: int, min_timestamp: int):
+        """
+        Copies a message into the arena, evicting the messages older than min_timestamp
+        and as many of the oldest messages as needed to make room.
+
+        Args:
+            data (bytes): The serialized message.
+            timestamp (int): The receive time in nanoseconds.
+            min_timestamp (int): The receive time of the oldest message to keep.
+        """
+        length = len(data)
+        if length > len(self._arena):
+            self.dropped += 1
+            return
+
+        while self._count > 0 and self._stamps[self._head] < min_timestamp:
+            self._evict_oldest()
+        if self._count == self._max_messages:
+            self._evict_oldest()
+        offset = self._find_space(length)
+        while offset < 0:
+            self._evict_oldest()
+            offset = self._find_space(length)
+
+        self._view[offset:offset + length] = data
+        tail = (self._head + self._count) % self._max_messages
+        self._offsets[tail] = offset
+        self._lengths[tail] = length
+        self._stamps[tail] = timestamp
+        self._count += 1
+        self._write_pos = offset + length
+
+    def drain(self, min_timestamp: int) -> Iterator[Tuple[bytes, int]]:
+        """
+        Removes the messages from the buffer, oldest first.
+
+        Args:
+            min_timestamp (int): The receive time of the oldest message to return.
+
+        Yields:
+            Tuple[bytes, int]: The serialized message and its receive time in nanoseconds.
+        """
+        while self._count > 0:
+            offset = self._offsets[self._head]
+            timestamp = self._stamps[self._head]
+            data = bytes(self._view[offset:offset + self._lengths[self._head]])
+            self._evict_oldest()
+            if timestamp >= min_timestamp:
+                yield data, timestamp
+
+
+class PrerollBuffer:
+    """
+    Pre-roll buffers of all recorded topics.
+    """
+    def __init__(self, duration: float, max_size: int, topic_max_sizes: Dict[str, int],
+                 max_messages: int):
+        """
+        Creates the pre-roll buffer. The arena of a topic is allocated by add_topic.
+
+        Args:
+            duration (float): Seconds of messages kept before the recording starts, 0 disables.
+            max_size (int): Size in bytes of the arena of each topic.
+            topic_max_sizes (Dict[str, int]): Size in bytes of the arena per topic name,
+                                              overriding max_size.
+            max_messages (int): Maximum number of messages held per topic.
+        """
+        self._duration_ns = int(duration * 1e9)
+        self._max_size = max_size
+        self._topic_max_sizes = topic_max_sizes
+        self._max_messages = max_messages
+        self._topics: Dict[str, TopicPreroll] = {}
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._duration_ns > 0
+
+    def add_topic(self, topic: str):
+        """
+        Allocates the buffer of a topic.
+
+        Args:
+            topic (str): The name of the topic.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if topic not in self._topics:
+                self._topics[topic] = TopicPreroll(
+                    self._topic_max_sizes.get(topic, self._max_size), self._max_messages)
+
+    def push(self, topic: str, data, timestamp: int):
+        """
+        Keeps a message received while not recording.
+
+        Args:
+            topic (str): The name of the topic.
+            data (bytes): The serialized message.
+            timestamp (int): The receive time in nanoseconds.
+        """
+        with self._lock:
+            buffer = self._topics.get(topic)
+            if buffer is not None:
+                buffer.push(data, timestamp, timestamp - self._duration_ns)
+
+    def drain(self, now: int) -> Iterator[Tuple[str, bytes, int]]:
+        """
+        Removes the messages received within the pre-roll duration before now, all topics
+        merged in receive time order.
+
+        Args:
+            now (int): The current time in nanoseconds.
+
+        Returns:
+            Iterator[Tuple[str, bytes, int]]: The topic, serialized message and receive time.
+        """
+        with self._lock:
+            messages = [(topic, data, timestamp)
+                        for topic, buffer in self._topics.items()
+                        for data, timestamp in buffer.drain(now - self._duration_ns)]
+        messages.sort(key=lambda entry: entry[2])
+        return iter(messages)
+
+    def get_dropped(self) -> int:
+        """
+        Returns the number of messages that were larger than their buffer.
+        """
+        with self._lock:
+            return sum(buffer.dropped for buffer in self._topics.values())
@@ -19,6 +19,7 @@
 #include <iomanip>
 #include <sstream>
 #include <algorithm>
+#include <stdexcept>
 
 namespace logging_pkg {
 
@@ -35,6 +36,20 @@ BagLogNode::BagLogNode()
     this->declare_parameter<int>("monitor_topic_timeout", 15);
     this->declare_parameter<std::vector<std::string>>("log_topics", std::vector<std::string>{"/ctrl_pkg/servo_msg"});
     this->declare_parameter<std::string>("logging_provider", "sqlite3");
+    this->declare_parameter<int64_t>("max_bagfile_size", constants::DEFAULT_MAX_BAGFILE_SIZE);
+    this->declare_parameter<int64_t>("max_bagfile_duration", constants::DEFAULT_MAX_BAGFILE_DURATION);
+    this->declare_parameter<int64_t>("max_cache_size", 0);
+    this->declare_parameter<std::string>("storage_preset_profile", "");
+    this->declare_parameter<std::string>("compression_mode", "none");
+    this->declare_parameter<std::string>("compression_format", constants::DEFAULT_COMPRESSION_FORMAT);
+    this->declare_parameter<int64_t>("write_queue_size", constants::WRITE_QUEUE_DEFAULT_SIZE);
+    this->declare_parameter<int64_t>("write_batch_size", constants::WRITE_QUEUE_DEFAULT_BATCH_SIZE);
+    this->declare_parameter<std::vector<std::string>>("drop_policies", constants::DEFAULT_DROP_POLICIES);
+    this->declare_parameter<std::string>("default_drop_policy", constants::DEFAULT_DROP_POLICY);
+    this->declare_parameter<double>("preroll_duration", constants::DEFAULT_PREROLL_DURATION);
+    this->declare_parameter<int64_t>("preroll_max_size", constants::DEFAULT_PREROLL_MAX_SIZE);
+    this->declare_parameter<std::vector<std::string>>("preroll_topic_max_sizes",
+                                                      constants::DEFAULT_PREROLL_TOPIC_MAX_SIZES);
     
     // Get parameters
     output_path_ = this->get_parameter("output_path").as_string();
@@ -46,7 +61,57 @@ BagLogNode::BagLogNode()
     monitor_topic_timeout_ = this->get_parameter("monitor_topic_timeout").as_int();
     log_topics_ = this->get_parameter("log_topics").as_string_array();
     logging_provider_ = this->get_parameter("logging_provider").as_string();
+    max_bagfile_size_ = this->get_parameter("max_bagfile_size").as_int();
+    max_bagfile_duration_ = this->get_parameter("max_bagfile_duration").as_int();
+    max_cache_size_ = this->get_parameter("max_cache_size").as_int();
+    storage_preset_profile_ = this->get_parameter("storage_preset_profile").as_string();
+    compression_mode_ = this->get_parameter("compression_mode").as_string();
+    compression_format_ = this->get_parameter("compression_format").as_string();
+    std::transform(compression_mode_.begin(), compression_mode_.end(), compression_mode_.begin(), ::tolower);
+    if (compression_mode_ == "off") {
+        compression_mode_ = "none";
+    }
+    write_queue_size_ = this->get_parameter("write_queue_size").as_int();
+    write_batch_size_ = this->get_parameter("write_batch_size").as_int();
+    for (const auto& topic_policy : this->get_parameter("drop_policies").as_string_array()) {
+        auto separator = topic_policy.rfind('=');
+        if (separator == std::string::npos) {
+            throw std::invalid_argument("Invalid drop policy '" + topic_policy + "', expected topic=policy");
+        }
+        drop_policies_[topic_policy.substr(0, separator)] =
+            string_to_drop_policy(topic_policy.substr(separator + 1));
+    }
+    default_drop_policy_ = string_to_drop_policy(this->get_parameter("default_drop_policy").as_string());
+    preroll_duration_ = this->get_parameter("preroll_duration").as_double();
+    preroll_max_size_ = this->get_parameter("preroll_max_size").as_int();
+    for (const auto& topic_size : this->get_parameter("preroll_topic_max_sizes").as_string_array()) {
+        auto separator = topic_size.rfind('=');
+        if (separator == std::string::npos) {
+            throw std::invalid_argument("Invalid pre-roll size '" + topic_size + "', expected topic=bytes");
+        }
+        preroll_topic_max_sizes_[topic_size.substr(0, separator)] =
+            static_cast<size_t>(std::stoll(topic_size.substr(separator + 1)));
+    }
+    if (max_cache_size_ <= 0) {
+        auto default_cache_size = constants::STORAGE_DEFAULT_CACHE_SIZE.find(logging_provider_);
+        max_cache_size_ = default_cache_size != constants::STORAGE_DEFAULT_CACHE_SIZE.end() ?
+            default_cache_size->second : 0;
+    }
     
+    // Writer thread draining the write queue into the open bag
+    write_queue_ = std::make_unique<BagWriteQueue>(
+        this->get_logger(),
+        std::bind(&BagLogNode::write_batch, this, std::placeholders::_1),
+        static_cast<size_t>(std::max<int64_t>(write_queue_size_, 1)),
+        static_cast<size_t>(std::max<int64_t>(write_batch_size_, 1)),
+        drop_policies_, default_drop_policy_, constants::WRITE_QUEUE_FLUSH_INTERVAL);
+    write_queue_->start();
+
+    // Messages received while not recording, written at the start of the next bag
+    preroll_ = std::make_unique<PrerollBuffer>(
+        preroll_duration_, static_cast<size_t>(std::max<int64_t>(preroll_max_size_, 0)),
+        preroll_topic_max_sizes_, constants::PREROLL_MAX_MESSAGES);
+
     // Initialize state
     bag_name_ = constants::DEFAULT_BAG_NAME;
     monitor_last_received_ = this->now();
@@ -64,6 +129,11 @@ BagLogNode::BagLogNode()
                 "Node started. Mode '%s'. Provider '%s'. Monitor '%s'. Additionally logging %zu topics.",
                 logging_mode_str.c_str(), logging_provider_.c_str(), monitor_topic_.c_str(), 
                 topics_to_scan_.size());
+    RCLCPP_INFO(this->get_logger(),
+                "Storage: split at %ld bytes / %ld s, %ld bytes cache, compression '%s' (%s).",
+                static_cast<long>(max_bagfile_size_), static_cast<long>(max_bagfile_duration_),
+                static_cast<long>(max_cache_size_), compression_mode_.c_str(),
+                compression_format_.c_str());
 }
 
 BagLogNode::~BagLogNode()
@@ -75,6 +145,7 @@ BagLogNode::~BagLogNode()
     if (target_edit_state_ == RecordingState::RUNNING) {
         stop_bag();
     }
+    write_queue_->stop(constants::WRITE_QUEUE_STOP_TIMEOUT);
     
     topic_subscriptions_.clear();
     
@@ -111,6 +182,13 @@ void BagLogNode::setup_subscriptions_and_services()
         std::bind(&BagLogNode::stop_logging_cb, this, std::placeholders::_1, std::placeholders::_2),
         rclcpp::ServicesQoS(),
         main_cbg_);
+
+    // Create write queue statistics service
+    write_queue_stats_svc_ = this->create_service<std_srvs::srv::Trigger>(
+        "write_queue_stats",
+        std::bind(&BagLogNode::write_queue_stats_cb, this, std::placeholders::_1, std::placeholders::_2),
+        rclcpp::ServicesQoS(),
+        main_cbg_);
     
     // Setup USB monitoring if not disabled
     if (!disable_usb_monitor_) {
@@ -272,6 +350,8 @@ void BagLogNode::create_subscription_for_topic(const TopicInfo& topic_info)
     
     topic_subscriptions_[topic_info.name] = subscription;
     topics_type_info_.push_back(topic_info);
+    write_queue_->add_topic(topic_info.name);
+    preroll_->add_topic(topic_info.name);
 }
 
 void BagLogNode::receive_topic_callback(
@@ -297,10 +377,11 @@ void BagLogNode::receive_topic_callback(
             }
         }
         
-        // Write to bag if recording
+        // Queue for the writer thread if recording, otherwise keep in the pre-roll buffer
         if (target_edit_state_ == RecordingState::RUNNING && bag_writer_) {
-            std::lock_guard<std::mutex> lock(bag_lock_);
-            bag_writer_->write(msg, topic_name, topic_name, time_recv);
+            write_queue_->push(topic_name, msg, time_recv.nanoseconds());
+        } else {
+            preroll_->push(topic_name, msg, time_recv.nanoseconds());
         }
         
     } catch (const std::exception& e) {
@@ -308,6 +389,18 @@ void BagLogNode::receive_topic_callback(
     }
 }
 
+size_t BagLogNode::write_batch(const std::vector<QueuedMessage>& batch)
+{
+    std::lock_guard<std::mutex> lock(bag_lock_);
+    if (!bag_writer_) {
+        return 0;
+    }
+    for (const auto& entry : batch) {
+        bag_writer_->write(entry.data, entry.topic, entry.topic, rclcpp::Time(entry.timestamp));
+    }
+    return batch.size();
+}
+
 void BagLogNode::timeout_check_timer_cb()
 {
     try {
@@ -411,6 +504,17 @@ void BagLogNode::stop_logging_cb(
     }
 }
 
+void BagLogNode::write_queue_stats_cb(
+    const std::shared_ptr<std_srvs::srv::Trigger::Request> request,
+    std::shared_ptr<std_srvs::srv::Trigger::Response> response)
+{
+    (void)request;  // Unused
+
+    // Queued, written and dropped messages and the maximum queue depth per topic as JSON
+    response->success = true;
+    response->message = write_queue_->get_stats_json();
+}
+
 void BagLogNode::change_state()
 {
     if (!shutdown_) {
@@ -450,20 +554,45 @@ void BagLogNode::start_bag()
         rosbag2_storage::StorageOptions storage_options;
         storage_options.uri = bag_path;
         storage_options.storage_id = logging_provider_;
+        storage_options.max_bagfile_size = static_cast<uint64_t>(max_bagfile_size_);
+        storage_options.max_bagfile_duration = static_cast<uint64_t>(max_bagfile_duration_);
+        storage_options.max_cache_size = static_cast<uint64_t>(max_cache_size_);
+        storage_options.storage_preset_profile = storage_preset_profile_;
         
         // Setup converter options
         rosbag2_cpp::ConverterOptions converter_options;
         converter_options.input_serialization_format = "cdr";
         converter_options.output_serialization_format = "cdr";
         
-        // Create and open bag
-        bag_writer_ = std::make_unique<rosbag2_cpp::Writer>();
+        // Create and open bag, compressing the bag files or messages if enabled
+        if (compression_mode_ != "none") {
+            rosbag2_compression::CompressionOptions compression_options;
+            compression_options.compression_format = compression_format_;
+            compression_options.compression_mode =
+                rosbag2_compression::compression_mode_from_string(compression_mode_);
+            compression_options.compression_queue_size = constants::COMPRESSION_QUEUE_SIZE;
+            compression_options.compression_threads = constants::COMPRESSION_THREADS;
+            bag_writer_ = std::make_unique<rosbag2_cpp::Writer>(
+                std::make_unique<rosbag2_compression::SequentialCompressionWriter>(compression_options));
+        } else {
+            bag_writer_ = std::make_unique<rosbag2_cpp::Writer>();
+        }
         bag_writer_->open(storage_options, converter_options);
         
         // Create topics in bag
         for (const auto& topic_info : topics_type_info_) {
             create_topic_in_bag(topic_info);
         }
+
+        // Write the messages received before the recording started with their receive times
+        if (preroll_->enabled()) {
+            auto preroll_messages = preroll_->drain(this->now().nanoseconds());
+            for (const auto& entry : preroll_messages) {
+                bag_writer_->write(entry.data, entry.topic, entry.topic, rclcpp::Time(entry.timestamp));
+            }
+            RCLCPP_INFO(this->get_logger(), "Wrote %zu pre-roll messages, %lu too large for their buffer.",
+                        preroll_messages.size(), static_cast<unsigned long>(preroll_->get_dropped()));
+        }
         
         RCLCPP_INFO(this->get_logger(), "Started recording to %s", bag_path.c_str());
         
@@ -475,12 +604,22 @@ void BagLogNode::start_bag()
 
 void BagLogNode::stop_bag()
 {
-    std::lock_guard<std::mutex> lock(bag_lock_);
-    if (bag_writer_) {
-        RCLCPP_INFO(this->get_logger(), "Stopping bag recording.");
-        bag_writer_.reset();
-        topic_counter_ = 0;
+    // Write the queued messages before closing the bag.
+    if (!write_queue_->flush(constants::WRITE_QUEUE_STOP_TIMEOUT)) {
+        RCLCPP_WARN(this->get_logger(), "Timeout while writing the queued messages.");
+        write_queue_->discard();
     }
+
+    {
+        std::lock_guard<std::mutex> lock(bag_lock_);
+        if (bag_writer_) {
+            RCLCPP_INFO(this->get_logger(), "Stopping bag recording.");
+            bag_writer_.reset();
+            topic_counter_ = 0;
+        }
+    }
+
+    RCLCPP_INFO(this->get_logger(), "Write queue: %s", write_queue_->get_total_stats_json().c_str());
 }
 
 void BagLogNode::create_topic_in_bag(const TopicInfo& topic_info)
@@ -0,0 +1,305 @@
+//////////////////////////////////////////////////////////////////////////////////
+//   Copyright AWS DeepRacer Community. All Rights Reserved.                     //
+//                                                                               //
+//   Licensed under the Apache License, Version 2.0 (the "License").             //
+//   You may not use this file except in compliance with the License.            //
+//   You may obtain a copy of the License at                                     //
+//                                                                               //
+//       http://www.apache.org/licenses/LICENSE-2.0                              //
+//                                                                               //
+//   Unless required by applicable law or agreed to in writing, software         //
+//   distributed under the License is distributed on an "AS IS" BASIS,           //
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    //
+//   See the License for the specific language governing permissions and         //
+//   limitations under the License.                                              //
+//////////////////////////////////////////////////////////////////////////////////
+
+#include "logging_pkg/bag_write_queue.hpp"
+#include <algorithm>
+#include <sstream>
+#include <stdexcept>
+
+namespace logging_pkg {
+
+DropPolicy string_to_drop_policy(const std::string& policy_str)
+{
+    std::string name;
+    for (char c : policy_str) {
+        if (c != '_') {
+            name += static_cast<char>(::tolower(c));
+        }
+    }
+    if (name == "dropoldest") return DropPolicy::DROP_OLDEST;
+    if (name == "dropnewest") return DropPolicy::DROP_NEWEST;
+    if (name == "block") return DropPolicy::BLOCK;
+    throw std::invalid_argument("Unknown drop policy '" + policy_str + "'");
+}
+
+std::string drop_policy_to_string(DropPolicy policy)
+{
+    // Same names as the DropPolicy enum of the Python node.
+    switch (policy) {
+        case DropPolicy::DROP_OLDEST: return "DropOldest";
+        case DropPolicy::DROP_NEWEST: return "DropNewest";
+        case DropPolicy::BLOCK: return "Block";
+    }
+    return "Unknown";
+}
+
+TopicRing::TopicRing(size_t capacity, DropPolicy policy)
+    : policy_(policy),
+      entries_(std::max<size_t>(capacity, 1))
+{
+}
+
+bool TopicRing::push(std::shared_ptr<rclcpp::SerializedMessage> data, int64_t timestamp)
+{
+    if (is_full()) {
+        if (policy_ != DropPolicy::DROP_OLDEST) {
+            dropped++;
+            return false;
+        }
+        entries_[head_].first.reset();
+        head_ = (head_ + 1) % entries_.size();
+        count_--;
+        dropped++;
+    }
+
+    auto& entry = entries_[(head_ + count_) % entries_.size()];
+    entry.first = std::move(data);
+    entry.second = timestamp;
+    count_++;
+    queued++;
+    max_depth = std::max(max_depth, count_);
+    return true;
+}
+
+void TopicRing::clear()
+{
+    dropped += count_;
+    for (auto& entry : entries_) {
+        entry.first.reset();
+    }
+    head_ = 0;
+    count_ = 0;
+}
+
+void TopicRing::pop_into(const std::string& topic, std::vector<QueuedMessage>& batch, size_t limit)
+{
+    for (size_t i = std::min(limit, count_); i > 0; i--) {
+        auto& entry = entries_[head_];
+        batch.push_back(QueuedMessage{topic, std::move(entry.first), entry.second});
+        head_ = (head_ + 1) % entries_.size();
+        count_--;
+    }
+}
+
+BagWriteQueue::BagWriteQueue(rclcpp::Logger logger, WriteCallback write_cb, size_t capacity,
+                             size_t batch_size, std::map<std::string, DropPolicy> policies,
+                             DropPolicy default_policy, std::chrono::milliseconds flush_interval)
+    : logger_(logger),
+      write_cb_(std::move(write_cb)),
+      capacity_(capacity),
+      batch_size_(std::max<size_t>(batch_size, 1)),
+      policies_(std::move(policies)),
+      default_policy_(default_policy),
+      flush_interval_(flush_interval)
+{
+}
+
+BagWriteQueue::~BagWriteQueue()
+{
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        running_ = false;
+    }
+    not_empty_.notify_all();
+    not_full_.notify_all();
+    if (thread_.joinable()) {
+        thread_.join();
+    }
+}
+
+void BagWriteQueue::add_topic(const std::string& topic)
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    if (rings_.count(topic) == 0) {
+        auto policy = policies_.find(topic);
+        auto topic_policy = policy != policies_.end() ? policy->second : default_policy_;
+        rings_.emplace(topic, TopicRing(capacity_, topic_policy));
+        ring_order_.push_back(topic);
+        RCLCPP_INFO(logger_, "Write queue for %s: %zu messages, %s.",
+                    topic.c_str(), capacity_, drop_policy_to_string(topic_policy).c_str());
+    }
+}
+
+void BagWriteQueue::start()
+{
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        running_ = true;
+    }
+    thread_ = std::thread(&BagWriteQueue::writer_loop, this);
+}
+
+void BagWriteQueue::stop(std::chrono::milliseconds timeout)
+{
+    flush(timeout);
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        running_ = false;
+    }
+    not_empty_.notify_all();
+    not_full_.notify_all();
+    if (thread_.joinable()) {
+        thread_.join();
+    }
+}
+
+bool BagWriteQueue::push(const std::string& topic, std::shared_ptr<rclcpp::SerializedMessage> data,
+                         int64_t timestamp)
+{
+    std::unique_lock<std::mutex> lock(mutex_);
+    auto it = rings_.find(topic);
+    if (it == rings_.end()) {
+        return false;
+    }
+    auto& ring = it->second;
+    if (ring.policy() == DropPolicy::BLOCK) {
+        not_full_.wait(lock, [&ring, this]() { return !ring.is_full() || !running_; });
+    }
+    size_t depth = ring.count();
+    if (!ring.push(std::move(data), timestamp)) {
+        return false;
+    }
+    // Overwriting the oldest message of a full ring does not change the depth.
+    depth_ += ring.count() - depth;
+    max_depth_ = std::max(max_depth_, depth_);
+    if (depth_ == 1) {
+        not_empty_.notify_one();
+    }
+    return true;
+}
+
+bool BagWriteQueue::flush(std::chrono::milliseconds timeout)
+{
+    std::unique_lock<std::mutex> lock(mutex_);
+    not_empty_.notify_one();
+    return not_full_.wait_for(lock, timeout, [this]() {
+        return (depth_ == 0 && in_flight_ == 0) || !running_;
+    });
+}
+
+void BagWriteQueue::discard()
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    for (auto& ring : rings_) {
+        ring.second.clear();
+    }
+    depth_ = 0;
+    not_full_.notify_all();
+}
+
+std::string BagWriteQueue::get_stats_json()
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    std::ostringstream ss;
+    ss << "{";
+    for (const auto& topic : ring_order_) {
+        const auto& ring = rings_.at(topic);
+        ss << "\"" << topic << "\": {\"queued\": " << ring.queued
+           << ", \"written\": " << ring.written << ", \"dropped\": " << ring.dropped
+           << ", \"max_depth\": " << ring.max_depth << ", \"depth\": " << ring.count()
+           << ", \"policy\": \"" << drop_policy_to_string(ring.policy()) << "\"}, ";
+    }
+    ss << "\"total\": " << format_total_stats() << "}";
+    return ss.str();
+}
+
+std::string BagWriteQueue::get_total_stats_json()
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    return format_total_stats();
+}
+
+std::string BagWriteQueue::format_total_stats()
+{
+    uint64_t queued = 0;
+    uint64_t written = 0;
+    uint64_t dropped = 0;
+    for (const auto& ring : rings_) {
+        queued += ring.second.queued;
+        written += ring.second.written;
+        dropped += ring.second.dropped;
+    }
+    std::ostringstream ss;
+    ss << "{\"queued\": " << queued << ", \"written\": " << written
+       << ", \"dropped\": " << dropped << ", \"max_depth\": " << max_depth_
+       << ", \"depth\": " << depth_ << "}";
+    return ss.str();
+}
+
+std::vector<QueuedMessage> BagWriteQueue::take_batch()
+{
+    // Start with a different topic each time so that a busy topic cannot starve the others.
+    std::vector<QueuedMessage> batch;
+    batch.reserve(batch_size_);
+    size_t topic_count = ring_order_.size();
+    for (size_t i = 0; i < topic_count && batch.size() < batch_size_; i++) {
+        const auto& topic = ring_order_[(next_ring_ + i) % topic_count];
+        rings_.at(topic).pop_into(topic, batch, batch_size_ - batch.size());
+    }
+    next_ring_ = (next_ring_ + 1) % std::max<size_t>(topic_count, 1);
+    depth_ -= batch.size();
+    in_flight_ = batch.size();
+    return batch;
+}
+
+void BagWriteQueue::writer_loop()
+{
+    while (true) {
+        std::vector<QueuedMessage> batch;
+        {
+            std::unique_lock<std::mutex> lock(mutex_);
+            if (depth_ == 0 && running_) {
+                not_empty_.wait_for(lock, flush_interval_);
+            }
+            if (depth_ == 0) {
+                if (!running_) {
+                    return;
+                }
+                continue;
+            }
+            batch = take_batch();
+        }
+        not_full_.notify_all();
+
+        // Sort by time so that the batch of a slow and a fast topic stays in order.
+        std::stable_sort(batch.begin(), batch.end(),
+                         [](const QueuedMessage& a, const QueuedMessage& b) {
+                             return a.timestamp < b.timestamp;
+                         });
+        size_t written = 0;
+        try {
+            written = write_cb_(batch);
+        } catch (const std::exception& e) {
+            RCLCPP_ERROR(logger_, "Failed to write %zu messages: %s", batch.size(), e.what());
+        }
+
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            for (size_t i = 0; i < batch.size(); i++) {
+                auto& ring = rings_.at(batch[i].topic);
+                if (i < written) {
+                    ring.written++;
+                } else {
+                    ring.dropped++;
+                }
+            }
+            in_flight_ = 0;
+        }
+        not_full_.notify_all();
+    }
+}
+
+}  // namespace logging_pkg
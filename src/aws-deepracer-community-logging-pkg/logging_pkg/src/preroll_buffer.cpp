@@ -0,0 +1,126 @@
+//////////////////////////////////////////////////////////////////////////////////
+//   Copyright AWS DeepRacer Community. All Rights Reserved.                     //
+//                                                                               //
+//   Licensed under the Apache License, Version 2.0 (the "License").             //
+//   You may not use this file except in compliance with the License.            //
+//   You may obtain a copy of the License at                                     //
+//                                                                               //
+//       http://www.apache.org/licenses/LICENSE-2.0                              //
+//                                                                               //
+//   Unless required by applicable law or agreed to in writing, software         //
+//   distributed under the License is distributed on an "AS IS" BASIS,           //
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    //
+//   See the License for the specific language governing permissions and         //
+//   limitations under the License.                                              //
+//////////////////////////////////////////////////////////////////////////////////
+
+#include "logging_pkg/preroll_buffer.hpp"
+#include <algorithm>
+
+namespace logging_pkg {
+
+TopicPreroll::TopicPreroll(size_t max_size, size_t max_messages)
+    : max_size_(max_size),
+      max_messages_(std::max<size_t>(max_messages, 1))
+{
+}
+
+void TopicPreroll::evict_oldest()
+{
+    size_ -= messages_.front().first->size();
+    messages_.pop_front();
+}
+
+void TopicPreroll::push(std::shared_ptr<rclcpp::SerializedMessage> data, int64_t timestamp,
+                        int64_t min_timestamp)
+{
+    size_t length = data->size();
+    if (length > max_size_) {
+        dropped++;
+        return;
+    }
+
+    while (!messages_.empty() && messages_.front().second < min_timestamp) {
+        evict_oldest();
+    }
+    while (!messages_.empty() &&
+           (messages_.size() >= max_messages_ || size_ + length > max_size_)) {
+        evict_oldest();
+    }
+
+    messages_.emplace_back(std::move(data), timestamp);
+    size_ += length;
+}
+
+void TopicPreroll::drain_into(const std::string& topic, std::vector<QueuedMessage>& batch,
+                              int64_t min_timestamp)
+{
+    for (auto& message : messages_) {
+        if (message.second >= min_timestamp) {
+            batch.push_back(QueuedMessage{topic, std::move(message.first), message.second});
+        }
+    }
+    messages_.clear();
+    size_ = 0;
+}
+
+PrerollBuffer::PrerollBuffer(double duration, size_t max_size,
+                             std::map<std::string, size_t> topic_max_sizes, size_t max_messages)
+    : duration_ns_(static_cast<int64_t>(duration * 1e9)),
+      max_size_(max_size),
+      topic_max_sizes_(std::move(topic_max_sizes)),
+      max_messages_(max_messages)
+{
+}
+
+void PrerollBuffer::add_topic(const std::string& topic)
+{
+    if (!enabled()) {
+        return;
+    }
+    std::lock_guard<std::mutex> lock(mutex_);
+    if (topics_.count(topic) == 0) {
+        auto topic_max_size = topic_max_sizes_.find(topic);
+        topics_.emplace(topic, TopicPreroll(
+            topic_max_size != topic_max_sizes_.end() ? topic_max_size->second : max_size_,
+            max_messages_));
+    }
+}
+
+void PrerollBuffer::push(const std::string& topic, std::shared_ptr<rclcpp::SerializedMessage> data,
+                         int64_t timestamp)
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    auto buffer = topics_.find(topic);
+    if (buffer != topics_.end()) {
+        buffer->second.push(std::move(data), timestamp, timestamp - duration_ns_);
+    }
+}
+
+std::vector<QueuedMessage> PrerollBuffer::drain(int64_t now)
+{
+    std::vector<QueuedMessage> messages;
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        for (auto& buffer : topics_) {
+            buffer.second.drain_into(buffer.first, messages, now - duration_ns_);
+        }
+    }
+    std::stable_sort(messages.begin(), messages.end(),
+                     [](const QueuedMessage& a, const QueuedMessage& b) {
+                         return a.timestamp < b.timestamp;
+                     });
+    return messages;
+}
+
+uint64_t PrerollBuffer::get_dropped()
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    uint64_t dropped = 0;
+    for (const auto& buffer : topics_) {
+        dropped += buffer.second.dropped;
+    }
+    return dropped;
+}
+
+}  // namespace logging_pkg
@@ -27,6 +27,8 @@ GET_DEVICE_STATUS_SERVICE_NAME = "get_device_status"
 # Topic names
 DEVICE_STATUS_TOPIC_NAME = "device_status"
 SERVO_LATENCY_TOPIC_NAME = "/servo_pkg/latency"
+NAVIGATION_LATENCY_TOPIC_NAME = "/deepracer_navigation_pkg/latency"
+PIPELINE_TRACE_TOPIC_NAME = "/pipeline_trace"
 
 # Core package whose version is considered as DeepRacer software version.
 AWS_DEEPRACER_CORE_PKG = "aws-deepracer-core"
@@ -34,23 +36,41 @@ AWS_DEEPRACER_CORE_PKG = "aws-deepracer-core"
 # Base path of the GPIO ports.
 GPIO_BASE_PATH = "/sys/class/gpio"
 
-SECURE_BOOT_CMD = "od -An -t u2 /sys/firmware/efi/efivars/SecureBoot-8be4df61-93ca-11d2-aa0d-00e098032b8c"
+# Cache of the static device facts, valid until the next boot or package installation.
+DEVICE_FACTS_CACHE_PATH = "/opt/aws/deepracer/device_facts.json"
 
-OS_VERSION_CMD = "bash -c 'source /etc/os-release && echo $PRETTY_NAME'"
-
-CPU_MODEL_CMD = "lscpu | grep '^Model name' | awk -F: '{print $2}' | sed 's/^ *//' | sed 's/(R)//g' | sed 's/(TM)//g' | sed 's/Cortex/Arm Cortex/g'"
-
-ROS_DISTRO_CMD = "bash -c 'echo $ROS_DISTRO'"
-
-DISK_AMOUNT_CMD = "df / -h | awk '{print $2 \"B\"}' | tail -1"
-
-RAM_AMOUNT_CMD = "free -m | grep 'Mem' | awk '{print $2}'"
+# DeviceInfoNode attributes persisted in the device facts cache.
+DEVICE_FACTS = ("hardware_version", "software_version", "sb", "os_version", "cpu_model",
+                "ram_amount", "disk_amount")
 
 # Latency measurement
 MAX_LATENCY_HISTORY = 50
 LATENCY_SAMPLE_RATE = 5
+# Quantiles published over the last MAX_LATENCY_HISTORY latency samples.
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+# Upper bounds in milliseconds of the latency histogram buckets; a last bucket counts
+# the samples above the last bound.
+LATENCY_HISTOGRAM_BOUNDS_MS = [1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0]
 DEVICE_STATUS_TIMING = 2.5  # seconds
 
+# Pipeline tracing: stages in the order of the pipeline, as the PipelineStampMsg STAGE_ values.
+PIPELINE_STAGES = ["camera", "sensor_fusion", "preprocess", "inference", "navigation", "servo"]
+# Time in nanoseconds after the capture of a traced frame until its stamps are aggregated.
+PIPELINE_FRAME_TIMEOUT_NS = 1_000_000_000
+# Time in nanoseconds without stamps after which the per-stage histories are cleared.
+PIPELINE_RESET_GAP_NS = 5_000_000_000
+PIPELINE_MAX_PENDING_FRAMES = 100
+
+# Minimum time in seconds between two samples of each system metric group,
+# 0 to sample the group on every device status tick.
+DEVICE_STATUS_METRIC_PERIODS = {
+    "cpu": 0.0,
+    "temperature": 0.0,
+    "frequency": 0.0,
+    "memory": 5.0,
+    "disk": 30.0
+}
+
 # System type
 class SystemType(Enum):
     DR = auto()
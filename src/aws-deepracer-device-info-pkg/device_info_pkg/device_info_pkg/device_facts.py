@@ -0,0 +1,257 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+device_facts.py
+
+This module holds the readers of the static facts reported by the device_info_node and
+the cache persisting them. The facts are read directly from the dpkg status database,
+procfs, sysfs and efivarfs, without opening an apt cache or running commands, and are
+cached in a JSON file valid until the next boot or the next package installation.
+"""
+
+import json
+import math
+import os
+import shlex
+import tempfile
+
+DPKG_STATUS_PATH = "/var/lib/dpkg/status"
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+PROC_MEMINFO_PATH = "/proc/meminfo"
+PROC_CPUINFO_PATH = "/proc/cpuinfo"
+OS_RELEASE_PATH = "/etc/os-release"
+SECURE_BOOT_EFIVAR_PATH = \
+    "/sys/firmware/efi/efivars/SecureBoot-8be4df61-93ca-11d2-aa0d-00e098032b8c"
+
+# Names of the Arm cores by "CPU part" of /proc/cpuinfo, as reported by lscpu.
+ARM_CPU_PARTS = {
+    "0xd03": "Cortex-A53",
+    "0xd04": "Cortex-A35",
+    "0xd05": "Cortex-A55",
+    "0xd07": "Cortex-A57",
+    "0xd08": "Cortex-A72",
+    "0xd09": "Cortex-A73",
+    "0xd0a": "Cortex-A75",
+    "0xd0b": "Cortex-A76"
+}
+ARM_CPU_IMPLEMENTER = "0x41"
+
+DISK_SIZE_UNITS = ("", "K", "M", "G", "T", "P", "E")
+
+
+def read_installed_version(package_name, status_path=DPKG_STATUS_PATH):
+    """Read the version of an installed package from the dpkg status database.
+
+    Args:
+        package_name (str): Name of the package.
+        status_path (str): Path of the dpkg status file.
+
+    Returns:
+        str: Installed version, None if the package is not installed.
+    """
+    fields = dict()
+    with open(status_path, "r", encoding="utf-8", errors="replace") as status_file:
+        for line in status_file:
+            if line.strip() == "":
+                if is_installed_package(fields, package_name):
+                    return fields.get("Version")
+                fields = dict()
+            elif not line[0].isspace():
+                name, _, value = line.partition(":")
+                fields[name] = value.strip()
+    return fields.get("Version") if is_installed_package(fields, package_name) else None
+
+
+def is_installed_package(fields, package_name):
+    """Check if the fields of a dpkg status entry are the ones of the installed package."""
+    return fields.get("Package") == package_name and \
+        fields.get("Status", "").split()[-1:] == ["installed"]
+
+
+def read_boot_id():
+    """Read the identifier of the current boot."""
+    with open(BOOT_ID_PATH, "r") as boot_id_file:
+        return boot_id_file.read().strip()
+
+
+def read_secure_boot():
+    """Read the secure boot state from its EFI variable.
+
+    Returns:
+        str: "on" or "off".
+    """
+    with open(SECURE_BOOT_EFIVAR_PATH, "rb") as efivar_file:
+        data = efivar_file.read()
+    # 4 bytes of attributes followed by the variable value.
+    if len(data) < 5:
+        raise ValueError(f"Unexpected secure boot variable size: {len(data)}")
+    return "on" if data[4] == 1 else "off"
+
+
+def read_os_version():
+    """Read the pretty name of the OS from os-release."""
+    with open(OS_RELEASE_PATH, "r") as os_release_file:
+        for line in os_release_file:
+            if line.startswith("PRETTY_NAME="):
+                values = shlex.split(line.partition("=")[2])
+                return values[0] if values else ""
+    return ""
+
+
+def read_cpu_model():
+    """Read the CPU model name from /proc/cpuinfo, named as lscpu does without the
+       trademark signs.
+    """
+    fields = dict()
+    with open(PROC_CPUINFO_PATH, "r") as cpuinfo_file:
+        for line in cpuinfo_file:
+            name, _, value = line.partition(":")
+            # The fields of the first processor are enough.
+            fields.setdefault(name.strip(), value.strip())
+    model = fields.get("model name")
+    if not model and fields.get("CPU implementer") == ARM_CPU_IMPLEMENTER:
+        model = ARM_CPU_PARTS.get(fields.get("CPU part"))
+    if not model:
+        return ""
+    return model.replace("(R)", "").replace("(TM)", "").replace("Cortex", "Arm Cortex")
+
+
+def read_ram_amount():
+    """Read the total RAM amount from /proc/meminfo.
+
+    Returns:
+        str: Total RAM amount rounded to GB, e.g. "4GB".
+    """
+    with open(PROC_MEMINFO_PATH, "r") as meminfo_file:
+        for line in meminfo_file:
+            if line.startswith("MemTotal:"):
+                total_mib = int(line.split()[1]) // 1024
+                return f"{int(round(total_mib / 1024))}GB"
+    raise ValueError(f"MemTotal not found in {PROC_MEMINFO_PATH}")
+
+
+def read_disk_amount(path="/"):
+    """Read the size of the filesystem of a path.
+
+    Args:
+        path (str): Path on the filesystem.
+
+    Returns:
+        str: Size in the human readable format of df -h, e.g. "29GB".
+    """
+    stat = os.statvfs(path)
+    return format_disk_size(stat.f_blocks * stat.f_frsize) + "B"
+
+
+def format_disk_size(size):
+    """Format a size in bytes in powers of 1024 rounded up as df -h, e.g. "7.3G" or "29G"."""
+    value = float(size)
+    unit = 0
+    while value >= 1024 and unit < len(DISK_SIZE_UNITS) - 1:
+        value /= 1024
+        unit += 1
+    if unit > 0 and value < 10:
+        value = math.ceil(value * 10) / 10
+        if value < 10:
+            return f"{value:.1f}{DISK_SIZE_UNITS[unit]}"
+    value = math.ceil(value)
+    if value >= 1024 and unit < len(DISK_SIZE_UNITS) - 1:
+        return f"1.0{DISK_SIZE_UNITS[unit + 1]}"
+    return f"{value}{DISK_SIZE_UNITS[unit]}"
+
+
+class DeviceFactsCache:
+    """JSON file caching the device facts, valid for the boot and the dpkg status database
+       it was written with.
+    """
+
+    def __init__(self, path, logger, status_path=DPKG_STATUS_PATH):
+        """Create a DeviceFactsCache.
+
+        Args:
+            path (str): Path of the cache file.
+            logger (Logger): Logger object.
+            status_path (str): Path of the dpkg status file.
+        """
+        self.path = path
+        self.logger = logger
+        self.status_path = status_path
+
+    def get_key(self):
+        """Get the boot id and dpkg status modification time the facts are valid for.
+
+        Returns:
+            dict: Cache key, None if it cannot be read.
+        """
+        try:
+            return {
+                "boot_id": read_boot_id(),
+                "dpkg_status_mtime_ns": os.stat(self.status_path).st_mtime_ns
+            }
+        except OSError as ex:
+            self.logger.error(f"Unable to read the device facts cache key: {ex}")
+            return None
+
+    def load(self):
+        """Load the cached facts if they are still valid.
+
+        Returns:
+            dict: Facts by name, None if the cache is missing or out of date.
+        """
+        key = self.get_key()
+        if key is None:
+            return None
+        try:
+            with open(self.path, "r") as cache_file:
+                cache = json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as ex:
+            self.logger.error(f"Unable to read the device facts cache {self.path}: {ex}")
+            return None
+        if not isinstance(cache, dict) or cache.get("key") != key or \
+                not isinstance(cache.get("facts"), dict):
+            self.logger.info("Device facts cache is out of date")
+            return None
+        return cache["facts"]
+
+    def save(self, facts):
+        """Write the facts to the cache file, replacing it atomically.
+
+        Args:
+            facts (dict): Facts by name.
+
+        Returns:
+            bool: True if the facts were written.
+        """
+        key = self.get_key()
+        if key is None:
+            return False
+        directory = os.path.dirname(self.path) or "."
+        try:
+            with tempfile.NamedTemporaryFile("w", dir=directory, delete=False,
+                                             prefix=".device-facts-") as temp_file:
+                json.dump({"key": key, "facts": facts}, temp_file)
+            os.replace(temp_file.name, self.path)
+            return True
+        except OSError as ex:
+            self.logger.error(f"Unable to write the device facts cache {self.path}: {ex}")
+            try:
+                os.remove(temp_file.name)
+            except (OSError, NameError):
+                pass
+            return False
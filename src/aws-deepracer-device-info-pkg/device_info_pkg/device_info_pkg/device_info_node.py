@@ -29,13 +29,13 @@ The node defines:
                              software version information.
 """
 
-import apt
-import subprocess
+import os
 import rclpy
 from rclpy.node import Node
 
 from deepracer_interfaces_pkg.srv import GetDeviceInfoSrv
 from device_info_pkg import (constants,
+                             device_facts,
                              gpio_module)
 
 
@@ -52,9 +52,6 @@ class DeviceInfoNode(Node):
         """
         super().__init__("device_info_node")
 
-        # Apt cache.
-        self.apt_cache = apt.Cache()
-
         # Variables to store the version and secure boot details.
         self.hardware_version = None
         self.software_version = None
@@ -65,15 +62,30 @@ class DeviceInfoNode(Node):
         self.ram_amount = None
         self.disk_amount = None
 
-        # Initialize the variables.
-        self.load_hardware_version()
-        self.load_software_version()
-        self.load_sb()
-        self.load_os_version()
-        self.load_cpu_model()
+        # Initialize the variables from the facts cache, or load and cache them.
+        self.facts_cache = device_facts.DeviceFactsCache(constants.DEVICE_FACTS_CACHE_PATH,
+                                                         self.get_logger())
+        facts = self.facts_cache.load()
+        if facts is not None:
+            for name in constants.DEVICE_FACTS:
+                setattr(self, name, facts.get(name))
+            self.get_logger().info(f"Loaded device facts from {constants.DEVICE_FACTS_CACHE_PATH}")
+        else:
+            self.load_hardware_version()
+            self.load_software_version()
+            self.load_sb()
+            self.load_os_version()
+            self.load_cpu_model()
+            self.load_ram_amount()
+            self.load_disk_amount()
+            # Facts that failed to load are retried on the next start instead of being cached.
+            missing = [name for name in constants.DEVICE_FACTS if getattr(self, name) is None]
+            if missing:
+                self.get_logger().warning(f"Not caching the device facts, missing: {missing}")
+            else:
+                self.facts_cache.save({name: getattr(self, name)
+                                       for name in constants.DEVICE_FACTS})
         self.load_ros_distribution()
-        self.load_ram_amount()
-        self.load_disk_amount()
 
         # Service to get the DeepRacer hardware and software version details.
         self.get_device_info_service = self.create_service(GetDeviceInfoSrv,
@@ -128,25 +140,13 @@ class DeviceInfoNode(Node):
         return res
 
     def load_sb(self):
-        """Function to load the secure boot varible based on the result of the od command executed.
+        """Function to load the secure boot varible based on the SecureBoot EFI variable.
         """
-        cmd = constants.SECURE_BOOT_CMD
         try:
-            proc = subprocess.Popen(cmd.split(),
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    universal_newlines=True)
-            stdout = str(proc.communicate()[0]).split()
-            if len(stdout) >= 3:
-                if stdout[2].strip() == "1":
-                    self.sb = "on"
-                else:
-                    self.sb = "off"
-                self.get_logger().info(f"Loading secure boot information: {self.sb}")
-            else:
-                self.get_logger().error("od command did not return right values")
+            self.sb = device_facts.read_secure_boot()
+            self.get_logger().info(f"Loading secure boot information: {self.sb}")
         except Exception as ex:
-            self.get_logger().error(f"Failed to execute secure boot info cmd: {cmd} err:{ex}")
+            self.get_logger().error(f"Failed to read secure boot info: {ex}")
 
     def load_hardware_version(self):
         """Function to load the hardware version variable based on the board ids on the
@@ -201,14 +201,13 @@ class DeviceInfoNode(Node):
             self.get_logger().error(f"Error while loading hardware version: {ex}")
 
     def load_software_version(self):
-        """Function to load the software version variable based on the apt installed package
+        """Function to load the software version variable based on the dpkg installed package
            version for aws-deepracer-core pacakge.
         """
         try:
-            if constants.AWS_DEEPRACER_CORE_PKG in self.apt_cache:
-                deepracer_pkg = self.apt_cache[constants.AWS_DEEPRACER_CORE_PKG]
-                current_installed_version = deepracer_pkg.installed
-                self.software_version = current_installed_version.version
+            self.software_version = \
+                device_facts.read_installed_version(constants.AWS_DEEPRACER_CORE_PKG)
+            if self.software_version:
                 self.get_logger().info(f"Loading Software version: {self.software_version}")
             else:
                 self.software_version = None
@@ -257,18 +256,11 @@ class DeviceInfoNode(Node):
     def load_os_version(self):
         """Function to load the OS version pretty name.
         """
-        cmd = constants.OS_VERSION_CMD
         try:
-            proc = subprocess.Popen(cmd,
-                                    shell=True,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    universal_newlines=True)
-            stdout = str(proc.communicate()[0]).strip()
-            self.os_version = stdout
+            self.os_version = device_facts.read_os_version()
             self.get_logger().info(f"Loading OS information: {self.os_version}")
         except Exception as ex:
-            self.get_logger().error(f"Failed to execute os version cmd: {cmd} err:{ex}")
+            self.get_logger().error(f"Failed to read os version: {ex}")
 
     def get_os_version(self):
         """Getter method to return the OS version if loaded, else load it
@@ -286,18 +278,11 @@ class DeviceInfoNode(Node):
     def load_cpu_model(self):
         """Function to load the CPU Model name.
         """
-        cmd = constants.CPU_MODEL_CMD
         try:
-            proc = subprocess.Popen(cmd,
-                                    shell=True,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    universal_newlines=True)
-            stdout = str(proc.communicate()[0]).strip()
-            self.cpu_model = stdout
-            self.get_logger().info(f"Loading CPU model information: {stdout}")
+            self.cpu_model = device_facts.read_cpu_model()
+            self.get_logger().info(f"Loading CPU model information: {self.cpu_model}")
         except Exception as ex:
-            self.get_logger().error(f"Failed to execute CPU model version cmd: {cmd} err:{ex}")
+            self.get_logger().error(f"Failed to read CPU model: {ex}")
 
     def get_cpu_model(self):
         """Getter method to return the CPU model if loaded, else load it
@@ -315,18 +300,8 @@ class DeviceInfoNode(Node):
     def load_ros_distribution(self):
         """Function to load the ROS distribution name.
         """
-        cmd = constants.ROS_DISTRO_CMD
-        try:
-            proc = subprocess.Popen(cmd,
-                                    shell=True,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    universal_newlines=True)
-            stdout = str(proc.communicate()[0]).strip()
-            self.ros_distribution = "ROS2 " + stdout.capitalize()
-            self.get_logger().info(f"Loading ROS distribution information: {self.ros_distribution}")
-        except Exception as ex:
-            self.get_logger().error(f"Failed to execute ROS distribution cmd: {cmd} err:{ex}")
+        self.ros_distribution = "ROS2 " + os.environ.get("ROS_DISTRO", "").strip().capitalize()
+        self.get_logger().info(f"Loading ROS distribution information: {self.ros_distribution}")
 
     def get_ros_distribution(self):
         """Getter method to return the ROS distribution if loaded, else load it
@@ -344,19 +319,11 @@ class DeviceInfoNode(Node):
     def load_ram_amount(self):
         """Function to load the total RAM amount in the system.
         """
-        cmd = constants.RAM_AMOUNT_CMD
         try:
-            proc = subprocess.Popen(cmd,
-                                    shell=True,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    universal_newlines=True)
-            stdout = str(proc.communicate()[0]).strip()
-            ram_float = float(stdout) / (1024)
-            self.ram_amount = str(int(round(ram_float, 0))) + "GB"
+            self.ram_amount = device_facts.read_ram_amount()
             self.get_logger().info(f"Loading RAM amount information: {self.ram_amount}")
         except Exception as ex:
-            self.get_logger().error(f"Failed to execute RAM amount cmd: {cmd} err:{ex}")
+            self.get_logger().error(f"Failed to read RAM amount: {ex}")
             self.ram_amount = None
 
     def get_ram_amount(self):
@@ -375,18 +342,11 @@ class DeviceInfoNode(Node):
     def load_disk_amount(self):
         """Function to load the total disk space amount.
         """
-        cmd = constants.DISK_AMOUNT_CMD
         try:
-            proc = subprocess.Popen(cmd,
-                                    shell=True,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    universal_newlines=True)
-            stdout = str(proc.communicate()[0]).strip()
-            self.disk_amount = stdout
+            self.disk_amount = device_facts.read_disk_amount()
             self.get_logger().info(f"Loading disk amount information: {self.disk_amount}")
         except Exception as ex:
-            self.get_logger().error(f"Failed to execute disk amount cmd: {cmd} err:{ex}")
+            self.get_logger().error(f"Failed to read disk amount: {ex}")
             self.disk_amount = None
 
     def get_disk_amount(self):
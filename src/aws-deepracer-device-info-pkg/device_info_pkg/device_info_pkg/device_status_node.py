@@ -20,21 +20,27 @@
 device_status_node.py
 
 This module creates the device_status_node which is responsible for providing real-time
-system metrics including CPU load, CPU temperature, memory utilization, and free disk space.
+system metrics including CPU load per core, CPU temperature and throttling state, memory
+utilization, and free disk space, together with the servo latency, the camera-to-servo
+latency of the navigation node and the latency of every pipeline stage of the traced
+camera frames.
 
 The node defines:
     get_device_status_service: A service that is called to get the real-time system metrics.
 """
 
-import psutil
 import rclpy
 from rclpy.node import Node
 from rclpy.executors import MultiThreadedExecutor
 
 from deepracer_interfaces_pkg.srv import GetDeviceStatusSrv
-from deepracer_interfaces_pkg.msg import DeviceStatusMsg, LatencyMeasureMsg
+from deepracer_interfaces_pkg.msg import (DeviceStatusMsg,
+                                          LatencyMeasureMsg,
+                                          PipelineStampMsg)
 from device_info_pkg import constants
+from device_info_pkg.pipeline_trace import PipelineTrace
 from device_info_pkg.ring_buffer import RingBuffer
+from device_info_pkg.system_metrics import SystemMetricsCollector
 
 #########################################################################################
 # DeviceStatusNode
@@ -52,7 +58,9 @@ class DeviceStatusNode(Node):
 
         # Variables to store the system metrics
         self.cpu_percent = 0.0
+        self.cpu_core_percent = []
         self.cpu_temp = 0.0
+        self.cpu_throttled = False
         self.cpu_freq = 0.0     # Current CPU frequency in MHz
         self.cpu_freq_max = 0.0  # Maximum CPU frequency in MHz
         self.memory_usage = 0.0
@@ -65,11 +73,29 @@ class DeviceStatusNode(Node):
             "std": 0.0,
             "min": 0.0,
             "max": 0.0,
-            "median": 0.0,
-            "p95": 0.0
+            "p50": 0.0,
+            "p95": 0.0,
+            "p99": 0.0,
+            "jitter": 0.0,
+            "histogram": [0] * (len(constants.LATENCY_HISTOGRAM_BOUNDS_MS) + 1)
         }
         self.latency_history = RingBuffer(maxsize=constants.MAX_LATENCY_HISTORY)
 
+        # Camera frame to servo command latency reported by the navigation node
+        self.inference_latency_stats = {
+            "mean": 0.0,
+            "p95": 0.0
+        }
+        self.inference_latency_history = RingBuffer(maxsize=constants.MAX_LATENCY_HISTORY)
+
+        # Latency of every pipeline stage of the traced camera frames
+        self.pipeline_stats = []
+        self.pipeline_trace = PipelineTrace(constants.PIPELINE_STAGES,
+                                            constants.MAX_LATENCY_HISTORY,
+                                            constants.PIPELINE_FRAME_TIMEOUT_NS,
+                                            constants.PIPELINE_RESET_GAP_NS,
+                                            constants.PIPELINE_MAX_PENDING_FRAMES)
+
         # Subscribe to the latency topic
         self.latency_subscriber = self.create_subscription(
             LatencyMeasureMsg,
@@ -79,6 +105,24 @@ class DeviceStatusNode(Node):
         )
         self.get_logger().info(f"Subscribed to {constants.SERVO_LATENCY_TOPIC_NAME} topic")
 
+        # Subscribe to the navigation latency topic
+        self.inference_latency_subscriber = self.create_subscription(
+            LatencyMeasureMsg,
+            constants.NAVIGATION_LATENCY_TOPIC_NAME,
+            self.inference_latency_callback,
+            10  # QoS depth,
+        )
+        self.get_logger().info(f"Subscribed to {constants.NAVIGATION_LATENCY_TOPIC_NAME} topic")
+
+        # Subscribe to the stamps of the pipeline stages, up to six per traced frame
+        self.pipeline_trace_subscriber = self.create_subscription(
+            PipelineStampMsg,
+            constants.PIPELINE_TRACE_TOPIC_NAME,
+            self.pipeline_stamp_callback,
+            50  # QoS depth
+        )
+        self.get_logger().info(f"Subscribed to {constants.PIPELINE_TRACE_TOPIC_NAME} topic")
+
         # Service to get the system metrics
         self.get_device_status_service = self.create_service(
             GetDeviceStatusSrv,
@@ -100,10 +144,12 @@ class DeviceStatusNode(Node):
 
         # Pre-allocate for better performance
         self.last_latency_msg =  self.get_clock().now()
+        self.last_inference_latency_msg = self.last_latency_msg
         self.latency_msg_counter = 0
 
-        # Cache temperature sensor path on startup
-        self.temp_sensor_path = self._find_temp_sensor_path()
+        # Kernel files of the system metrics, opened once and sampled on every tick
+        self.metrics_collector = SystemMetricsCollector(constants.DEVICE_STATUS_METRIC_PERIODS,
+                                                        self.get_logger())
 
         # Initialize metrics on startup
         self.update_metrics()
@@ -132,6 +178,39 @@ class DeviceStatusNode(Node):
         except Exception as ex:
             self.get_logger().error(f"Error processing latency message: {ex}")
 
+    def inference_latency_callback(self, latency_msg: LatencyMeasureMsg):
+        """Callback for the navigation latency subscriber.
+
+        Args:
+            latency_msg (LatencyMeasureMsg): The age of the camera frame when the servo
+                                             message computed from it was published.
+        """
+        try:
+            receive_time = self.get_clock().now()
+            # Clear the history when the car was not driving autonomously in between.
+            if (receive_time - self.last_inference_latency_msg).nanoseconds > 500_000_000:
+                self.inference_latency_history.clear()
+            self.inference_latency_history.append(latency_msg.latency_ms, receive_time)
+            self.last_inference_latency_msg = receive_time
+        except Exception as ex:
+            self.get_logger().error(f"Error processing inference latency message: {ex}")
+
+    def pipeline_stamp_callback(self, stamp_msg: PipelineStampMsg):
+        """Callback for the pipeline trace subscriber.
+
+        Args:
+            stamp_msg (PipelineStampMsg): Time a stage finished processing a traced frame.
+        """
+        try:
+            source_ns = stamp_msg.source_stamp.sec * 1_000_000_000 + stamp_msg.source_stamp.nanosec
+            stamp_ns = stamp_msg.stamp.sec * 1_000_000_000 + stamp_msg.stamp.nanosec
+            if not self.pipeline_trace.add_stamp(source_ns, stamp_msg.stage, stamp_ns,
+                                                 self.get_clock().now().nanoseconds):
+                self.get_logger().warn(f"Unknown pipeline stage: {stamp_msg.stage}",
+                                       throttle_duration_sec=constants.DEVICE_STATUS_TIMING)
+        except Exception as ex:
+            self.get_logger().error(f"Error processing pipeline stamp message: {ex}")
+
     def update_timer_callback(self):
         """Timer callback to update the system metrics periodically.
         """
@@ -146,9 +225,11 @@ class DeviceStatusNode(Node):
                 f"Status update (count: {self.timer_count}) | " +
                 f"CPU percent: {self.cpu_percent:.2f}% | " +
                 f"CPU temp: {self.cpu_temp:.1f}°C | " +
+                f"CPU throttled: {self.cpu_throttled} | " +
                 f"CPU freq: {self.cpu_freq:.1f}MHz / {self.cpu_freq_max:.1f}MHz max | " +
                 f"Memory usage: {self.memory_usage:.1f}% | Free disk: {self.free_disk:.1f}% | " +
-                f"Latency: {self.latency_stats['mean']:.1f}")
+                f"Latency: {self.latency_stats['mean']:.1f} | " +
+                f"Inference latency: {self.inference_latency_stats['mean']:.1f}")
 
     def get_device_status(self, req, res):
         """Callback for the get_device_status service. Returns the system metrics."""
@@ -156,14 +237,18 @@ class DeviceStatusNode(Node):
         try:
             # Fill response with current metrics
             res.cpu_percent = self.cpu_percent
+            res.cpu_core_percent = self.cpu_core_percent
             res.cpu_temp = self.cpu_temp
+            res.cpu_throttled = self.cpu_throttled
             res.cpu_freq = self.cpu_freq
             res.cpu_freq_max = self.cpu_freq_max
             res.memory_usage = self.memory_usage
             res.free_disk = self.free_disk
-            res.latency_mean = self.latency_stats["mean"]
-            res.latency_p95 = self.latency_stats["p95"]
+            self.fill_latency_statistics(res)
             res.fps_mean = self.fps_mean
+            res.inference_latency_mean = self.inference_latency_stats["mean"]
+            res.inference_latency_p95 = self.inference_latency_stats["p95"]
+            self.fill_pipeline_statistics(res)
             res.error = 0
         except Exception as ex:
             res.error = 1
@@ -173,144 +258,86 @@ class DeviceStatusNode(Node):
     def update_metrics(self):
         """Update all system metrics.
         """
-        self.update_cpu_load()
-        self.update_cpu_temp()
-        self.update_cpu_freq()
-        self.update_memory_usage()
-        self.update_free_disk()
+        collector = self.metrics_collector
+        collector.sample()
+        self.cpu_percent = collector.cpu_percent
+        self.cpu_core_percent = collector.cpu_core_percent
+        self.cpu_temp = collector.cpu_temp
+        self.cpu_throttled = collector.cpu_throttled
+        self.cpu_freq = collector.cpu_freq
+        self.cpu_freq_max = collector.cpu_freq_max
+        self.memory_usage = collector.memory_usage
+        self.free_disk = collector.free_disk
         self.update_latency_statistics()
 
-    def update_cpu_load(self):
-        """Function to update CPU utilization percentage using psutil."""
-        try:
-            # Use interval=1 for more accurate reading with less frequent calls
-            self.cpu_percent = psutil.cpu_percent(interval=0.2)
-            self.get_logger().debug(f"CPU utilization: {self.cpu_percent:.1f}%")
-        except Exception as ex:
-            self.get_logger().error(f"Failed to get CPU utilization: {ex}")
-
-    def _find_temp_sensor_path(self):
-        """Find the best temperature sensor path once at startup."""
-        try:
-            temps = psutil.sensors_temperatures()
-            if 'coretemp' in temps:
-                return ('psutil', 'coretemp', 0)
-            elif 'cpu_thermal' in temps:
-                return ('psutil', 'cpu_thermal', 0)
-            elif temps:
-                first_sensor = list(temps.keys())[0]
-                return ('psutil', first_sensor, 0)
-            else:
-                # Check if thermal zone file exists
-                import os
-                if os.path.exists('/sys/class/thermal/thermal_zone0/temp'):
-                    return ('file', '/sys/class/thermal/thermal_zone0/temp', None)
-        except Exception:
-            pass
-        return None
-
-    def update_cpu_temp(self):
-        """Function to update CPU temperature using cached sensor path."""
-        try:
-            if not self.temp_sensor_path:
-                self.cpu_temp = 0.0
-                return
-
-            method, path, index = self.temp_sensor_path
-
-            if method == 'psutil':
-                temps = psutil.sensors_temperatures()
-                if path in temps and len(temps[path]) > index:
-                    self.cpu_temp = temps[path][index].current
-                else:
-                    self.cpu_temp = 0.0
-            elif method == 'file':
-                with open(path, 'r') as f:
-                    self.cpu_temp = float(f.read().strip()) / 1000.0
-
-            self.get_logger().debug(f"CPU temperature: {self.cpu_temp:.1f}°C")
-        except Exception as ex:
-            self.get_logger().error(f"Failed to get CPU temperature: {ex}")
-            self.cpu_temp = 0.0
-
-    def update_cpu_freq(self):
-        """Function to update CPU frequency information using psutil.
-        """
-        try:
-            # Get CPU frequency information
-            freq = psutil.cpu_freq()
-            if freq:
-                self.cpu_freq = freq.current
-                self.cpu_freq_max = freq.max if freq.max else self.cpu_freq
-                self.get_logger().debug(f"CPU frequency updated: {self.cpu_freq:.1f}MHz / {self.cpu_freq_max:.1f}MHz")
-            else:
-                # Try reading from /proc/cpuinfo as fallback
-                try:
-                    with open('/proc/cpuinfo', 'r') as f:
-                        for line in f:
-                            if line.startswith('cpu MHz'):
-                                self.cpu_freq = float(line.split(':')[1].strip())
-                                break
-                    self.get_logger().debug(f"CPU frequency updated (fallback): {self.cpu_freq:.1f}MHz")
-                except:
-                    self.get_logger().debug("CPU frequency information not available")
-        except Exception as ex:
-            self.get_logger().error(f"Failed to get CPU frequency: {ex}")
-
-    def update_memory_usage(self):
-        """Function to update memory usage percentage using psutil.
-        """
-        try:
-            # Get virtual memory statistics
-            memory = psutil.virtual_memory()
-            # Calculate memory usage as percentage
-            self.memory_usage = memory.percent
-            self.get_logger().debug(f"Memory usage updated: {self.memory_usage}%")
-        except Exception as ex:
-            self.get_logger().error(f"Failed to get memory usage: {ex}")
-
-    def update_free_disk(self):
-        """Function to update free disk space as percentage using psutil.
-        """
-        try:
-            # Get disk usage for the root filesystem
-            disk = psutil.disk_usage('/')
-
-            # Calculate free disk space as percentage (disk.percent is usage percentage)
-            free_percent = 100.0 - disk.percent
-            self.free_disk = free_percent
-
-            self.get_logger().debug(f"Free disk space updated: {self.free_disk:.1f}%")
-        except Exception as ex:
-            self.get_logger().error(f"Failed to get free disk space: {ex}")
-            self.free_disk = 0.0
-
     def update_latency_statistics(self):
         """Get statistics for the latency values - update less frequently."""
+        self.pipeline_stats = self.pipeline_trace.get_stats(self.get_clock().now().nanoseconds)
+
+        if self.inference_latency_history:
+            self.inference_latency_stats["mean"] = self.inference_latency_history.get_mean()
+            self.inference_latency_stats["p95"] = \
+                self.inference_latency_history.get_percentile(0.95)
+
         if not self.latency_history:
             return
 
-        # Get basic statistics in O(1) time
-        self.latency_stats["mean"] = self.latency_history.get_mean()
-        self.latency_stats["p95"] = self.latency_history.get_percentile(0.95)
+        # Get all statistics in O(1) time
+        self.latency_stats = self.latency_history.get_stats()
 
         # Calculate FPS in O(1) time
         self.fps_mean = self.latency_history.get_fps()
 
+    def fill_latency_statistics(self, msg):
+        """Fill the servo latency statistics of a DeviceStatusMsg or GetDeviceStatusSrv
+           response.
+
+        Args:
+            msg (DeviceStatusMsg|GetDeviceStatusSrv.Response): Message to fill.
+        """
+        msg.latency_mean = self.latency_stats["mean"]
+        msg.latency_std = self.latency_stats["std"]
+        msg.latency_min = self.latency_stats["min"]
+        msg.latency_max = self.latency_stats["max"]
+        msg.latency_p50 = self.latency_stats["p50"]
+        msg.latency_p95 = self.latency_stats["p95"]
+        msg.latency_p99 = self.latency_stats["p99"]
+        msg.latency_jitter = self.latency_stats["jitter"]
+        msg.latency_histogram = self.latency_stats["histogram"]
+        msg.latency_histogram_bounds = constants.LATENCY_HISTOGRAM_BOUNDS_MS
+
+    def fill_pipeline_statistics(self, msg):
+        """Fill the per-stage latency statistics of a DeviceStatusMsg or GetDeviceStatusSrv
+           response.
+
+        Args:
+            msg (DeviceStatusMsg|GetDeviceStatusSrv.Response): Message to fill.
+        """
+        msg.pipeline_stages = [stage for stage, _ in self.pipeline_stats]
+        msg.pipeline_latency_mean = [stats["mean"] for _, stats in self.pipeline_stats]
+        msg.pipeline_latency_p50 = [stats["p50"] for _, stats in self.pipeline_stats]
+        msg.pipeline_latency_p95 = [stats["p95"] for _, stats in self.pipeline_stats]
+        msg.pipeline_latency_p99 = [stats["p99"] for _, stats in self.pipeline_stats]
+        msg.pipeline_latency_max = [stats["max"] for _, stats in self.pipeline_stats]
+
     def publish_status(self):
         """Publish the current device status metrics.
         """
         try:
             msg = DeviceStatusMsg()
             msg.cpu_percent = self.cpu_percent
+            msg.cpu_core_percent = self.cpu_core_percent
             msg.cpu_temp = self.cpu_temp
+            msg.cpu_throttled = self.cpu_throttled
             msg.cpu_freq = self.cpu_freq
             msg.cpu_freq_max = self.cpu_freq_max
             msg.memory_usage = self.memory_usage
             msg.free_disk = self.free_disk
-            msg.latency_mean = self.latency_stats["mean"]
-            msg.latency_p95 = self.latency_stats["p95"]
+            self.fill_latency_statistics(msg)
             msg.fps_mean = self.fps_mean
+            msg.inference_latency_mean = self.inference_latency_stats["mean"]
+            msg.inference_latency_p95 = self.inference_latency_stats["p95"]
+            self.fill_pipeline_statistics(msg)
 
             self.status_publisher.publish(msg)
             self.get_logger().debug("Published device status update")
@@ -334,6 +361,7 @@ def main(args=None):
     finally:
         if node:
             node.get_logger().info("Device Status Node shutting down")
+            node.metrics_collector.close()
             node.destroy_node()
         if rclpy.ok():
             rclpy.shutdown()
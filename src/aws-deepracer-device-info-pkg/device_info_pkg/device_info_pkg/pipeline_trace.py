@@ -0,0 +1,117 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+pipeline_trace.py
+
+This module holds the aggregation of the pipeline stamps published by the camera, sensor
+fusion, inference, navigation and servo stages for the traced camera frames. The stamps of
+a frame are collected until the frame is older than the trace timeout, then the latency of
+every stage is measured from the previous stamped stage of the frame, or from the capture
+for the first one, into a RingBuffer per stage.
+"""
+
+from collections import OrderedDict
+
+from rclpy.time import Time
+
+from device_info_pkg.ring_buffer import RingBuffer
+
+
+class PipelineTrace:
+    """Per-stage latency distributions of the traced camera frames."""
+
+    def __init__(self, stages, maxsize, frame_timeout_ns, reset_gap_ns, max_pending_frames):
+        """Create the latency history of every stage.
+
+        Args:
+            stages (list): Stage names in the order of the pipeline.
+            maxsize (int): Number of latencies kept per stage.
+            frame_timeout_ns (int): Time after the capture of a frame until its stamps
+                                    are aggregated.
+            reset_gap_ns (int): Time without stamps after which the histories are cleared.
+            max_pending_frames (int): Maximum number of frames waiting for their stamps.
+        """
+        self.stages = list(stages)
+        self.stage_indexes = {stage: index for index, stage in enumerate(self.stages)}
+        self.histories = {stage: RingBuffer(maxsize=maxsize) for stage in self.stages}
+        self.frame_timeout_ns = frame_timeout_ns
+        self.reset_gap_ns = reset_gap_ns
+        self.max_pending_frames = max_pending_frames
+        # Stamps in nanoseconds of the pending frames per stage, 0 if not stamped yet,
+        # keyed by the capture timestamp in nanoseconds.
+        self.frames = OrderedDict()
+        self.last_stamp_time = None
+
+    def add_stamp(self, source_ns, stage, stamp_ns, now_ns):
+        """Add the stamp of a stage for a frame and aggregate the frames that timed out.
+
+        Returns:
+            bool: False if the stage is unknown.
+        """
+        index = self.stage_indexes.get(stage)
+        if index is None:
+            return False
+        # Every autonomous run gets its own statistics.
+        if self.last_stamp_time is not None \
+           and now_ns - self.last_stamp_time > self.reset_gap_ns:
+            self.clear()
+        self.last_stamp_time = now_ns
+
+        frame = self.frames.get(source_ns)
+        if frame is None:
+            frame = [0] * len(self.stages)
+            self.frames[source_ns] = frame
+            if len(self.frames) > self.max_pending_frames:
+                self.add_frame(*self.frames.popitem(last=False))
+        frame[index] = stamp_ns
+        self.flush(now_ns)
+        return True
+
+    def flush(self, now_ns):
+        """Aggregate the pending frames captured more than the trace timeout ago."""
+        frames = self.frames
+        while frames:
+            source_ns = next(iter(frames))
+            if now_ns - source_ns < self.frame_timeout_ns:
+                break
+            self.add_frame(source_ns, frames.pop(source_ns))
+
+    def add_frame(self, source_ns, frame):
+        """Add the latency of every stamped stage of a frame to its history."""
+        timestamp = Time(nanoseconds=source_ns)
+        previous_ns = source_ns
+        for stage, stamp_ns in zip(self.stages, frame):
+            if not stamp_ns:
+                continue
+            self.histories[stage].append(max(0, stamp_ns - previous_ns) / 1.0e6, timestamp)
+            previous_ns = stamp_ns
+
+    def get_stats(self, now_ns):
+        """Get the statistics of the stages with samples, in the order of the pipeline.
+
+        Returns:
+            list: (stage, statistics dictionary of RingBuffer.get_stats) tuples.
+        """
+        self.flush(now_ns)
+        return [(stage, self.histories[stage].get_stats())
+                for stage in self.stages if self.histories[stage]]
+
+    def clear(self):
+        """Forget the pending frames and the latency histories."""
+        self.frames.clear()
+        for history in self.histories.values():
+            history.clear()
@@ -1,85 +1,170 @@
+from array import array
+from collections import deque
+import bisect
+import math
+
 from rclpy.time import Time
 from device_info_pkg import constants
 
 
 class RingBuffer:
-    """High-performance ring buffer for latency measurements."""
+    """High-performance ring buffer for latency measurements.
+
+    The last maxsize latencies and their timestamps are kept in fixed float64 and int64
+    arrays. All the statistics cover these samples: mean, standard deviation, minimum,
+    maximum, histogram, jitter and FPS are maintained in O(1) (amortized for minimum and
+    maximum) per sample, and the quantiles are read from a sorted copy of the window kept
+    up to date in O(log n) comparisons and an O(n) memmove per sample.
+    """
 
-    def __init__(self, maxsize):
+    def __init__(self, maxsize, quantiles=constants.LATENCY_QUANTILES,
+                 histogram_bounds=constants.LATENCY_HISTOGRAM_BOUNDS_MS):
         self.maxsize = maxsize
-        self.data = [(0.0, Time())] * maxsize  # Pre-allocate tuples (latency_ms, Time)
+        self.latencies = array("d", [0.0]) * maxsize
+        self.timestamps = array("q", [0]) * maxsize
         self.index = 0
         self.size = 0
-
-        # Running statistics for O(1) mean calculation
-        self.running_sum = 0.0
+        self.count = 0
+
+        # Running window statistics: Welford mean and sum of squared deviations, and
+        # monotonic queues of (latency, sample number) for the minimum and maximum.
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.min_queue = deque()
+        self.max_queue = deque()
+
+        # Sorted window for the quantiles, window histogram counts and sum of the absolute
+        # differences of consecutive latencies in the window for the jitter.
+        self.quantiles = tuple(quantiles)
+        self.sorted_latencies = array("d")
+        self.histogram_bounds = list(histogram_bounds)
+        self.histogram = array("L", [0]) * (len(self.histogram_bounds) + 1)
+        self.difference_sum = 0.0
 
     def append(self, latency_ms: float, timestamp: Time):
-        """Add latency measurement - O(1) operation."""
-        # If buffer is full, subtract the value being overwritten
+        """Add latency measurement - O(log n) comparisons and an O(n) memmove of the sorted
+           window, all other statistics in O(1) (amortized for minimum and maximum)."""
+        # If buffer is full, remove the value being overwritten from the window statistics
         if self.size == self.maxsize:
-            old_value, _ = self.data[self.index]
-            self.running_sum -= old_value
+            old_value = self.latencies[self.index]
+            del self.sorted_latencies[bisect.bisect_left(self.sorted_latencies, old_value)]
+            self.histogram[bisect.bisect_left(self.histogram_bounds, old_value)] -= 1
+            if self.size > 1:
+                next_value = self.latencies[(self.index + 1) % self.maxsize]
+                self.difference_sum -= abs(next_value - old_value)
+            if self.size == 1:
+                self.mean = 0.0
+                self.squared_deviations = 0.0
+            else:
+                old_mean = self.mean
+                self.mean = (self.size * old_mean - old_value) / (self.size - 1)
+                self.squared_deviations -= (old_value - old_mean) * (old_value - self.mean)
+            self.size -= 1
 
         # Add new value
-        self.data[self.index] = (latency_ms, timestamp)
-        self.running_sum += latency_ms
+        if self.size > 0:
+            last_value = self.latencies[(self.index - 1) % self.maxsize]
+            self.difference_sum = max(0.0, self.difference_sum + abs(latency_ms - last_value))
+        self.latencies[self.index] = latency_ms
+        self.timestamps[self.index] = timestamp.nanoseconds
+        self.size += 1
+        delta = latency_ms - self.mean
+        self.mean += delta / self.size
+        self.squared_deviations = max(0.0, self.squared_deviations +
+                                      delta * (latency_ms - self.mean))
+
+        oldest = self.count - self.size + 1
+        while self.min_queue and self.min_queue[-1][0] >= latency_ms:
+            self.min_queue.pop()
+        self.min_queue.append((latency_ms, self.count))
+        while self.min_queue[0][1] < oldest:
+            self.min_queue.popleft()
+        while self.max_queue and self.max_queue[-1][0] <= latency_ms:
+            self.max_queue.pop()
+        self.max_queue.append((latency_ms, self.count))
+        while self.max_queue[0][1] < oldest:
+            self.max_queue.popleft()
+        self.count += 1
+
+        bisect.insort(self.sorted_latencies, latency_ms)
+        self.histogram[bisect.bisect_left(self.histogram_bounds, latency_ms)] += 1
 
         # Advance index
         self.index = (self.index + 1) % self.maxsize
-        self.size = min(self.size + 1, self.maxsize)
 
     def get_mean(self):
         """Get mean in O(1) time."""
-        return self.running_sum / self.size if self.size > 0 else 0.0
+        return self.mean if self.size > 0 else 0.0
+
+    def get_std(self):
+        """Get population standard deviation in O(1) time."""
+        return math.sqrt(self.squared_deviations / self.size) if self.size > 0 else 0.0
+
+    def get_min(self):
+        """Get minimum in O(1) time."""
+        return self.min_queue[0][0] if self.size > 0 else 0.0
+
+    def get_max(self):
+        """Get maximum in O(1) time."""
+        return self.max_queue[0][0] if self.size > 0 else 0.0
 
     def get_fps(self):
         """Calculate FPS using first and last timestamps - O(1)."""
         if self.size < 2:
             return 0.0
 
-        if self.size < self.maxsize:
-            # Buffer not full - simple case
-            first_time = self.data[0][1]
-            last_time = self.data[self.size - 1][1]
-        else:
-            # Buffer is full - handle wraparound
-            first_time = self.data[self.index][1]  # Oldest entry
-            last_index = (self.index - 1) % self.maxsize
-            last_time = self.data[last_index][1]   # Newest entry
-
-        time_diff_ns = (last_time - first_time).nanoseconds
+        # Oldest entry is at index once the buffer is full, at 0 before
+        first_time = self.timestamps[self.index if self.size == self.maxsize else 0]
+        last_time = self.timestamps[(self.index - 1) % self.maxsize]
+
+        time_diff_ns = last_time - first_time
         if time_diff_ns > 0:
             time_diff_s = time_diff_ns / 1_000_000_000.0
             return (self.size - 1) * constants.LATENCY_SAMPLE_RATE / time_diff_s
         return 0.0
 
     def get_percentile(self, percentile):
-        """Get percentile (expensive operation - use sparingly)."""
+        """Get exact percentile of the window in O(1) time."""
         if self.size == 0:
             return 0.0
-
-        # Extract values in correct order
-        if self.size < self.maxsize:
-            values = [self.data[i][0] for i in range(self.size)]
-        else:
-            # Handle wraparound
-            values = []
-            for i in range(self.size):
-                idx = (self.index + i) % self.maxsize
-                values.append(self.data[idx][0])
-
-        values.sort()
-        index = min(int(percentile * len(values)), len(values) - 1)
-        if index < 0:
-            index = 0
-        return values[index]
+        index = min(max(int(percentile * self.size), 0), self.size - 1)
+        return self.sorted_latencies[index]
+
+    def get_histogram(self):
+        """Get sample counts of the window per bucket of histogram_bounds, the last bucket
+           counting the samples above the last bound."""
+        return list(self.histogram)
+
+    def get_jitter(self):
+        """Get mean absolute difference between consecutive latencies of the window."""
+        return self.difference_sum / (self.size - 1) if self.size > 1 else 0.0
+
+    def get_stats(self):
+        """Get all statistics as a dictionary."""
+        stats = {
+            "mean": self.get_mean(),
+            "std": self.get_std(),
+            "min": self.get_min(),
+            "max": self.get_max(),
+            "jitter": self.get_jitter(),
+            "histogram": self.get_histogram()
+        }
+        for quantile in self.quantiles:
+            stats[f"p{round(quantile * 100)}"] = self.get_percentile(quantile)
+        return stats
 
     def clear(self):
         """Clear the buffer and reset statistics."""
         self.size = 0
         self.index = 0
-        self.running_sum = 0.0
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.min_queue.clear()
+        self.max_queue.clear()
+        del self.sorted_latencies[:]
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+        self.difference_sum = 0.0
 
     def __len__(self):
         return self.size
@@ -0,0 +1,272 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+system_metrics.py
+
+This module holds the collector of the system metrics published by the device_status_node.
+The kernel files are opened once and read again at offset 0 on every sample, and the CPU
+utilization is computed from the /proc/stat counters of two consecutive samples, so no
+sample blocks or sleeps.
+"""
+
+import glob
+import os
+import time
+
+# Metric groups sampled by the collector.
+CPU_GROUP = "cpu"
+TEMPERATURE_GROUP = "temperature"
+FREQUENCY_GROUP = "frequency"
+MEMORY_GROUP = "memory"
+DISK_GROUP = "disk"
+
+PROC_STAT_PATH = "/proc/stat"
+PROC_MEMINFO_PATH = "/proc/meminfo"
+PROC_CPUINFO_PATH = "/proc/cpuinfo"
+HWMON_GLOB = "/sys/class/hwmon/hwmon*"
+THERMAL_ZONE_TEMP_PATH = "/sys/class/thermal/thermal_zone0/temp"
+CPUFREQ_GLOB = "/sys/devices/system/cpu/cpu[0-9]*/cpufreq"
+# Thermal throttling event counters of the Intel CPUs.
+THROTTLE_COUNT_GLOB = "/sys/devices/system/cpu/cpu[0-9]*/thermal_throttle/*_throttle_count"
+# Throttling flags of the Raspberry Pi firmware: under-voltage, frequency capped,
+# throttled and soft temperature limit, currently active.
+PI_THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+PI_THROTTLED_ACTIVE_MASK = 0xF
+# Preferred hwmon sensors for the CPU temperature, as chosen before from psutil.
+PREFERRED_TEMP_SENSORS = ["coretemp", "cpu_thermal"]
+READ_SIZE = 64 * 1024
+
+
+class KernelFile:
+    """Kernel file kept open and read again from offset 0 on every read."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        """Read the current content of the file."""
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(self.fd, READ_SIZE, offset)
+            chunks.append(chunk)
+            if len(chunk) < READ_SIZE:
+                return b"".join(chunks)
+            offset += len(chunk)
+
+    def read_int(self):
+        """Read the file content as an integer."""
+        return int(self.read().split()[0], 0)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_kernel_file(path):
+    """Open a kernel file, None if it does not exist or cannot be read."""
+    try:
+        return KernelFile(path)
+    except OSError:
+        return None
+
+
+def find_temp_sensor_path():
+    """Find the CPU temperature input once at startup: the first input of the coretemp or
+       cpu_thermal hwmon sensor, else of the first hwmon sensor, else thermal zone 0.
+    """
+    sensors = dict()
+    for hwmon in sorted(glob.glob(HWMON_GLOB)):
+        try:
+            with open(os.path.join(hwmon, "name"), "r") as name_file:
+                name = name_file.read().strip()
+        except OSError:
+            continue
+        inputs = sorted(glob.glob(os.path.join(hwmon, "temp*_input")))
+        if inputs and name not in sensors:
+            sensors[name] = inputs[0]
+    for name in PREFERRED_TEMP_SENSORS:
+        if name in sensors:
+            return sensors[name]
+    if sensors:
+        return next(iter(sensors.values()))
+    if os.path.exists(THERMAL_ZONE_TEMP_PATH):
+        return THERMAL_ZONE_TEMP_PATH
+    return None
+
+
+def parse_cpu_times(stat):
+    """Parse the busy and total jiffies of the aggregate and per core lines of /proc/stat.
+
+    Returns:
+        list: (busy, total) tuples, the aggregate first, then one per core.
+    """
+    cpu_times = []
+    for line in stat.split(b"\n"):
+        if not line.startswith(b"cpu"):
+            break
+        # user nice system idle iowait irq softirq steal; guest times are part of user.
+        fields = [int(value) for value in line.split()[1:9]]
+        total = sum(fields)
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        cpu_times.append((total - idle, total))
+    return cpu_times
+
+
+class SystemMetricsCollector:
+    """Collector sampling every metric group at its own period."""
+
+    def __init__(self, group_periods, logger):
+        """Open the kernel files and take the first CPU sample.
+
+        Args:
+            group_periods (dict): Minimum time in seconds between two samples of each
+                                  metric group, 0 to sample the group on every call.
+            logger (RcutilsLogger): Logger of the node.
+        """
+        self.group_periods = group_periods
+        self.logger = logger
+        self.sample_times = dict()
+
+        self.cpu_percent = 0.0
+        self.cpu_core_percent = []
+        self.cpu_temp = 0.0
+        self.cpu_freq = 0.0
+        self.cpu_freq_max = 0.0
+        self.cpu_throttled = False
+        self.memory_usage = 0.0
+        self.free_disk = 0.0
+
+        self.stat_file = open_kernel_file(PROC_STAT_PATH)
+        self.meminfo_file = open_kernel_file(PROC_MEMINFO_PATH)
+        temp_sensor_path = find_temp_sensor_path()
+        self.temp_file = open_kernel_file(temp_sensor_path) if temp_sensor_path else None
+
+        self.freq_files = []
+        for cpufreq in sorted(glob.glob(CPUFREQ_GLOB)):
+            freq_file = open_kernel_file(os.path.join(cpufreq, "scaling_cur_freq"))
+            if freq_file:
+                self.freq_files.append(freq_file)
+            try:
+                with open(os.path.join(cpufreq, "cpuinfo_max_freq"), "r") as max_file:
+                    self.cpu_freq_max = max(self.cpu_freq_max, int(max_file.read()) / 1000.0)
+            except (OSError, ValueError):
+                pass
+        self.cpuinfo_file = None if self.freq_files else open_kernel_file(PROC_CPUINFO_PATH)
+
+        self.throttle_count_files = [kernel_file for kernel_file in
+                                     map(open_kernel_file, sorted(glob.glob(THROTTLE_COUNT_GLOB)))
+                                     if kernel_file]
+        self.pi_throttled_file = open_kernel_file(PI_THROTTLED_PATH)
+        self.throttle_count = None
+
+        self.cpu_times = None
+        try:
+            self.cpu_times = parse_cpu_times(self.stat_file.read())
+        except (OSError, ValueError, AttributeError) as ex:
+            self.logger.error(f"Failed to read the CPU times: {ex}")
+
+    def sample(self, now=None):
+        """Sample the metric groups whose period elapsed since their last sample."""
+        now = time.monotonic() if now is None else now
+        for group, sample_group in ((CPU_GROUP, self.sample_cpu),
+                                    (TEMPERATURE_GROUP, self.sample_temperature),
+                                    (FREQUENCY_GROUP, self.sample_frequency),
+                                    (MEMORY_GROUP, self.sample_memory),
+                                    (DISK_GROUP, self.sample_disk)):
+            last_time = self.sample_times.get(group)
+            if last_time is not None and now - last_time < self.group_periods.get(group, 0.0):
+                continue
+            self.sample_times[group] = now
+            try:
+                sample_group()
+            except Exception as ex:
+                self.logger.error(f"Failed to sample the {group} metrics: {ex}")
+
+    def sample_cpu(self):
+        """Update the total and per core CPU utilization since the previous sample."""
+        cpu_times = parse_cpu_times(self.stat_file.read())
+        if self.cpu_times is not None and len(self.cpu_times) == len(cpu_times):
+            percents = []
+            for (busy, total), (last_busy, last_total) in zip(cpu_times, self.cpu_times):
+                total_delta = total - last_total
+                percents.append(max(0.0, min(100.0, 100.0 * (busy - last_busy) / total_delta))
+                                if total_delta > 0 else 0.0)
+            # Keep the previous values if no jiffy elapsed since the previous sample.
+            if cpu_times[0][1] > self.cpu_times[0][1]:
+                self.cpu_percent = percents[0]
+                self.cpu_core_percent = percents[1:]
+        self.cpu_times = cpu_times
+        self.logger.debug(f"CPU utilization: {self.cpu_percent:.1f}%")
+
+    def sample_temperature(self):
+        """Update the CPU temperature and the throttling state."""
+        self.cpu_temp = self.temp_file.read_int() / 1000.0 if self.temp_file else 0.0
+
+        throttled = False
+        if self.pi_throttled_file:
+            throttled = bool(self.pi_throttled_file.read_int() & PI_THROTTLED_ACTIVE_MASK)
+        if self.throttle_count_files:
+            throttle_count = sum(kernel_file.read_int()
+                                 for kernel_file in self.throttle_count_files)
+            # The counters only grow: throttled if an event happened since the last sample.
+            throttled = throttled or (self.throttle_count is not None
+                                      and throttle_count > self.throttle_count)
+            self.throttle_count = throttle_count
+        self.cpu_throttled = throttled
+        self.logger.debug(f"CPU temperature: {self.cpu_temp:.1f}°C throttled: {throttled}")
+
+    def sample_frequency(self):
+        """Update the mean current frequency of the cores."""
+        if self.freq_files:
+            frequencies = [freq_file.read_int() / 1000.0 for freq_file in self.freq_files]
+            self.cpu_freq = sum(frequencies) / len(frequencies)
+        elif self.cpuinfo_file:
+            for line in self.cpuinfo_file.read().split(b"\n"):
+                if line.startswith(b"cpu MHz"):
+                    self.cpu_freq = float(line.split(b":")[1])
+                    break
+        if not self.cpu_freq_max:
+            self.cpu_freq_max = self.cpu_freq
+        self.logger.debug(f"CPU frequency: {self.cpu_freq:.1f}MHz / {self.cpu_freq_max:.1f}MHz")
+
+    def sample_memory(self):
+        """Update the memory usage percentage from MemTotal and MemAvailable."""
+        meminfo = dict()
+        for line in self.meminfo_file.read().split(b"\n"):
+            fields = line.split()
+            if len(fields) >= 2:
+                meminfo[fields[0]] = int(fields[1])
+        total = meminfo[b"MemTotal:"]
+        self.memory_usage = 100.0 * (total - meminfo[b"MemAvailable:"]) / total
+        self.logger.debug(f"Memory usage: {self.memory_usage:.1f}%")
+
+    def sample_disk(self):
+        """Update the free disk space percentage of the root filesystem, computed as df."""
+        stat = os.statvfs("/")
+        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        available = stat.f_bavail * stat.f_frsize
+        self.free_disk = 100.0 * available / (used + available) if used + available else 0.0
+        self.logger.debug(f"Free disk space: {self.free_disk:.1f}%")
+
+    def close(self):
+        """Close the kernel files."""
+        for kernel_file in [self.stat_file, self.meminfo_file, self.temp_file,
+                            self.cpuinfo_file, self.pi_throttled_file,
+                            *self.freq_files, *self.throttle_count_files]:
+            if kernel_file:
+                kernel_file.close()
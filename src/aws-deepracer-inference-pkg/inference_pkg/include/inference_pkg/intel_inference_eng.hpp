@@ -18,6 +18,7 @@
 #define INTEL_INFERENCE_ENG_HPP
 
 #include "inference_pkg/inference_base.hpp"
+#include "inference_pkg/pipeline_trace.hpp"
 #include "inference_engine.hpp"
 #include "deepracer_interfaces_pkg/msg/evo_sensor_msg.hpp"
 #include "deepracer_interfaces_pkg/msg/infer_results_array.hpp"
@@ -49,6 +50,8 @@ namespace IntelInferenceEngine {
         rclcpp::Subscription<deepracer_interfaces_pkg::msg::EvoSensorMsg>::SharedPtr sensorSub_;
         /// ROS publisher object to the desired topic.
         rclcpp::Publisher<deepracer_interfaces_pkg::msg::InferResultsArray>::SharedPtr resultPub_;
+        /// Publisher of the pipeline stamps of the traced frames.
+        std::unique_ptr<InferTask::PipelineTrace> pipelineTrace_;
         /// Pointer to image processing algorithm.
         std::shared_ptr<InferTask::ImgProcessBase> imgProcess_;
         /// Inference state variable.
@@ -0,0 +1,62 @@
+///////////////////////////////////////////////////////////////////////////////////
+//   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          //
+//                                                                               //
+//   Licensed under the Apache License, Version 2.0 (the "License").             //
+//   You may not use this file except in compliance with the License.            //
+//   You may obtain a copy of the License at                                     //
+//                                                                               //
+//       http://www.apache.org/licenses/LICENSE-2.0                              //
+//                                                                               //
+//   Unless required by applicable law or agreed to in writing, software         //
+//   distributed under the License is distributed on an "AS IS" BASIS,           //
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    //
+//   See the License for the specific language governing permissions and         //
+//   limitations under the License.                                              //
+
+#ifndef PIPELINE_TRACE_HPP
+#define PIPELINE_TRACE_HPP
+
+#include "rclcpp/rclcpp.hpp"
+#include "deepracer_interfaces_pkg/msg/pipeline_stamp_msg.hpp"
+#include <memory>
+#include <string>
+
+namespace InferTask {
+    class PipelineTrace
+    {
+    /// Publishes the time the inference stages finished processing the traced camera
+    /// frames to the pipeline trace topic.
+    public:
+        const char* PIPELINE_TRACE_TOPIC = "/pipeline_trace";
+
+        /// @param inferenceNode Node that creates the publisher.
+        PipelineTrace(std::shared_ptr<rclcpp::Node> inferenceNode)
+          : inferenceNode_(inferenceNode)
+        {
+            tracePub_ = inferenceNode_->create_publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>(PIPELINE_TRACE_TOPIC, 10);
+        }
+        /// @returns True if the frame is traced and the trace topic has subscribers.
+        /// @param sourceStamp Capture timestamp of the camera frame.
+        bool isTraced(const builtin_interfaces::msg::Time &sourceStamp) const {
+            return (sourceStamp.nanosec / 1000) % deepracer_interfaces_pkg::msg::PipelineStampMsg::SAMPLE_RATE == 0
+                   && tracePub_->get_subscription_count() > 0;
+        }
+        /// Publishes the current time as the time the stage finished processing the frame.
+        /// @param sourceStamp Capture timestamp of the camera frame.
+        /// @param stage Name of the stage.
+        void stamp(const builtin_interfaces::msg::Time &sourceStamp, const std::string &stage) {
+            deepracer_interfaces_pkg::msg::PipelineStampMsg stampMsg;
+            stampMsg.source_stamp = sourceStamp;
+            stampMsg.stage = stage;
+            stampMsg.stamp = inferenceNode_->get_clock()->now();
+            tracePub_->publish(stampMsg);
+        }
+
+    private:
+        /// Inference node object
+        std::shared_ptr<rclcpp::Node> inferenceNode_;
+        /// ROS publisher object to the pipeline trace topic.
+        rclcpp::Publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>::SharedPtr tracePub_;
+    };
+}
+#endif
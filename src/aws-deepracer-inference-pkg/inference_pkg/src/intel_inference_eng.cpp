@@ -194,6 +194,7 @@ namespace IntelInferenceEngine {
         // Subscribe to the sensor topic and set the call back
         sensorSub_ = inferenceNode->create_subscription<deepracer_interfaces_pkg::msg::EvoSensorMsg>(sensorSubName, 10, std::bind(&IntelInferenceEngine::RLInferenceModel::sensorCB, this, std::placeholders::_1));
         resultPub_ = inferenceNode->create_publisher<deepracer_interfaces_pkg::msg::InferResultsArray>("rl_results", 1);
+        pipelineTrace_ = std::make_unique<InferTask::PipelineTrace>(inferenceNode);
     }
 
     RLInferenceModel::~RLInferenceModel() {
@@ -249,6 +250,8 @@ namespace IntelInferenceEngine {
         if(!doInference_) {
             return;
         }
+        // The traced frames are identified by the capture timestamp of the first image.
+        const bool traced = !msg->images.empty() && pipelineTrace_->isTraced(msg->images.front().header.stamp);
         try {
             for(size_t i = 0; i < inputNamesArr_.size(); ++i) {
                 auto inputPtr = inferRequest_.GetBlob(inputNamesArr_[i])->buffer().as<InferenceEngine::PrecisionTrait<InferenceEngine::Precision::FP32>::value_type *>();
@@ -273,6 +276,10 @@ namespace IntelInferenceEngine {
                 }
                 imgProcess_->reset();
             }
+            if (traced) {
+                pipelineTrace_->stamp(msg->images.front().header.stamp,
+                                      deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_PREPROCESS);
+            }
             // Do inference
             inferRequest_.Infer();
 
@@ -302,6 +309,10 @@ namespace IntelInferenceEngine {
             }
             // Send results to all subscribers.
             resultPub_->publish(inferMsg);
+            if (traced) {
+                pipelineTrace_->stamp(msg->images.front().header.stamp,
+                                      deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_INFERENCE);
+            }
         }
         catch (const std::exception &ex) {
             RCLCPP_ERROR(inferenceNode->get_logger(), "Inference failed %s", ex.what());
@@ -204,6 +204,7 @@ namespace IntelOVInferenceEngine {
         // Subscribe to the sensor topic and set the call back
         sensorSub_ = inferenceNode->create_subscription<deepracer_interfaces_pkg::msg::EvoSensorMsg>(sensorSubName, 10, std::bind(&IntelOVInferenceEngine::RLInferenceModel::sensorCB, this, std::placeholders::_1));
         resultPub_ = inferenceNode->create_publisher<deepracer_interfaces_pkg::msg::InferResultsArray>("rl_results", 1);
+        pipelineTrace_ = std::make_unique<InferTask::PipelineTrace>(inferenceNode);
     }
 
     RLInferenceModel::~RLInferenceModel() {
@@ -303,6 +304,8 @@ namespace IntelOVInferenceEngine {
         if(!doInference_) {
             return;
         }
+        // The traced frames are identified by the capture timestamp of the first image.
+        const bool traced = !msg->images.empty() && pipelineTrace_->isTraced(msg->images.front().header.stamp);
         try {
             // Use cached tensor pointers instead of fetching them every time
             for(size_t i = 0; i < inputNamesArr_.size(); ++i) {
@@ -328,6 +331,10 @@ namespace IntelOVInferenceEngine {
                 }
                 imgProcess_->reset();
             }
+            if (traced) {
+                pipelineTrace_->stamp(msg->images.front().header.stamp,
+                                      deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_PREPROCESS);
+            }
             // Do inference
             inferRequest_.infer();
 
@@ -352,6 +359,10 @@ namespace IntelOVInferenceEngine {
             }
             // Send results to all subscribers.
             resultPub_->publish(inferMsg);
+            if (traced) {
+                pipelineTrace_->stamp(msg->images.front().header.stamp,
+                                      deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_INFERENCE);
+            }
         }
         catch (const std::exception &ex) {
             RCLCPP_ERROR(inferenceNode->get_logger(), "Inference failed %s", ex.what());
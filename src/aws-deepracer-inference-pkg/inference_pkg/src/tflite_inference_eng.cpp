@@ -150,6 +150,7 @@ namespace TFLiteInferenceEngine {
         // Subscribe to the sensor topic and set the call back
         sensorSub_ = inferenceNode->create_subscription<deepracer_interfaces_pkg::msg::EvoSensorMsg>(sensorSubName, 10, std::bind(&TFLiteInferenceEngine::RLInferenceModel::sensorCB, this, std::placeholders::_1));
         resultPub_ = inferenceNode->create_publisher<deepracer_interfaces_pkg::msg::InferResultsArray>("rl_results", 1);
+        pipelineTrace_ = std::make_unique<InferTask::PipelineTrace>(inferenceNode);
     }
 
     RLInferenceModel::~RLInferenceModel() {
@@ -269,6 +270,8 @@ namespace TFLiteInferenceEngine {
         if(!doInference_) {
             return;
         }
+        // The traced frames are identified by the capture timestamp of the first image.
+        const bool traced = !msg->images.empty() && pipelineTrace_->isTraced(msg->images.front().header.stamp);
         try {
             // Use cached tensor pointers for performance (like OpenVINO)
             for(size_t i = 0; i < inputNamesArr_.size(); ++i) {
@@ -294,6 +297,10 @@ namespace TFLiteInferenceEngine {
                 }
                 imgProcess_->reset();
             }
+            if (traced) {
+                pipelineTrace_->stamp(msg->images.front().header.stamp,
+                                      deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_PREPROCESS);
+            }
             // Do inference
             interpreter_->Invoke();
 
@@ -321,6 +328,10 @@ namespace TFLiteInferenceEngine {
             }
             // Send results to all subscribers.
             resultPub_->publish(inferMsg);
+            if (traced) {
+                pipelineTrace_->stamp(msg->images.front().header.stamp,
+                                      deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_INFERENCE);
+            }
         }
         catch (const std::exception &ex) {
             RCLCPP_ERROR(inferenceNode->get_logger(), "Inference failed %s", ex.what());
@@ -49,6 +49,23 @@ MODEL_OPTIMIZER_COMMAND, MODEL_OPTIMIZER_VERSION = get_mo_path_and_version()
 # Max retry count
 MAX_OPTIMIZER_RETRY_COUNT = 1
 
+# Content-addressed cache of converted model artifacts.
+CONVERSION_CACHE_DIR = "/opt/aws/deepracer/cache/model_optimizer"
+# Upper bound of the conversion cache size before least recently used entries are evicted.
+# A value of 0 disables the cache.
+CONVERSION_CACHE_MAX_SIZE_MB = 256
+# Name of the file describing a cache entry.
+CONVERSION_CACHE_ENTRY_FILE = "entry.json"
+# Extension of the file written next to the converted artifacts with their cache key.
+CONVERSION_CACHE_KEY_FILE_EXTENSION = ".conversion_key"
+# Chunk size used while hashing the frozen graph.
+CONVERSION_CACHE_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Seconds a service call waits for the converter worker to finish a job.
+CONVERTER_JOB_TIMEOUT = 300
+# Seconds to wait for the converter worker to exit before terminating it.
+CONVERTER_WORKER_STOP_TIMEOUT = 5
+
 
 class SensorInputTypes(Enum):
     """Enum listing the sensors input types supported; as we add sensors we should add
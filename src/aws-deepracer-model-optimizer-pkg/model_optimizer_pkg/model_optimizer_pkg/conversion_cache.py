@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+conversion_cache.py
+
+This module creates the ConversionCache class which stores the artifacts produced by
+the model converter keyed by the content of the frozen graph and the conversion settings.
+A model that is uploaded again under a different folder name is restored from the cache
+by hardlinking (or copying) the stored artifacts instead of running the converter again.
+
+The cache is bounded in size and evicts the least recently used entries. The module can
+also be run from the command line to list and purge the cache entries:
+
+    ros2 run model_optimizer_pkg model_conversion_cache list
+    ros2 run model_optimizer_pkg model_conversion_cache purge [--key KEY]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+from model_optimizer_pkg import constants
+
+# Extensions of the files produced by the supported converters.
+ARTIFACT_EXTENSIONS = (".tflite", ".xml", ".bin", ".mapping")
+# Cache keys are sha256 hexdigests.
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def hash_file(file_path):
+    """Compute the sha256 hexdigest of a file.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: Hexdigest of the file content.
+    """
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(constants.CONVERSION_CACHE_HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def is_valid_key(key):
+    """Check if a string has the format of a cache key.
+
+    Args:
+        key (str): Key to check.
+
+    Returns:
+        bool: True if the key is a 64 character lowercase hexdigest.
+    """
+    return KEY_PATTERN.fullmatch(key) is not None
+
+
+def read_artifact_key(artifact_path):
+    """Read the cache key written next to a converted artifact.
+
+    Args:
+        artifact_path (str): Path to the artifact returned by the converter.
+
+    Returns:
+        str: Cache key of the conversion or None if no key was written.
+    """
+    key_path = os.path.splitext(artifact_path)[0] + constants.CONVERSION_CACHE_KEY_FILE_EXTENSION
+    try:
+        with open(key_path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_artifact_key(artifact_path, key):
+    """Write the cache key of a conversion next to its artifact, so that the artifact
+       can be recognized as current when the cache entry is missing.
+
+    Args:
+        artifact_path (str): Path to the artifact returned by the converter.
+        key (str): Cache key of the conversion.
+    """
+    key_path = os.path.splitext(artifact_path)[0] + constants.CONVERSION_CACHE_KEY_FILE_EXTENSION
+    temp_path = f"{key_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(key)
+    os.replace(temp_path, key_path)
+
+
+def remove_artifacts(output_dir, model_name):
+    """Remove the artifacts a previous conversion left in the output directory under
+       the model name, so that they are not mistaken for the conversion of a new model.
+
+    Args:
+        output_dir (str): Directory where the converter writes its output.
+        model_name (str): Name of the model relative to the output directory.
+
+    Returns:
+        list: Paths of the removed files.
+    """
+    removed = []
+    for ext in ARTIFACT_EXTENSIONS + (constants.CONVERSION_CACHE_KEY_FILE_EXTENSION,):
+        path = os.path.join(output_dir, f"{model_name}{ext}")
+        try:
+            os.remove(path)
+            removed.append(path)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def is_staging_in_use(name):
+    """Check if a staging directory name belongs to a process that is still running.
+
+    Args:
+        name (str): Name of the staging directory, .<key>.<pid>.tmp.
+
+    Returns:
+        bool: True if the process which creates the staging directory is alive.
+    """
+    try:
+        pid = int(name.split(".")[-2])
+        os.kill(pid, 0)
+    except (IndexError, ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user.
+        return True
+    return True
+
+
+class ConversionCache:
+    """Size bounded, least recently used cache of converted model artifacts.
+    """
+
+    def __init__(self, cache_dir, max_size_mb, logger):
+        """Create a ConversionCache object.
+
+        Args:
+            cache_dir (str): Directory where the cache entries are stored.
+            max_size_mb (int): Maximum size of the cache in MB, 0 disables the cache.
+            logger (rclpy.impl.rcutils_logger.RcutilsLogger or logging.Logger): Logger object.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+        self.logger = logger
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Flag indicating if the cache is used.
+
+        Returns:
+            bool: True if the cache has a non-zero size limit.
+        """
+        return self.max_size > 0
+
+    def make_key(self, model_path, input_names, input_shapes, training_algorithm,
+                 use_fp16, converter_id):
+        """Compute the cache key for a conversion.
+
+        Args:
+            model_path (str): Path to the frozen graph.
+            input_names (str): Comma separated input names passed to the converter.
+            input_shapes (str): Comma separated input shapes passed to the converter.
+            training_algorithm (int): Training algorithm key of the model.
+            use_fp16 (bool): Flag indicating if the model is compressed to FP16.
+            converter_id (str): Identifier of the converter and its output format version.
+
+        Returns:
+            str: Hexdigest identifying the conversion result.
+        """
+        settings = json.dumps({"model": hash_file(model_path),
+                               "input_names": input_names,
+                               "input_shapes": input_shapes,
+                               "training_algorithm": training_algorithm,
+                               "fp16": use_fp16,
+                               "converter": converter_id},
+                              sort_keys=True)
+        return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+    def restore(self, key, output_dir, model_name, extension):
+        """Place the cached artifacts of a conversion into the output directory.
+
+        Args:
+            key (str): Cache key of the conversion.
+            output_dir (str): Directory where the converter would write its output.
+            model_name (str): Name of the model relative to the output directory.
+            extension (str): Extension of the artifact returned to the caller.
+
+        Returns:
+            str: Path to the restored artifact or None if the entry is not cached.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        with self.lock:
+            entry = self._read_entry(entry_dir)
+            if entry is None or extension not in entry["files"]:
+                return None
+            try:
+                for ext in entry["files"]:
+                    self._link_or_copy(os.path.join(entry_dir, f"model{ext}"),
+                                       os.path.join(output_dir, f"{model_name}{ext}"))
+                # Directory mtime is used as the last access time for the LRU policy.
+                os.utime(entry_dir)
+            except OSError as ex:
+                self.logger.error(f"Failed to restore cached conversion {key}: {ex}")
+                return None
+        return os.path.join(output_dir, f"{model_name}{extension}")
+
+    def store(self, key, artifact_path, model_name):
+        """Add the artifacts of a successful conversion to the cache.
+
+        Args:
+            key (str): Cache key of the conversion.
+            artifact_path (str): Path to the artifact returned by the converter.
+            model_name (str): Name of the converted model, kept for reference.
+        """
+        stem = os.path.splitext(artifact_path)[0]
+        files = [ext for ext in ARTIFACT_EXTENSIONS if os.path.isfile(f"{stem}{ext}")]
+        entry_dir = os.path.join(self.cache_dir, key)
+        with self.lock:
+            if os.path.isdir(entry_dir):
+                return
+            staging_dir = os.path.join(self.cache_dir, f".{key}.{os.getpid()}.tmp")
+            try:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                os.makedirs(staging_dir)
+                size = 0
+                for ext in files:
+                    target = os.path.join(staging_dir, f"model{ext}")
+                    self._link_or_copy(f"{stem}{ext}", target)
+                    size += os.path.getsize(target)
+                with open(os.path.join(staging_dir,
+                                       constants.CONVERSION_CACHE_ENTRY_FILE), "w") as f:
+                    json.dump({"model_name": model_name,
+                               "files": files,
+                               "size": size,
+                               "created": time.time()}, f)
+                os.rename(staging_dir, entry_dir)
+            except OSError as ex:
+                self.logger.error(f"Failed to cache conversion of {model_name}: {ex}")
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                return
+            self.logger.info(f"Cached conversion of {model_name} as {key}")
+            self._evict()
+
+    def list_entries(self):
+        """List the entries in the cache, most recently used first.
+
+        Returns:
+            list: List of dictionaries with the key, model_name, files, size and last_used.
+        """
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for key in os.listdir(self.cache_dir):
+            # Skip entries that are still being staged.
+            if key.startswith("."):
+                continue
+            entry_dir = os.path.join(self.cache_dir, key)
+            entry = self._read_entry(entry_dir)
+            if entry is None:
+                continue
+            entry["key"] = key
+            entry["last_used"] = os.stat(entry_dir).st_mtime
+            entries.append(entry)
+        entries.sort(key=lambda entry: entry["last_used"], reverse=True)
+        return entries
+
+    def purge(self, key=None):
+        """Remove one or all entries from the cache.
+
+        Args:
+            key (str, optional): Key of the entry to remove. Defaults to None which
+                                 removes all the entries.
+
+        Raises:
+            ValueError: If the key is not a cache key.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if key is not None and not is_valid_key(key):
+            raise ValueError(f"Invalid cache key: {key}")
+        with self.lock:
+            if key is not None:
+                keys = [key] if os.path.isdir(os.path.join(self.cache_dir, key)) else []
+            elif os.path.isdir(self.cache_dir):
+                # Keep the staging directories a running node is still writing.
+                keys = [entry_key for entry_key in os.listdir(self.cache_dir)
+                        if not (entry_key.startswith(".") and entry_key.endswith(".tmp") and
+                                is_staging_in_use(entry_key))]
+            else:
+                keys = []
+            for entry_key in keys:
+                shutil.rmtree(os.path.join(self.cache_dir, entry_key), ignore_errors=True)
+        return len(keys)
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in its size limit.
+           Must be called with the lock held.
+        """
+        entries = self.list_entries()
+        total_size = sum(entry["size"] for entry in entries)
+        # Never evict the entry that was just added.
+        while total_size > self.max_size and len(entries) > 1:
+            entry = entries.pop()
+            shutil.rmtree(os.path.join(self.cache_dir, entry["key"]), ignore_errors=True)
+            total_size -= entry["size"]
+            self.logger.info(f"Evicted cached conversion of {entry['model_name']}")
+
+    def _read_entry(self, entry_dir):
+        """Read the description of a cache entry.
+
+        Args:
+            entry_dir (str): Directory of the cache entry.
+
+        Returns:
+            dict: Content of the entry file or None if the entry is missing or invalid.
+        """
+        try:
+            with open(os.path.join(entry_dir, constants.CONVERSION_CACHE_ENTRY_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _link_or_copy(self, source, target):
+        """Hardlink the source file to the target path, falling back to a copy
+           if the paths are on different file systems.
+
+        Args:
+            source (str): Path of the existing file.
+            target (str): Path of the file to be created or replaced.
+        """
+        temp_target = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.link(source, temp_target)
+        except OSError:
+            shutil.copy2(source, temp_target)
+        os.replace(temp_target, target)
+
+
+def cache_key_argument(value):
+    """Argument type of the cache keys given on the command line."""
+    if not is_valid_key(value):
+        raise argparse.ArgumentTypeError(f"{value} is not a 64 character hexadecimal key")
+    return value
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Inspect the model conversion cache.")
+    parser.add_argument("--cache-dir", default=constants.CONVERSION_CACHE_DIR,
+                        help="Directory of the conversion cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List the cached conversions.")
+    purge_parser = subparsers.add_parser("purge", help="Remove cached conversions.")
+    purge_parser.add_argument("--key", type=cache_key_argument,
+                              help="Remove only the entry with this key.")
+    parsed = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    cache = ConversionCache(parsed.cache_dir, constants.CONVERSION_CACHE_MAX_SIZE_MB,
+                            logging.getLogger("model_conversion_cache"))
+    if parsed.command == "list":
+        entries = cache.list_entries()
+        for entry in entries:
+            last_used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["last_used"]))
+            print(f"{entry['key']}  {entry['size'] / 1024 / 1024:8.2f} MB  {last_used}  "
+                  f"{entry['model_name']} ({', '.join(entry['files'])})")
+        print(f"{len(entries)} entries, "
+              f"{sum(entry['size'] for entry in entries) / 1024 / 1024:.2f} MB")
+    else:
+        print(f"Removed {cache.purge(parsed.key)} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+converter_worker.py
+
+This module creates the ConverterWorker class which runs the TFLite or OpenVINO model
+conversion in a long-lived worker process. The worker imports the toolkit once when the
+model_optimizer_node starts, so the first model loaded after boot does not pay for the
+import, and then processes the conversion jobs it receives over a queue one at a time.
+
+Each job reports the time spent in the import, parse, convert and save phases.
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+
+from model_optimizer_pkg import constants
+
+
+def import_toolkit(inference_engine):
+    """Import the conversion toolkit for the inference engine.
+
+    Args:
+        inference_engine (str): Inference engine the models are converted for.
+
+    Returns:
+        module: The tensorflow.compat.v1 or openvino module.
+    """
+    if inference_engine == "TFLITE":
+        os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+        import tensorflow.compat.v1 as tf  # type: ignore
+        return tf
+    import openvino as ov  # type: ignore
+    return ov
+
+
+def convert_tflite(tf, job, timings, log):
+    """Convert a frozen graph to a TFLite model.
+
+    Args:
+        tf (module): The tensorflow.compat.v1 module.
+        job (dict): Conversion job with model_path, input_names, input_shapes,
+                    output_node, use_fp16 and output_file keys.
+        timings (dict): Dictionary where the phase timings are recorded.
+        log (list): List where the (level, message) log entries are appended.
+
+    Returns:
+        str: Path to the converted model.
+    """
+    start = time.monotonic()
+    converter = tf.lite.TFLiteConverter.from_frozen_graph(
+        graph_def_file=job["model_path"],
+        input_shapes=dict(zip(job["input_names"], job["input_shapes"])),
+        input_arrays=job["input_names"],
+        output_arrays=[job["output_node"]]
+    )
+    converter.allow_custom_ops = True
+    if job["use_fp16"]:
+        log.append(("info", "Using float16 quantization."))
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    timings["parse"] = time.monotonic() - start
+
+    start = time.monotonic()
+    tflite_model = converter.convert()
+    timings["convert"] = time.monotonic() - start
+
+    start = time.monotonic()
+    with open(job["output_file"], "wb") as f:
+        f.write(tflite_model)
+    timings["save"] = time.monotonic() - start
+    return job["output_file"]
+
+
+def convert_ov(ov, job, timings, log):
+    """Convert a frozen graph to an OpenVINO IR model. The graph is parsed once, the
+       parsed model is used to detect the input and output names and is then reshaped
+       and cut to the requested output instead of being converted a second time.
+
+    Args:
+        ov (module): The openvino module.
+        job (dict): Conversion job with model_path, input_names, input_shapes,
+                    output_node, use_fp16 and output_file keys.
+        timings (dict): Dictionary where the phase timings are recorded.
+        log (list): List where the (level, message) log entries are appended.
+
+    Returns:
+        str: Path to the converted model.
+    """
+    start = time.monotonic()
+    model = ov.convert_model(job["model_path"])
+    timings["parse"] = time.monotonic() - start
+
+    start = time.monotonic()
+    detected_input_names = [inp.get_any_name() for inp in model.inputs]
+    detected_output_names = [out.get_any_name() for out in model.outputs]
+    log.append(("debug", f"Detected inputs: {detected_input_names}"))
+    log.append(("debug", f"Detected outputs: {detected_output_names}"))
+
+    # Build input specifications using detected names (which include :0 suffix)
+    input_specs = list(zip(detected_input_names[:len(job["input_names"])],
+                           job["input_shapes"]))
+
+    # Find the output that matches our desired output (may have :0 suffix)
+    output_index = None
+    for index, detected_out in enumerate(detected_output_names):
+        if detected_out.startswith(job["output_node"]):
+            output_index = index
+            break
+    if output_index is None:
+        log.append(("warn", f"Could not find output matching {job['output_node']}, "
+                            f"using first detected output: {detected_output_names[0]}"))
+        output_index = 0
+
+    log.append(("info", f"Using input specs: {input_specs}"))
+    log.append(("info", f"Using output spec: {detected_output_names[output_index]}"))
+
+    model.reshape({name: ov.PartialShape(shape) for name, shape in input_specs})
+    model = ov.Model([model.outputs[output_index]], model.get_parameters(),
+                     model.get_friendly_name())
+    timings["convert"] = time.monotonic() - start
+
+    if job["use_fp16"]:
+        log.append(("info", "Using FP16 compression during save."))
+    else:
+        log.append(("info", "Using FP32 (no compression) during save."))
+
+    start = time.monotonic()
+    ov.save_model(model, job["output_file"], compress_to_fp16=job["use_fp16"])
+    timings["save"] = time.monotonic() - start
+    return job["output_file"]
+
+
+def worker_main(inference_engine, job_queue, result_queue):
+    """Entry point of the worker process.
+
+    Args:
+        inference_engine (str): Inference engine the models are converted for.
+        job_queue (multiprocessing.Queue): Queue of (job_id, job) tuples, None stops the worker.
+        result_queue (multiprocessing.Queue): Queue where the worker posts its messages.
+    """
+    # The node handles the shutdown of the worker.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    start = time.monotonic()
+    try:
+        toolkit = import_toolkit(inference_engine)
+    except Exception as ex:
+        result_queue.put(("failed", str(ex)))
+        return
+    import_time = time.monotonic() - start
+    result_queue.put(("ready", import_time))
+
+    converter = convert_tflite if inference_engine == "TFLITE" else convert_ov
+    while True:
+        item = job_queue.get()
+        if item is None:
+            break
+        job_id, job = item
+        # The import cost is only paid by the first job after start-up.
+        timings = {"import": import_time}
+        import_time = 0.0
+        log = []
+        try:
+            result = (0, converter(toolkit, job, timings, log), "")
+        except Exception as ex:
+            result = (1, "", str(ex))
+        result_queue.put(("result", job_id, result, timings, log))
+
+
+class ConverterWorker:
+    """Class managing the converter worker process and dispatching its results
+       to the service threads waiting for them.
+    """
+
+    def __init__(self, inference_engine, logger):
+        """Create the ConverterWorker object.
+
+        Args:
+            inference_engine (str): Inference engine the models are converted for.
+            logger (rclpy.impl.rcutils_logger.RcutilsLogger): Logger object of the
+                                                               model_optimizer_node.
+        """
+        self.inference_engine = inference_engine
+        self.logger = logger
+        self.context = multiprocessing.get_context("spawn")
+        self.job_ids = itertools.count()
+        self.pending = {}
+        # Guards the pending jobs together with the worker queues and error, so that a
+        # job is never posted to the queue of a worker whose jobs were already failed.
+        self.pending_lock = threading.RLock()
+        self.ready = threading.Event()
+        self.error = ""
+        self.stopping = False
+        self.process = None
+        self.job_queue = None
+        self.result_queue = None
+        self.dispatcher = threading.Thread(target=self.dispatch_results, daemon=True)
+
+    def start(self):
+        """Start the worker process and the result dispatcher thread.
+        """
+        self.start_process()
+        self.dispatcher.start()
+
+    def start_process(self):
+        """Spawn the worker process which imports the toolkit in the background.
+        """
+        self.ready.clear()
+        self.error = ""
+        self.job_queue = self.context.Queue()
+        self.result_queue = self.context.Queue()
+        self.process = self.context.Process(target=worker_main,
+                                            args=(self.inference_engine,
+                                                  self.job_queue,
+                                                  self.result_queue),
+                                            daemon=True)
+        self.process.start()
+        self.logger.info(f"Started {self.inference_engine} converter worker "
+                         f"(pid {self.process.pid})")
+
+    def stop(self):
+        """Stop the worker process and fail the jobs still pending.
+        """
+        self.stopping = True
+        if self.process is not None and self.process.is_alive():
+            self.job_queue.put(None)
+            self.process.join(constants.CONVERTER_WORKER_STOP_TIMEOUT)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.fail_pending("Converter worker stopped")
+
+    def convert(self, job):
+        """Run a conversion job in the worker process and wait for its result.
+
+        Args:
+            job (dict): Conversion job with model_path, input_names, input_shapes,
+                        output_node, use_fp16 and output_file keys.
+
+        Returns:
+            tuple: Tuple with the error code, the path to the converted model, the
+                   error message, the phase timings and the worker log entries.
+        """
+        job_id = next(self.job_ids)
+        done = threading.Event()
+        with self.pending_lock:
+            if self.error:
+                return 1, "", self.error, {}, []
+            if self.stopping:
+                return 1, "", "Converter worker stopped", {}, []
+            self.pending[job_id] = [done, None]
+            self.job_queue.put((job_id, job))
+        if not done.wait(constants.CONVERTER_JOB_TIMEOUT):
+            with self.pending_lock:
+                self.pending.pop(job_id, None)
+            return 1, "", "Conversion timed out", {}, []
+        with self.pending_lock:
+            return self.pending.pop(job_id)[1]
+
+    def fail_pending(self, error):
+        """Complete all pending jobs with an error.
+
+        Args:
+            error (str): Error message returned for the pending jobs.
+        """
+        with self.pending_lock:
+            for entry in self.pending.values():
+                if entry[1] is None:
+                    entry[1] = (1, "", error, {}, [])
+                    entry[0].set()
+
+    def dispatch_results(self):
+        """Thread function that hands the worker messages over to the waiting jobs
+           and restarts the worker process if it exits unexpectedly.
+        """
+        while not self.stopping:
+            try:
+                message = self.result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if self.stopping or self.error or self.process.is_alive():
+                    continue
+                with self.pending_lock:
+                    if not self.ready.is_set():
+                        # Do not respawn a worker that cannot even start.
+                        self.error = "Converter worker exited during start-up"
+                        self.logger.error(self.error)
+                        self.fail_pending(self.error)
+                    else:
+                        self.logger.error("Converter worker exited unexpectedly, restarting")
+                        self.fail_pending("Converter worker exited")
+                        self.start_process()
+                continue
+            except (EOFError, OSError):
+                continue
+
+            if message[0] == "ready":
+                self.logger.info(f"Converter worker ready, toolkit import took "
+                                 f"{message[1]:.2f}s")
+                self.ready.set()
+            elif message[0] == "failed":
+                with self.pending_lock:
+                    self.error = f"Converter worker failed to import toolkit: {message[1]}"
+                    self.logger.error(self.error)
+                    self.fail_pending(self.error)
+            elif message[0] == "result":
+                _, job_id, (error_code, artifact_path, error), timings, log = message
+                with self.pending_lock:
+                    entry = self.pending.get(job_id)
+                    if entry is not None:
+                        entry[1] = (error_code, artifact_path, error, timings, log)
+                        entry[0].set()
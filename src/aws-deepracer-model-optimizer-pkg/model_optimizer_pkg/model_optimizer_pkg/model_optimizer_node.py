@@ -31,6 +31,10 @@ The node defines:
     model_optimizer_service: A service to call the model converter API
                              for the specific model with appropriate model and platform
                              specific parameters set.
+
+Converted models are kept in a content-addressed conversion cache, so a model that is
+uploaded again under a different name is not converted a second time. The TFLite and
+OpenVINO conversions run in a worker process that imports the toolkit at start-up.
 """
 
 import os
@@ -38,6 +42,7 @@ import subprocess
 import shlex
 import re
 import xml.etree.ElementTree as ET
+from importlib import metadata
 import rclpy
 from rclpy.parameter import ParameterType
 from rclpy.node import Node, ParameterDescriptor
@@ -45,7 +50,9 @@ from rclpy.callback_groups import ReentrantCallbackGroup
 from rclpy.executors import MultiThreadedExecutor
 
 from deepracer_interfaces_pkg.srv import (ModelOptimizeSrv)
-from model_optimizer_pkg import constants
+from model_optimizer_pkg import (constants,
+                                 conversion_cache,
+                                 converter_worker)
 
 
 class ModelOptimizerNode(Node):
@@ -68,6 +75,28 @@ class ModelOptimizerNode(Node):
             self.get_logger().error(
                 f"Inference Engine {self._inference_engine} unknown.")
 
+        self.declare_parameter('conversion_cache_dir', constants.CONVERSION_CACHE_DIR,
+                               ParameterDescriptor(type=ParameterType.PARAMETER_STRING))
+        self.declare_parameter('conversion_cache_max_size_mb',
+                               constants.CONVERSION_CACHE_MAX_SIZE_MB,
+                               ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self._conversion_cache = conversion_cache.ConversionCache(
+            self.get_parameter('conversion_cache_dir').value,
+            self.get_parameter('conversion_cache_max_size_mb').value,
+            self.get_logger())
+        self._converter_id = self.get_converter_id()
+
+        # Worker process that keeps the conversion toolkit imported between requests.
+        self._converter_worker = None
+        if self._inference_engine == "TFLITE" or \
+                (self._inference_engine == "OV" and constants.MODEL_OPTIMIZER_VERSION == 2024):
+            self._converter_worker = converter_worker.ConverterWorker(self._inference_engine,
+                                                                      self.get_logger())
+            self._converter_worker.start()
+        if self._conversion_cache.enabled:
+            self.get_logger().info(f"Conversion cache: {self._conversion_cache.cache_dir} "
+                                   f"({self._converter_id})")
+
         self.model_optimizer_service_cb_group = ReentrantCallbackGroup()
         self.model_optimizer_service = \
             self.create_service(ModelOptimizeSrv,
@@ -79,6 +108,13 @@ class ModelOptimizerNode(Node):
         self.timer_count = 0
         self.timer = self.create_timer(5.0, self.timer_callback)
 
+    def destroy_node(self):
+        """Stop the converter worker process before destroying the node.
+        """
+        if self._converter_worker is not None:
+            self._converter_worker.stop()
+        super().destroy_node()
+
     def timer_callback(self):
         """Heartbeat function to keep the node alive.
         """
@@ -264,6 +300,27 @@ class ModelOptimizerNode(Node):
         """
         return 10 if constants.MODEL_OPTIMIZER_VERSION == 2021 else 11
 
+    def get_converter_id(self):
+        """Return an identifier of the converter used for the configured inference engine.
+           The identifier is part of the conversion cache key, so that upgrading the
+           toolkit invalidates previously converted models.
+
+        Returns:
+            str: Converter name with toolkit and output format version.
+        """
+        def package_version(name):
+            try:
+                return metadata.version(name)
+            except metadata.PackageNotFoundError:
+                return "unknown"
+
+        if self._inference_engine == "TFLITE":
+            return f"tflite-{package_version('tensorflow')}"
+        elif self._inference_engine == "OV" and constants.MODEL_OPTIMIZER_VERSION == 2024:
+            return f"ov-{package_version('openvino')}-ir{self.get_expected_ir_version()}"
+        else:
+            return f"mo-{constants.MODEL_OPTIMIZER_VERSION}-ir{self.get_expected_ir_version()}"
+
     def run_optimizer_mo(self, mo_path, common_params, platform_parms):
         """Helper method that combines the common commands with the platform specific
            commands.
@@ -342,72 +399,24 @@ class ModelOptimizerNode(Node):
             tuple: Tuple whose first value is the error code and second value
                    is a string to the location of the converted model if any.
         """
-
-        # Import Tensorflow if optimizing for TFLITE
-        os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-        import tensorflow.compat.v1 as tf # type: ignore
-
         if not os.path.isfile(common_params[constants.ParamKeys.MODEL_PATH]):
             raise Exception(
                 f"Model file {common_params[constants.ParamKeys.MODEL_PATH]} not found")
 
         # Check if model exists
-        if os.path.isfile(os.path.join(common_params[constants.ParamKeys.OUT_DIR],
-                                       f"{common_params[constants.ParamKeys.MODEL_NAME]}.tflite")):
+        output_file = os.path.join(common_params[constants.ParamKeys.OUT_DIR],
+                                   f"{common_params[constants.ParamKeys.MODEL_NAME]}.tflite")
+        if os.path.isfile(output_file):
             self.get_logger().info(
                 f"Cached model: {common_params[constants.ParamKeys.MODEL_NAME]}.tflite")
-            return 0, os.path.join(common_params[constants.ParamKeys.OUT_DIR],
-                                   f"{common_params[constants.ParamKeys.MODEL_NAME]}.tflite")
-
-        try:
-            with tf.gfile.GFile(common_params[constants.ParamKeys.MODEL_PATH], 'rb') as f:
-                graph_def = tf.GraphDef()
-                graph_def.ParseFromString(f.read())
-
-            input_shapes = {}
-            input_arrays = []
-            output = f'main_level/agent/{constants.INPUT_HEAD_NAME_MAPPING[constants.TrainingAlgorithms(training_algorithm)]}/online/network_1/ppo_head_0/policy'
-
-            for i, s in zip(
-                    common_params[constants.APIFlags.INPUT].split(
-                        constants.ParamKeys.INPUT_SHAPE_DELIM),
-                    eval(f'[{common_params[constants.ParamKeys.INPUT_SHAPE]}]')):
-                input_shapes[i] = s
-                input_arrays.append(i)
-
-            self.get_logger().info(f"Inputs: {str(input_shapes)}")
-            self.get_logger().info(f"Output: {output}")
-
-            converter = tf.lite.TFLiteConverter.from_frozen_graph(
-                graph_def_file=common_params[constants.ParamKeys.MODEL_PATH],
-                input_shapes=input_shapes,
-                input_arrays=input_arrays,
-                output_arrays=[output]
-            )
-            converter.allow_custom_ops = True
-
-            if (constants.ParamKeys.DATA_TYPE in common_params and common_params[constants.ParamKeys.DATA_TYPE] == "FP16") or \
-                    "--compress_to_fp16" in common_params:
-                self.get_logger().info(f"Using float16 quantization.")
-                converter.optimizations = [tf.lite.Optimize.DEFAULT]
-                converter.target_spec.supported_types = [tf.float16]
-
-            tflite_model = converter.convert()
-
-            with open(os.path.join(common_params[constants.ParamKeys.OUT_DIR],
-                                   f"{common_params[constants.ParamKeys.MODEL_NAME]}.tflite"), 'wb') as f:
-                f.write(tflite_model)
-
-            output_file = os.path.join(common_params[constants.ParamKeys.OUT_DIR],
-                                       f"{common_params[constants.ParamKeys.MODEL_NAME]}.tflite")
-
-            self.get_logger().info(f"Created TFLite model: {output_file}")
-
             return 0, output_file
 
-        except:  # noqa
-            # Return error code 1, which means that the model optimizer failed even after retries.
-            return 1, ""
+        error_code, artifact_path = self.run_converter_job(common_params,
+                                                           training_algorithm,
+                                                           output_file)
+        if not error_code:
+            self.get_logger().info(f"Created TFLite model: {artifact_path}")
+        return error_code, artifact_path
 
     def run_optimizer_ov(self, common_params, training_algorithm):
         """Helper method that combines the common commands with the platform specific
@@ -424,10 +433,6 @@ class ModelOptimizerNode(Node):
             tuple: Tuple whose first value is the error code and second value
                    is a string to the location of the converted model if any.
         """
-
-        # Import OpenVINO if optimizing for OV
-        import openvino as ov
-
         if not os.path.isfile(common_params[constants.ParamKeys.MODEL_PATH]):
             raise Exception(
                 f"Model file {common_params[constants.ParamKeys.MODEL_PATH]} not found")
@@ -448,75 +453,67 @@ class ModelOptimizerNode(Node):
                     f"IR version mismatch: cached model has IR v{cached_ir_version}, "
                     f"expected IR v{expected_ir_version}. Re-optimizing...")
 
-        try:
-            # Parse input names and shapes - exactly like TFLite does it
-            input_names = common_params[constants.APIFlags.INPUT].split(constants.ParamKeys.INPUT_SHAPE_DELIM)
-            input_shapes = eval(f'[{common_params[constants.ParamKeys.INPUT_SHAPE]}]')
-            output_node = f'main_level/agent/{constants.INPUT_HEAD_NAME_MAPPING[constants.TrainingAlgorithms(training_algorithm)]}/online/network_1/ppo_head_0/policy'
-
-            self.get_logger().debug(f"Input names (from metadata): {input_names}")
-            self.get_logger().debug(f"Input shapes: {input_shapes}")
-            self.get_logger().debug(f"Output node (from metadata): {output_node}")
-
-            # First convert without input/output constraints to see what OpenVINO detects
-            self.get_logger().debug("Converting model without input/output constraints to inspect...")
-            temp_model = ov.convert_model(common_params[constants.ParamKeys.MODEL_PATH])
-            
-            # Log what OpenVINO actually found
-            detected_input_names = [inp.get_any_name() for inp in temp_model.inputs]
-            detected_output_names = [out.get_any_name() for out in temp_model.outputs]
-
-            self.get_logger().debug(f"Detected inputs: {detected_input_names}")
-            self.get_logger().debug(f"Detected outputs: {detected_output_names}")
-
-            # Build input/output specifications using detected names (which include :0 suffix)
-            input_specs = list(zip(detected_input_names[:len(input_names)], input_shapes))
-            
-            # Find the output that matches our desired output (may have :0 suffix)
-            output_spec = None
-            for detected_out in detected_output_names:
-                if detected_out.startswith(output_node):
-                    output_spec = detected_out
-                    break
-            
-            if output_spec is None:
-                self.get_logger().warn(f"Could not find output matching {output_node}, using first detected output: {detected_output_names[0]}")
-                output_spec = detected_output_names[0]
-            
-            self.get_logger().info(f"Using input specs: {input_specs}")
-            self.get_logger().info(f"Using output spec: {output_spec}")
-
-            # Convert again with proper input/output specifications using detected names
-            model = ov.convert_model(
-                common_params[constants.ParamKeys.MODEL_PATH],
-                input=input_specs,
-                output=output_spec
-            )
-
-            # Determine FP16 compression setting
-            use_fp16 = (constants.ParamKeys.DATA_TYPE in common_params and 
-                       common_params[constants.ParamKeys.DATA_TYPE] == "FP16") or \
-                       "--compress_to_fp16" in common_params
-
-            if use_fp16:
-                self.get_logger().info(f"Using FP16 compression during save.")
-            else:
-                self.get_logger().info(f"Using FP32 (no compression) during save.")
-
-            # Save the OpenVINO model with appropriate compression
-            output_file = os.path.join(common_params[constants.ParamKeys.OUT_DIR],
-                                       f"{common_params[constants.ParamKeys.MODEL_NAME]}.xml")
-            
-            ov.save_model(model, output_file, compress_to_fp16=use_fp16)
+        error_code, artifact_path = self.run_converter_job(common_params,
+                                                           training_algorithm,
+                                                           xml_path)
+        if error_code:
+            self.get_logger().error("Failed to optimize model with OpenVINO")
+        else:
+            self.get_logger().info(f"Created OpenVINO model: {artifact_path}")
+        return error_code, artifact_path
 
-            self.get_logger().info(f"Created OpenVINO model: {output_file}")
+    def run_converter_job(self, common_params, training_algorithm, output_file):
+        """Helper method that sends a conversion job to the converter worker process
+           and logs the per-phase timings of the conversion.
 
-            return 0, output_file
+        Args:
+            common_params (dict): Dictionary containing the cli flags common to all
+                                  model optimizer.
+            training_algorithm (int): Which training algorithm is used.
+            output_file (str): Path where the converted model is written.
 
-        except Exception as e:  # noqa
-            self.get_logger().error(f"Failed to optimize model with OpenVINO: {e}")
-            # Return error code 1, which means that the model optimizer failed even after retries.
+        Returns:
+            tuple: Tuple whose first value is the error code and second value
+                   is a string to the location of the converted model if any.
+        """
+        try:
+            # Parse input names and shapes
+            input_names = common_params[constants.APIFlags.INPUT].split(
+                constants.ParamKeys.INPUT_SHAPE_DELIM)
+            input_shapes = eval(f'[{common_params[constants.ParamKeys.INPUT_SHAPE]}]')
+        except Exception as ex:
+            self.get_logger().error(f"Invalid model inputs: {ex}")
+            return 1, ""
+        head_name = constants.INPUT_HEAD_NAME_MAPPING[
+            constants.TrainingAlgorithms(training_algorithm)]
+        output_node = f'main_level/agent/{head_name}/online/network_1/ppo_head_0/policy'
+        use_fp16 = common_params.get(constants.ParamKeys.DATA_TYPE) == "FP16" or \
+            "--compress_to_fp16" in common_params
+
+        self.get_logger().info(f"Inputs: {dict(zip(input_names, input_shapes))}")
+        self.get_logger().info(f"Output: {output_node}")
+
+        error_code, artifact_path, error, timings, log = self._converter_worker.convert({
+            "model_path": common_params[constants.ParamKeys.MODEL_PATH],
+            "input_names": input_names,
+            "input_shapes": input_shapes,
+            "output_node": output_node,
+            "use_fp16": use_fp16,
+            "output_file": output_file
+        })
+        for level, message in log:
+            getattr(self.get_logger(), level)(message)
+        if timings:
+            self.get_logger().info(
+                f"Conversion timings for {common_params[constants.ParamKeys.MODEL_NAME]}: " +
+                ", ".join(f"{phase} {timings[phase]:.2f}s"
+                          for phase in ("import", "parse", "convert", "save")
+                          if phase in timings))
+        if error_code:
+            self.get_logger().error(f"Model conversion failed: {error}")
+            # Return error code 1, which means that the model optimizer failed.
             return 1, ""
+        return 0, artifact_path
 
     def set_platform_param(self, platform_param, aux_inputs):
         """Helper method that creates a dictionary with the platform specific
@@ -561,6 +558,7 @@ class ModelOptimizerNode(Node):
 
         Raises:
             Exception: Custom exception if the input height or width is less than 1.
+            Exception: Custom exception if the model file is not present.
 
         Returns:
             tuple: Tuple whose first value is the error code and second value
@@ -586,13 +584,97 @@ class ModelOptimizerNode(Node):
         # Add the correct file suffix.
         common_params[constants.ParamKeys.MODEL_PATH] += ".pbtxt" if "--input_model_is_text" in aux_inputs else ".pb"
 
+        if not os.path.isfile(common_params[constants.ParamKeys.MODEL_PATH]):
+            raise Exception(
+                f"Model file {common_params[constants.ParamKeys.MODEL_PATH]} not found")
+
+        # Look up the conversion in the content-addressed cache.
+        cache_key = None
+        extension = ".tflite" if self._inference_engine == "TFLITE" else ".xml"
+        if self._conversion_cache.enabled:
+            use_fp16 = common_params.get(constants.ParamKeys.DATA_TYPE) == "FP16" or \
+                "--compress_to_fp16" in common_params
+            cache_key = self._conversion_cache.make_key(
+                common_params[constants.ParamKeys.MODEL_PATH],
+                common_params.get(constants.APIFlags.INPUT, ""),
+                common_params[constants.ParamKeys.INPUT_SHAPE],
+                training_algorithm,
+                use_fp16,
+                self._converter_id)
+            cached_path = self._conversion_cache.restore(
+                cache_key, common_params[constants.ParamKeys.OUT_DIR], model_name, extension)
+            if cached_path is not None:
+                self.get_logger().info(f"Restored {model_name}{extension} from conversion "
+                                       f"cache entry {cache_key}")
+                return 0, cached_path
+            # An artifact already converted under this name with the same settings, e.g.
+            # before an upgrade or after its entry was evicted, is added back to the cache.
+            # Otherwise it comes from a conversion with another key and must not be stored
+            # under this one.
+            artifact_path = os.path.join(common_params[constants.ParamKeys.OUT_DIR],
+                                         f"{model_name}{extension}")
+            if self.is_artifact_current(artifact_path,
+                                        common_params[constants.ParamKeys.MODEL_PATH],
+                                        cache_key):
+                self.get_logger().info(f"Reusing current artifact {artifact_path}")
+                self.store_conversion(cache_key, artifact_path, model_name)
+                return 0, artifact_path
+            for path in conversion_cache.remove_artifacts(
+                    common_params[constants.ParamKeys.OUT_DIR], model_name):
+                self.get_logger().info(f"Removed stale artifact {path}")
+
         if self._inference_engine == "TFLITE":
-            return self.run_optimizer_tflite(common_params, training_algorithm)
+            error_code, artifact_path = self.run_optimizer_tflite(common_params,
+                                                                  training_algorithm)
         elif self._inference_engine == "OV" and constants.MODEL_OPTIMIZER_VERSION == 2024:
-            return self.run_optimizer_ov(common_params, training_algorithm)
+            error_code, artifact_path = self.run_optimizer_ov(common_params, training_algorithm)
         else:
-            return self.run_optimizer_mo(constants.MODEL_OPTIMIZER_COMMAND, common_params,
-                                         self.set_platform_param(tf_params, aux_inputs))
+            error_code, artifact_path = \
+                self.run_optimizer_mo(constants.MODEL_OPTIMIZER_COMMAND, common_params,
+                                      self.set_platform_param(tf_params, aux_inputs))
+
+        if cache_key is not None and error_code == 0:
+            self.store_conversion(cache_key, artifact_path, model_name)
+        return error_code, artifact_path
+
+    def is_artifact_current(self, artifact_path, model_path, cache_key):
+        """Helper method to check if an existing artifact is the conversion of the model
+           with the settings of the cache key.
+
+        Args:
+            artifact_path (str): Path to the artifact of a previous conversion.
+            model_path (str): Path to the frozen graph.
+            cache_key (str): Cache key of the requested conversion.
+
+        Returns:
+            bool: True if the artifact can be used without converting the model again.
+        """
+        if not os.path.isfile(artifact_path):
+            return False
+        artifact_key = conversion_cache.read_artifact_key(artifact_path)
+        if artifact_key is not None:
+            return artifact_key == cache_key
+        # Converted before the keys were written next to the artifacts: the artifact is
+        # current if the frozen graph has not been replaced since.
+        if os.path.getmtime(artifact_path) < os.path.getmtime(model_path):
+            return False
+        return not artifact_path.endswith(".xml") or \
+            self.get_xml_ir_version(artifact_path) == self.get_expected_ir_version()
+
+    def store_conversion(self, cache_key, artifact_path, model_name):
+        """Helper method to add a conversion to the cache and write its key next to
+           the artifact.
+
+        Args:
+            cache_key (str): Cache key of the conversion.
+            artifact_path (str): Path to the artifact returned by the converter.
+            model_name (str): Name of the converted model.
+        """
+        self._conversion_cache.store(cache_key, artifact_path, model_name)
+        try:
+            conversion_cache.write_artifact_key(artifact_path, cache_key)
+        except OSError as ex:
+            self.get_logger().error(f"Failed to write the cache key of {artifact_path}: {ex}")
 
 
 def main(args=None):
@@ -40,7 +40,8 @@ setup(
     tests_require=["pytest"],
     entry_points={
         "console_scripts": [
-            "model_optimizer_node = model_optimizer_pkg.model_optimizer_node:main"
+            "model_optimizer_node = model_optimizer_pkg.model_optimizer_node:main",
+            "model_conversion_cache = model_optimizer_pkg.conversion_cache:main"
         ],
     },
 )
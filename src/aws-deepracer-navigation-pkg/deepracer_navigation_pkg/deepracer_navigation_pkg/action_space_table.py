@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+action_space_table.py
+
+This module creates the lookup tables used by the deepracer_navigation_node to map the
+inference results to servo angle and throttle values. The tables are compiled once when
+the action space is loaded, so that mapping an inference message does not need to scale
+the action values again:
+
+    DiscreteActionTable: Final servo angle and throttle factor of every action, indexed
+                         by the class label of the action with the highest probability.
+    ContinuousActionTable: Affine coefficients that map the network outputs in [-1, 1]
+                           to servo angle and scaled speed.
+"""
+
+import operator
+import numpy as np
+
+from deepracer_navigation_pkg import constants
+
+# Key function returning the probability of an inference result.
+get_class_prob = operator.attrgetter("class_prob")
+
+
+def get_speed_mapping_coefficients(max_speed):
+    """Helper method that computes the coefficients a and b of the parabola y = ax^2 + bx
+       passing through the points [0, 0], [max_speed/2, 0.8] and [max_speed, 1.0] that
+       non linearly maps the action space speed to the servo throttle.
+
+    Args:
+        max_speed (float): Maximum speed value of the action space.
+
+    Returns:
+        tuple: Tuple of (a, b) coefficients.
+    """
+    a = (1.0 / max_speed**2) * \
+        (2.0 * constants.DEFAULT_SPEED_SCALES[0] - 4.0 * constants.DEFAULT_SPEED_SCALES[1])
+    b = (1.0 / max_speed) * \
+        (4.0 * constants.DEFAULT_SPEED_SCALES[1] - constants.DEFAULT_SPEED_SCALES[0])
+    return a, b
+
+
+def map_speed(speed, speed_mapping_coefficients):
+    """Helper method that non linearly maps the speed value to the servo throttle
+       value in [-1.0, 1.0] using the parabola coefficients.
+
+    Args:
+        speed (float or numpy.ndarray): Action space speed value(s).
+        speed_mapping_coefficients (tuple): Tuple of (a, b) coefficients.
+
+    Returns:
+        float or numpy.ndarray: Non linearly mapped speed value(s).
+    """
+    a, b = speed_mapping_coefficients
+    return np.clip(a * speed**2 + b * speed, -1.0, 1.0)
+
+
+class DiscreteActionTable:
+    """Lookup table with the final servo angle and throttle factor of every action
+       of a discrete action space.
+    """
+    def __init__(self, action_space, max_steering, speed_mapping_coefficients):
+        """Compile the action space into the lookup table.
+
+        Args:
+            action_space (list): List of dictionaries with the steering_angle and
+                                 speed of every action.
+            max_steering (float): Maximum absolute steering angle of the action space,
+                                  the angles are scaled to [-1.0, 1.0] with it.
+            speed_mapping_coefficients (tuple): Tuple of (a, b) coefficients of the
+                                                non linear speed mapping.
+        """
+        steering = np.array([action[constants.ModelMetadataKeys.STEERING]
+                             for action in action_space], dtype=np.float64)
+        speed = np.array([action[constants.ModelMetadataKeys.SPEED]
+                          for action in action_space], dtype=np.float64)
+        # The tables are kept as lists, indexing them returns plain floats and is
+        # cheaper than indexing a numpy array for a single value.
+        if max_steering > 0.0:
+            self.angles = (steering / max_steering).tolist()
+        else:
+            self.angles = [0.0] * len(action_space)
+        self.throttles = map_speed(speed, speed_mapping_coefficients).tolist()
+
+    def map_results(self, results):
+        """Map the inference results to the servo angle and throttle factor of the
+           action with the highest probability.
+
+        Args:
+            results (list): List of InferResults with the class_label and class_prob
+                            of every action.
+
+        Returns:
+            tuple: Tuple of (servo angle, throttle factor).
+        """
+        # The results are a handful of message objects, a builtin max is cheaper than
+        # copying their probabilities into an array for numpy.argmax.
+        action_id = max(results, key=get_class_prob).class_label
+        return self.angles[action_id], self.throttles[action_id]
+
+
+class ContinuousActionTable:
+    """Affine coefficients that map the outputs of a continuous action space model
+       to the servo angle and throttle factor.
+    """
+    def __init__(self, action_space, max_steering, speed_mapping_coefficients):
+        """Compile the action space bounds into the affine coefficients.
+
+        Args:
+            action_space (dict): Dictionary with the low and high bounds of the
+                                 steering_angle and speed.
+            max_steering (float): Maximum steering angle of the action space, the angles
+                                  are scaled to [-1.0, 1.0] with it.
+            speed_mapping_coefficients (tuple): Tuple of (a, b) coefficients of the
+                                                non linear speed mapping.
+        """
+        steering = action_space[constants.ModelMetadataKeys.STEERING]
+        speed = action_space[constants.ModelMetadataKeys.SPEED]
+        # Network outputs in [-1, 1] are scaled linearly to [low, high].
+        self.angle_gain, self.angle_offset = \
+            self.get_affine_coefficients(steering[constants.ModelMetadataKeys.CONTINUOUS_LOW],
+                                         steering[constants.ModelMetadataKeys.CONTINUOUS_HIGH])
+        if max_steering > 0.0:
+            self.angle_gain /= max_steering
+            self.angle_offset /= max_steering
+        else:
+            self.angle_gain = self.angle_offset = 0.0
+        self.speed_gain, self.speed_offset = \
+            self.get_affine_coefficients(speed[constants.ModelMetadataKeys.CONTINUOUS_LOW],
+                                         speed[constants.ModelMetadataKeys.CONTINUOUS_HIGH])
+        self.speed_a, self.speed_b = speed_mapping_coefficients
+
+    @staticmethod
+    def get_affine_coefficients(low, high):
+        """Helper method that returns the gain and offset mapping [-1, 1] to [low, high].
+
+        Args:
+            low (float): The minimum bound value after scaling.
+            high (float): The maximum bound value after scaling.
+
+        Returns:
+            tuple: Tuple of (gain, offset).
+        """
+        gain = (float(high) - float(low)) / 2.0
+        return gain, gain + float(low)
+
+    def map_results(self, results):
+        """Map the inference results to the servo angle and throttle factor.
+
+        Args:
+            results (list): List of InferResults with the steering output as class_label 0
+                            and the speed output as class_label 1.
+
+        Returns:
+            tuple: Tuple of (servo angle, throttle factor).
+        """
+        action_values = dict()
+        for result in results:
+            action_values[int(result.class_label)] = max(min(result.class_prob, 1.0), -1.0)
+        angle = self.angle_gain * action_values[0] + self.angle_offset
+        speed = self.speed_gain * action_values[1] + self.speed_offset
+        throttle = self.speed_a * speed * speed + self.speed_b * speed
+        return angle, max(min(throttle, 1.0), -1.0)
@@ -46,9 +46,19 @@ DEFAULT_SPEED_SCALES = [1.0, 0.8]
 
 # deepracer_navigation_node topics
 AUTO_DRIVE_TOPIC_NAME = "auto_drive"
+NAVIGATION_LATENCY_TOPIC_NAME = "latency"
+PIPELINE_TRACE_TOPIC_NAME = "/pipeline_trace"
 NAVIGATION_THROTTLE_SERVICE_NAME = "navigation_throttle"
 LOAD_ACTION_SPACE_SERVICE_NAME = "load_action_space"
 
 # inference results topic
 INFERENCE_PKG_PKG_NS = "/inference_pkg"
 INFERENCE_PKG_RL_RESULTS_TOPIC = f"{INFERENCE_PKG_PKG_NS}/rl_results"
+
+# Inference results from camera frames older than this are dropped, 0 disables the check.
+DEFAULT_MAX_FRAME_AGE_MS = 0.0
+# Seconds between the log messages about dropped frames.
+DROPPED_FRAME_LOG_PERIOD = 5.0
+# One latency message is published every LATENCY_SAMPLE_RATE servo messages,
+# matching the rate of the servo_pkg latency messages.
+LATENCY_SAMPLE_RATE = 5
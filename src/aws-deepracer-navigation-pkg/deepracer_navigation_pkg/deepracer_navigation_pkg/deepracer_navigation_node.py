@@ -33,6 +33,12 @@ The node defines:
                           the inference results.
     throttle_service: A service that is called to dynamically set the scale value to
                       multiply to the throttle in autonomous mode for each action.
+    latency_publisher: A publisher that publishes /deepracer_navigation_pkg/latency
+                       messages with the age of the camera frame when the servo
+                       message computed from it is published.
+    pipeline_trace_publisher: A publisher that publishes /pipeline_trace messages with
+                              the time the servo message of a traced camera frame
+                              is published.
 """
 
 import os
@@ -41,12 +47,20 @@ import rclpy
 from rclpy.node import Node
 from rclpy.executors import MultiThreadedExecutor
 from rclpy.callback_groups import ReentrantCallbackGroup
+from rclpy.qos import (QoSProfile,
+                       QoSHistoryPolicy,
+                       QoSReliabilityPolicy)
+from rcl_interfaces.msg import (ParameterDescriptor,
+                                ParameterType)
 
 from deepracer_interfaces_pkg.msg import (ServoCtrlMsg,
-                                          InferResultsArray)
+                                          InferResultsArray,
+                                          LatencyMeasureMsg,
+                                          PipelineStampMsg)
 from deepracer_interfaces_pkg.srv import (LoadModelSrv,
                                           NavThrottleSrv)
-from deepracer_navigation_pkg import constants
+from deepracer_navigation_pkg import (constants,
+                                      action_space_table)
 
 
 class DRNavigationNode(Node):
@@ -59,6 +73,24 @@ class DRNavigationNode(Node):
         """
         super().__init__('deepracer_navigation_node')
         self.get_logger().info("deepracer_navigation_node started")
+        # In latest-only mode only the newest inference result is queued and the servo
+        # message object is reused for every frame.
+        self.declare_parameter('latest_only', True, ParameterDescriptor(
+            type=ParameterType.PARAMETER_BOOL))
+        self.latest_only = self.get_parameter('latest_only').value
+        # Inference results computed from camera frames older than this are dropped,
+        # 0 disables the check.
+        self.declare_parameter('max_frame_age_ms', constants.DEFAULT_MAX_FRAME_AGE_MS,
+                               ParameterDescriptor(type=ParameterType.PARAMETER_DOUBLE))
+        self.max_frame_age_ns = int(self.get_parameter('max_frame_age_ms').value * 1.0e6)
+        self.get_logger().info(f"Latest-only mode: {self.latest_only}, "
+                               f"max frame age: {self.max_frame_age_ns / 1.0e6}ms")
+        self.servo_msg = ServoCtrlMsg()
+        self.dropped_frame_count = 0
+        self.latency_msg_count = 0
+        self.latency_msg = LatencyMeasureMsg()
+        self.pipeline_stamp_msg = PipelineStampMsg()
+        self.pipeline_stamp_msg.stage = PipelineStampMsg.STAGE_NAVIGATION
         # Initialize the listener for inference data
         self.infer_listener()
         # Publisher that sends driving messages to the servo
@@ -67,6 +99,14 @@ class DRNavigationNode(Node):
         self.auto_drive_publisher = self.create_publisher(ServoCtrlMsg,
                                                           constants.AUTO_DRIVE_TOPIC_NAME,
                                                           1)
+        # Publisher that sends the camera-to-servo age of the published servo messages.
+        self.latency_publisher = self.create_publisher(LatencyMeasureMsg,
+                                                       constants.NAVIGATION_LATENCY_TOPIC_NAME,
+                                                       1)
+        # Publisher that stamps the traced camera frames once their servo message is published.
+        self.pipeline_trace_publisher = self.create_publisher(PipelineStampMsg,
+                                                              constants.PIPELINE_TRACE_TOPIC_NAME,
+                                                              10)
         # Service for dynamically setting the throttle in autonomous mode
         self.throttle_service_cb_group = ReentrantCallbackGroup()
         self.throttle_service = self.create_service(NavThrottleSrv,
@@ -89,6 +129,9 @@ class DRNavigationNode(Node):
                                         constants.ModelMetadataKeys.SPEED: 0.0}
         # Coeffiecent for the non linear mapping of the velocity
         self.speed_mapping_coeficients = {'a': 0.0, 'b': 0.0}
+        # Lookup table compiled from the action space that maps the inference results
+        # to the servo angle and throttle factor.
+        self.action_table = None
         # Set the action value scales for the default space.
         self.set_action_space_scales()
         self.timer_count = 0
@@ -116,36 +159,11 @@ class DRNavigationNode(Node):
         # Negative value moves the car forward, positive values move the car backwards
         servo_msg.throttle = self.throttle_scale
         try:
-            if self.action_space_type == constants.ActionSpaceTypes.DISCRETE:
-                max_prob = max(inference_msg.results, key=lambda result: result.class_prob)
-                action_id = max_prob.class_label
-                servo_msg.angle = self.get_max_scaled_value(self.action_space[action_id]
-                                                            [constants.ModelMetadataKeys.STEERING],
-                                                            constants.ModelMetadataKeys.STEERING)
-                servo_msg.throttle *= self.get_non_linearly_mapped_speed(self.action_space[action_id]
-                                                                         [constants.ModelMetadataKeys.SPEED])
-            elif self.action_space_type == constants.ActionSpaceTypes.CONTINUOUS:
-                action_values = dict()
-                for result in inference_msg.results:
-                    action_values[int(result.class_label)] = max(min(result.class_prob, 1.0), -1.0)
-                scaled_angle = self.scale_continuous_value(action_values[0],
-                                                           -1.0,
-                                                           1.0,
-                                                           self.action_space[constants.ModelMetadataKeys.STEERING]
-                                                           [constants.ModelMetadataKeys.CONTINUOUS_LOW],
-                                                           self.action_space[constants.ModelMetadataKeys.STEERING]
-                                                           [constants.ModelMetadataKeys.CONTINUOUS_HIGH])
-                servo_msg.angle = self.get_max_scaled_value(scaled_angle, constants.ModelMetadataKeys.STEERING)
-                scaled_throttle = self.scale_continuous_value(action_values[1],
-                                                              -1.0,
-                                                              1.0,
-                                                              self.action_space[constants.ModelMetadataKeys.SPEED]
-                                                              [constants.ModelMetadataKeys.CONTINUOUS_LOW],
-                                                              self.action_space[constants.ModelMetadataKeys.SPEED]
-                                                              [constants.ModelMetadataKeys.CONTINUOUS_HIGH])
-                servo_msg.throttle *= self.get_non_linearly_mapped_speed(scaled_throttle)
-            else:
-                raise Exception("Action space type {} is not supported".format(self.action_space_type))
+            if self.action_table is None:
+                raise Exception("Action space is not compiled")
+            angle, throttle = self.action_table.map_results(inference_msg.results)
+            servo_msg.angle = angle
+            servo_msg.throttle *= throttle
         except Exception as ex:
             self.get_logger().error("Error while processing data in navigation node: {}".format(ex))
             servo_msg.throttle = 0.0
@@ -157,17 +175,84 @@ class DRNavigationNode(Node):
         Args:
             inference_msg (InferResultsArray): Message containing all relevant inference data.
         """
-        servo = ServoCtrlMsg()
+        frame_age_ns = self.get_frame_age_ns(inference_msg)
+        if self.max_frame_age_ns > 0 and frame_age_ns > self.max_frame_age_ns:
+            self.dropped_frame_count += 1
+            self.get_logger().warn(f"Dropped inference result from a frame "
+                                   f"{frame_age_ns / 1.0e6:.1f}ms old "
+                                   f"({self.dropped_frame_count} dropped)",
+                                   throttle_duration_sec=constants.DROPPED_FRAME_LOG_PERIOD)
+            return
+
+        # Publishing serializes the message, so the same object can be filled every frame.
+        servo = self.servo_msg if self.latest_only else ServoCtrlMsg()
         self.process_inference_data(inference_msg, servo)
         self.auto_drive_publisher.publish(servo)
+        self.publish_latency(inference_msg)
+        self.publish_pipeline_stamp(servo.source_stamp)
+
+    def get_frame_age_ns(self, inference_msg):
+        """Helper method that returns the age of the camera frame the inference results
+           were computed from.
+
+        Args:
+            inference_msg (InferResultsArray): Message containing all relevant inference data.
+
+        Returns:
+            int: Age of the frame in nanoseconds or 0 if the frame is not stamped.
+        """
+        if not inference_msg.images:
+            return 0
+        frame_stamp = inference_msg.images[0].header.stamp
+        if frame_stamp.sec == 0 and frame_stamp.nanosec == 0:
+            return 0
+        return self.get_clock().now().nanoseconds \
+            - (frame_stamp.sec * 1000000000 + frame_stamp.nanosec)
+
+    def publish_latency(self, inference_msg):
+        """Publish the age of the camera frame once the servo message computed from it
+           is published, for every LATENCY_SAMPLE_RATE-th message.
+
+        Args:
+            inference_msg (InferResultsArray): Message containing all relevant inference data.
+        """
+        self.latency_msg_count = (self.latency_msg_count + 1) % constants.LATENCY_SAMPLE_RATE
+        if self.latency_msg_count != 0 \
+           or self.latency_publisher.get_subscription_count() == 0:
+            return
+        latency_ns = self.get_frame_age_ns(inference_msg)
+        if latency_ns > 0:
+            self.latency_msg.latency_ms = latency_ns / 1.0e6
+            self.latency_publisher.publish(self.latency_msg)
+
+    def publish_pipeline_stamp(self, source_stamp):
+        """Publish the time the servo message of a camera frame is published, if the
+           frame is traced and the pipeline trace topic has subscribers.
+
+        Args:
+            source_stamp (Time): Capture timestamp of the camera frame.
+        """
+        if (source_stamp.nanosec // 1000) % PipelineStampMsg.SAMPLE_RATE != 0 \
+           or self.pipeline_trace_publisher.get_subscription_count() == 0:
+            return
+        self.pipeline_stamp_msg.source_stamp = source_stamp
+        self.pipeline_stamp_msg.stamp = self.get_clock().now().to_msg()
+        self.pipeline_trace_publisher.publish(self.pipeline_stamp_msg)
 
     def infer_listener(self):
-        """Method that registers the class to listen to inference results
+        """Method that registers the class to listen to inference results. In latest-only
+           mode a late result is not queued behind newer ones.
         """
+        if self.latest_only:
+            qos_profile = QoSProfile(depth=1)
+            qos_profile.history = QoSHistoryPolicy.KEEP_LAST
+            qos_profile.reliability = QoSReliabilityPolicy.BEST_EFFORT
+        else:
+            qos_profile = 10
         self.create_subscription(InferResultsArray,
                                  constants.INFERENCE_PKG_RL_RESULTS_TOPIC,
                                  self.inference_cb,
-                                 10)
+                                 qos_profile)
 
     def set_throttle_scale_cb(self, req, res):
         """Callback for the navigation_throttle service. Allows clients to dynamically set the
@@ -214,6 +299,7 @@ class DRNavigationNode(Node):
             self.action_space = constants.DEFAULT_ACTION_SPACE
             self.action_space_type = constants.ActionSpaceTypes.DISCRETE
             self.get_logger().error(f"Failed to load action space and action space type due to: {ex}")
+            self.set_action_space_scales()
             res.error = 1
             return res
 
@@ -277,76 +363,29 @@ class DRNavigationNode(Node):
                 self.max_action_space_values[constants.ModelMetadataKeys.SPEED] = \
                     self.action_space[constants.ModelMetadataKeys.SPEED][constants.ModelMetadataKeys.CONTINUOUS_HIGH]
             else:
-                raise(f"Incorrect action space type: {self.action_space_type}")
+                raise Exception(f"Incorrect action space type: {self.action_space_type}")
             # This is the solution to a*x**2 + b*x for the two points in DEFAULT_SPEED_SCALES
-            self.speed_mapping_coeficients['a'] = \
-                (1.0 / self.max_action_space_values[constants.ModelMetadataKeys.SPEED]**2) * \
-                (2.0 * constants.DEFAULT_SPEED_SCALES[0] - 4.0 * constants.DEFAULT_SPEED_SCALES[1])
-            self.speed_mapping_coeficients['b'] = \
-                (1.0 / self.max_action_space_values[constants.ModelMetadataKeys.SPEED]) * \
-                (4.0 * constants.DEFAULT_SPEED_SCALES[1] - constants.DEFAULT_SPEED_SCALES[0])
+            self.speed_mapping_coeficients['a'], self.speed_mapping_coeficients['b'] = \
+                action_space_table.get_speed_mapping_coefficients(
+                    self.max_action_space_values[constants.ModelMetadataKeys.SPEED])
 
             self.get_logger().info(f"Action space scale set: {self.max_action_space_values} \n"
                                    f" Mapping equation params a: {self.speed_mapping_coeficients['a']}"
                                    f" b: {self.speed_mapping_coeficients['b']}")
-        except Exception as ex:
-            self.get_logger().error(f"Unable to detect action space scale: {ex}")
 
-    def get_max_scaled_value(self, action_value, action_key):
-        """Helper method that scales the action value based on the maximum value in the
-           action space.
-
-        Args:
-            action_value (float): steering angle or speed value
-            action_key (string): steering_angle or speed
-
-        Returns:
-            float: scaled action value between [0.0, 1.0]
-        """
-        try:
-            max_value = self.max_action_space_values[action_key]
-            if max_value <= 0.0:
-                self.get_logger().error(f"Invalid {action_key} value {max_value}")
-                return 0.0
-            return float(action_value) / float(max_value)
+            # Compile the action space so that every inference message is mapped with a
+            # single lookup instead of scaling the action values again.
+            table_class = action_space_table.DiscreteActionTable \
+                if self.action_space_type == constants.ActionSpaceTypes.DISCRETE \
+                else action_space_table.ContinuousActionTable
+            self.action_table = \
+                table_class(self.action_space,
+                            self.max_action_space_values[constants.ModelMetadataKeys.STEERING],
+                            (self.speed_mapping_coeficients['a'],
+                             self.speed_mapping_coeficients['b']))
         except Exception as ex:
-            self.get_logger().error(f"Unable to scale the action value {action_key}: {ex}")
-            return 0.0
-
-    def get_non_linearly_mapped_speed(self, scaled_action_space_speed):
-        """Helper method that non linearly maps the scaled speed value to a value passed
-           as part of the servo message calculated as a solution to the formula y = ax^2 + bx.
-           Where a and b are the coffecients in the equation of a parabola (y = ax^2 + bx) passing
-           through the points [0, 0], [maximum_speed/2, 0.8] and [maximum_speed, 1.0].
-
-        Args:
-            scaled_action_space_speed (float): scaled action space speed
-
-        Returns:
-            float: non linearly mapped speed value between [0.0, 1.0]
-        """
-        mapped_speed = self.speed_mapping_coeficients['a'] * scaled_action_space_speed**2 + \
-            self.speed_mapping_coeficients['b'] * scaled_action_space_speed
-        return max(min(mapped_speed, 1.0), -1.0)
-
-    def scale_continuous_value(self, action, min_old, max_old, min_new, max_new):
-        """Helper method that return the scaled continuous action space values
-           from min_old, max_old to min_new, max_new.
-
-        Args:
-            action (float): The action value to be scaled
-            min_old (float): The minimum bound value before scaling
-            max_old (float): The maximum bound value before scaling
-            min_new (float): The minimum bound value after scaling
-            max_new (float): The maximum bound value after scaling
-
-        Returns:
-            (float): scaled action value
-        """
-        if max_old == min_old:
-            self.get_logger().error("Unsupported minimum and maximum action space bounds for scaling values. \
-                min_old: {}; max_old: {}".format(min_old, max_old))
-        return ((max_new - min_new) / (max_old - min_old)) * (action - min_old) + min_new
+            self.action_table = None
+            self.get_logger().error(f"Unable to detect action space scale: {ex}")
 
 
 def main(args=None):
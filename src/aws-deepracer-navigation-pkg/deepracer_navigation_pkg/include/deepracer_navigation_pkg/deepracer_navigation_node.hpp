@@ -11,6 +11,8 @@
 #include "rclcpp/rclcpp.hpp"
 #include "deepracer_interfaces_pkg/msg/servo_ctrl_msg.hpp"
 #include "deepracer_interfaces_pkg/msg/infer_results_array.hpp"
+#include "deepracer_interfaces_pkg/msg/latency_measure_msg.hpp"
+#include "deepracer_interfaces_pkg/msg/pipeline_stamp_msg.hpp"
 #include "deepracer_interfaces_pkg/srv/nav_throttle_srv.hpp"
 #include "deepracer_interfaces_pkg/srv/load_model_srv.hpp"
 
@@ -21,6 +23,8 @@ namespace constants {
     // Topic names
     const std::string INFERENCE_PKG_RL_RESULTS_TOPIC = "/inference_pkg/rl_results";
     const std::string AUTO_DRIVE_TOPIC_NAME = "auto_drive";
+    const std::string NAVIGATION_LATENCY_TOPIC_NAME = "latency";
+    const std::string PIPELINE_TRACE_TOPIC_NAME = "/pipeline_trace";
 
     // Service names
     const std::string NAVIGATION_THROTTLE_SERVICE_NAME = "navigation_throttle";
@@ -43,6 +47,14 @@ namespace constants {
 
     // Default speed scales
     const std::vector<double> DEFAULT_SPEED_SCALES = {1.0, 0.8};
+
+    // Inference results from camera frames older than this are dropped, 0 disables the check.
+    const double DEFAULT_MAX_FRAME_AGE_MS = 0.0;
+    // Milliseconds between the log messages about dropped frames.
+    const int DROPPED_FRAME_LOG_PERIOD_MS = 5000;
+    // One latency message is published every LATENCY_SAMPLE_RATE servo messages,
+    // matching the rate of the servo_pkg latency messages.
+    const int LATENCY_SAMPLE_RATE = 5;
 }
 
 class DRNavigationNode : public rclcpp::Node {
@@ -61,6 +73,17 @@ private:
     
     // Callback for inference results
     void inference_cb(const deepracer_interfaces_pkg::msg::InferResultsArray::SharedPtr inference_msg);
+
+    // Age of the camera frame the inference results were computed from
+    int64_t get_frame_age_ns(
+        const deepracer_interfaces_pkg::msg::InferResultsArray::SharedPtr inference_msg);
+
+    // Publish the camera-to-servo age of every LATENCY_SAMPLE_RATE-th servo message
+    void publish_latency(
+        const deepracer_interfaces_pkg::msg::InferResultsArray::SharedPtr inference_msg);
+
+    // Publish the navigation stamp of a traced camera frame
+    void publish_pipeline_stamp(const builtin_interfaces::msg::Time& source_stamp);
     
     // Service callbacks
     void set_throttle_scale_cb(
@@ -86,10 +109,18 @@ private:
     std::map<std::string, double> max_action_space_values_;
     std::map<std::string, double> speed_mapping_coefficients_;
     int timer_count_{0};
+    bool latest_only_{true};
+    int64_t max_frame_age_ns_{0};
+    int dropped_frame_count_{0};
+    int latency_msg_count_{0};
+    deepracer_interfaces_pkg::msg::ServoCtrlMsg servo_msg_;
+    deepracer_interfaces_pkg::msg::LatencyMeasureMsg latency_msg_;
     
     // ROS members
     rclcpp::CallbackGroup::SharedPtr throttle_service_cb_group_;
     rclcpp::Publisher<deepracer_interfaces_pkg::msg::ServoCtrlMsg>::SharedPtr auto_drive_publisher_;
+    rclcpp::Publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg>::SharedPtr latency_publisher_;
+    rclcpp::Publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>::SharedPtr pipeline_trace_publisher_;
     rclcpp::Subscription<deepracer_interfaces_pkg::msg::InferResultsArray>::SharedPtr inference_subscription_;
     rclcpp::Service<deepracer_interfaces_pkg::srv::NavThrottleSrv>::SharedPtr throttle_service_;
     rclcpp::Service<deepracer_interfaces_pkg::srv::LoadModelSrv>::SharedPtr action_space_service_;
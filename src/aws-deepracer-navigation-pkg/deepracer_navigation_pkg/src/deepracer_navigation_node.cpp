@@ -12,10 +12,28 @@ DRNavigationNode::DRNavigationNode()
     : Node("deepracer_navigation_node")
 {
     RCLCPP_INFO(get_logger(), "deepracer_navigation_node started");
+
+    // In latest-only mode only the newest inference result is queued and the servo
+    // message object is reused for every frame.
+    latest_only_ = declare_parameter<bool>("latest_only", true);
+    // Inference results computed from camera frames older than this are dropped,
+    // 0 disables the check.
+    max_frame_age_ns_ = static_cast<int64_t>(
+        declare_parameter<double>("max_frame_age_ms", constants::DEFAULT_MAX_FRAME_AGE_MS) * 1.0e6);
+    RCLCPP_INFO(get_logger(), "Latest-only mode: %s, max frame age: %fms",
+                latest_only_ ? "true" : "false", max_frame_age_ns_ / 1.0e6);
     
     // Publisher for autonomous driving commands
     auto_drive_publisher_ = create_publisher<deepracer_interfaces_pkg::msg::ServoCtrlMsg>(
         constants::AUTO_DRIVE_TOPIC_NAME, 1);
+
+    // Publisher for the camera-to-servo age of the published servo messages
+    latency_publisher_ = create_publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg>(
+        constants::NAVIGATION_LATENCY_TOPIC_NAME, 1);
+
+    // Publisher for the navigation stamps of the traced camera frames
+    pipeline_trace_publisher_ = create_publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>(
+        constants::PIPELINE_TRACE_TOPIC_NAME, 10);
         
     // Create callback group for throttle service
     throttle_service_cb_group_ = create_callback_group(
@@ -45,9 +63,12 @@ DRNavigationNode::DRNavigationNode()
     // Set default action space scales
     set_action_space_scales();
     
-    // Subscribe to inference results
+    // Subscribe to inference results. In latest-only mode a late result is not queued
+    // behind newer ones.
+    auto inference_qos = latest_only_ ? rclcpp::QoS(rclcpp::KeepLast(1)).best_effort()
+                                      : rclcpp::QoS(10);
     inference_subscription_ = create_subscription<deepracer_interfaces_pkg::msg::InferResultsArray>(
-        constants::INFERENCE_PKG_RL_RESULTS_TOPIC, 10,
+        constants::INFERENCE_PKG_RL_RESULTS_TOPIC, inference_qos,
         std::bind(&DRNavigationNode::inference_cb, this, std::placeholders::_1));
     
     // Create heartbeat timer
@@ -122,9 +143,64 @@ void DRNavigationNode::process_inference_data(
 void DRNavigationNode::inference_cb(
     const deepracer_interfaces_pkg::msg::InferResultsArray::SharedPtr inference_msg) 
 {
+    int64_t frame_age_ns = get_frame_age_ns(inference_msg);
+    if (max_frame_age_ns_ > 0 && frame_age_ns > max_frame_age_ns_) {
+        dropped_frame_count_++;
+        RCLCPP_WARN_THROTTLE(get_logger(), *get_clock(), constants::DROPPED_FRAME_LOG_PERIOD_MS,
+                             "Dropped inference result from a frame %.1fms old (%d dropped)",
+                             frame_age_ns / 1.0e6, dropped_frame_count_);
+        return;
+    }
+
+    // Publishing serializes the message, so the same object can be filled every frame.
     deepracer_interfaces_pkg::msg::ServoCtrlMsg servo_msg;
-    process_inference_data(inference_msg, servo_msg);
-    auto_drive_publisher_->publish(servo_msg);
+    auto& servo = latest_only_ ? servo_msg_ : servo_msg;
+    process_inference_data(inference_msg, servo);
+    auto_drive_publisher_->publish(servo);
+    publish_latency(inference_msg);
+    publish_pipeline_stamp(servo.source_stamp);
+}
+
+int64_t DRNavigationNode::get_frame_age_ns(
+    const deepracer_interfaces_pkg::msg::InferResultsArray::SharedPtr inference_msg)
+{
+    // Results without a stamped camera frame have no age.
+    if (inference_msg->images.empty()) {
+        return 0;
+    }
+    const auto& frame_stamp = inference_msg->images[0].header.stamp;
+    if (frame_stamp.sec == 0 && frame_stamp.nanosec == 0) {
+        return 0;
+    }
+    return now().nanoseconds() - rclcpp::Time(frame_stamp).nanoseconds();
+}
+
+void DRNavigationNode::publish_latency(
+    const deepracer_interfaces_pkg::msg::InferResultsArray::SharedPtr inference_msg)
+{
+    latency_msg_count_ = (latency_msg_count_ + 1) % constants::LATENCY_SAMPLE_RATE;
+    if (latency_msg_count_ != 0 || latency_publisher_->get_subscription_count() == 0) {
+        return;
+    }
+    int64_t latency_ns = get_frame_age_ns(inference_msg);
+    if (latency_ns > 0) {
+        latency_msg_.latency_ms = latency_ns / 1.0e6;
+        latency_publisher_->publish(latency_msg_);
+    }
+}
+
+void DRNavigationNode::publish_pipeline_stamp(const builtin_interfaces::msg::Time& source_stamp)
+{
+    // Only the frames sampled by all the stages are traced, and only when someone listens.
+    if ((source_stamp.nanosec / 1000) % deepracer_interfaces_pkg::msg::PipelineStampMsg::SAMPLE_RATE != 0
+        || pipeline_trace_publisher_->get_subscription_count() == 0) {
+        return;
+    }
+    deepracer_interfaces_pkg::msg::PipelineStampMsg stamp_msg;
+    stamp_msg.source_stamp = source_stamp;
+    stamp_msg.stage = deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_NAVIGATION;
+    stamp_msg.stamp = now();
+    pipeline_trace_publisher_->publish(stamp_msg);
 }
 
 void DRNavigationNode::set_throttle_scale_cb(
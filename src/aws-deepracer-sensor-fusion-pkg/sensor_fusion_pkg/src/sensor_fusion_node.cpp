@@ -35,6 +35,8 @@ The node defines:
     overlayImagePub_: A publisher to publish the Image message that has the LiDAR
                       overaly data on top of the camera frame to highlight the sectors
                       with an obstacle present behind the DeepRacer device.
+    pipelineTracePub_: A publisher to publish the time the sensor message of a traced
+                       camera frame is published to the /pipeline_trace topic.
     statusCheckService_: A service to find out the data status of the cameras and the LiDAR
                          sensors. Based on whether the single camera/stereo camera/LiDAR data
                          is being read by the node, the corresponding sensor status are set.
@@ -67,6 +69,7 @@ The node defines:
 
 #include "deepracer_interfaces_pkg/msg/evo_sensor_msg.hpp"
 #include "deepracer_interfaces_pkg/msg/camera_msg.hpp"
+#include "deepracer_interfaces_pkg/msg/pipeline_stamp_msg.hpp"
 #include "deepracer_interfaces_pkg/srv/lidar_config_srv.hpp"
 #include "deepracer_interfaces_pkg/srv/sensor_status_check_srv.hpp"
 
@@ -123,6 +126,7 @@ namespace SensorFusion {
     // Message Topics to publish to.
     const char* SENSOR_MSG_TOPIC = "sensor_msg";
     const char* OVERLAY_MSG_TOPIC = "overlay_msg";
+    const char* PIPELINE_TRACE_TOPIC = "/pipeline_trace";
     const char* SENSOR_DATA_STATUS_SERVICE_NAME = "sensor_data_status";
     const char* CONFIGURE_LIDAR_SERVICE_NAME = "configure_lidar";
 
@@ -201,6 +205,9 @@ namespace SensorFusion {
             // to inference node.
             sensorMsgPub_ = this->create_publisher<deepracer_interfaces_pkg::msg::EvoSensorMsg>(SENSOR_MSG_TOPIC, 1);
 
+            // Publisher to stamp the traced camera frames once the sensor message is published.
+            pipelineTracePub_ = this->create_publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>(PIPELINE_TRACE_TOPIC, 10);
+
             // Publisher to publish the overlay message with sector LiDAR information
             // overlayed over the camera image frame.
             if (enableOverlay_)
@@ -300,12 +307,30 @@ namespace SensorFusion {
                     sensorMsg.lidar_data = lidarData_; 
                 }
                 this->sensorMsgPub_->publish(sensorMsg);  // Publish it along.
+                if (!sensorMsg.images.empty()) {
+                    publishPipelineStamp(sensorMsg.images.front().header.stamp);
+                }
             }
             catch (const std::exception &ex) {
                 RCLCPP_ERROR(this->get_logger(), "Camera callback failed: %s", ex.what());
             }
         }
 
+        /// Publishes the time the sensor fusion stage finished processing a camera frame,
+        /// if the frame is traced and the pipeline trace topic has subscribers.
+        /// @param sourceStamp Capture timestamp of the camera frame.
+        void publishPipelineStamp(const builtin_interfaces::msg::Time &sourceStamp) {
+            if ((sourceStamp.nanosec / 1000) % deepracer_interfaces_pkg::msg::PipelineStampMsg::SAMPLE_RATE != 0
+                || pipelineTracePub_->get_subscription_count() == 0) {
+                return;
+            }
+            deepracer_interfaces_pkg::msg::PipelineStampMsg stampMsg;
+            stampMsg.source_stamp = sourceStamp;
+            stampMsg.stage = deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_SENSOR_FUSION;
+            stampMsg.stamp = this->get_clock()->now();
+            pipelineTracePub_->publish(stampMsg);
+        }
+
 
         /// Callback function for camera message subscription.
         /// @param msg Message with images from DeepRacer cameras.
@@ -596,6 +621,7 @@ namespace SensorFusion {
         rclcpp::Service<deepracer_interfaces_pkg::srv::SensorStatusCheckSrv>::SharedPtr statusCheckService_;
 
         rclcpp::Publisher<deepracer_interfaces_pkg::msg::EvoSensorMsg>::SharedPtr sensorMsgPub_;
+        rclcpp::Publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>::SharedPtr pipelineTracePub_;
 
         std::shared_ptr<SensorFusionNode> node_handle_;
         image_transport::ImageTransport image_transport_;       
@@ -25,6 +25,7 @@
 
 #include "deepracer_interfaces_pkg/msg/servo_ctrl_msg.hpp"
 #include "deepracer_interfaces_pkg/msg/latency_measure_msg.hpp"
+#include "deepracer_interfaces_pkg/msg/pipeline_stamp_msg.hpp"
 #include "deepracer_interfaces_pkg/srv/get_calibration_srv.hpp"
 #include "deepracer_interfaces_pkg/srv/set_calibration_srv.hpp"
 #include "deepracer_interfaces_pkg/srv/servo_gpio_srv.hpp"
@@ -59,7 +60,8 @@ namespace PWM {
         {
         public:
             ServoMgr(rclcpp::Logger logger_, std::shared_ptr<rclcpp::Clock> clock, 
-                     std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg, std::allocator<void>>> latencyPub);
+                     std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg, std::allocator<void>>> latencyPub,
+                     std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg, std::allocator<void>>> tracePub);
             ~ServoMgr();
             void servoSubscriber(const deepracer_interfaces_pkg::msg::ServoCtrlMsg::SharedPtr servoMsg);
             void rawPWMSubscriber(const deepracer_interfaces_pkg::msg::ServoCtrlMsg::SharedPtr servoMsg);
@@ -112,6 +114,8 @@ namespace PWM {
             std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg, std::allocator<void>>> latencyPub_;
             /// Message count for latency measurement
             int latency_msg_count_ = 0;
+            /// ROS Publisher for the pipeline stamps of the traced camera frames
+            std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg, std::allocator<void>>> tracePub_;
     };
 }
 #endif
@@ -43,12 +43,14 @@ namespace PWM {
 
 
     ServoMgr::ServoMgr(rclcpp::Logger logger_, std::shared_ptr<rclcpp::Clock> clock,
-                       std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg, std::allocator<void>>> latencyPub)  
+                       std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg, std::allocator<void>>> latencyPub,
+                       std::shared_ptr<rclcpp::Publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg, std::allocator<void>>> tracePub)
         : throttle_(std::make_unique<Servo>(0, logger_)),
           angle_(std::make_unique<Servo>(1, logger_)),
           logger_(logger_),
           clock_(clock),
-          latencyPub_(latencyPub)    
+          latencyPub_(latencyPub),
+          tracePub_(tracePub)
     {
         throttle_->setPeriod(SERVO_PERIOD);
         angle_->setPeriod(SERVO_PERIOD);
@@ -116,6 +118,17 @@ namespace PWM {
             latencyPub_->publish(latency_msg);
         } 
 
+        // Stamp the traced camera frames, sampled on the source_stamp like in the other stages
+        if (servoMsg->source_stamp.sec != 0
+            && (servoMsg->source_stamp.nanosec / 1000) % deepracer_interfaces_pkg::msg::PipelineStampMsg::SAMPLE_RATE == 0
+            && tracePub_->get_subscription_count() > 0) {
+            auto stamp_msg = deepracer_interfaces_pkg::msg::PipelineStampMsg();
+            stamp_msg.source_stamp = servoMsg->source_stamp;
+            stamp_msg.stage = deepracer_interfaces_pkg::msg::PipelineStampMsg::STAGE_SERVO;
+            stamp_msg.stamp = now;
+            tracePub_->publish(stamp_msg);
+        }
+
         // Sleep until 20ms has elapsed since 'now'
         const int TARGET_CYCLE_TIME_NS = 20'000'000; // 20 ms in nanoseconds
         auto elapsed_ns = std::chrono::duration_cast<std::chrono::nanoseconds>(
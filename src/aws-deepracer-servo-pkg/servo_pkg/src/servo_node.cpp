@@ -38,12 +38,15 @@ int main(int argc, char **argv) {
     const char* SERVO_TOPIC = "/ctrl_pkg/servo_msg";
     const char* RAW_PWM_TOPIC = "/ctrl_pkg/raw_pwm";
     const char* LATENCY_TOPIC = "/servo_pkg/latency";
+    const char* PIPELINE_TRACE_TOPIC = "/pipeline_trace";
     
     std::shared_ptr<rclcpp::Node> node = rclcpp::Node::make_shared("servo_node");
 
     auto pub_ = node->create_publisher<deepracer_interfaces_pkg::msg::LatencyMeasureMsg>(LATENCY_TOPIC, rclcpp::SystemDefaultsQoS());
 
-    auto servoMgr = std::make_unique<PWM::ServoMgr>(node->get_logger(), node->get_clock(), pub_);
+    auto tracePub_ = node->create_publisher<deepracer_interfaces_pkg::msg::PipelineStampMsg>(PIPELINE_TRACE_TOPIC, 10);
+
+    auto servoMgr = std::make_unique<PWM::ServoMgr>(node->get_logger(), node->get_clock(), pub_, tracePub_);
     auto ledMgr = std::make_unique<PWM::LedMgr>(node->get_logger());
     auto qos = rclcpp::QoS(rclcpp::KeepLast(1));
     qos.best_effort();
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+import os
+import gzip
+import hashlib
+import tarfile
+
+from deepracer_systems_pkg.model_loader_module import model_loader_config
+
+
+def is_tar_archive(filename):
+    """Helper method to check if the file is a tar archive, optionally gzip compressed.
+
+    Args:
+        filename (str): Name of the file.
+
+    Returns:
+        bool: True if the file has a .tar or .tar.gz extension.
+    """
+    return filename.endswith((".tar", ".tar.gz"))
+
+
+def write_stream(source, target_path, max_size, compute_checksum):
+    """Helper method to copy a file object to the target path in chunks, computing the
+       Md5 checksum of the content on the way.
+
+    Args:
+        source (file object): File object to read the content from.
+        target_path (str): Path of the file to be written.
+        max_size (int): Maximum number of bytes accepted from the source.
+        compute_checksum (bool): Flag to compute the checksum of the content.
+
+    Returns:
+        str: Hexdigest of the content or empty string if the checksum is not computed.
+    """
+    hash_md5 = hashlib.md5() if compute_checksum else None
+    written = 0
+    with open(target_path, "wb") as out_file:
+        for chunk in iter(lambda: source.read(model_loader_config.MODEL_ARCHIVE_CHUNK_SIZE), b""):
+            written += len(chunk)
+            if written > max_size:
+                raise ValueError(f"{os.path.basename(target_path)} is too large")
+            out_file.write(chunk)
+            if hash_md5 is not None:
+                hash_md5.update(chunk)
+    return hash_md5.hexdigest() if hash_md5 is not None else ""
+
+
+def extract_tar_archive(archive_path, target_directory, model_file_extensions):
+    """Helper method that extracts a tar archive in a single streaming pass, writing the
+       members directly to the target directory and computing the checksum of the model
+       files while they are written. Members that are larger than the configured limit
+       or that would be written outside the target directory fail the extraction, links
+       and special files are skipped.
+
+    Args:
+        archive_path (str): Path to the .tar or .tar.gz archive.
+        target_directory (str): Directory where the members are extracted.
+        model_file_extensions (tuple): Extensions of the files to be checksummed.
+
+    Returns:
+        tuple: Tuple of (error_code, error_message, list of tuples with the path
+               and the checksum of the model files extracted).
+    """
+    model_list = list()
+    try:
+        mode = "r|" if archive_path.endswith(".tar") else "r|gz"
+        target_root = os.path.realpath(target_directory)
+        with tarfile.open(archive_path, mode) as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+
+                target_path = os.path.realpath(os.path.join(target_root, member.name))
+                if os.path.commonpath([target_root, target_path]) != target_root:
+                    return 1, f"Archive member {member.name} is outside the target directory", []
+                if member.size > model_loader_config.MODEL_ARCHIVE_MAX_MEMBER_SIZE:
+                    return 1, f"Archive member {member.name} is too large: {member.size} bytes", []
+
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                is_model_file = target_path.endswith(model_file_extensions)
+                checksum = write_stream(tar.extractfile(member),
+                                        target_path,
+                                        member.size,
+                                        is_model_file)
+                if is_model_file:
+                    model_list.append((target_path, checksum))
+
+        return 0, "", model_list
+    except Exception as exc:
+        return 1, f"Error while extracting {archive_path}: {exc}", []
+
+
+def copy_model_file(file_path, target_directory, model_file_extensions):
+    """Helper method that copies a single model or metadata file to the target directory,
+       computing the checksum of the model file while it is copied. Files with a .gz
+       extension are decompressed on the way.
+
+    Args:
+        file_path (str): Path to the file, optionally gzip compressed.
+        target_directory (str): Directory where the file is copied.
+        model_file_extensions (tuple): Extensions of the files to be checksummed.
+
+    Returns:
+        tuple: Tuple of (error_code, error_message, list of tuples with the path
+               and the checksum of the model file copied).
+    """
+    try:
+        filename = os.path.basename(file_path)
+        open_file = open
+        if filename.endswith(".gz"):
+            filename = filename[:-len(".gz")]
+            open_file = gzip.open
+
+        target_path = os.path.join(target_directory, filename)
+        is_model_file = target_path.endswith(model_file_extensions)
+        with open_file(file_path, "rb") as in_file:
+            checksum = write_stream(in_file,
+                                    target_path,
+                                    model_loader_config.MODEL_ARCHIVE_MAX_MEMBER_SIZE,
+                                    is_model_file)
+        return 0, "", [(target_path, checksum)] if is_model_file else []
+    except Exception as exc:
+        return 1, f"Error while copying {file_path}: {exc}", []
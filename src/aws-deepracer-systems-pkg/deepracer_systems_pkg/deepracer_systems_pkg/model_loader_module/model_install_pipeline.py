@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+model_install_pipeline.py
+
+This module creates the ModelInstallPipeline class which runs the stages of the
+model installation on bounded worker pools. Extraction and copy run on a
+pool sized to the number of cores, while the model optimization runs on its own
+smaller pool so that a slow optimizer does not hold back the file operations of the
+other models. Every stage transition is reported through a progress callback and the
+time spent per stage is accumulated.
+"""
+
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from deepracer_systems_pkg.model_loader_module import model_loader_config
+
+
+class ModelInstallStages():
+    """Names of the stages of the model installation pipeline.
+    """
+    EXTRACT = "extract"
+    COPY = "copy"
+    OPTIMIZE = "optimize"
+    INSTALL = "install"
+
+
+class ModelInstallStatus():
+    """Status values reported for a stage.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ModelInstallPipeline:
+    """Class owning the worker pools of the model installation pipeline.
+    """
+    def __init__(self,
+                 logger,
+                 progress_cb=None,
+                 install_workers=model_loader_config.INSTALL_WORKER_COUNT,
+                 optimizer_workers=model_loader_config.OPTIMIZER_WORKER_COUNT):
+        """Create the ModelInstallPipeline object.
+
+        Args:
+            logger (rclpy.rclpy.impl.rcutils_logger.RcutilsLogger): Logger object of the
+                                                                     model_loader_node.
+            progress_cb (function, optional): Function called with the model name, stage,
+                                              status and elapsed seconds on every stage
+                                              transition. Defaults to None.
+            install_workers (int, optional): Size of the extraction/copy pool.
+                                             Defaults to INSTALL_WORKER_COUNT.
+            optimizer_workers (int, optional): Size of the optimization pool.
+                                               Defaults to OPTIMIZER_WORKER_COUNT.
+        """
+        self.logger = logger
+        self.progress_cb = progress_cb
+        self.install_executor = ThreadPoolExecutor(max_workers=install_workers,
+                                                   thread_name_prefix="model_install")
+        self.optimize_executor = ThreadPoolExecutor(max_workers=optimizer_workers,
+                                                    thread_name_prefix="model_optimize")
+        self.stage_times = collections.defaultdict(float)
+        self.stage_times_lock = threading.Lock()
+
+    def shutdown(self, wait=True):
+        """Release the worker pools.
+
+        Args:
+            wait (bool, optional): Wait for the queued stages to finish. Defaults to True.
+        """
+        self.install_executor.shutdown(wait=wait)
+        self.optimize_executor.shutdown(wait=wait)
+
+    def reset_stage_times(self):
+        """Clear the accumulated time spent per stage.
+        """
+        with self.stage_times_lock:
+            self.stage_times.clear()
+
+    def get_stage_times(self):
+        """Return the accumulated time spent per stage.
+
+        Returns:
+            dict: Dictionary with the total seconds spent in each stage.
+        """
+        with self.stage_times_lock:
+            return dict(self.stage_times)
+
+    def report(self, model_name, stage, status, elapsed=0.0):
+        """Report a stage transition of a model.
+
+        Args:
+            model_name (str): Name of the model.
+            stage (str): Stage of the pipeline.
+            status (str): Status of the stage.
+            elapsed (float, optional): Seconds spent in the stage. Defaults to 0.0.
+        """
+        if self.progress_cb is None:
+            return
+        try:
+            self.progress_cb(model_name, stage, status, elapsed)
+        except Exception as ex:
+            self.logger.error(f"Failed to report progress of {model_name}: {ex}")
+
+    def run_stage(self, model_name, stage, function, *args):
+        """Run one stage of the pipeline for a model, timing and reporting it.
+           The stage fails if the function raises or returns a falsy value.
+
+        Args:
+            model_name (str): Name of the model.
+            stage (str): Stage of the pipeline.
+            function (function): Function implementing the stage.
+
+        Returns:
+            Any: Return value of the function or None if it raised an exception.
+        """
+        self.report(model_name, stage, ModelInstallStatus.RUNNING)
+        start = time.monotonic()
+        try:
+            result = function(*args)
+        except Exception as ex:
+            self.logger.error(f"Stage {stage} of {model_name} failed: {ex}")
+            result = None
+        elapsed = time.monotonic() - start
+        with self.stage_times_lock:
+            self.stage_times[stage] += elapsed
+        self.report(model_name,
+                    stage,
+                    ModelInstallStatus.DONE if result else ModelInstallStatus.FAILED,
+                    elapsed)
+        return result
@@ -21,20 +21,22 @@ model_install_state.py
 
 This module creates the ModelInstallState class which is responsible for creating the
 model directory in the /opt/aws/deepracer/artifacts folder and copying the verified files
-to it in a seperate thread. If the model_optimizer_client is passed, the class handles
-calling model optimizer service with the relevant details to optimize the model.
+to it on the install pool of the model installation pipeline. If the model_optimizer_client
+is passed, the class handles calling model optimizer service with the relevant details to
+optimize the model on the optimizer pool of the pipeline.
 """
 
 import os
 import shutil
 import threading
-import time
 
 from deepracer_interfaces_pkg.srv import ModelOptimizeSrv
 from deepracer_systems_pkg import (constants,
                                    file_system_utils)
 from deepracer_systems_pkg.model_loader_module import (model_loader_config,
                                                        model_metadata_file_utils)
+from deepracer_systems_pkg.model_loader_module.model_install_pipeline import (ModelInstallStages,
+                                                                              ModelInstallStatus)
 
 
 #########################################################################################
@@ -43,7 +45,7 @@ from deepracer_systems_pkg.model_loader_module import (model_loader_config,
 
 class ModelInstallState:
     """Class responsible for copying the model files to install directory
-       and optimizing them in a seperate thread.
+       and optimizing them on the worker pools of the model installation pipeline.
     """
     def __init__(self,
                  temp_directory,
@@ -51,7 +53,8 @@ class ModelInstallState:
                  checksum,
                  install_directory,
                  model_optimizer_client,
-                 logger):
+                 logger,
+                 pipeline):
         """Create the ModelInstallState object.
 
         Args:
@@ -61,8 +64,9 @@ class ModelInstallState:
             install_directory (str): Target directory where the model files are to be copied.
             model_optimizer_client (rclpy.client.Client): Model optimizer client object or None.
             logger (rclpy.rclpy.impl.rcutils_logger.RcutilsLogger): Logger object of the model_loader_node.
+            pipeline (ModelInstallPipeline): Pipeline whose worker pools run the installation.
         """
-        self.thread = threading.Thread(target=self.install_thread)
+        self.completed = threading.Event()
         self.installed = threading.Event()
         self.name = os.path.basename(install_directory)
         self.temp_directory = temp_directory
@@ -71,159 +75,198 @@ class ModelInstallState:
         self.install_directory = install_directory
         self.model_optimizer_client = model_optimizer_client
         self.logger = logger
+        self.pipeline = pipeline
 
     def start_install(self):
-        """Start the install thread's activity.
+        """Queue the copy stage of the installation on the install pool.
         """
-        self.thread.start()
+        self.pipeline.report(self.name, ModelInstallStages.COPY, ModelInstallStatus.QUEUED)
+        self.pipeline.install_executor.submit(self.install_task)
 
     def wait_complete(self):
         """Blocking call to wait till the installation of the model is complete.
         """
-        self.thread.join()
+        self.completed.wait()
 
-    def install_thread(self):
-        """Main function to create the target directory, copy the model files and
-           call the model optimizer if the client is passed as parameter to the class.
+    def install_task(self):
+        """Task run on the install pool to copy the model files and queue the
+           optimization if the client is passed as parameter to the class.
         """
-        successfully_installed = False
-
         self.logger.info(f"Installing {self.name}...")
+        successfully_copied = self.pipeline.run_stage(self.name,
+                                                      ModelInstallStages.COPY,
+                                                      self.copy_model)
+        if successfully_copied and self.model_optimizer_client is not None:
+            try:
+                self.pipeline.report(self.name,
+                                     ModelInstallStages.OPTIMIZE,
+                                     ModelInstallStatus.QUEUED)
+                self.pipeline.optimize_executor.submit(self.optimize_task)
+                return
+            except RuntimeError as ex:
+                self.logger.error(f"Failed to queue the optimization of {self.name}: {ex}")
+                successfully_copied = False
+        self.finish_install(successfully_copied)
 
-        while True:
-            # Recreate model directory.
-            file_system_utils.remove_dir_tree(self.install_directory)
-            if not file_system_utils.create_dir(self.install_directory):
-                break
+    def optimize_task(self):
+        """Task run on the optimizer pool to optimize the copied model.
+        """
+        self.finish_install(self.pipeline.run_stage(self.name,
+                                                    ModelInstallStages.OPTIMIZE,
+                                                    self.optimize_model))
 
-            # Copy the model in place.
-            try:
-                if model_loader_config.USE_FIXED_TARGET_FILENAME:
-                    model_ext = os.path.splitext(self.temp_file_path)[1]
-                    target_name = \
-                        os.path.join(self.install_directory,
-                                     model_loader_config.TARGET_MODEL_FILENAME + model_ext)
-                else:
-                    target_name = self.install_directory
-
-                self.logger.info(f"Copy the model in place: {self.temp_file_path} {target_name}")
-                shutil.copy(self.temp_file_path, target_name)
-            except Exception as ex:
-                self.logger.error(f"Failed to install model {self.temp_file_path}: {ex}")
-                break
-
-            metadata_path = os.path.join(self.temp_directory,
-                                         model_loader_config.MODEL_METADATA_NAME)
-            # The navigation node assumes that the only json file transferred to the model directory
-            # is the meta data file, if we add other json files to the model directory we need to
-            # modify the navigation node accordingly.
-            if os.path.isfile(metadata_path):
-                shutil.copy(metadata_path, self.install_directory)
+    def copy_model(self):
+        """Create the target directory and copy the model and metadata files to it.
+
+        Returns:
+            bool: True if the files were copied successfully else False.
+        """
+        # Recreate model directory.
+        file_system_utils.remove_dir_tree(self.install_directory)
+        if not file_system_utils.create_dir(self.install_directory):
+            return False
+
+        # Copy the model in place.
+        try:
+            if model_loader_config.USE_FIXED_TARGET_FILENAME:
+                model_ext = os.path.splitext(self.temp_file_path)[1]
+                target_name = \
+                    os.path.join(self.install_directory,
+                                 model_loader_config.TARGET_MODEL_FILENAME + model_ext)
             else:
-                self.logger.info("No model meta data file found")
-
-            # Call model optimizer.
-            if self.model_optimizer_client is not None:
-                # Get the model file name.
-                model_filename = os.path.basename(self.temp_file_path)
-                model_filename = os.path.splitext(model_filename)[0]
-
-                # Consruct the model file name for the optimizer.
-                relative_model_name = os.path.join(self.name, model_filename)
-
-                self.logger.info(f"calling optimizer for {relative_model_name}...")
-                model_metatdata_file_path = os.path.join(self.install_directory,
-                                                         model_loader_config.MODEL_METADATA_NAME)
-                # Read the content of the model_metadata.json.
-                self.logger.info(f"read model_metadata_file from {model_metatdata_file_path}...")
-                err_code, err_msg, model_metadata_content = \
-                    model_metadata_file_utils.read_model_metadata_file(model_metatdata_file_path)
-                if err_code != 0:
-                    self.logger.error("Error while reading from "
-                                      f"{model_loader_config.MODEL_METADATA_NAME}: {err_msg}")
-                    break
-
-                # Get the sensor information of the model from the model_metadata.json.
-                err_code,  err_msg, model_metadata_sensors = \
-                    model_metadata_file_utils.get_sensors(model_metadata_content)
-                if err_code != 0:
-                    self.logger.error("Error while getting sensor names from "
-                                      f"{model_metatdata_file_path}: {err_msg}")
-                    break
-                self.logger.info("Sensor names read from "
-                                 f"{model_metatdata_file_path}: {model_metadata_sensors}")
-
-                # Get the training algorithm information of the model from the model_metadata.json.
-                err_code,  err_msg, training_algorithm = \
-                    model_metadata_file_utils.get_training_algorithm(model_metadata_content)
-                if err_code != 0:
-                    self.logger.error(f"Error while getting training algorithm from "
-                                      f"{model_metatdata_file_path}: {err_msg}")
-                    break
-                self.logger.info("Training algorithm read from "
-                                 f"{model_metatdata_file_path}: {training_algorithm}")
-
-                # Get the LiDAR configuration if passed for the model from the model_metadata.json.
-                err_code,  err_msg, model_lidar_config = \
-                    model_metadata_file_utils.load_lidar_configuration(model_metadata_sensors,
-                                                                       model_metadata_content)
-                if err_code != 0:
-                    self.logger.error("Error while getting LiDAR configuration from "
-                                      f"{model_metatdata_file_path}: {err_msg}")
-                    break
-                self.logger.info("LiDAR configuration read from "
-                                 f"{model_metatdata_file_path}: {model_lidar_config}")
-
-                # Create the ModelOptimizeSrv request object.
-                model_optimizer_req = ModelOptimizeSrv.Request()
-                model_optimizer_req.model_name = relative_model_name
-                model_optimizer_req.model_metadata_sensors = model_metadata_sensors
-                model_optimizer_req.training_algorithm = training_algorithm
-                model_optimizer_req.img_format = "BGR"
-                model_optimizer_req.width = 160
-                model_optimizer_req.height = 120
-                model_optimizer_req.num_channels = 1
-                model_optimizer_req.lidar_channels = \
-                    model_lidar_config[constants.ModelMetadataKeys.NUM_LIDAR_SECTORS.value]
-                model_optimizer_req.platform = 1
-
-                # Call the model optimizer service.
-                future = self.model_optimizer_client.call_async(model_optimizer_req)
-                elapsed_time = 0
-                timeout = 300
-                while not future.done():
-                    self.logger.info("Service call not finished: "
-                                     f"{self.model_optimizer_client.srv_name}")
-                    time.sleep(2)
-                    elapsed_time += 2
-                    if elapsed_time >= timeout:
-                        self.logger.info("Service call was not completed before timeout:"
-                                         f" {self.model_optimizer_client.srv_name} {timeout}")
-                        self.model_optimizer_client.remove_pending_request(future)
-                        break
-
-                # Response received from the model optimizer service.
-                response = future.result()
-                if response.error:
-                    self.logger.error(f"Model optimizer for {self.name} failed.")
-                    break
-
-            # Write new checksum file.
-            checksum_path = os.path.join(self.install_directory,
-                                         model_loader_config.MODEL_CHECKSUM_FILE)
-            if not file_system_utils.write_line(checksum_path, self.checksum):
-                self.logger.info(f"Failed to write checksum {checksum_path}")
-                break
-
-            # Success.
-            successfully_installed = True
-            break
-
-        if successfully_installed:
-            self.logger.info(f"Installation of {self.name} complete.")
-            self.installed.set()
+                target_name = self.install_directory
+
+            self.logger.info(f"Copy the model in place: {self.temp_file_path} {target_name}")
+            shutil.copy(self.temp_file_path, target_name)
+        except Exception as ex:
+            self.logger.error(f"Failed to install model {self.temp_file_path}: {ex}")
+            return False
+
+        metadata_path = os.path.join(self.temp_directory,
+                                     model_loader_config.MODEL_METADATA_NAME)
+        # The navigation node assumes that the only json file transferred to the model directory
+        # is the meta data file, if we add other json files to the model directory we need to
+        # modify the navigation node accordingly.
+        if os.path.isfile(metadata_path):
+            shutil.copy(metadata_path, self.install_directory)
         else:
-            self.logger.error(f"Installation of {self.name} failed.")
-            file_system_utils.remove_dir_tree(self.install_directory)
+            self.logger.info("No model meta data file found")
+        return True
+
+    def optimize_model(self):
+        """Call the model optimizer service for the copied model and wait for its response.
+
+        Returns:
+            bool: True if the model was optimized successfully else False.
+        """
+        # Get the model file name.
+        model_filename = os.path.basename(self.temp_file_path)
+        model_filename = os.path.splitext(model_filename)[0]
+
+        # Consruct the model file name for the optimizer.
+        relative_model_name = os.path.join(self.name, model_filename)
+
+        self.logger.info(f"calling optimizer for {relative_model_name}...")
+        model_metatdata_file_path = os.path.join(self.install_directory,
+                                                 model_loader_config.MODEL_METADATA_NAME)
+        # Read the content of the model_metadata.json.
+        self.logger.info(f"read model_metadata_file from {model_metatdata_file_path}...")
+        err_code, err_msg, model_metadata_content = \
+            model_metadata_file_utils.read_model_metadata_file(model_metatdata_file_path)
+        if err_code != 0:
+            self.logger.error("Error while reading from "
+                              f"{model_loader_config.MODEL_METADATA_NAME}: {err_msg}")
+            return False
+
+        # Get the sensor information of the model from the model_metadata.json.
+        err_code,  err_msg, model_metadata_sensors = \
+            model_metadata_file_utils.get_sensors(model_metadata_content)
+        if err_code != 0:
+            self.logger.error("Error while getting sensor names from "
+                              f"{model_metatdata_file_path}: {err_msg}")
+            return False
+        self.logger.info("Sensor names read from "
+                         f"{model_metatdata_file_path}: {model_metadata_sensors}")
+
+        # Get the training algorithm information of the model from the model_metadata.json.
+        err_code,  err_msg, training_algorithm = \
+            model_metadata_file_utils.get_training_algorithm(model_metadata_content)
+        if err_code != 0:
+            self.logger.error(f"Error while getting training algorithm from "
+                              f"{model_metatdata_file_path}: {err_msg}")
+            return False
+        self.logger.info("Training algorithm read from "
+                         f"{model_metatdata_file_path}: {training_algorithm}")
+
+        # Get the LiDAR configuration if passed for the model from the model_metadata.json.
+        err_code,  err_msg, model_lidar_config = \
+            model_metadata_file_utils.load_lidar_configuration(model_metadata_sensors,
+                                                               model_metadata_content)
+        if err_code != 0:
+            self.logger.error("Error while getting LiDAR configuration from "
+                              f"{model_metatdata_file_path}: {err_msg}")
+            return False
+        self.logger.info("LiDAR configuration read from "
+                         f"{model_metatdata_file_path}: {model_lidar_config}")
+
+        # Create the ModelOptimizeSrv request object.
+        model_optimizer_req = ModelOptimizeSrv.Request()
+        model_optimizer_req.model_name = relative_model_name
+        model_optimizer_req.model_metadata_sensors = model_metadata_sensors
+        model_optimizer_req.training_algorithm = training_algorithm
+        model_optimizer_req.img_format = "BGR"
+        model_optimizer_req.width = 160
+        model_optimizer_req.height = 120
+        model_optimizer_req.num_channels = 1
+        model_optimizer_req.lidar_channels = \
+            model_lidar_config[constants.ModelMetadataKeys.NUM_LIDAR_SECTORS]
+        model_optimizer_req.platform = 1
+
+        # Call the model optimizer service and wait for the future to be completed.
+        response_received = threading.Event()
+        future = self.model_optimizer_client.call_async(model_optimizer_req)
+        future.add_done_callback(lambda _: response_received.set())
+        if not response_received.wait(model_loader_config.MODEL_OPTIMIZER_TIMEOUT):
+            self.logger.info("Service call was not completed before timeout:"
+                             f" {self.model_optimizer_client.srv_name}"
+                             f" {model_loader_config.MODEL_OPTIMIZER_TIMEOUT}")
+            self.model_optimizer_client.remove_pending_request(future)
+            return False
+
+        # Response received from the model optimizer service.
+        response = future.result()
+        if response is None or response.error:
+            self.logger.error(f"Model optimizer for {self.name} failed.")
+            return False
+        return True
+
+    def finish_install(self, successfully_installed):
+        """Write the checksum file of a successfully installed model, clean up the
+           temporary files and mark the installation as complete.
+
+        Args:
+            successfully_installed (bool): True if the copy and optimization succeeded.
+        """
+        try:
+            if successfully_installed:
+                # Write new checksum file.
+                checksum_path = os.path.join(self.install_directory,
+                                             model_loader_config.MODEL_CHECKSUM_FILE)
+                if not file_system_utils.write_line(checksum_path, self.checksum):
+                    self.logger.info(f"Failed to write checksum {checksum_path}")
+                    successfully_installed = False
+
+            if successfully_installed:
+                self.logger.info(f"Installation of {self.name} complete.")
+                self.installed.set()
+            else:
+                self.logger.error(f"Installation of {self.name} failed.")
+                file_system_utils.remove_dir_tree(self.install_directory)
 
-        file_system_utils.remove_dir_tree(self.temp_directory)
+            file_system_utils.remove_dir_tree(self.temp_directory)
+            self.pipeline.report(self.name,
+                                 ModelInstallStages.INSTALL,
+                                 ModelInstallStatus.DONE if successfully_installed
+                                 else ModelInstallStatus.FAILED)
+        finally:
+            self.completed.set()
@@ -24,6 +24,7 @@ import os
 
 VERIFY_MODEL_READY_SERVICE_NAME = "verify_model_ready"
 CONSOLE_MODEL_ACTION_SERVICE_NAME = "console_model_action"
+MODEL_INSTALL_PROGRESS_TOPIC_NAME = "model_install_progress"
 
 ENABLE_MODEL_OPTIMIZER = False
 MODEL_SOURCE_LEAF_DIRECTORY = "models"
@@ -50,6 +51,18 @@ TARGET_MODEL_FILENAME = "model"
 
 SCHEDULE_MODEL_LOADER_CB = "schedule_model_loader"
 
+# Largest file accepted from a model archive.
+MODEL_ARCHIVE_MAX_MEMBER_SIZE = 512 * 1024 * 1024
+# Size of the chunks read while extracting and checksumming the model archives.
+MODEL_ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+# Number of models extracted and copied in parallel.
+INSTALL_WORKER_COUNT = os.cpu_count() or 1
+# Number of models optimized in parallel, the optimizer itself is the bottleneck.
+OPTIMIZER_WORKER_COUNT = 1
+# Seconds to wait for the model optimizer service to respond.
+MODEL_OPTIMIZER_TIMEOUT = 300
+
 # model_optimizer_pkg
 MODEL_OPTIMIZER_PKG_NS = "/model_optimizer_pkg"
 MODEL_OPTIMIZER_SERVER_SERVICE = f"{MODEL_OPTIMIZER_PKG_NS}/model_optimizer_server"
@@ -34,13 +34,12 @@ The node defines:
                                   extract and copy a tar.gz file with model that was
                                   uploaded from the console or delete a model that is
                                   present in the /opt/aws/deepracer/artifacts folder.
+    model_install_progress_publisher: A publisher that reports the progress of every model
+                                      through the stages of the installation pipeline.
 """
 
 import os
 import glob
-import shutil
-import gzip
-import tarfile
 import threading
 import rclpy
 from rclpy.node import Node
@@ -55,14 +54,19 @@ from deepracer_interfaces_pkg.srv import (VerifyModelReadySrv,
                                           SetStatusLedSolidSrv,
                                           USBFileSystemSubscribeSrv,
                                           USBMountPointManagerSrv)
-from deepracer_interfaces_pkg.msg import USBFileSystemNotificationMsg
+from deepracer_interfaces_pkg.msg import (USBFileSystemNotificationMsg,
+                                          ModelInstallProgressMsg)
 from deepracer_systems_pkg import (file_system_utils,
                                    constants,
                                    scheduler,
                                    utility)
 
 from deepracer_systems_pkg.model_loader_module import (model_loader_config,
-                                                       model_install_state)
+                                                       model_install_state,
+                                                       model_archive_utils)
+from deepracer_systems_pkg.model_loader_module.model_install_pipeline import (ModelInstallPipeline,
+                                                                              ModelInstallStages,
+                                                                              ModelInstallStatus)
 
 
 #########################################################################################
@@ -96,16 +100,20 @@ class ModelLoaderNode(Node):
         else:
             self.model_optimizer_client = None
 
-        # Supported file extensions and their corresponding action functions.
-        self.supported_exts = {
-            ".pb": self.copymodel,
-            ".json": self.copymodel,
-            ".gz": self.unzip,
-            ".tar": self.untar
-        }
+        # Publisher to report the progress of the models through the installation pipeline.
+        self.model_install_progress_publisher = \
+            self.create_publisher(ModelInstallProgressMsg,
+                                  model_loader_config.MODEL_INSTALL_PROGRESS_TOPIC_NAME,
+                                  10)
+        # Bounded worker pools that extract, copy and optimize the models in parallel.
+        self.install_pipeline = ModelInstallPipeline(self.get_logger(),
+                                                     self.publish_install_progress)
+
+        # Supported file extensions.
+        self.supported_exts = (".pb", ".json", ".gz", ".tar")
 
         # Supported model extension.
-        self.model_file_extensions = (".pb")
+        self.model_file_extensions = (".pb",)
 
         # Service that is called when a model is loaded to verify if the model
         # was extracted successfully.
@@ -189,6 +197,7 @@ class ModelLoaderNode(Node):
         """
         self.destroy_timer(self.timer)
         self.scheduler.schedule_exit()
+        self.install_pipeline.shutdown(wait=False)
 
     def timer_callback(self):
         """Heartbeat function to keep the node alive.
@@ -196,6 +205,22 @@ class ModelLoaderNode(Node):
         self.get_logger().debug(f"Timer heartbeat {self.timer_count}")
         self.timer_count += 1
 
+    def publish_install_progress(self, model_name, stage, status, elapsed):
+        """Publish the progress of a model through the installation pipeline.
+
+        Args:
+            model_name (str): Name of the model folder being installed.
+            stage (str): Stage of the installation pipeline.
+            status (str): Status of the stage.
+            elapsed (float): Seconds spent in the stage.
+        """
+        progress_msg = ModelInstallProgressMsg()
+        progress_msg.model_name = model_name
+        progress_msg.stage = stage
+        progress_msg.status = status
+        progress_msg.elapsed = float(elapsed)
+        self.model_install_progress_publisher.publish(progress_msg)
+
     def set_enable_model_wipe_flag(self, enable_model_wipe):
         """Setter method to set the enable model wipe flag.
 
@@ -283,60 +308,6 @@ class ModelLoaderNode(Node):
                                        name=name,
                                        node_name=node_name)
 
-    def copymodel(self, full_source_name, target_directory):
-        """Action function called for a .pb or .json file to copy the files from
-           source path to target directory.
-
-        Args:
-            full_source_name (str): .pb or .json file path.
-            target_directory (str): Target directory path where these files are to be copied.
-
-        Returns:
-            str: Full target path of the file.
-        """
-        filename = os.path.basename(full_source_name)
-        full_target_name = os.path.splitext(os.path.join(target_directory, filename))[0]
-        self.get_logger().info(f"    copying to {target_directory}...")
-        shutil.copy(full_source_name, target_directory)
-        return full_target_name
-
-    def unzip(self, full_source_name, target_directory):
-        """Action function called for a .gz file to unzip the file and copy them from
-           source path to target directory.
-
-        Args:
-            full_source_name (str): .gz file path.
-            target_directory (str): Target directory path where these files are to be copied.
-
-        Returns:
-            str: Full target path of the place where the unzipped files are copied.
-        """
-        filename = os.path.basename(full_source_name)
-        full_target_name = os.path.splitext(os.path.join(target_directory, filename))[0]
-        self.get_logger().info(f"    unzipping to {target_directory}...")
-        with gzip.open(full_source_name, "rb") as inFile:
-            with open(full_target_name, "wb") as outFile:
-                shutil.copyfileobj(inFile, outFile)
-        return full_target_name
-
-    def untar(self, full_source_name, target_directory):
-        """Action function called for a .tar file to untar the file and copy them from
-           source path to target directory.
-
-        Args:
-            full_source_name (str): .tar file path.
-            target_directory (str): Target directory path where these files are to be copied.
-
-        Returns:
-            str: Full target path of the place where the untarred files are copied.
-        """
-        filename = os.path.basename(full_source_name)
-        full_target_name = os.path.splitext(os.path.join(target_directory, filename))[0]
-        self.get_logger().info(f"    untarring to {target_directory}...")
-        with tarfile.TarFile(full_source_name, "r") as srcFile:
-            srcFile.extractall(target_directory)
-        return full_target_name
-
     def get_list_of_archives(self, search_path):
         """Helper function to get the list of files with the supported extensions
            in the search path.
@@ -378,63 +349,33 @@ class ModelLoaderNode(Node):
         return list_of_archives
 
     def extract_archive(self, filepath, target_directory):
-        """Helper function to recursively split the filename in the filepath and
-           call the mapped action function for the extension found.
-           If the file contains multiple extensions(.tar.gz) then the unzip is triggered
-           first and then untar is triggered.
+        """Helper function to extract a .tar or .tar.gz archive in a single streaming pass,
+           or to copy a single model file, into the target directory. The checksum of the
+           model files is computed while they are written.
 
         Args:
-            filepath (str): Path to the file that should be run through
-                            action functions recursively.
+            filepath (str): Path to the archive or model file.
             target_directory (str): Path where the target files are to be copied to.
 
         Returns:
-            bool: True if successfully executed all actions else False.
+            list: List of tuples with the extracted model files and their checksum
+                  or None if the extraction failed.
         """
-        try:
-            while True:
-                ext = os.path.splitext(filepath)[1]
-                if ext not in self.supported_exts:
-                    break
-                action = self.supported_exts[ext]
-                filepath = action(filepath, target_directory)
-
-            return True
-
-        except Exception as ex:
-            self.get_logger().error(f"    failed to decompress {filepath}: {ex}")
-            return False
-
-    def get_model_list(self, directory):
-        """Returns the list of models having the supported model file extension in the
-           directory passed as a parameter.
-
-        Args:
-            directory (str): Full path of the directory in which the model file
-                             is to searched.
-
-        Returns:
-            list: List of tuples with a potential models with valid model file extension
-                  and its corresponding checksum data.
-        """
-        model_list = list()
-
-        # Get the list of all files from the directory.
-        files = file_system_utils.list_dir(directory)
-        for potential_model in files:
-
-            # Ignore the file if not a supported model file.
-            ext = os.path.splitext(potential_model)[1]
-            if ext not in self.model_file_extensions:
-                continue
-
-            # Find model checksum.
-            checksum = file_system_utils.md5(potential_model)
-            if checksum == "":
-                continue
-
-            model_list.append((potential_model, checksum))
-
+        if model_archive_utils.is_tar_archive(filepath):
+            self.get_logger().info(f"    extracting to {target_directory}...")
+            err_code, err_msg, model_list = \
+                model_archive_utils.extract_tar_archive(filepath,
+                                                        target_directory,
+                                                        self.model_file_extensions)
+        else:
+            self.get_logger().info(f"    copying to {target_directory}...")
+            err_code, err_msg, model_list = \
+                model_archive_utils.copy_model_file(filepath,
+                                                    target_directory,
+                                                    self.model_file_extensions)
+        if err_code != 0:
+            self.get_logger().error(f"    failed to decompress {filepath}: {err_msg}")
+            return None
         return model_list
 
     def get_installed(self):
@@ -554,74 +495,47 @@ class ModelLoaderNode(Node):
         else:
             self.get_logger().info(f"Processing {source_count} potential model(s)...")
 
+        # Name the models and drop the duplicates before processing the archives in parallel.
+        pending_archives = list()
         for archive_name in list_of_archives:
-            self.get_logger().info(f"  * processing {archive_name}...")
-
             # Determine the model name.
             model_name = archive_name
             dot_pos = model_name.find(".")
             if dot_pos != -1:
                 model_name = model_name[:dot_pos]
 
-            # Create the temp directory.
-            model_temp_directory = os.path.join(constants.TEMP_DIRECTORY,
-                                                f"{model_loader_config.MODEL_TEMP_LEAF_DIRECTORY}-{model_name}")
-            if os.path.isdir(model_temp_directory):
+            if model_name in [pending[1] for pending in pending_archives]:
                 self.get_logger().info(f"    ! ignoring model with duplicate name: {model_name}")
                 continue
 
-            if not file_system_utils.create_dir(model_temp_directory):
-                continue
-
-            # Extract the archive.
-            archive_path = os.path.join(search_path, archive_name)
-            if not self.extract_archive(archive_path, model_temp_directory):
-                file_system_utils.remove_dir_tree(model_temp_directory)
-                continue
-
-            # Get the list of models.
-            model_list = self.get_model_list(model_temp_directory)
-
-            if len(model_list) == 0:
-                file_system_utils.remove_dir_tree(model_temp_directory)
-                self.get_logger().info("    ! no models found in the archive, ignoring")
-                continue
-
-            if len(model_list) > 1:
-                file_system_utils.remove_dir_tree(model_temp_directory)
-                self.get_logger().info("    ! unexpected: more than one models found in the archive,"
-                                       " ignoring all of them")
-                continue
-
             # Golden model?
+            install_name = model_name
             if model_loader_config.ENABLE_GOLDEN_MODEL \
                and (model_name == model_loader_config.GOLDEN_MODEL_SOURCE_NAME):
-                self.get_logger().info("    golden model detected")
-                model_name = model_loader_config.GOLDEN_MODEL_SOURCE_NAME
+                self.get_logger().info(f"    golden model detected: {archive_name}")
+                install_name = model_loader_config.GOLDEN_MODEL_SOURCE_NAME
 
             # Intel model optimizer does not handle spaces in the path correctly, replace with underscores.
             if model_loader_config.REPLACE_MODEL_NAMESPACES:
-                model_name = model_name.replace(" ", "_")
-
-            # Extract model info.
-            model_file_path, model_checksum = model_list[0]
-            model_install_directory = os.path.join(model_loader_config.MODEL_INSTALL_ROOT_DIRECTORY, model_name)
-            checksum_path = os.path.join(model_install_directory, model_loader_config.MODEL_CHECKSUM_FILE)
-
-            # Verify the checksum.
-            if model_checksum == file_system_utils.read_line(checksum_path).strip():
-                self.get_logger().info("    model already installed, ignoring")
-                file_system_utils.remove_dir_tree(model_temp_directory)
-                continue
-
-            # Add to the dictionary to be processed later.
-            self.get_logger().info("    scheduling for installation")
-            self.models_in_progress[model_name] = model_install_state.ModelInstallState(model_temp_directory,
-                                                                                        model_file_path,
-                                                                                        model_checksum,
-                                                                                        model_install_directory,
-                                                                                        self.model_optimizer_client,
-                                                                                        self.get_logger())
+                install_name = install_name.replace(" ", "_")
+
+            pending_archives.append((archive_name, model_name, install_name))
+            self.install_pipeline.report(install_name,
+                                         ModelInstallStages.EXTRACT,
+                                         ModelInstallStatus.QUEUED)
+
+        # Extract and checksum the archives on the install pool.
+        futures = [self.install_pipeline.install_executor.submit(self.prepare_model,
+                                                                 search_path,
+                                                                 archive_name,
+                                                                 model_name,
+                                                                 install_name)
+                   for archive_name, model_name, install_name in pending_archives]
+        for future in futures:
+            state = future.result()
+            if state is not None:
+                # Add to the dictionary to be processed later.
+                self.models_in_progress[state.name] = state
 
         # Unmount the media.
         if node_name is not None:
@@ -631,6 +545,75 @@ class ModelLoaderNode(Node):
 
         self.call_solid_led_service()
 
+    def prepare_model(self, search_path, archive_name, model_name, install_name):
+        """Task run on the install pool to extract an archive into its temporary directory
+           and compare the checksum of the model file in it with the installed model.
+
+        Args:
+            search_path (str): Directory where the archive is located.
+            archive_name (str): File name of the archive.
+            model_name (str): Name of the model derived from the archive name.
+            install_name (str): Name of the model folder in /opt/aws/deepracer/artifacts.
+
+        Returns:
+            ModelInstallState: State object of the model to be installed or None if the
+                               archive is ignored.
+        """
+        self.get_logger().info(f"  * processing {archive_name}...")
+
+        # Create the temp directory.
+        temp_leaf_directory = f"{model_loader_config.MODEL_TEMP_LEAF_DIRECTORY}-{model_name}"
+        model_temp_directory = os.path.join(constants.TEMP_DIRECTORY, temp_leaf_directory)
+        if not file_system_utils.create_dir(model_temp_directory):
+            return None
+
+        # Extract the archive and checksum the models in a single pass.
+        archive_path = os.path.join(search_path, archive_name)
+        model_list = self.install_pipeline.run_stage(install_name,
+                                                     ModelInstallStages.EXTRACT,
+                                                     self.extract_archive,
+                                                     archive_path,
+                                                     model_temp_directory)
+        if model_list is None:
+            file_system_utils.remove_dir_tree(model_temp_directory)
+            return None
+
+        if len(model_list) == 0:
+            file_system_utils.remove_dir_tree(model_temp_directory)
+            self.get_logger().info(f"    ! no models found in {archive_name}, ignoring")
+            return None
+
+        if len(model_list) > 1:
+            file_system_utils.remove_dir_tree(model_temp_directory)
+            self.get_logger().info("    ! unexpected: more than one models found in "
+                                   f"{archive_name}, ignoring all of them")
+            return None
+
+        # Extract model info.
+        model_file_path, model_checksum = model_list[0]
+        model_install_directory = os.path.join(model_loader_config.MODEL_INSTALL_ROOT_DIRECTORY,
+                                               install_name)
+        checksum_path = os.path.join(model_install_directory,
+                                     model_loader_config.MODEL_CHECKSUM_FILE)
+
+        # Verify the checksum.
+        if model_checksum == file_system_utils.read_line(checksum_path).strip():
+            self.get_logger().info(f"    {install_name} already installed, ignoring")
+            file_system_utils.remove_dir_tree(model_temp_directory)
+            self.install_pipeline.report(install_name,
+                                         ModelInstallStages.INSTALL,
+                                         ModelInstallStatus.DONE)
+            return None
+
+        self.get_logger().info(f"    scheduling {install_name} for installation")
+        return model_install_state.ModelInstallState(model_temp_directory,
+                                                     model_file_path,
+                                                     model_checksum,
+                                                     model_install_directory,
+                                                     self.model_optimizer_client,
+                                                     self.get_logger(),
+                                                     self.install_pipeline)
+
     def verify_model_ready(self, model_name):
         """Helper function to wait for model loading to complete if its not already,
            else verify if the model folder has a checksum file created.
@@ -87,5 +87,11 @@ PROG_STATE_KEY = "progress_state"
 # Dictionary key for % progress of the update
 PROG_PCT_KEY = "progress_pct"
 
+# Phases of the software update check reported with the update percentage.
+CHECK_PHASE_CACHE_UPDATE = "cache_update"
+CHECK_PHASE_CACHE_OPEN = "cache_open"
+CHECK_PHASE_PROVIDES_INDEX = "provides_index"
+CHECK_PHASE_CANDIDATE_SCAN = "candidate_scan"
+
 SCHEDULE_USB_UPDATE_SCAN_CB = "schedule_usb_update_scan"
 UPDATE_SOURCE_DIRECTORY = "update"
@@ -112,6 +112,12 @@ class SoftwareUpdateNode(Node):
 
         # The apt cache object.
         self.cache = apt.Cache()
+        # Installed packages by name of the packages they provide, built when the cache
+        # is re-opened by the software update check.
+        self.provides_index = dict()
+
+        # Duration in seconds of each phase of the last software update check.
+        self.update_check_timings = dict()
 
         # Double buffer object containing the current update percentage and progress state.
         self.pct_dict_db = utility.DoubleBuffer(clear_data_on_get=False)
@@ -464,6 +470,7 @@ class SoftwareUpdateNode(Node):
         """
         # Update and open the cache.
         try:
+            phase_start = time.monotonic()
             for sources_list in software_update_config.DEEPRACER_SOURCE_LIST_PATH:
                 if not os.path.exists(sources_list):
                     self.get_logger().warn(f"Sources list {sources_list} does not exist.")
@@ -471,14 +478,52 @@ class SoftwareUpdateNode(Node):
                 self.get_logger().info(f"Updating the cache for {sources_list}...")
                 self.cache.update(fetch_progress=cache_update_progress.CacheUpdateProgress(self.get_logger()),
                                 sources_list=sources_list)
-                
+            phase_start = self.end_update_check_phase(
+                software_update_config.CHECK_PHASE_CACHE_UPDATE, phase_start)
+
             self.get_logger().info("Cache updated. Re-opening the cache...")
             self.cache.open(cache_open_progress.CacheOpenProgress(self.get_logger()))
+            phase_start = self.end_update_check_phase(
+                software_update_config.CHECK_PHASE_CACHE_OPEN, phase_start)
+
+            self.build_provides_index()
+            self.end_update_check_phase(software_update_config.CHECK_PHASE_PROVIDES_INDEX,
+                                        phase_start)
         except Exception as ex:
             self.get_logger().error(f"Failed to update APT cache: {ex}")
             return False
         return True
 
+    def build_provides_index(self):
+        """Helper method to index the installed packages by name of the packages they provide,
+           in one pass over the cache.
+        """
+        provides_index = dict()
+        for package in self.cache:
+            if not package.is_installed:
+                continue
+            provided_names = set(package.installed.provides)
+            if package.candidate is not None:
+                provided_names.update(package.candidate.provides)
+            for provided_name in provided_names:
+                provides_index.setdefault(provided_name, list()).append(package.name)
+        self.provides_index = provides_index
+
+    def end_update_check_phase(self, phase, start_time):
+        """Helper method to record the duration of a phase of the software update check.
+
+        Args:
+            phase (str): Name of the phase.
+            start_time (float): Monotonic time at which the phase started.
+
+        Returns:
+            float: Monotonic time at which the phase ended.
+        """
+        end_time = time.monotonic()
+        self.update_check_timings[phase] = end_time - start_time
+        self.get_logger().info(f"Software update check {phase} took {end_time - start_time:.3f}s")
+        return end_time
+
     def update_pkg_candidate_list(self):
         """Helper method to identify the packages that have an update candidate available and
            populate the update_list.
@@ -491,14 +536,10 @@ class SoftwareUpdateNode(Node):
                 self.get_logger().info(f"Verifying package {package.name}...")
 
                 # Skip if already provided by another package that's installed
-                already_provided = False
-                for other_package in self.cache:
-                    if other_package.is_installed and self.check_package_provides(other_package.name, package_name):
-                        already_provided = True
-                        break
-
-                if already_provided:
-                    self.get_logger().info(f"Package {package_name} is provided by installed {other_package.name}")
+                providers = self.provides_index.get(package_name)
+                if providers:
+                    self.get_logger().info(f"Package {package_name} is provided by "
+                                           f"installed {providers[0]}")
                     continue
 
                 if not package.candidate.version.startswith(software_update_config.VERSION_MASK):
@@ -552,6 +593,7 @@ class SoftwareUpdateNode(Node):
            update_state flag.
         """
         self.check_in_progress = True
+        self.update_check_timings = dict()
         self.get_logger().info("Checking software update...")
         # Make sure we have network connection.
         if not self.is_network_connected:
@@ -562,12 +604,15 @@ class SoftwareUpdateNode(Node):
 
         # Update and Re-open the cache to read the updated package list
         if not self.update_deepracer_cache():
+            self.publish_update_pct()
             self.check_complete.set()
             self.check_in_progress = False
             return
 
         # Reset the package update list.
+        phase_start = time.monotonic()
         self.update_pkg_candidate_list()
+        self.end_update_check_phase(software_update_config.CHECK_PHASE_CANDIDATE_SCAN, phase_start)
 
         with utility.AutoLock(self.state_guard):
 
@@ -581,6 +626,7 @@ class SoftwareUpdateNode(Node):
                                       software_update_config.PROGRESS_STATES[1],
                                       software_update_config.PROG_PCT_KEY: 0.0})
             self.get_logger().info(self.get_state_description(self.update_state))
+            self.publish_update_pct()
             self.check_in_progress = False
             self.check_complete.set()
 
@@ -785,40 +831,11 @@ class SoftwareUpdateNode(Node):
         pct_obj = SoftwareUpdatePctMsg()
         pct_obj.update_pct = pct_dict[software_update_config.PROG_PCT_KEY]
         pct_obj.status = pct_dict[software_update_config.PROG_STATE_KEY]
+        update_check_timings = list(self.update_check_timings.items())
+        pct_obj.check_phases = [phase for phase, _ in update_check_timings]
+        pct_obj.check_durations = [float(duration) for _, duration in update_check_timings]
         self.software_update_pct_publisher.publish(pct_obj)
 
-    def check_package_provides(self, package_name, provided_package_name):
-        """Checks if a package provides another package (acts as a substitute).
-        
-        Args:
-            package_name (str): Name of the package to check
-            provided_package_name (str): Name of the package that might be provided
-            
-        Returns:
-            bool: True if package_name provides provided_package_name, False otherwise
-        """
-        if package_name not in self.cache:
-            self.get_logger().error(f"Package {package_name} not found in cache")
-            return False
-            
-        package = self.cache[package_name]
-        
-        # Check installed version first if available
-        if package.is_installed and hasattr(package.installed, 'provides'):
-            for provided in package.installed.provides:
-                if provided == provided_package_name:
-                    self.get_logger().debug(f"Installed {package_name} provides {provided_package_name}")
-                    return True
-                    
-        # Also check candidate version
-        if hasattr(package.candidate, 'provides'):
-            for provided in package.candidate.provides:
-                if provided == provided_package_name:
-                    self.get_logger().debug(f"Candidate {package_name} provides {provided_package_name}")
-                    return True
-                    
-        return False
-
 
 def main(args=None):
     try:
@@ -50,6 +50,7 @@ GET_CAR_LED_SERVICE = f"{CTRL_PKG_NS}/get_car_led"
 SET_CAR_LED_SERVICE = f"{CTRL_PKG_NS}/set_car_led"
 AUTONOMOUS_THROTTLE_SERVICE = f"{CTRL_PKG_NS}/autonomous_throttle"
 GET_CTRL_MODES_SERVICE = f"{CTRL_PKG_NS}/get_ctrl_modes"
+SERVO_MSG_TOPIC = f"{CTRL_PKG_NS}/servo_msg"
 
 # deepracer_navigation_pkg
 DEEPRACER_NAVIGATION_PKG_NS = "/deepracer_navigation_pkg"
@@ -65,6 +66,7 @@ CONSOLE_MODEL_ACTION_SERVICE = f"{DEEPRACER_SYSTEMS_PKG_NS}/console_model_action
 VERIFY_MODEL_READY_SERVICE = f"{DEEPRACER_SYSTEMS_PKG_NS}/verify_model_ready"
 GET_OTG_LINK_STATE_SERVICE = f"{DEEPRACER_SYSTEMS_PKG_NS}/get_otg_link_state"
 SOFTWARE_UPDATE_PCT_TOPIC = f"{DEEPRACER_SYSTEMS_PKG_NS}/software_update_pct"
+MODEL_INSTALL_PROGRESS_TOPIC = f"{DEEPRACER_SYSTEMS_PKG_NS}/model_install_progress"
 
 # device_info_pkg
 DEVICE_INFO_PKG_NS = "/device_info_pkg"
@@ -107,13 +109,86 @@ STATUS_LED_PKG_NS = "/status_led_pkg"
 LED_BLINK_SERVICE = f"{STATUS_LED_PKG_NS}/led_blink"
 LED_SOLID_SERVICE = f"{STATUS_LED_PKG_NS}/led_solid"
 
+# Service call metrics constants.
+# Upper bounds in milliseconds of the latency histogram buckets of the service calls.
+SERVICE_LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+# Telemetry stream constants.
+TELEMETRY_DEVICE_STATUS = "device_status"
+TELEMETRY_BATTERY = "battery"
+TELEMETRY_MODEL_LOADING = "model_loading"
+TELEMETRY_SERVO = "servo"
+TELEMETRY_INFERENCE = "inference"
+TELEMETRY_CHANNELS = [TELEMETRY_DEVICE_STATUS, TELEMETRY_BATTERY, TELEMETRY_MODEL_LOADING,
+                      TELEMETRY_SERVO, TELEMETRY_INFERENCE]
+# Events per second sent to a client by default and at most.
+TELEMETRY_DEFAULT_RATE = 5.0
+TELEMETRY_MAX_RATE = 20.0
+# Seconds without change after which a keepalive comment is sent.
+TELEMETRY_KEEPALIVE_PERIOD = 15.0
+# Seconds between two calls to the battery level and model loading services while
+# clients are connected.
+TELEMETRY_POLL_PERIOD = 2.0
+
+# Serving backends selectable with the server_backend parameter of the webserver node.
+# The pooled backend serves the requests on bounded pools of worker threads, the
+# development backend is the Flask development server with one thread per connection.
+SERVER_BACKEND_POOLED = "pooled"
+SERVER_BACKEND_DEVELOPMENT = "development"
+SERVER_WORKER_THREADS = 8
+# Every open event stream and model upload holds one stream worker for its whole
+# duration: 16 workers serve 10 telemetry clients together with the status and install
+# progress streams and two uploads.
+SERVER_STREAM_WORKER_THREADS = 16
+SERVER_DRIVE_WORKER_THREADS = 2
+# Path prefixes of the long-lived requests served by the stream worker pool.
+SERVER_STREAM_PATHS = ("/api/telemetry",
+                       "/api/update_status",
+                       "/api/uploadModels",
+                       "/api/model_uploads/",
+                       "/api/model_install_progress/stream")
+# Path prefixes of the manual drive requests served by their own worker pool, so that
+# the drive commands never wait behind the streams and uploads.
+SERVER_DRIVE_PATHS = ("/api/manual_drive_ws",)
+# Connections waiting for a worker of each pool beyond which new ones get a 503 response.
+SERVER_MAX_QUEUED_CONNECTIONS = 16
+# Seconds a connection can wait for a worker before getting a 503 response.
+SERVER_QUEUE_TIMEOUT = 2.0
+# Seconds a control connection can stay idle, waiting for a request or its body.
+SERVER_REQUEST_TIMEOUT = 30.0
+# Seconds a stream connection can stay idle.
+SERVER_STREAM_TIMEOUT = 300.0
+# Seconds given to the requests being served to finish when the node is destroyed.
+SERVER_SHUTDOWN_TIMEOUT = 5.0
+# Seconds between two pings sent on the WebSockets to keep them active.
+SERVER_WEBSOCKET_PING_INTERVAL = 25
+
 # Logging constants.
 SYS = "/var/log/syslog"
 SEVER_LOG = "SERVER"
+# Maximum number of log lines returned by the logs API.
+LOG_MAX_LINES = 1000
+# Number of bytes read at once, and at most, backwards from the end of a log file.
+LOG_READ_BLOCK_SIZE = 64 * 1024
+LOG_MAX_SCAN_SIZE = 16 * 1024 * 1024
 
 # Models constants.
 MODEL_DIRECTORY_PATH = os.path.join(BASE_PATH, "artifacts/")
 MODEL_FILE_TYPE = ".pb"
+# Time in seconds after which the model catalog checks the model folders again even if
+# the artifacts directory did not change.
+MODEL_CATALOG_REVALIDATE_PERIOD = 5.0
+# Time in seconds the sensor status used by the model APIs is reused.
+SENSOR_STATUS_CACHE_TTL = 2.0
+# Folder holding the archives of the chunked model uploads until they are complete.
+MODEL_UPLOAD_STAGING_PATH = os.path.join(BASE_PATH, "model_uploads/")
+# Maximum size in bytes of an uploaded model archive and of its model_metadata.json.
+MODEL_UPLOAD_MAX_SIZE = 1024 * 1024 * 1024
+MODEL_UPLOAD_MAX_METADATA_SIZE = 1024 * 1024
+# Number of bytes read at once from the body of an upload chunk.
+MODEL_UPLOAD_READ_SIZE = 256 * 1024
+# Time in seconds after which an inactive or finished upload is dropped.
+MODEL_UPLOAD_SESSION_TIMEOUT = 3600.0
 
 # parameters to load machine learning model by
 MODEL_WIDTH = 160
@@ -134,6 +209,10 @@ MODEL_FORMAT = "RGB"
 TOKEN_PATH = os.path.join(BASE_PATH, "token.txt")
 PASSWORD_PATH = os.path.join(BASE_PATH, "password.txt")
 DEEPRACER_TOKEN = "deepracer_token"
+# Time in seconds between a login and the write of the token file, coalescing the logins.
+TOKEN_STORE_WRITE_DELAY = 1.0
+# Minimum time in seconds between two checks of the token file modification time.
+TOKEN_STORE_RELOAD_CHECK_PERIOD = 1.0
 DESTINATION_PATH = "/opt/aws/deepracer/password.txt"
 DEFAULT_PASSWORD_PATH = "/sys/class/dmi/id/chassis_asset_tag"
 
@@ -141,6 +220,11 @@ DEFAULT_PASSWORD_PATH = "/sys/class/dmi/id/chassis_asset_tag"
 AUTONOMOUS_MODE = 1
 # Max autonomous throttle value allowed on the front end.
 MAX_AUTO_THROTTLE_VAL = 100.0
+# Maximum number of manual drive messages published per second from the WebSocket.
+MANUAL_DRIVE_MAX_RATE = 50.0
+# Seconds without manual drive command on the WebSocket after which the throttle is
+# set to zero.
+MANUAL_DRIVE_DEADMAN_TIMEOUT = 0.5
 
 # Calibration constants.
 PWM_ANGLE_CONVERSION = 10000
@@ -167,6 +251,11 @@ SERVER_NAME = "deepracer.aws"
 # Every one second ping the server
 PING_SERVER_FREQUENCY = 1
 REMOVE_IPS = ["10.0.0.1", "10.0.1.1"]
+# Time in seconds the IP addresses and connected SSID are reused by the network APIs.
+SYSTEM_INFO_NETWORK_TTL = 5.0
+# Time in seconds the timezone name and the list of timezones are reused by the time APIs.
+SYSTEM_INFO_TIMEZONE_TTL = 60.0
+SYSTEM_INFO_TIMEZONE_LIST_TTL = 24 * 3600.0
 
 # Day 0 / Mandatory Software Update status
 SOFTWARE_UPDATE_STATUS_PATH = os.path.join(BASE_PATH, "software_update_status.json")
@@ -176,6 +265,9 @@ SOFTWARE_UPDATE_FETCH_FREQUENCY = 1
 # The sleep time is 1 more than that of the software update frequency. This will make sure
 # that 100% of software completion is passed back to the browser before rebooting the vehicle.
 SLEEP_TIME_BEFORE_REBOOT = SOFTWARE_UPDATE_FETCH_FREQUENCY + 1
+# Time in seconds without progress after which the software update and model install
+# progress streams send a heartbeat comment to keep the connection open.
+PROGRESS_HEARTBEAT_PERIOD = 15.0
 
 INVALID_ENUM_VALUE = 0
 
@@ -186,6 +186,24 @@ def get_supported_apis():
     })
 
 
+def get_pipeline_latency(device_status):
+    """Helper method to group the per-stage latency statistics of the device status.
+
+    Args:
+        device_status (DeviceStatusMsg): Latest device status message.
+
+    Returns:
+        list: Dictionary with the stage name and latency statistics per stage.
+    """
+    return [{"stage": stage, "mean": mean, "p50": p50, "p95": p95, "p99": p99, "max": maximum}
+            for stage, mean, p50, p95, p99, maximum in zip(device_status.pipeline_stages,
+                                                           device_status.pipeline_latency_mean,
+                                                           device_status.pipeline_latency_p50,
+                                                           device_status.pipeline_latency_p95,
+                                                           device_status.pipeline_latency_p99,
+                                                           device_status.pipeline_latency_max)]
+
+
 @DEVICE_INFO_API_BLUEPRINT.route("/api/get_device_status", methods=["GET"])
 def get_device_status():
     """API to get the current system metrics including CPU load, temperature, memory usage, etc.
@@ -196,14 +214,30 @@ def get_device_status():
     Returns:
         dict: JSON object containing device metrics and success status:
               - cpu_percent: CPU utilization percentage
+              - cpu_core_percent: Utilization percentage of every CPU core
               - cpu_temp: CPU temperature in Celsius
+              - cpu_throttled: True if the CPU is throttled
               - cpu_freq: Current CPU frequency in MHz
               - cpu_freq_max: Maximum CPU frequency in MHz
               - memory_usage: Memory utilization percentage
               - free_disk: Free disk space percentage
               - latency_mean: Mean latency in millisecondsz
-              - latency_p95: 95th percentile latency in milliseconds
+              - latency_std, latency_min, latency_max: Standard deviation, minimum and
+                maximum latency in milliseconds
+              - latency_p50, latency_p95, latency_p99: 50th, 95th and 99th percentile
+                latency in milliseconds
+              - latency_jitter: Mean difference between consecutive latencies in
+                milliseconds
+              - latency_histogram: Bucket upper bounds in milliseconds and sample counts,
+                the last count being above the last bound
               - fps_mean: Mean frames per second
+              - inference_latency_mean: Mean camera frame to servo command latency
+                                        in milliseconds
+              - inference_latency_p95: 95th percentile camera frame to servo command
+                                       latency in milliseconds
+              - pipeline_latency: Mean, 50th, 95th and 99th percentile and maximum
+                                  latency in milliseconds of every traced pipeline stage,
+                                  in the order of the pipeline
     """
     try:
         webserver_node = webserver_publisher_node.get_webserver_node()
@@ -214,14 +248,29 @@ def get_device_status():
         if latest_device_status is not None:
             data = {
                 "cpu_percent": latest_device_status.cpu_percent,
+                "cpu_core_percent": list(latest_device_status.cpu_core_percent),
                 "cpu_temp": latest_device_status.cpu_temp,
+                "cpu_throttled": latest_device_status.cpu_throttled,
                 "cpu_freq": latest_device_status.cpu_freq,
                 "cpu_freq_max": latest_device_status.cpu_freq_max,
                 "memory_usage": latest_device_status.memory_usage,
                 "free_disk": latest_device_status.free_disk,
                 "latency_mean": latest_device_status.latency_mean,
+                "latency_std": latest_device_status.latency_std,
+                "latency_min": latest_device_status.latency_min,
+                "latency_max": latest_device_status.latency_max,
+                "latency_p50": latest_device_status.latency_p50,
                 "latency_p95": latest_device_status.latency_p95,
+                "latency_p99": latest_device_status.latency_p99,
+                "latency_jitter": latest_device_status.latency_jitter,
+                "latency_histogram": {
+                    "bounds": list(latest_device_status.latency_histogram_bounds),
+                    "counts": list(latest_device_status.latency_histogram)
+                },
                 "fps_mean": latest_device_status.fps_mean,
+                "inference_latency_mean": latest_device_status.inference_latency_mean,
+                "inference_latency_p95": latest_device_status.inference_latency_p95,
+                "pipeline_latency": get_pipeline_latency(latest_device_status),
                 "success": True
             }
             webserver_node.get_logger().debug(
@@ -0,0 +1,146 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+log_reader.py
+
+This module holds the functions reading the last lines of the log files by seeking
+backwards from their end, so that the cost depends on the number of lines requested
+and not on the size of the log.
+"""
+
+import os
+import re
+
+
+# Severity levels of the ROS log lines, in increasing order.
+SEVERITY_LEVELS = ["DEBUG", "INFO", "WARN", "ERROR", "FATAL"]
+SEVERITY_PATTERN = re.compile(rb"\[(DEBUG|INFO|WARN|WARNING|ERROR|FATAL)\]")
+
+
+def make_line_filter(severity=None, node_name=None):
+    """Helper function to create the filter keeping the log lines with a minimum severity
+       and/or logged by a node.
+
+    Args:
+        severity (str, optional): Minimum severity level, one of SEVERITY_LEVELS.
+                                  Defaults to None.
+        node_name (str, optional): Text contained in the bracketed logger name of the
+                                   line, e.g. ctrl_pkg. Defaults to None.
+
+    Raises:
+        ValueError: Exception if the severity level is unknown.
+
+    Returns:
+        function: Function returning True for the lines to keep, None if no filter is set.
+    """
+    if not severity and not node_name:
+        return None
+    min_level = 0
+    if severity:
+        severity = severity.upper()
+        if severity not in SEVERITY_LEVELS:
+            raise ValueError(f"Unknown severity {severity}")
+        min_level = SEVERITY_LEVELS.index(severity)
+    node_pattern = None
+    if node_name:
+        node_pattern = re.compile(rb"\[[^\]]*" + re.escape(node_name.encode()) + rb"[^\]]*\]")
+
+    def line_filter(line):
+        if severity:
+            match = SEVERITY_PATTERN.search(line)
+            if match is None:
+                return False
+            level = match.group(1).decode()
+            level = "WARN" if level == "WARNING" else level
+            if SEVERITY_LEVELS.index(level) < min_level:
+                return False
+        return node_pattern is None or node_pattern.search(line) is not None
+    return line_filter
+
+
+def tail_lines(path, num_lines, start_offset=0, line_filter=None,
+               block_size=64 * 1024, max_scan_size=16 * 1024 * 1024):
+    """Helper function to read the last complete lines of a file after start_offset, reading
+       blocks backwards from the end of the file until enough lines are found.
+
+    Only the lines ending with a newline are returned, so the returned offset can be passed
+    back as start_offset to read only the lines written since. If the file is shorter than
+    start_offset, it was rotated and its last lines are read from the beginning.
+
+    Args:
+        path (str): Path of the log file.
+        num_lines (int): Maximum number of lines to return.
+        start_offset (int, optional): Offset of the first byte that can be returned,
+                                      at the start of a line. Defaults to 0.
+        line_filter (function, optional): Function returning True for the lines to keep.
+                                          Defaults to None.
+        block_size (int, optional): Number of bytes read at once. Defaults to 64 KiB.
+        max_scan_size (int, optional): Maximum number of bytes read to find the lines.
+                                       Defaults to 16 MiB.
+
+    Returns:
+        dict: The lines as bytes ending with a newline, the offset after the last complete
+              line, whether lines between start_offset and the returned ones may have been
+              skipped because num_lines or max_scan_size was reached and whether the file
+              was rotated.
+    """
+    with open(path, "rb") as log_file:
+        end = os.fstat(log_file.fileno()).st_size
+        rotated = start_offset > end
+        if rotated:
+            start_offset = 0
+
+        lines = list()
+        remainder = b""
+        end_offset = None
+        position = end
+        while position > start_offset and len(lines) < num_lines \
+                and end - position < max_scan_size:
+            read_size = min(block_size, position - start_offset)
+            position -= read_size
+            log_file.seek(position)
+            parts = (log_file.read(read_size) + remainder).split(b"\n")
+            # The first part may be the end of a line starting before this block.
+            remainder = parts.pop(0)
+            if end_offset is None:
+                if not parts:
+                    continue
+                # The last part is the line still being written, empty if the file ends
+                # with a newline.
+                end_offset = end - len(parts.pop())
+            for line in reversed(parts):
+                if line_filter is None or line_filter(line):
+                    lines.append(line)
+                    if len(lines) == num_lines:
+                        break
+
+        reached_start = position == start_offset
+        if end_offset is None:
+            # No complete line after start_offset.
+            end_offset = start_offset
+        elif reached_start:
+            # The first line of the range starts at start_offset.
+            if len(lines) == num_lines:
+                reached_start = False
+            elif line_filter is None or line_filter(remainder):
+                lines.append(remainder)
+
+    lines.reverse()
+    return {"data": b"".join(line + b"\n" for line in lines),
+            "offset": end_offset,
+            "truncated": not reached_start,
+            "rotated": rotated}
@@ -26,7 +26,6 @@ import hmac
 import os
 import uuid
 import hashlib
-import json
 from flask import (Blueprint,
                    request,
                    make_response,
@@ -38,13 +37,21 @@ from webserver_pkg.constants import (TOKEN_PATH,
                                      PASSWORD_PATH,
                                      DEEPRACER_TOKEN,
                                      DESTINATION_PATH,
-                                     DEFAULT_PASSWORD_PATH)
+                                     DEFAULT_PASSWORD_PATH,
+                                     TOKEN_STORE_WRITE_DELAY,
+                                     TOKEN_STORE_RELOAD_CHECK_PERIOD)
 
 from webserver_pkg import webserver_publisher_node
+from webserver_pkg.token_store import TokenStore
 
 
 LOGIN_BLUEPRINT = Blueprint("login", __name__)
 
+# Login tokens checked by the authorization API, persisted to the token file.
+TOKEN_STORE = TokenStore(TOKEN_PATH,
+                         TOKEN_STORE_WRITE_DELAY,
+                         TOKEN_STORE_RELOAD_CHECK_PERIOD)
+
 
 @LOGIN_BLUEPRINT.route("/", methods=["GET"])
 @LOGIN_BLUEPRINT.route("/home", methods=["GET"])
@@ -92,25 +99,10 @@ def login():
                 webserver_node.get_logger().info("Password check passed")
                 token = str(uuid.uuid4())
                 try:
-                    # Create expiry timestamp (1 hour from now)
-                    expires_at = (datetime.datetime.now() + datetime.timedelta(hours=COOKIE_DURATION)).isoformat()
-
-                    # Load existing tokens or create new structure
-                    tokens_data = {"tokens": []}
-                    if os.path.exists(TOKEN_PATH) and os.path.getsize(TOKEN_PATH) > 0:
-                        try:
-                            with open(TOKEN_PATH, "r") as token_file:
-                                tokens_data = json.load(token_file)
-                        except json.JSONDecodeError:
-                            # If file exists but isn't valid JSON, start fresh
-                            tokens_data = {"tokens": []}
-
-                    # Add new token
-                    tokens_data["tokens"].append({"token": token, "expires_at": expires_at})
-
-                    # Write updated tokens to file
-                    with open(TOKEN_PATH, "w") as token_file:
-                        json.dump(tokens_data, token_file)
+                    # Create expiry timestamp (12 hours from now)
+                    expires_at = (datetime.datetime.now() +
+                                  datetime.timedelta(hours=COOKIE_DURATION)).timestamp()
+                    TOKEN_STORE.add(token, expires_at)
 
                     webserver_node.get_logger().info("Token set")
                     response.set_cookie("deepracer_token",
@@ -217,58 +209,22 @@ def check_authentication():
         tuple: A tuple of validation flag, cookie value, and max_age in seconds.
     """
     webserver_node = webserver_publisher_node.get_webserver_node()
-    if not os.path.exists(TOKEN_PATH):
-        webserver_node.get_logger().error("Token path not found")
-        return False, None, None
 
-    cookie_val = str(request.cookies.get(DEEPRACER_TOKEN))
+    cookie_val = request.cookies.get(DEEPRACER_TOKEN)
     if not cookie_val:
         return False, None, None
 
-    try:
-        with open(TOKEN_PATH, "r") as file_ptr:
-            tokens_data = json.load(file_ptr)
-
-        # Get current time
-        current_time = datetime.datetime.now()
-
-        # Create list to store valid tokens
-        valid_tokens = []
-        status = False
-        max_age = None
-
-        for token_entry in tokens_data.get("tokens", []):
-            token = token_entry.get("token")
-            expires_at = token_entry.get("expires_at")
-
-            # Parse expiry date
-            expiry_date = datetime.datetime.fromisoformat(expires_at)
-
-            # Keep token if not expired
-            if expiry_date > current_time:
-                valid_tokens.append(token_entry)
-
-                # Check if this token matches the cookie
-                if hmac.compare_digest(cookie_val, token):
-                    status = True
-                    # Calculate max_age in seconds
-                    max_age = int((expiry_date - current_time).total_seconds())
-
-        # Update token file to remove expired tokens
-        if len(valid_tokens) != len(tokens_data.get("tokens", [])):
-            tokens_data["tokens"] = valid_tokens
-            with open(TOKEN_PATH, "w") as file_ptr:
-                json.dump(tokens_data, file_ptr)
-
-        if webserver_node is not None:
-            webserver_node.get_logger().debug(f"Cookie compare status: {status}")
-
-        return status, cookie_val, max_age
-
-    except (json.JSONDecodeError, IOError) as e:
-        webserver_node.get_logger().error(f"Error reading tokens: {str(e)}")
+    expires_at = TOKEN_STORE.get_expiry(cookie_val)
+    status = expires_at is not None
+    if webserver_node is not None:
+        webserver_node.get_logger().debug(f"Cookie compare status: {status}")
+    if not status:
         return False, None, None
 
+    # Calculate max_age in seconds
+    max_age = int(expires_at - datetime.datetime.now().timestamp())
+    return status, cookie_val, max_age
+
 
 def compute_password_digest(message):
     """Helper method to compute the message digest for the given string.
@@ -0,0 +1,124 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+manual_drive_channel.py
+
+This module holds the channel publishing the manual drive commands received over the
+manual drive WebSocket.
+"""
+
+import threading
+import time
+
+from deepracer_interfaces_pkg.msg import ServoCtrlMsg
+from webserver_pkg.vehicle_control import get_manual_drive_servo_msg
+
+
+class ManualDriveChannel():
+    """Object type which publishes the latest manual drive command on a dedicated thread.
+
+    Commands received faster than the publish rate are coalesced to the latest one, so a
+    burst of joystick movements never queues up behind the publisher. If no command is
+    received for the dead-man timeout, or the client disconnects, while the car is moving,
+    a message with zero throttle is published.
+    """
+    def __init__(self, publish_cb, min_interval, deadman_timeout):
+        """Create a ManualDriveChannel object and start its publisher thread.
+
+        Args:
+            publish_cb (function): Function publishing a ServoCtrlMsg.
+            min_interval (float): Minimum time in seconds between two published messages.
+            deadman_timeout (float): Time in seconds without command after which the
+                                     throttle is set to zero.
+        """
+        self.publish_cb = publish_cb
+        self.min_interval = min_interval
+        self.deadman_timeout = deadman_timeout
+        self.pending = None
+        self.stop_requested = False
+        self.last_msg = ServoCtrlMsg()
+        self.last_command_time = 0.0
+        self.last_publish_time = 0.0
+        self.cv = threading.Condition()
+        self.thread = threading.Thread(target=self.publisher_loop,
+                                       name="manual_drive_channel",
+                                       daemon=True)
+        self.thread.start()
+
+    def submit(self, angle, throttle, max_speed):
+        """Helper method to set the latest command of the joystick, replacing the command
+           waiting to be published if any.
+
+        Args:
+            angle (float): Float value ranging from -1.0 to 1.0 taken as input from joystick.
+            throttle (float): Float value ranging from -1.0 to 1.0 taken as input from joystick.
+            max_speed (float): Float value ranging from 0.0 to 1.0 taken as input
+                               from maximum speed input.
+        """
+        with self.cv:
+            self.pending = (angle, throttle, max_speed)
+            self.stop_requested = False
+            self.last_command_time = time.monotonic()
+            self.cv.notify()
+
+    def release(self):
+        """Helper method to stop the car when the client disconnects.
+        """
+        with self.cv:
+            self.pending = None
+            self.stop_requested = True
+            self.cv.notify()
+
+    def get_next_msg(self):
+        """Helper method to wait for the next message to publish. Must be called with the
+           lock held.
+
+        Returns:
+            ServoCtrlMsg: The message to publish.
+        """
+        while True:
+            now = time.monotonic()
+            is_moving = self.last_msg.throttle != 0.0
+            if self.pending is not None:
+                timeout = self.last_publish_time + self.min_interval - now
+                if timeout <= 0:
+                    msg = get_manual_drive_servo_msg(*self.pending)
+                    self.pending = None
+                    return msg
+            elif is_moving and (self.stop_requested
+                                or now - self.last_command_time >= self.deadman_timeout):
+                self.stop_requested = False
+                msg = ServoCtrlMsg()
+                msg.angle = self.last_msg.angle
+                msg.throttle = 0.0
+                return msg
+            elif is_moving:
+                timeout = self.last_command_time + self.deadman_timeout - now
+            else:
+                self.stop_requested = False
+                timeout = None
+            self.cv.wait(timeout)
+
+    def publisher_loop(self):
+        """Body of the publisher thread.
+        """
+        while True:
+            with self.cv:
+                msg = self.get_next_msg()
+                self.last_msg = msg
+                self.last_publish_time = time.monotonic()
+            self.publish_cb(msg)
@@ -0,0 +1,48 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+metrics_api.py
+
+This is the module that holds the API to fetch the latency metrics of the service calls
+made by the webserver.
+"""
+
+from flask import (Blueprint,
+                   jsonify)
+
+from webserver_pkg import webserver_publisher_node
+
+METRICS_API_BLUEPRINT = Blueprint("metrics_api", __name__)
+
+
+@METRICS_API_BLUEPRINT.route("/api/metrics", methods=["GET"])
+def api_get_metrics():
+    """API to return the latency histogram and the failure counters of the service calls
+       per service name since the webserver started, and the load of the server workers.
+
+    Returns:
+        dict: Execution status if the API call was successful, the metrics per service
+              and the server worker pools status.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+    try:
+        return jsonify({"success": True,
+                        "services": webserver_node.service_metrics.get_metrics(),
+                        "server": webserver_node.get_server_status()})
+    except Exception as ex:
+        webserver_node.get_logger().error(f"Unable to get the service call metrics: {ex}")
+        return jsonify(success=False, reason="Error")
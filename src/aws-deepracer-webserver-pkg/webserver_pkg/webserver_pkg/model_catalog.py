@@ -0,0 +1,284 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+model_catalog.py
+
+This module holds the in-memory catalog of the model folders in the artifacts directory
+and the cache of the sensor status, which let the model APIs answer without walking the
+directory, parsing every model_metadata.json and calling the sensor status service on
+every request.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+
+
+def get_disk_usage(path):
+    """Helper function to get the disk space used by a directory tree, like du.
+
+    Args:
+        path (str): Directory path.
+
+    Returns:
+        int: Number of bytes allocated for the files and directories under path.
+    """
+    total = 0
+    pending = [path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        total += entry.stat(follow_symlinks=False).st_blocks * 512
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    try:
+        total += os.stat(path).st_blocks * 512
+    except OSError:
+        pass
+    return total
+
+
+def format_disk_usage(size):
+    """Helper function to format a size the way du -h does, rounding up to one decimal
+       below 10 and to an integer above.
+
+    Args:
+        size (int): Size in bytes.
+
+    Returns:
+        str: Human readable size, e.g. 4.0K, 12M.
+    """
+    value = float(size)
+    for unit in ["", "K", "M", "G", "T"]:
+        if value < 1024 or unit == "T":
+            break
+        value /= 1024
+    if unit == "":
+        return str(size)
+    if value < 10:
+        value = math.ceil(value * 10) / 10
+        if value < 10:
+            return f"{value:.1f}{unit}"
+    return f"{math.ceil(value)}{unit}"
+
+
+class ModelCatalog():
+    """Object type which thread-safely keeps the details of the model folders in the
+       artifacts directory in memory.
+
+    Every folder is keyed by a signature made of its modification time, the modification
+    times of its subdirectories and the size and modification time of its
+    model_metadata.json. The disk usage and the model files are only recomputed when the
+    signature changes, and the metadata is only parsed again when the hash of
+    model_metadata.json changes. The folders are checked again when the artifacts
+    directory changes, when invalidate is called or after the revalidation period.
+    """
+    def __init__(self, directory, describe_cb, model_file_type, revalidate_period):
+        """Create a ModelCatalog object.
+
+        Args:
+            directory (str): Path of the artifacts directory.
+            describe_cb (function): Function called with a model folder path to read the
+                                    details of the model from its model_metadata.json.
+            model_file_type (str): Extension of the model files.
+            revalidate_period (float): Time in seconds after which the folders are checked
+                                       again even if the artifacts directory did not change.
+        """
+        self.directory = directory
+        self.describe_cb = describe_cb
+        self.model_file_type = model_file_type
+        self.revalidate_period = revalidate_period
+        self.entries = dict()
+        self.directory_mtime = None
+        self.validation_time = None
+        self.lock = threading.Lock()
+
+    def invalidate(self, folder_name=None):
+        """Helper method to force a check of the model folders on the next request.
+
+        Args:
+            folder_name (str, optional): Name of a model folder to read again from disk.
+                                         Defaults to None.
+        """
+        with self.lock:
+            self.validation_time = None
+            if folder_name is not None:
+                self.entries.pop(folder_name, None)
+
+    def get_models(self):
+        """Helper method to get the details of all model folders.
+
+        Returns:
+            list: Dictionaries with the name, path, size, creation time, model files and
+                  details of every model folder, sorted by folder name.
+        """
+        with self.lock:
+            if not self.is_valid():
+                self.refresh()
+            return [self.entries[name] for name in sorted(self.entries)]
+
+    def is_valid(self):
+        """Helper method to check if the entries can be returned without checking the
+           folders. Must be called with the lock held.
+
+        Returns:
+            bool: True if the catalog is up to date.
+        """
+        if self.validation_time is None \
+           or time.monotonic() - self.validation_time > self.revalidate_period:
+            return False
+        try:
+            return os.stat(self.directory).st_mtime_ns == self.directory_mtime
+        except OSError:
+            return False
+
+    def get_signature(self, path):
+        """Helper method to get the signature of a model folder.
+
+        Args:
+            path (str): Model folder path.
+
+        Returns:
+            tuple: Modification times of the folder and its subdirectories and the size and
+                   modification time of model_metadata.json.
+        """
+        children = list()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    children.append((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns))
+                elif entry.name == "model_metadata.json":
+                    stat = entry.stat()
+                    children.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return (os.stat(path).st_mtime_ns, tuple(sorted(children)))
+
+    def get_metadata_hash(self, path):
+        """Helper method to hash the content of the model_metadata.json of a model folder.
+
+        Args:
+            path (str): Model folder path.
+
+        Returns:
+            str: SHA-256 digest of the file or an empty string if it cannot be read.
+        """
+        try:
+            with open(os.path.join(path, "model_metadata.json"), "rb") as metadata_file:
+                return hashlib.sha256(metadata_file.read()).hexdigest()
+        except OSError:
+            return ""
+
+    def refresh(self):
+        """Helper method to check the model folders and read the ones that changed.
+           Must be called with the lock held.
+        """
+        try:
+            directory_mtime = os.stat(self.directory).st_mtime_ns
+            with os.scandir(self.directory) as entries:
+                folders = [(entry.name, entry.path) for entry in entries
+                           if entry.is_dir()]
+        except OSError:
+            self.entries = dict()
+            self.directory_mtime = None
+            self.validation_time = None
+            return
+
+        entries = dict()
+        for name, path in folders:
+            try:
+                signature = self.get_signature(path)
+            except OSError:
+                continue
+            entry = self.entries.get(name)
+            if entry is not None and entry["signature"] == signature:
+                entries[name] = entry
+                continue
+
+            metadata_hash = self.get_metadata_hash(path)
+            if entry is not None and entry["metadata_hash"] == metadata_hash:
+                details = entry["details"]
+            else:
+                details = self.describe_cb(path)
+            with os.scandir(path) as folder_entries:
+                model_files = sorted(folder_entry.name for folder_entry in folder_entries
+                                     if folder_entry.name.endswith(self.model_file_type)
+                                     and folder_entry.is_file())
+            size = get_disk_usage(path)
+            entries[name] = {
+                "name": name,
+                "path": path,
+                "signature": signature,
+                "size_bytes": size,
+                "size": format_disk_usage(size),
+                "creation_time": os.path.getmtime(path),
+                "model_files": model_files,
+                "metadata_hash": metadata_hash,
+                "details": details
+            }
+
+        self.entries = entries
+        self.directory_mtime = directory_mtime
+        self.validation_time = time.monotonic()
+
+
+class SensorStatusCache():
+    """Object type which keeps the last successful sensor status response for a short time,
+       so that concurrent and repeated model API calls share one service call.
+    """
+    def __init__(self, ttl):
+        """Create a SensorStatusCache object.
+
+        Args:
+            ttl (float): Time in seconds a sensor status response is reused.
+        """
+        self.ttl = ttl
+        self.value = None
+        self.update_time = None
+        self.lock = threading.Lock()
+
+    def get(self, fetch_cb):
+        """Helper method to get the sensor status, calling fetch_cb if the cached one is
+           older than the time to live. Failed calls are not cached.
+
+        Args:
+            fetch_cb (function): Function returning a tuple of error code and
+                                 SensorStatusCheckSrv.Response object.
+
+        Returns:
+            tuple: A tuple with error code and SensorStatusCheckSrv.Response object.
+        """
+        with self.lock:
+            if self.update_time is not None and time.monotonic() - self.update_time < self.ttl:
+                return self.value
+            err_code, sensor_status = fetch_cb()
+            if err_code == 0:
+                self.value = (err_code, sensor_status)
+                self.update_time = time.monotonic()
+            return err_code, sensor_status
+
+    def invalidate(self):
+        """Helper method to drop the cached sensor status.
+        """
+        with self.lock:
+            self.update_time = None
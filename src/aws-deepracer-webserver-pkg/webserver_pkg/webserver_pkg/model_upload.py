@@ -0,0 +1,347 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+model_upload.py
+
+This module holds the resumable chunked model uploads. The chunks are written to the
+archive in a staging folder as they are received and hashed on the way; once complete,
+the archive is validated and its folder moved into the artifacts directory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+import uuid
+
+from werkzeug.utils import secure_filename
+
+
+# States of a model upload.
+UPLOAD_STATE_UPLOADING = "uploading"
+UPLOAD_STATE_INSTALLING = "installing"
+UPLOAD_STATE_DONE = "done"
+UPLOAD_STATE_FAILED = "failed"
+
+MODEL_ARCHIVE_EXTENSION = ".tar.gz"
+MODEL_METADATA_FILE_NAME = "model_metadata.json"
+
+
+def validate_model_archive(archive_path, model_file_type, max_metadata_size,
+                           validate_metadata_cb):
+    """Helper function to check the layout of a model archive in a single streaming pass.
+       The archive must only hold files and directories inside the archive root, exactly
+       one model file and a valid model_metadata.json.
+
+    Args:
+        archive_path (str): Path of the .tar.gz archive.
+        model_file_type (str): Extension of the model files.
+        max_metadata_size (int): Maximum size in bytes of model_metadata.json.
+        validate_metadata_cb (function): Function called with the parsed model_metadata.json
+                                         returning a tuple of error code and error message.
+
+    Returns:
+        tuple: A tuple of error code and error message.
+    """
+    model_file_count = 0
+    metadata_found = False
+    try:
+        with tarfile.open(archive_path, "r|gz") as tar:
+            for member in tar:
+                name = os.path.normpath(member.name)
+                if os.path.isabs(name) or name.split(os.sep)[0] == "..":
+                    return 1, f"Archive member {member.name} is outside the archive"
+                if member.isdir():
+                    continue
+                if not member.isfile():
+                    return 1, f"Archive member {member.name} is not a regular file"
+                if name.endswith(model_file_type):
+                    model_file_count += 1
+                elif os.path.basename(name) == MODEL_METADATA_FILE_NAME:
+                    if member.size > max_metadata_size:
+                        return 1, f"{MODEL_METADATA_FILE_NAME} is too large"
+                    metadata = json.loads(tar.extractfile(member).read())
+                    err_code, err_msg = validate_metadata_cb(metadata)
+                    if err_code != 0:
+                        return err_code, err_msg
+                    metadata_found = True
+    except (OSError, EOFError, tarfile.TarError, ValueError) as ex:
+        return 1, f"The model archive is not a valid .tar.gz file: {ex}"
+
+    if model_file_count != 1:
+        return 1, f"The model archive must hold exactly one {model_file_type} file"
+    if not metadata_found:
+        return 1, f"The model archive has no {MODEL_METADATA_FILE_NAME}"
+    return 0, ""
+
+
+class ModelUpload():
+    """Object type which holds the state of one resumable model upload.
+    """
+    def __init__(self, upload_id, file_name, size, sha256, staging_directory):
+        """Create a ModelUpload object.
+
+        Args:
+            upload_id (str): Identifier of the upload.
+            file_name (str): Secured file name of the .tar.gz archive.
+            size (int): Size of the archive in bytes.
+            sha256 (str): Expected SHA-256 hex digest of the archive, empty if unknown.
+            staging_directory (str): Folder the archive is written to.
+        """
+        self.upload_id = upload_id
+        self.file_name = file_name
+        self.folder_name = file_name[:-len(MODEL_ARCHIVE_EXTENSION)]
+        # Name the model loader reports the installation progress with.
+        self.install_name = file_name.split(".")[0]
+        self.size = size
+        self.sha256 = sha256
+        self.staging_directory = staging_directory
+        self.archive_path = os.path.join(staging_directory, file_name)
+        self.offset = 0
+        self.hash = hashlib.sha256()
+        self.state = UPLOAD_STATE_UPLOADING
+        self.message = ""
+        self.update_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def get_status(self):
+        """Helper method to get the status of the upload.
+
+        Returns:
+            dict: Identifier, model folder name, received and total size, state and message.
+        """
+        return {"upload_id": self.upload_id,
+                "folder_name": self.folder_name,
+                "offset": self.offset,
+                "size": self.size,
+                "state": self.state,
+                "message": self.message}
+
+    def set_state(self, state, message=""):
+        """Helper method to set the state of the upload.
+
+        Args:
+            state (str): New state of the upload.
+            message (str, optional): Details about the state. Defaults to "".
+        """
+        self.state = state
+        self.message = message
+        self.update_time = time.monotonic()
+
+
+class ModelUploadManager():
+    """Object type which thread-safely keeps the model uploads in progress and the recently
+       finished ones, writes their chunks and validates the completed archives.
+
+    Chunks are written at the current offset of their upload only, so a client that lost
+    the response of a chunk reads the offset back from the status and resumes from there.
+    The archive is hashed while it is written, so the SHA-256 digest is available as soon
+    as the last chunk is received.
+    """
+    def __init__(self, staging_directory, model_directory, model_file_type, max_size,
+                 max_metadata_size, read_size, session_timeout, validate_metadata_cb):
+        """Create a ModelUploadManager object.
+
+        Args:
+            staging_directory (str): Folder holding the staging folders of the uploads.
+            model_directory (str): Path of the artifacts directory.
+            model_file_type (str): Extension of the model files.
+            max_size (int): Maximum size in bytes of an archive.
+            max_metadata_size (int): Maximum size in bytes of model_metadata.json.
+            read_size (int): Number of bytes read from the request at once.
+            session_timeout (float): Time in seconds after which an inactive upload
+                                     is dropped.
+            validate_metadata_cb (function): Function called with the parsed
+                                             model_metadata.json returning a tuple of
+                                             error code and error message.
+        """
+        self.staging_directory = staging_directory
+        self.model_directory = model_directory
+        self.model_file_type = model_file_type
+        self.max_size = max_size
+        self.max_metadata_size = max_metadata_size
+        self.read_size = read_size
+        self.session_timeout = session_timeout
+        self.validate_metadata_cb = validate_metadata_cb
+        self.uploads = dict()
+        self.lock = threading.Lock()
+
+    def create(self, file_name, size, sha256=""):
+        """Helper method to start a new upload.
+
+        Args:
+            file_name (str): File name of the .tar.gz archive.
+            size (int): Size of the archive in bytes.
+            sha256 (str, optional): Expected SHA-256 hex digest of the archive.
+                                    Defaults to "".
+
+        Returns:
+            tuple: A tuple of error code, error message and the ModelUpload object.
+        """
+        secured_file_name = secure_filename(file_name)
+        if not secured_file_name.endswith(MODEL_ARCHIVE_EXTENSION) \
+           or len(secured_file_name) == len(MODEL_ARCHIVE_EXTENSION):
+            return 1, "Failed to upload the model. Not a .tar.gz file", None
+        if size <= 0 or size > self.max_size:
+            return 1, f"The model archive size must be between 1 and {self.max_size} bytes", None
+
+        self.expire_uploads()
+        upload_id = uuid.uuid4().hex
+        upload = ModelUpload(upload_id,
+                             secured_file_name,
+                             size,
+                             sha256.lower(),
+                             os.path.join(self.staging_directory, upload_id))
+        # Register the upload first so that its staging folder is never seen as left over.
+        with self.lock:
+            self.uploads[upload_id] = upload
+        try:
+            os.makedirs(upload.staging_directory)
+            open(upload.archive_path, "wb").close()
+        except OSError as ex:
+            shutil.rmtree(upload.staging_directory, ignore_errors=True)
+            with self.lock:
+                del self.uploads[upload_id]
+            return 1, f"Unable to create the upload: {ex}", None
+        return 0, "", upload
+
+    def get(self, upload_id):
+        """Helper method to get an upload.
+
+        Args:
+            upload_id (str): Identifier of the upload.
+
+        Returns:
+            ModelUpload: The upload or None if it is unknown or expired.
+        """
+        with self.lock:
+            return self.uploads.get(upload_id)
+
+    def write_chunk(self, upload, offset, stream):
+        """Helper method to append a chunk to the archive of an upload, hashing it on
+           the way. If the chunk is interrupted, the bytes received are kept and the
+           client resumes from the new offset.
+
+        Args:
+            upload (ModelUpload): The upload.
+            offset (int): Offset of the chunk in the archive.
+            stream (file object): Stream to read the chunk from.
+
+        Returns:
+            tuple: A tuple of error code and error message.
+        """
+        if not upload.lock.acquire(blocking=False):
+            return 1, "Another chunk of this upload is being received"
+        try:
+            if upload.state != UPLOAD_STATE_UPLOADING:
+                return 1, f"The upload is {upload.state}"
+            if offset != upload.offset:
+                return 1, f"The chunk offset must be {upload.offset}"
+            with open(upload.archive_path, "r+b") as archive_file:
+                archive_file.seek(upload.offset)
+                try:
+                    for data in iter(lambda: stream.read(self.read_size), b""):
+                        if upload.offset + len(data) > upload.size:
+                            return 1, "The chunk goes past the end of the archive"
+                        archive_file.write(data)
+                        upload.hash.update(data)
+                        upload.offset += len(data)
+                        upload.update_time = time.monotonic()
+                finally:
+                    # Drop a partially written piece so that the file matches the hash.
+                    archive_file.truncate(upload.offset)
+            return 0, ""
+        except Exception as ex:
+            # Includes the client disconnecting in the middle of the chunk.
+            return 1, f"Unable to write the chunk: {ex}"
+        finally:
+            upload.lock.release()
+
+    def complete(self, upload):
+        """Helper method to validate the archive of a fully received upload and move its
+           folder into the artifacts directory, replacing the model folder of the same name.
+
+        Args:
+            upload (ModelUpload): The upload, with all its bytes received.
+
+        Returns:
+            tuple: A tuple of error code, error message and the model folder path.
+        """
+        with upload.lock:
+            if upload.state != UPLOAD_STATE_UPLOADING or upload.offset != upload.size:
+                return 1, "The upload is not complete", None
+            digest = upload.hash.hexdigest()
+            if upload.sha256 and upload.sha256 != digest:
+                err_code, err_msg = 1, f"The SHA-256 digest of the archive is {digest}"
+            else:
+                err_code, err_msg = validate_model_archive(upload.archive_path,
+                                                           self.model_file_type,
+                                                           self.max_metadata_size,
+                                                           self.validate_metadata_cb)
+            if err_code == 0:
+                model_path = os.path.join(self.model_directory, upload.folder_name)
+                try:
+                    if os.path.exists(model_path):
+                        shutil.rmtree(model_path)
+                    shutil.move(upload.staging_directory, model_path)
+                except OSError as ex:
+                    err_code, err_msg = 1, f"Unable to move the model folder: {ex}"
+            if err_code != 0:
+                shutil.rmtree(upload.staging_directory, ignore_errors=True)
+                upload.set_state(UPLOAD_STATE_FAILED, err_msg)
+                return err_code, err_msg, None
+            upload.set_state(UPLOAD_STATE_INSTALLING)
+            return 0, "", model_path
+
+    def abort(self, upload):
+        """Helper method to cancel an upload in progress and delete its staging folder.
+
+        Args:
+            upload (ModelUpload): The upload.
+
+        Returns:
+            tuple: A tuple of error code and error message.
+        """
+        with upload.lock:
+            if upload.state != UPLOAD_STATE_UPLOADING:
+                return 1, f"The upload is {upload.state}"
+            shutil.rmtree(upload.staging_directory, ignore_errors=True)
+            upload.set_state(UPLOAD_STATE_FAILED, "The upload was cancelled")
+        return 0, ""
+
+    def expire_uploads(self):
+        """Helper method to drop the uploads inactive for longer than the session timeout
+           and the staging folders left by a previous run of the webserver.
+        """
+        now = time.monotonic()
+        with self.lock:
+            for upload_id, upload in list(self.uploads.items()):
+                if now - upload.update_time > self.session_timeout \
+                   and upload.state != UPLOAD_STATE_INSTALLING:
+                    del self.uploads[upload_id]
+            known_ids = set(self.uploads)
+        try:
+            staging_folders = os.listdir(self.staging_directory)
+        except OSError:
+            return
+        for folder in staging_folders:
+            if folder not in known_ids:
+                shutil.rmtree(os.path.join(self.staging_directory, folder),
+                              ignore_errors=True)
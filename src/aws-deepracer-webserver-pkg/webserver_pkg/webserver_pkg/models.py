@@ -25,7 +25,6 @@ inference.
 """
 import itertools
 import time
-import fnmatch
 import os
 import shutil
 import json
@@ -41,8 +40,11 @@ from deepracer_interfaces_pkg.srv import (ModelStateSrv,
                                           VerifyModelReadySrv,
                                           LidarConfigSrv,
                                           SensorStatusCheckSrv)
-from webserver_pkg import utility
 from webserver_pkg.utility import call_service_sync
+from webserver_pkg.model_catalog import ModelCatalog, SensorStatusCache
+from webserver_pkg.model_upload import (ModelUploadManager,
+                                        UPLOAD_STATE_DONE,
+                                        UPLOAD_STATE_FAILED)
 from webserver_pkg import constants
 from webserver_pkg import webserver_publisher_node
 
@@ -50,55 +52,136 @@ from webserver_pkg import webserver_publisher_node
 MODELS_BLUEPRINT = Blueprint("models", __name__)
 
 
-def get_file_and_folder_info(path):
-    """Helper function to get the file and folder information for the model at the
-       model path sent as parameter.
+def describe_model_folder(path):
+    """Helper function to read the details of the model at the model path sent as parameter
+       from its model_metadata.json. Called by the model catalog when the model folder or
+       its model_metadata.json changed.
 
     Args:
         path (str): Model directory path.
 
     Returns:
-        dict: Dictonary with the relevant details about the model.
+        dict: Sensors, training algorithm and action space type of the model, None for the
+              values that could not be read, and their display names.
     """
-    training_algorithm_display_name = \
-        constants.TRAINING_ALGORITHM_NAME_MAPPING[constants.INVALID_ENUM_VALUE]
-    action_space_type_display_name = \
-        constants.ACTION_SPACE_TYPE_NAME_MAPPING[constants.INVALID_ENUM_VALUE]
-    model_metadata_sensors_display_names = \
-        [constants.SENSOR_INPUT_NAME_MAPPING[constants.INVALID_ENUM_VALUE]]
-
-    size = utility.execute(["du", "-sh", path])[1].split("\t")[0]
+    details = {
+        "sensors": None,
+        "training_algorithm": None,
+        "action_space_type": None,
+        "sensors_display_names":
+            [constants.SENSOR_INPUT_NAME_MAPPING[constants.INVALID_ENUM_VALUE]],
+        "training_algorithm_display_name":
+            constants.TRAINING_ALGORITHM_NAME_MAPPING[constants.INVALID_ENUM_VALUE],
+        "action_space_type_display_name":
+            constants.ACTION_SPACE_TYPE_NAME_MAPPING[constants.INVALID_ENUM_VALUE]
+    }
     err_code, err_msg, model_metadata_content = \
         read_model_metadata_file(os.path.join(path, "model_metadata.json"))
     if err_code == 0:
         err_code, err_msg, model_metadata_sensors = get_sensors(model_metadata_content)
         if err_code == 0:
-            model_metadata_sensors_display_names = [constants.SENSOR_INPUT_NAME_MAPPING[
-                                                    constants.SensorInputKeys(sensor)]
-                                                    for sensor in model_metadata_sensors]
+            details["sensors"] = model_metadata_sensors
+            details["sensors_display_names"] = [constants.SENSOR_INPUT_NAME_MAPPING[
+                                                constants.SensorInputKeys(sensor)]
+                                                for sensor in model_metadata_sensors]
         err_code, err_msg, training_algorithm = get_training_algorithm(model_metadata_content)
         if err_code == 0:
-            training_algorithm_display_name = \
+            details["training_algorithm"] = training_algorithm
+            details["training_algorithm_display_name"] = \
                 constants.TRAINING_ALGORITHM_NAME_MAPPING[
                     constants.TrainingAlgorithms(training_algorithm)]
         err_code, err_msg, action_space_type = get_action_space_type(model_metadata_content)
         if err_code == 0:
-            action_space_type_display_name = \
+            details["action_space_type"] = action_space_type
+            details["action_space_type_display_name"] = \
                 constants.ACTION_SPACE_TYPE_NAME_MAPPING[
                     constants.ActionSpaceTypes(action_space_type)]
+    return details
+
+
+# In-memory catalog of the model folders and cache of the sensor status used by the APIs.
+MODEL_CATALOG = ModelCatalog(constants.MODEL_DIRECTORY_PATH,
+                             describe_model_folder,
+                             constants.MODEL_FILE_TYPE,
+                             constants.MODEL_CATALOG_REVALIDATE_PERIOD)
+SENSOR_STATUS_CACHE = SensorStatusCache(constants.SENSOR_STATUS_CACHE_TTL)
+
+
+def validate_model_metadata(model_metatdata_json):
+    """Helper function to validate the content of the model_metadata.json of an uploaded
+       model archive before it is accepted.
+
+    Args:
+        model_metatdata_json (dict): JSON data with the content read from
+                                     model_metadata.json of the model.
+
+    Returns:
+        tuple: A tuple of error code and error message.
+    """
+    if not isinstance(model_metatdata_json, dict):
+        return 1, "Incorrect values in model_metadata.json"
+    err_code, err_msg, _ = get_sensors(model_metatdata_json)
+    if err_code > 0:
+        return err_code, err_msg
+    err_code, err_msg, _ = get_training_algorithm(model_metatdata_json)
+    if err_code > 0:
+        return err_code, err_msg
+    err_code, err_msg, action_space_type = get_action_space_type(model_metatdata_json)
+    if err_code > 0:
+        return err_code, err_msg
+    err_code, err_msg, action_space = get_action_space(model_metatdata_json)
+    if err_code > 0:
+        return err_code, err_msg
+    if not validate_action_space(action_space, action_space_type):
+        return 1, "Incorrect values in model_metadata.json"
+    return 0, ""
+
+
+# Resumable chunked model uploads.
+MODEL_UPLOADS = ModelUploadManager(constants.MODEL_UPLOAD_STAGING_PATH,
+                                   constants.MODEL_DIRECTORY_PATH,
+                                   constants.MODEL_FILE_TYPE,
+                                   constants.MODEL_UPLOAD_MAX_SIZE,
+                                   constants.MODEL_UPLOAD_MAX_METADATA_SIZE,
+                                   constants.MODEL_UPLOAD_READ_SIZE,
+                                   constants.MODEL_UPLOAD_SESSION_TIMEOUT,
+                                   validate_model_metadata)
+
+
+def get_file_and_folder_info(model_entry):
+    """Helper function to get the file and folder information for the model catalog entry
+       sent as parameter.
+
+    Args:
+        model_entry (dict): Model catalog entry of the model directory.
+
+    Returns:
+        dict: Dictonary with the relevant details about the model.
+    """
+    details = model_entry["details"]
     data = {
-        "name": os.path.basename(path),
-        "size": size,
-        "creation_time": os.path.getmtime(path),
+        "name": model_entry["name"],
+        "size": model_entry["size"],
+        "creation_time": model_entry["creation_time"],
         "status": "Ready",
-        "training_algorithm": training_algorithm_display_name,
-        "action_space_type": action_space_type_display_name,
-        "sensors": ", ".join(model_metadata_sensors_display_names)
+        "training_algorithm": details["training_algorithm_display_name"],
+        "action_space_type": details["action_space_type_display_name"],
+        "sensors": ", ".join(details["sensors_display_names"])
     }
     return data
 
 
 def get_sensor_status():
+    """Helper function to get the status of the sensor connected to the vehicle. The response
+       of the sensor status service is reused for SENSOR_STATUS_CACHE_TTL seconds.
+
+    Returns:
+        tuple: A tuple with error code and SensorStatusCheckSrv.Response object.
+    """
+    return SENSOR_STATUS_CACHE.get(request_sensor_status)
+
+
+def request_sensor_status():
     """Helper function to call the service to get the status of the sensor connected to the vehicle.
 
     Returns:
@@ -448,52 +531,28 @@ def api_list_models():
             sensor_status_info["lidar_status"] = \
                 "not_connected" if sensor_resp.lidar_status == 1 else "connected"
             data["sensor_status"] = sensor_status_info
-        for root, _, filenames in os.walk(constants.MODEL_DIRECTORY_PATH):
-            for file_name in fnmatch.filter(filenames, "*" + constants.MODEL_FILE_TYPE):
-                model_folder_name = os.path.basename(root)
-                if model_folder_name:
-                    err_code, err_msg, model_metadata_content = \
-                        read_model_metadata_file(os.path.join(
-                                                    os.path.join(constants.MODEL_DIRECTORY_PATH,
-                                                                 model_folder_name),
-                                                    "model_metadata.json"))
-                    model_metadata_sensors = None
-                    training_algorithm = ""
-                    action_space_type = ""
-                    if err_code == 0:
-                        err_code, err_msg, model_metadata_sensors = \
-                            get_sensors(model_metadata_content)
-                    if err_code == 0:
-                        err_code, err_msg, training_algorithm = \
-                            get_training_algorithm(model_metadata_content)
-                    if err_code == 0:
-                        err_code, err_msg, action_space_type = \
-                            get_action_space_type(model_metadata_content)
-                    if err_code == 0:
-                        model_disabled = False
-                        if sensor_status_code == 1:
-                            model_disabled = True
-                        else:
-                            sensor_status, _ = verify_sensor_connection(model_metadata_sensors,
-                                                                        sensor_resp)
-                            model_disabled = sensor_status == 1
-                        model = {"model_name": file_name[:-ext_length],
-                                 "model_folder_name": model_folder_name,
-                                 "model_training_algorithm":
-                                 constants.TRAINING_ALGORITHM_NAME_MAPPING[
-                                    constants.TrainingAlgorithms(training_algorithm)],
-                                 "model_action_space_type":
-                                 constants.ACTION_SPACE_TYPE_NAME_MAPPING[
-                                    constants.ActionSpaceTypes(action_space_type)],
-                                 "model_sensors":
-                                 [constants.SENSOR_INPUT_NAME_MAPPING[
-                                    constants.SensorInputKeys(sensor)]
-                                     for sensor in model_metadata_sensors],
-                                 "is_select_disabled": model_disabled}
-                        if not model_disabled:
-                            data["models"].append(model)
-                        else:
-                            disabled_models.append(model)
+        for model_entry in MODEL_CATALOG.get_models():
+            details = model_entry["details"]
+            if details["sensors"] is None or details["training_algorithm"] is None \
+               or details["action_space_type"] is None:
+                continue
+            model_disabled = False
+            if sensor_status_code == 1:
+                model_disabled = True
+            else:
+                sensor_status, _ = verify_sensor_connection(details["sensors"], sensor_resp)
+                model_disabled = sensor_status == 1
+            for file_name in model_entry["model_files"]:
+                model = {"model_name": file_name[:-ext_length],
+                         "model_folder_name": model_entry["name"],
+                         "model_training_algorithm": details["training_algorithm_display_name"],
+                         "model_action_space_type": details["action_space_type_display_name"],
+                         "model_sensors": details["sensors_display_names"],
+                         "is_select_disabled": model_disabled}
+                if not model_disabled:
+                    data["models"].append(model)
+                else:
+                    disabled_models.append(model)
         data["models"] += disabled_models
     except AttributeError:
         webserver_node.get_logger().error("Model folder not found")
@@ -637,12 +696,8 @@ def get_uploaded_models_list():
     Returns:
         list: List of models and their details.
     """
-    model_list = list()
-    for cur_dir in os.listdir(constants.MODEL_DIRECTORY_PATH):
-        model_list.append(
-            get_file_and_folder_info(
-                os.path.join(constants.MODEL_DIRECTORY_PATH,
-                             cur_dir)))
+    model_list = [get_file_and_folder_info(model_entry)
+                  for model_entry in MODEL_CATALOG.get_models()]
     return jsonify(model_list)
 
 
@@ -685,6 +740,7 @@ def model_file_upload():
     # action=1 (For upload the model) & action=0 for deleting the model
     upload_model_req.action = 1
     upload_model_res = call_service_sync(webserver_node.model_action_cli, upload_model_req)
+    MODEL_CATALOG.invalidate(folder_name)
     if upload_model_res:
         webserver_node.get_logger().info(f"Uploaded model status return {upload_model_res.status}")
         if upload_model_res.status == "done-upload":
@@ -694,6 +750,154 @@ def model_file_upload():
                     "message": "Failed to upload & optimize the model"})
 
 
+def start_model_install(upload, model_path):
+    """Helper function to call the service installing an uploaded model without waiting
+       for the response. The upload state is set when the installation finishes.
+
+    Args:
+        upload (ModelUpload): The completed upload.
+        model_path (str): Path of the model folder in the artifacts directory.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+    client = webserver_node.model_action_cli
+    if not client.service_is_ready():
+        webserver_node.service_metrics.record_failure(client.srv_name, "not_ready")
+        upload.set_state(UPLOAD_STATE_FAILED, "Failed to upload & optimize the model")
+        return
+
+    upload_model_req = ConsoleModelActionSrv.Request()
+    upload_model_req.model_path = model_path
+    # action=1 (For upload the model) & action=0 for deleting the model
+    upload_model_req.action = 1
+    start_time = time.monotonic()
+
+    def done_cb(future):
+        MODEL_CATALOG.invalidate(upload.folder_name)
+        if future.exception() is not None:
+            webserver_node.get_logger().error(f"Error while installing {upload.folder_name}: "
+                                              f"{future.exception()}")
+            webserver_node.service_metrics.record_failure(client.srv_name, "errors")
+            upload.set_state(UPLOAD_STATE_FAILED, "Failed to upload & optimize the model")
+            return
+        webserver_node.service_metrics.record(client.srv_name,
+                                              (time.monotonic() - start_time) * 1000.0)
+        status = future.result().status
+        webserver_node.get_logger().info(f"Uploaded model status return {status}")
+        if status == "done-upload":
+            upload.set_state(UPLOAD_STATE_DONE, "Model uploaded successfully to your vehicle")
+        else:
+            upload.set_state(UPLOAD_STATE_FAILED, "Failed to upload & optimize the model")
+    client.call_async(upload_model_req).add_done_callback(done_cb)
+
+
+def get_model_upload_status(upload):
+    """Helper function to get the status of an upload and the installation progress
+       of its model.
+
+    Args:
+        upload (ModelUpload): The upload.
+
+    Returns:
+        dict: Execution status and the status of the upload.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+    status = upload.get_status()
+    status["install_progress"] = \
+        webserver_node.get_model_install_progress().get(upload.install_name)
+    return jsonify({"success": upload.state != UPLOAD_STATE_FAILED, **status})
+
+
+@MODELS_BLUEPRINT.route("/api/model_uploads", methods=["POST"])
+def create_model_upload():
+    """API to start a resumable chunked upload of a model .tar.gz archive. Takes the file
+       name, the size in bytes and optionally the SHA-256 hex digest of the archive.
+
+    Returns:
+        dict: Execution status if the API call was successful and the upload status with
+              the upload_id to send the chunks to.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+    try:
+        file_name = str(request.json["filename"])
+        size = int(request.json["size"])
+        sha256 = str(request.json.get("sha256", ""))
+    except Exception:
+        return jsonify({"success": False,
+                        "reason": "filename and size are required"})
+    err_code, err_msg, upload = MODEL_UPLOADS.create(file_name, size, sha256)
+    if err_code > 0:
+        return jsonify({"success": False, "reason": err_msg})
+    webserver_node.get_logger().info(f"Model upload {upload.upload_id} started: "
+                                     f"{upload.file_name} {size} bytes")
+    return get_model_upload_status(upload)
+
+
+@MODELS_BLUEPRINT.route("/api/model_uploads/<upload_id>", methods=["PUT"])
+def write_model_upload_chunk(upload_id):
+    """API to receive the next chunk of an upload as the raw request body, at the offset
+       passed as parameter. When the last chunk is received, the archive is validated,
+       moved into the artifacts directory and its installation started; the progress is
+       then read from the status of the upload.
+
+    Returns:
+        dict: Execution status if the API call was successful, the reason if failed and
+              the upload status with the offset of the next chunk.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+    upload = MODEL_UPLOADS.get(upload_id)
+    if upload is None:
+        return jsonify({"success": False, "reason": "Unknown upload"})
+    offset = request.args.get("offset", type=int)
+    if offset is None:
+        return jsonify({"success": False, "reason": "offset is required", **upload.get_status()})
+
+    err_code, err_msg = MODEL_UPLOADS.write_chunk(upload, offset, request.stream)
+    if err_code > 0:
+        return jsonify({"success": False, "reason": err_msg, **upload.get_status()})
+    if upload.offset < upload.size:
+        return get_model_upload_status(upload)
+
+    err_code, err_msg, model_path = MODEL_UPLOADS.complete(upload)
+    if err_code > 0:
+        webserver_node.get_logger().error(f"Model upload {upload_id} rejected: {err_msg}")
+        return jsonify({"success": False, "reason": err_msg, **upload.get_status()})
+    webserver_node.get_logger().info(f"Model upload {upload_id} received, installing "
+                                     f"{upload.folder_name}")
+    MODEL_CATALOG.invalidate(upload.folder_name)
+    start_model_install(upload, model_path)
+    return get_model_upload_status(upload)
+
+
+@MODELS_BLUEPRINT.route("/api/model_uploads/<upload_id>", methods=["GET"])
+def model_upload_status(upload_id):
+    """API to get the status of an upload: the offset to resume from while it is uploading,
+       then the state and installation progress of its model.
+
+    Returns:
+        dict: Execution status if the API call was successful and the upload status.
+    """
+    upload = MODEL_UPLOADS.get(upload_id)
+    if upload is None:
+        return jsonify({"success": False, "reason": "Unknown upload"})
+    return get_model_upload_status(upload)
+
+
+@MODELS_BLUEPRINT.route("/api/model_uploads/<upload_id>", methods=["DELETE"])
+def cancel_model_upload(upload_id):
+    """API to cancel an upload in progress.
+
+    Returns:
+        dict: Execution status if the API call was successful and the error reason if failed.
+    """
+    upload = MODEL_UPLOADS.get(upload_id)
+    if upload is None:
+        return jsonify({"success": False, "reason": "Unknown upload"})
+    err_code, err_msg = MODEL_UPLOADS.abort(upload)
+    if err_code > 0:
+        return jsonify({"success": False, "reason": err_msg})
+    return jsonify({"success": True})
+
+
 @MODELS_BLUEPRINT.route("/api/deleteModels", methods=["POST", "PUT"])
 def delete_model_folder():
     """API to call the service to delete models passed as parameter. Takes the folder
@@ -716,6 +920,7 @@ def delete_model_folder():
         # action=1 (For upload the model) & action=0 for deleting the model.
         delete_model_req.action = 0
         delete_model_res = call_service_sync(webserver_node.model_action_cli, delete_model_req)
+        MODEL_CATALOG.invalidate(filename)
         if delete_model_res:
             webserver_node.get_logger().info("Delete model status return "
                                              f"{delete_model_res.status}")
@@ -751,6 +956,40 @@ def is_model_installed():
                     "message": "Model is not installed"})
 
 
+@MODELS_BLUEPRINT.route("/api/model_install_progress", methods=["GET"])
+def model_install_progress():
+    """API to get the latest stage and status of the models going through the
+       model installation pipeline.
+
+    Returns:
+        dict: Execution status if the API call was successful and the progress per model.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+    return jsonify({"success": True,
+                    "progress": webserver_node.get_model_install_progress()})
+
+
+@MODELS_BLUEPRINT.route("/api/model_install_progress/stream", methods=["GET"])
+def model_install_progress_stream():
+    """API to stream the latest stage and status of the models going through the model
+       installation pipeline as server-sent events. Every event is a JSON object with the
+       progress per model, sent when the client connects and when a model progresses.
+
+    Returns:
+        flask.Response: Flask response object with the content_type set to text/event-stream.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+
+    def format_event(version, progress):
+        return f"id: {version}\ndata: {json.dumps(progress)}\n\n"
+
+    return Response(webserver_node.model_install_progress_hub.stream(
+                        format_event, constants.PROGRESS_HEARTBEAT_PERIOD),
+                    content_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache",
+                             "X-Accel-Buffering": "no"})
+
+
 @MODELS_BLUEPRINT.route("/api/isModelLoading", methods=["GET"])
 def is_model_loading():
     """API to stream the model loading status.
@@ -0,0 +1,115 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+progress_hub.py
+
+This module holds the hub that broadcasts the progress of a long running operation,
+such as the software update or the model installation, to the browser clients connected
+to its event stream.
+"""
+
+import threading
+
+
+class ProgressHub():
+    """Object type which keeps the last known state of an operation and wakes up the
+       connected event stream clients when it changes.
+
+    The state is published once by the subscriber callback of the node, whatever the
+    number of clients. The clients wait on a condition until the state changes or the
+    heartbeat period expires, instead of polling it.
+    """
+    def __init__(self, initial_state=None):
+        """Create a ProgressHub object.
+
+        Args:
+            initial_state (object, optional): State sent to the clients until the first
+                                              one is published. Defaults to None.
+        """
+        self.state = initial_state
+        self.version = 0
+        self.client_count = 0
+        self.cv = threading.Condition()
+
+    def publish(self, state):
+        """Helper method to set the last known state and wake up the clients.
+
+        Args:
+            state (object): New state, not modified after it is published.
+
+        Returns:
+            bool: True if the state changed and the clients were woken up.
+        """
+        with self.cv:
+            if state == self.state:
+                return False
+            self.state = state
+            self.version += 1
+            self.cv.notify_all()
+            return True
+
+    def get_state(self):
+        """Helper method to get the last known state.
+
+        Returns:
+            object: Last known state.
+        """
+        with self.cv:
+            return self.state
+
+    def wait_for_update(self, client_version, timeout):
+        """Helper method to wait until the state changes after the version sent to a client.
+
+        Args:
+            client_version (int): Version of the last state sent to the client.
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            tuple: A tuple of the current version and state, or of client_version and None
+                   if the timeout expired.
+        """
+        with self.cv:
+            if not self.cv.wait_for(lambda: self.version > client_version, timeout):
+                return client_version, None
+            return self.version, self.state
+
+    def stream(self, format_cb, heartbeat_period):
+        """Generator of the server-sent events of one client. The first event holds the last
+           known state, the following ones every new state.
+
+        Args:
+            format_cb (function): Function returning the server-sent event of a version
+                                  and a state.
+            heartbeat_period (float): Time in seconds without change after which a comment
+                                      is sent to keep the connection open.
+
+        Yields:
+            str: Server-sent event or heartbeat comment.
+        """
+        with self.cv:
+            self.client_count += 1
+        try:
+            client_version = -1
+            while True:
+                client_version, state = self.wait_for_update(client_version, heartbeat_period)
+                if state is None:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_cb(client_version, state)
+        finally:
+            with self.cv:
+                self.client_count -= 1
@@ -23,8 +23,6 @@ update status, execute software update, check if the device has rebooted and web
 is back up online.
 """
 
-import itertools
-import time
 import os
 import json
 from flask import (Blueprint,
@@ -36,8 +34,8 @@ from deepracer_interfaces_pkg.srv import (SoftwareUpdateCheckSrv,
                                           BeginSoftwareUpdateSrv,
                                           SoftwareUpdateStateSrv)
 from webserver_pkg.constants import (SOFTWARE_UPDATE_STATUS_PATH,
-                                     SOFTWARE_UPDATE_FETCH_FREQUENCY,
-                                     SLEEP_TIME_BEFORE_REBOOT)
+                                     SLEEP_TIME_BEFORE_REBOOT,
+                                     PROGRESS_HEARTBEAT_PERIOD)
 from webserver_pkg.utility import (execute,
                                    call_service_sync)
 from webserver_pkg import webserver_publisher_node
@@ -168,34 +166,25 @@ def begin_software_update():
 
 @SOFTWARE_UPDATE_BLUEPRINT.route("/api/update_status", methods=["GET"])
 def get_software_update_status():
-    """API to stream the software update progress percentage and the current state.
+    """API to stream the software update progress percentage and the current state. The
+       last known state is sent when the client connects, then every new state published
+       by the software update node.
 
     Returns:
         flask.Response: Flask response object with the content_type set to text/event-stream.
     """
     webserver_node = webserver_publisher_node.get_webserver_node()
-    webserver_node.get_logger().info("Inside the update status function")
-
-    def events():
-        webserver_node.get_logger().info("Running software update event source")
-        for i, c in enumerate(itertools.cycle(r"\|/-")):
-            try:
-                pct_dict = webserver_node.pct_dict_db.get_nowait()
-                percentage_completion = pct_dict["update_pct"]
-                result = f"status:{pct_dict['status']}|update_pct:{percentage_completion}"
-                yield "data: %s %d\n\n" % (result, i)
-                # The sleep is introduced here so as to fetch the next message from
-                # the software_update_status service. This is rate at which the UI shows
-                # the change in the status querying the service. So this will provide us
-                # to control the rate at which we would like to see the software update
-                # information on the browser. For now its set to 1 seconds.
-                time.sleep(SOFTWARE_UPDATE_FETCH_FREQUENCY)
-            except Exception as ex:
-                webserver_node.get_logger().error(f"Unable to reach update status service: {ex}")
-                result = "status:checking|update_pct:0"
-                yield f"data: {result} {1}\n\n"
-                break
-    return Response(events(), content_type="text/event-stream")
+    webserver_node.get_logger().info("Software update status client connected")
+
+    def format_event(version, pct_dict):
+        result = f"status:{pct_dict['status']}|update_pct:{pct_dict['update_pct']}"
+        return f"data: {result} {version}\n\n"
+
+    return Response(webserver_node.sw_update_progress_hub.stream(format_event,
+                                                                 PROGRESS_HEARTBEAT_PERIOD),
+                    content_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache",
+                             "X-Accel-Buffering": "no"})
 
 
 @SOFTWARE_UPDATE_BLUEPRINT.route("/api/server_ready", methods=["GET"])
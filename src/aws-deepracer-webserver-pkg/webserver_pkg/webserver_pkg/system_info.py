@@ -0,0 +1,332 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+system_info.py
+
+This module holds the provider of the system information shown by the network and time
+APIs. The information is read from netlink, ioctls and the file system instead of
+running a command for every request, and is cached for a short time.
+"""
+
+import ctypes
+import fcntl
+import os
+import socket
+import struct
+import subprocess
+import threading
+import time
+
+from webserver_pkg import constants
+
+
+# rtnetlink message types and flags (linux/netlink.h, linux/rtnetlink.h).
+NLMSG_HEADER = struct.Struct("=IHHII")
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+IFADDRMSG = struct.Struct("=BBBBI")
+RTATTR_HEADER = struct.Struct("=HH")
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+RT_SCOPE_LINK = 253
+RT_SCOPE_HOST = 254
+
+# Wireless extensions ioctl returning the ESSID of an interface (linux/wireless.h).
+SIOCGIWESSID = 0x8B1B
+IW_ESSID_MAX_SIZE = 32
+IFNAMSIZ = 16
+SYSFS_NET_PATH = "/sys/class/net"
+
+LOCALTIME_PATH = "/etc/localtime"
+TIMEZONE_PATH = "/etc/timezone"
+ZONEINFO_DIRECTORY = "zoneinfo/"
+
+
+def netlink_align(length):
+    """Helper function to round a netlink length up to the 4 bytes alignment.
+    """
+    return (length + 3) & ~3
+
+
+def read_interface_addresses():
+    """Helper function to list the IP addresses of the network interfaces with a
+       RTM_GETADDR netlink dump.
+
+    Returns:
+        list: List of tuples with interface index, address family, scope and address,
+              in the order of the interfaces.
+    """
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        sock.bind((0, 0))
+        request = IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        sock.send(NLMSG_HEADER.pack(NLMSG_HEADER.size + len(request), RTM_GETADDR,
+                                    NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + request)
+        addresses = list()
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                msg_len, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+                if msg_len < NLMSG_HEADER.size:
+                    raise OSError("Malformed netlink message")
+                if msg_type == NLMSG_DONE:
+                    return addresses
+                if msg_type == NLMSG_ERROR:
+                    error = struct.unpack_from("=i", data, offset + NLMSG_HEADER.size)[0]
+                    raise OSError(-error, os.strerror(-error))
+                if msg_type == RTM_NEWADDR:
+                    addresses.append(parse_address_message(
+                        data[offset + NLMSG_HEADER.size:offset + msg_len]))
+                offset += netlink_align(msg_len)
+
+
+def parse_address_message(payload):
+    """Helper function to parse the payload of a RTM_NEWADDR netlink message.
+
+    Args:
+        payload (bytes): ifaddrmsg structure followed by its attributes.
+
+    Returns:
+        tuple: A tuple of interface index, address family, scope and address.
+    """
+    family, _, _, scope, index = IFADDRMSG.unpack_from(payload)
+    attributes = dict()
+    offset = netlink_align(IFADDRMSG.size)
+    while offset + RTATTR_HEADER.size <= len(payload):
+        attr_len, attr_type = RTATTR_HEADER.unpack_from(payload, offset)
+        if attr_len < RTATTR_HEADER.size:
+            break
+        attributes[attr_type] = payload[offset + RTATTR_HEADER.size:offset + attr_len]
+        offset += netlink_align(attr_len)
+    # IFA_LOCAL is the address of the interface, IFA_ADDRESS the peer one on
+    # point-to-point links.
+    address = attributes.get(IFA_LOCAL, attributes.get(IFA_ADDRESS))
+    return index, family, scope, socket.inet_ntop(family, address) if address else None
+
+
+def read_essid(sock, interface):
+    """Helper function to read the ESSID of a wireless interface with the SIOCGIWESSID
+       ioctl, as done by iwgetid.
+
+    Args:
+        sock (socket.socket): Socket used for the ioctl.
+        interface (str): Name of the wireless interface.
+
+    Returns:
+        str: ESSID of the network the interface is connected to, empty if not connected.
+    """
+    essid = ctypes.create_string_buffer(IW_ESSID_MAX_SIZE + 1)
+    # struct iwreq: interface name followed by the struct iw_point of the union.
+    request = struct.pack(f"{IFNAMSIZ}sPHH", interface.encode(),
+                          ctypes.addressof(essid), len(essid), 0)
+    request += b"\0" * (IFNAMSIZ + 16 - len(request))
+    response = fcntl.ioctl(sock.fileno(), SIOCGIWESSID, request)
+    length = struct.unpack_from("H", response, IFNAMSIZ + struct.calcsize("P"))[0]
+    return essid.raw[:min(length, IW_ESSID_MAX_SIZE)].decode("utf-8", errors="replace")
+
+
+def run_command(cmd):
+    """Helper function to run a command and return its output.
+
+    Args:
+        cmd (list): Command and arguments.
+
+    Raises:
+        subprocess.CalledProcessError: Exception if the command fails.
+
+    Returns:
+        str: Output of the command.
+    """
+    return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+
+
+class CachedValue():
+    """Object type which thread-safely keeps a value for a time to live, so that the
+       requests made meanwhile share one read of the value.
+    """
+    def __init__(self, ttl):
+        """Create a CachedValue object.
+
+        Args:
+            ttl (float): Time in seconds the value is reused.
+        """
+        self.ttl = ttl
+        self.value = None
+        self.update_time = None
+        self.lock = threading.Lock()
+
+    def get(self, fetch_cb):
+        """Helper method to get the value, calling fetch_cb if the cached one is older than
+           the time to live. Exceptions raised by fetch_cb are not cached.
+
+        Args:
+            fetch_cb (function): Function returning the value.
+
+        Returns:
+            object: The value.
+        """
+        with self.lock:
+            if self.update_time is not None and time.monotonic() - self.update_time < self.ttl:
+                return self.value
+            self.value = fetch_cb()
+            self.update_time = time.monotonic()
+            return self.value
+
+    def invalidate(self):
+        """Helper method to drop the cached value.
+        """
+        with self.lock:
+            self.update_time = None
+
+
+class SystemInfoProvider():
+    """Object type which provides the IP addresses, connected SSID and timezone information
+       of the vehicle, cached for a time to live.
+
+    Each value is read without starting a process when possible, and with the command
+    used before otherwise. The set operations invalidate the values they change.
+    """
+    def __init__(self, network_ttl, timezone_ttl, timezone_list_ttl):
+        """Create a SystemInfoProvider object.
+
+        Args:
+            network_ttl (float): Time in seconds the IP addresses and SSID are reused.
+            timezone_ttl (float): Time in seconds the timezone name is reused.
+            timezone_list_ttl (float): Time in seconds the list of timezones is reused.
+        """
+        self.ip_addresses = CachedValue(network_ttl)
+        self.connected_ssid = CachedValue(network_ttl)
+        self.timezone_name = CachedValue(timezone_ttl)
+        self.timezones = CachedValue(timezone_list_ttl)
+
+    def get_ip_addresses(self):
+        """Helper method to get the IP addresses of the vehicle, as listed by hostname -I:
+           every address except the loopback and IPv6 link-local ones.
+
+        Returns:
+            list: List of the IP addresses.
+        """
+        return list(self.ip_addresses.get(self.read_ip_addresses))
+
+    def read_ip_addresses(self):
+        """Helper method to read the IP addresses of the vehicle.
+
+        Returns:
+            tuple: Tuple of the IP addresses.
+        """
+        try:
+            return tuple(address
+                         for _, family, scope, address in read_interface_addresses()
+                         if address is not None and scope != RT_SCOPE_HOST
+                         and not (family == socket.AF_INET6 and scope == RT_SCOPE_LINK))
+        except OSError:
+            return tuple(run_command(["hostname", "-I"]).split())
+
+    def get_connected_ssid(self):
+        """Helper method to get the SSID of the WiFi network the vehicle is connected to.
+
+        Returns:
+            str: SSID, empty if the vehicle is not connected to a WiFi network.
+        """
+        return self.connected_ssid.get(self.read_connected_ssid)
+
+    def read_connected_ssid(self):
+        """Helper method to read the SSID of the first connected wireless interface.
+
+        Returns:
+            str: SSID, empty if no wireless interface is connected.
+        """
+        try:
+            interfaces = sorted(interface for interface in os.listdir(SYSFS_NET_PATH)
+                                if os.path.isdir(os.path.join(SYSFS_NET_PATH, interface,
+                                                              "wireless")))
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                for interface in interfaces:
+                    essid = read_essid(sock, interface)
+                    if essid:
+                        return essid
+            return ""
+        except OSError:
+            try:
+                return run_command(["iwgetid", "-r"]).strip()
+            except (OSError, subprocess.CalledProcessError):
+                # iwgetid fails when no interface is connected.
+                return ""
+
+    def invalidate_network(self):
+        """Helper method to drop the cached IP addresses and SSID after the network
+           connection was changed.
+        """
+        self.ip_addresses.invalidate()
+        self.connected_ssid.invalidate()
+
+    def get_timezone_name(self):
+        """Helper method to get the name of the system timezone, e.g. Europe/Berlin.
+
+        Raises:
+            subprocess.CalledProcessError: Exception if the name could not be read.
+
+        Returns:
+            str: Timezone name.
+        """
+        return self.timezone_name.get(self.read_timezone_name)
+
+    def read_timezone_name(self):
+        """Helper method to read the name of the system timezone from the target of
+           /etc/localtime, as done by timedatectl, or from /etc/timezone.
+
+        Returns:
+            str: Timezone name.
+        """
+        localtime = os.path.realpath(LOCALTIME_PATH)
+        if ZONEINFO_DIRECTORY in localtime:
+            return localtime.split(ZONEINFO_DIRECTORY, 1)[1]
+        try:
+            with open(TIMEZONE_PATH, "r") as timezone_file:
+                timezone_name = timezone_file.read().strip()
+            if timezone_name:
+                return timezone_name
+        except OSError:
+            pass
+        return run_command(["timedatectl", "show", "-p", "Timezone", "--value"]).strip()
+
+    def get_timezones(self):
+        """Helper method to get the names of the timezones that can be set.
+
+        Raises:
+            subprocess.CalledProcessError: Exception if the list could not be read.
+
+        Returns:
+            frozenset: Set of the timezone names.
+        """
+        return self.timezones.get(
+            lambda: frozenset(run_command(["timedatectl", "list-timezones"]).split()))
+
+    def invalidate_timezone(self):
+        """Helper method to drop the cached timezone name after the timezone was set.
+        """
+        self.timezone_name.invalidate()
+
+
+# System information shared by the network and time APIs.
+SYSTEM_INFO = SystemInfoProvider(constants.SYSTEM_INFO_NETWORK_TTL,
+                                 constants.SYSTEM_INFO_TIMEZONE_TTL,
+                                 constants.SYSTEM_INFO_TIMEZONE_LIST_TTL)
@@ -0,0 +1,59 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+telemetry_api.py
+
+This is the module that holds the API streaming the live telemetry of the vehicle
+to the device console.
+"""
+
+import math
+
+from flask import (Blueprint,
+                   jsonify,
+                   request,
+                   Response)
+
+from webserver_pkg import webserver_publisher_node
+from webserver_pkg.constants import (TELEMETRY_DEFAULT_RATE,
+                                     TELEMETRY_MAX_RATE,
+                                     TELEMETRY_KEEPALIVE_PERIOD)
+
+TELEMETRY_API_BLUEPRINT = Blueprint("telemetry_api", __name__)
+
+
+@TELEMETRY_API_BLUEPRINT.route("/api/telemetry", methods=["GET"])
+def api_telemetry():
+    """API to stream the device status, battery level, model loading state, servo command
+       and inference rate as server-sent events. Every event is a JSON object holding the
+       channels that changed since the previous event. Events are sent at most rate times
+       per second, and only when a channel changed.
+
+    Returns:
+        flask.Response: Flask response object with the content_type set to text/event-stream,
+                        or the reason if the rate is not a finite number.
+    """
+    webserver_node = webserver_publisher_node.get_webserver_node()
+    rate = request.args.get("rate", TELEMETRY_DEFAULT_RATE, type=float)
+    if not math.isfinite(rate):
+        return jsonify({"success": False, "reason": "rate must be a finite number"})
+    rate = min(max(rate, 0.1), TELEMETRY_MAX_RATE)
+    webserver_node.get_logger().info(f"Telemetry client connected at {rate:.1f} events/s")
+    return Response(webserver_node.telemetry_hub.stream(1.0 / rate, TELEMETRY_KEEPALIVE_PERIOD),
+                    content_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache",
+                             "X-Accel-Buffering": "no"})
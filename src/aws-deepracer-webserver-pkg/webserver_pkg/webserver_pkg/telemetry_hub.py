@@ -0,0 +1,131 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+telemetry_hub.py
+
+This module holds the hub that fans out the live telemetry of the vehicle to the
+browser clients connected to the telemetry event stream.
+"""
+
+import json
+import threading
+import time
+
+from webserver_pkg.utility import DoubleBuffer
+
+
+class TelemetryHub():
+    """Object type which keeps the latest value of every telemetry channel and wakes up
+       the connected event stream clients when one of them changes.
+
+    Every value is serialized once when it is updated, so the cost of a new value does
+    not grow with the number of clients. Updates equal to the current value are ignored,
+    and a client that is rate limited receives only the latest value of the channels that
+    changed in the meantime.
+    """
+    def __init__(self, channels):
+        """Create a TelemetryHub object.
+
+        Args:
+            channels (list): Names of the telemetry channels.
+        """
+        self.channel_buffers = {channel: DoubleBuffer(clear_data_on_get=False)
+                                for channel in channels}
+        self.channel_versions = {channel: 0 for channel in channels}
+        self.version = 0
+        self.client_count = 0
+        self.cv = threading.Condition()
+
+    def has_clients(self):
+        """Helper method to check if a client is connected to the event stream.
+
+        Returns:
+            bool: True if at least one client is connected.
+        """
+        return self.client_count > 0
+
+    def update(self, channel, data):
+        """Helper method to set the latest value of a channel.
+
+        Args:
+            channel (str): Name of the telemetry channel.
+            data (dict): JSON serializable value of the channel.
+
+        Returns:
+            bool: True if the value changed and the clients were woken up.
+        """
+        encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        with self.cv:
+            try:
+                if self.channel_buffers[channel].get_nowait() == encoded:
+                    return False
+            except DoubleBuffer.Empty:
+                pass
+            self.channel_buffers[channel].put(encoded)
+            self.version += 1
+            self.channel_versions[channel] = self.version
+            self.cv.notify_all()
+            return True
+
+    def wait_for_changes(self, client_version, timeout):
+        """Helper method to wait until a channel changes after the version sent to a client.
+
+        Args:
+            client_version (int): Version of the last message sent to the client.
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            tuple: A tuple of the current version and the serialized values of the channels
+                   that changed, empty if the timeout expired.
+        """
+        with self.cv:
+            self.cv.wait_for(lambda: self.version > client_version, timeout)
+            changes = {channel: self.channel_buffers[channel].get_nowait()
+                       for channel, version in self.channel_versions.items()
+                       if version > client_version}
+            return self.version, changes
+
+    def stream(self, min_interval, keepalive_period):
+        """Generator of the server-sent events of one client. The first event holds all
+           channels with a value, the following ones only the channels that changed.
+
+        Args:
+            min_interval (float): Minimum time in seconds between two events.
+            keepalive_period (float): Time in seconds without change after which a comment
+                                      is sent to keep the connection open.
+
+        Yields:
+            str: Server-sent event with the changed channels as a JSON object.
+        """
+        with self.cv:
+            self.client_count += 1
+        try:
+            client_version = 0
+            while True:
+                client_version, changes = self.wait_for_changes(client_version,
+                                                                keepalive_period)
+                if not changes:
+                    yield ": keepalive\n\n"
+                    continue
+                payload = ",".join(f"\"{channel}\":{encoded}"
+                                   for channel, encoded in changes.items())
+                yield f"id: {client_version}\ndata: {{{payload}}}\n\n"
+                # Changes arriving while the client waits are coalesced into the next event.
+                time.sleep(min_interval)
+        finally:
+            with self.cv:
+                self.client_count -= 1
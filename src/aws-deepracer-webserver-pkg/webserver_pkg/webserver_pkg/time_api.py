@@ -28,6 +28,7 @@ from flask import (Blueprint,
 
 from webserver_pkg import utility
 from webserver_pkg import webserver_publisher_node
+from webserver_pkg.system_info import SYSTEM_INFO
 import subprocess
 
 _timezone_changed = False
@@ -73,11 +74,7 @@ def get_time_info():
 def _get_timezone_name(webserver_node):
     """Get the system timezone name."""
     try:
-        result = subprocess.run(
-            ["timedatectl", "show", "-p", "Timezone", "--value"],
-            capture_output=True, text=True, check=True
-        )
-        return result.stdout.strip()
+        return SYSTEM_INFO.get_timezone_name()
     except subprocess.CalledProcessError as ex:
         webserver_node.get_logger().warning(f"Failed to get timezone from timedatectl: {ex}")
         return time.tzname[time.daylight] if time.daylight else time.tzname[0]
@@ -133,11 +130,7 @@ def set_timezone():
 
         # Validate timezone by checking if it exists in the system's timezone list
         try:
-            result = utility.execute("timedatectl list-timezones", shlex_split=True)
-            stdout = result[1] if isinstance(result, tuple) and len(result) > 0 else ""
-            valid_timezones = stdout.strip().split('\n') if stdout else []
-
-            if timezone not in valid_timezones:
+            if timezone not in SYSTEM_INFO.get_timezones():
                 return jsonify(success=False, reason=f"Invalid timezone: {timezone}")
 
         except Exception as validation_ex:
@@ -146,6 +139,7 @@ def set_timezone():
 
         result = utility.execute(f"timedatectl set-timezone {timezone}", shlex_split=True)
         if result[0] == 0:
+            SYSTEM_INFO.invalidate_timezone()
             _timezone_changed = True
             return jsonify(success=True, reason="Timezone updated successfully")
         else:
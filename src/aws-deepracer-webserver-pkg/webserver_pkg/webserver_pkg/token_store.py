@@ -0,0 +1,185 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+token_store.py
+
+This module holds the in-memory store of the console login tokens, backed by the token
+file, which lets the authorization API check a cookie without reading the file.
+"""
+
+import datetime
+import heapq
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class TokenStore():
+    """Object type which thread-safely keeps the login tokens and their expiry time in
+       memory and persists them to the token file.
+
+    Tokens are looked up in a dictionary, and an expiry min-heap lets the expired tokens be
+    dropped without scanning all of them. Changes are written to the token file after a
+    short delay, coalescing the logins of that period, by replacing the file atomically.
+    The file is read again only when its modification time changed, which is checked at
+    most once per reload check period.
+    """
+    def __init__(self, path, write_delay, reload_check_period):
+        """Create a TokenStore object.
+
+        Args:
+            path (str): Path of the token file.
+            write_delay (float): Time in seconds between a change and its write to the file.
+            reload_check_period (float): Minimum time in seconds between two checks of the
+                                         modification time of the token file.
+        """
+        self.path = path
+        self.write_delay = write_delay
+        self.reload_check_period = reload_check_period
+        self.tokens = dict()
+        self.expiry_heap = list()
+        # Tokens added since the last write, kept when the file is read again.
+        self.pending_tokens = dict()
+        self.loaded = False
+        self.file_mtime = None
+        self.check_time = None
+        self.write_timer = None
+        self.lock = threading.Lock()
+
+    def add(self, token, expires_at):
+        """Helper method to store a new token.
+
+        Args:
+            token (str): Token value.
+            expires_at (float): Expiry time of the token as a POSIX timestamp.
+        """
+        with self.lock:
+            self.reload_if_changed()
+            self.tokens[token] = expires_at
+            self.pending_tokens[token] = expires_at
+            heapq.heappush(self.expiry_heap, (expires_at, token))
+            self.schedule_write()
+
+    def get_expiry(self, token):
+        """Helper method to get the expiry time of a token.
+
+        Args:
+            token (str): Token value.
+
+        Returns:
+            float: Expiry time of the token as a POSIX timestamp or None if the token is
+                   unknown or expired.
+        """
+        with self.lock:
+            self.reload_if_changed()
+            self.prune(time.time())
+            return self.tokens.get(token)
+
+    def prune(self, now):
+        """Helper method to drop the expired tokens. Must be called with the lock held.
+
+        Args:
+            now (float): Current time as a POSIX timestamp.
+        """
+        pruned = False
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            expires_at, token = heapq.heappop(self.expiry_heap)
+            if self.tokens.get(token) == expires_at:
+                del self.tokens[token]
+                self.pending_tokens.pop(token, None)
+                pruned = True
+        if pruned:
+            self.schedule_write()
+
+    def reload_if_changed(self):
+        """Helper method to read the token file again if it was changed by another process.
+           Must be called with the lock held.
+        """
+        now = time.monotonic()
+        if self.check_time is not None and now - self.check_time < self.reload_check_period:
+            return
+        self.check_time = now
+        try:
+            file_mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            file_mtime = None
+        if self.loaded and file_mtime == self.file_mtime:
+            return
+        self.loaded = True
+        self.file_mtime = file_mtime
+
+        tokens = dict()
+        if file_mtime is not None:
+            try:
+                with open(self.path, "r") as token_file:
+                    tokens_data = json.load(token_file)
+                for token_entry in tokens_data.get("tokens", []):
+                    expiry_date = datetime.datetime.fromisoformat(token_entry["expires_at"])
+                    tokens[token_entry["token"]] = expiry_date.timestamp()
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                # If file exists but isn't valid, start fresh.
+                tokens = dict()
+        tokens.update(self.pending_tokens)
+        self.tokens = tokens
+        self.expiry_heap = [(expires_at, token) for token, expires_at in tokens.items()]
+        heapq.heapify(self.expiry_heap)
+
+    def schedule_write(self):
+        """Helper method to write the tokens to the file after the write delay, unless
+           a write is already scheduled. Must be called with the lock held.
+        """
+        if self.write_timer is None:
+            self.write_timer = threading.Timer(self.write_delay, self.flush)
+            self.write_timer.daemon = True
+            self.write_timer.start()
+
+    def flush(self):
+        """Helper method to write the tokens to the token file now, replacing it atomically.
+
+        Returns:
+            bool: True if the tokens were written or there was nothing to write.
+        """
+        with self.lock:
+            if self.write_timer is None:
+                return True
+            self.write_timer.cancel()
+            self.write_timer = None
+            tokens_data = {"tokens": [{"token": token,
+                                       "expires_at":
+                                           datetime.datetime.fromtimestamp(expires_at).isoformat()}
+                                      for token, expires_at in self.tokens.items()]}
+            directory = os.path.dirname(self.path) or "."
+            try:
+                with tempfile.NamedTemporaryFile("w", dir=directory, delete=False,
+                                                 prefix=".token-") as temp_file:
+                    json.dump(tokens_data, temp_file)
+                    temp_file.flush()
+                    os.fsync(temp_file.fileno())
+                os.replace(temp_file.name, self.path)
+                self.file_mtime = os.stat(self.path).st_mtime_ns
+                self.pending_tokens = dict()
+                return True
+            except OSError:
+                try:
+                    os.remove(temp_file.name)
+                except (OSError, NameError):
+                    pass
+                # Keep the pending tokens and try again later.
+                self.schedule_write()
+                return False
@@ -21,58 +21,66 @@ This module holds the utility functions and classes used across the package.
 """
 
 from subprocess import Popen, PIPE, STDOUT
+import bisect
+import itertools
 import shlex
 import threading
 import time
 from flask import jsonify
 
 from webserver_pkg import webserver_publisher_node
+from webserver_pkg.system_info import SYSTEM_INFO
 
+# Number identifying the service calls in the log messages.
+SERVICE_CALL_SEQUENCE = itertools.count(1)
 
-def call_service_sync(cli, req, timeout=10, sleep_time=0.01):
+
+def call_service_sync(cli, req, timeout=10):
     """A wrapper function to call the services and wait for the results until timeout.
 
+    The calling thread waits on an event set from the done callback of the future, so it
+    wakes up as soon as the executor delivers the response. The latency of every call is
+    recorded in the service metrics of the webserver node.
+
     Args:
         cli (rclpy.client.Client): Client object using which we call the service.
         req (Request): Service request object.
-        timeout (int, optional): Time in seconds to keep checking for service call to
-                                 return result before removing the request. Defaults to 60.
-        sleep_time (float, optional): Time in seconds to sleep before each check for
-                                      returned result from service call. Defaults to 0.01.
+        timeout (int, optional): Time in seconds to wait for the service call to
+                                 return result before removing the request. Defaults to 10.
 
     Returns:
         Response: The service response.
     """
     webserver_node = webserver_publisher_node.get_webserver_node()
     if cli.service_is_ready():
-        webserver_node.get_logger().debug(f"Service call initiated: {cli.srv_name}")
+        sequence = next(SERVICE_CALL_SEQUENCE)
+        webserver_node.get_logger().debug(f"Service call initiated: {sequence} {cli.srv_name}")
+        done_event = threading.Event()
+        start_time = time.monotonic()
         future = cli.call_async(req)
-        sequence = -1
-        for seq, req_future in cli._pending_requests.items():
-            if req_future == future:
-                sequence = seq
-                break
-        webserver_node.get_logger().debug(f"New request: {sequence} {cli.srv_name}")
-        elapsed_time = 0
-        while not future.done():
-            if elapsed_time == int(elapsed_time):
-                webserver_node.get_logger().debug(f"Service call not finished: {sequence} {cli.srv_name}")
-            time.sleep(sleep_time)
-            elapsed_time += sleep_time
-            if elapsed_time >= timeout:
-                webserver_node.get_logger().info("Service call was not completed before timeout: "
-                                                 f"{sequence} {cli.srv_name} {timeout}")
-                future.cancel()
-                if future.cancelled():
-                    webserver_node.get_logger().error(f"Service was cancelled: {sequence} {cli.srv_name}")
-                return None
-        webserver_node.get_logger().debug(f"Service call finished: {sequence} {cli.srv_name}")
+        future.add_done_callback(lambda _: done_event.set())
+        if not done_event.wait(timeout):
+            webserver_node.get_logger().info("Service call was not completed before timeout: "
+                                             f"{sequence} {cli.srv_name} {timeout}")
+            webserver_node.service_metrics.record_failure(cli.srv_name, "timeouts")
+            future.cancel()
+            if future.cancelled():
+                webserver_node.get_logger().error("Service was cancelled: "
+                                                  f"{sequence} {cli.srv_name}")
+            return None
+        latency_ms = (time.monotonic() - start_time) * 1000.0
+        webserver_node.get_logger().debug(f"Service call finished: {sequence} {cli.srv_name} "
+                                          f"{latency_ms:.1f}ms")
         if future.exception() is not None:
             webserver_node.get_logger().error(f"Error while calling service: {sequence} - "
                                               f"{cli.srv_name} - {future.exception()}")
+            webserver_node.service_metrics.record_failure(cli.srv_name, "errors")
+        else:
+            webserver_node.service_metrics.record(cli.srv_name, latency_ms)
         return future.result()
     else:
         webserver_node.get_logger().warn(f"Service is not ready: {cli.srv_name}")
+        webserver_node.service_metrics.record_failure(cli.srv_name, "not_ready")
         return None
 
 
@@ -114,13 +122,7 @@ def is_network_connected(ssid):
     """
     webserver_node = webserver_publisher_node.get_webserver_node()
     webserver_node.get_logger().info(f"Checking if ssid: {ssid} is connected")
-    cur_ssid = execute(r'/usr/bin/nmcli -t -f active,ssid -e no dev wifi | egrep "^yes" | cut -d\: -f2',
-                       shell=True)[1].split('\n')
-
-    if cur_ssid[0] == ssid:
-        return True
-
-    return False
+    return SYSTEM_INFO.get_connected_ssid() == ssid
 
 
 def is_network_inactive(ssid):
@@ -240,3 +242,120 @@ class DoubleBuffer():
             Exception (Exception): Inherits from Exception class.
         """
         pass
+
+
+#########################################################################################
+# Service call metrics.
+
+
+class ServiceMetrics():
+    """Object type which thread-safely collects the latency histogram and the failure
+       counters of the service calls per service name.
+    """
+    FAILURE_KEYS = ("timeouts", "errors", "not_ready")
+
+    def __init__(self, buckets_ms):
+        """Create a ServiceMetrics object.
+
+        Args:
+            buckets_ms (list): Sorted upper bounds in milliseconds of the histogram buckets.
+                               Latencies above the last bound are counted in an extra bucket.
+        """
+        self.buckets_ms = list(buckets_ms)
+        self.services = dict()
+        self.lock = threading.Lock()
+
+    def _get_service(self, srv_name):
+        """Helper method to get the metrics of a service, creating them on first use.
+           Must be called with the lock held.
+
+        Args:
+            srv_name (str): Name of the service.
+
+        Returns:
+            dict: Histogram and counters of the service.
+        """
+        service = self.services.get(srv_name)
+        if service is None:
+            service = {
+                "histogram": [0] * (len(self.buckets_ms) + 1),
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0
+            }
+            for key in self.FAILURE_KEYS:
+                service[key] = 0
+            self.services[srv_name] = service
+        return service
+
+    def record(self, srv_name, latency_ms):
+        """Helper method to record the latency of a completed service call.
+
+        Args:
+            srv_name (str): Name of the service.
+            latency_ms (float): Time in milliseconds from the request to the response.
+        """
+        with self.lock:
+            service = self._get_service(srv_name)
+            service["histogram"][bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+            service["count"] += 1
+            service["total_ms"] += latency_ms
+            service["max_ms"] = max(service["max_ms"], latency_ms)
+
+    def record_failure(self, srv_name, failure):
+        """Helper method to count a service call that did not return a response.
+
+        Args:
+            srv_name (str): Name of the service.
+            failure (str): One of "timeouts", "errors" or "not_ready".
+        """
+        with self.lock:
+            self._get_service(srv_name)[failure] += 1
+
+    def _get_percentile(self, service, percentile):
+        """Helper method to estimate a percentile as the upper bound of the bucket holding it.
+
+        Args:
+            service (dict): Histogram and counters of the service.
+            percentile (float): Percentile to estimate in the range [0, 100].
+
+        Returns:
+            float: Upper bound in milliseconds of the bucket, the maximum latency for the
+                   overflow bucket and 0 if no call was recorded.
+        """
+        if service["count"] == 0:
+            return 0.0
+        rank = percentile / 100.0 * service["count"]
+        cumulative = 0
+        for bucket_ms, bucket_count in zip(self.buckets_ms, service["histogram"]):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(bucket_ms, service["max_ms"])
+        return service["max_ms"]
+
+    def get_metrics(self):
+        """Helper method to get a snapshot of the metrics of all services.
+
+        Returns:
+            dict: Metrics per service name with the call counts, mean, maximum and estimated
+                  percentiles of the latency and the histogram keyed by bucket upper bound.
+        """
+        with self.lock:
+            services = {srv_name: dict(service, histogram=list(service["histogram"]))
+                        for srv_name, service in self.services.items()}
+        metrics = dict()
+        for srv_name, service in services.items():
+            count = service["count"]
+            metrics[srv_name] = {
+                "count": count,
+                "mean_ms": service["total_ms"] / count if count else 0.0,
+                "max_ms": service["max_ms"],
+                "p50_ms": self._get_percentile(service, 50),
+                "p95_ms": self._get_percentile(service, 95),
+                "p99_ms": self._get_percentile(service, 99),
+                "histogram": dict(zip([f"le_{bucket_ms:g}" for bucket_ms in self.buckets_ms] +
+                                      ["inf"], service["histogram"]))
+            }
+            for key in self.FAILURE_KEYS:
+                metrics[srv_name][key] = service[key]
+        return metrics
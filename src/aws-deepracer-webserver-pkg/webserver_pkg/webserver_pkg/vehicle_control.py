@@ -24,10 +24,15 @@ the servo/motor.
 """
 
 import math
+import struct
 import subprocess
 from flask import (Blueprint,
                    jsonify,
                    request)
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 
 from deepracer_interfaces_pkg.msg import ServoCtrlMsg
 from deepracer_interfaces_pkg.srv import (ActiveStateSrv,
@@ -41,6 +46,11 @@ from webserver_pkg import webserver_publisher_node
 
 
 VEHICLE_CONTROL_BLUEPRINT = Blueprint("vehicle_control", __name__)
+# WebSocket routes of the blueprint, None if flask-sock is not installed.
+VEHICLE_CONTROL_SOCK = Sock() if Sock is not None else None
+
+# Binary manual drive command: angle, throttle and max_speed as little-endian float32.
+MANUAL_DRIVE_COMMAND_STRUCT = struct.Struct("<fff")
 
 
 def get_rescaled_manual_speed(categorized_throttle, max_speed_pct):
@@ -157,6 +167,58 @@ def get_categorized_manual_angle(angle):
     return angle
 
 
+def get_manual_drive_servo_msg(angle, throttle, max_speed):
+    """Return the servo message for a manual drive command of the joystick.
+
+    Args:
+        angle (float): Float value ranging from -1.0 to 1.0 taken as input from joystick.
+        throttle (float): Float value ranging from -1.0 to 1.0 taken as input from joystick.
+        max_speed (float): Float value ranging from 0.0 to 1.0 taken as input
+                           from maximum speed input.
+
+    Returns:
+        ServoCtrlMsg: Message with the categorized angle and the rescaled throttle.
+    """
+    msg = ServoCtrlMsg()
+    # bound the throttle value based on the categories defined
+    msg.angle = -1.0 * get_categorized_manual_angle(angle)
+    categorized_throttle = get_categorized_manual_throttle(throttle)
+    msg.throttle = -1.0 * get_rescaled_manual_speed(categorized_throttle, max_speed)
+    return msg
+
+
+def parse_manual_drive_command(data):
+    """Return the values of a manual drive command received on the manual drive WebSocket.
+
+    Args:
+        data (bytes or str): Binary command packed with MANUAL_DRIVE_COMMAND_STRUCT or
+                             text command "angle,throttle,max_speed".
+
+    Raises:
+        ValueError: Exception if the command is malformed or a value is out of range.
+
+    Returns:
+        tuple: A tuple of angle, throttle and max_speed.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        if len(data) != MANUAL_DRIVE_COMMAND_STRUCT.size:
+            raise ValueError("command must be 3 float32 values")
+        angle, throttle, max_speed = MANUAL_DRIVE_COMMAND_STRUCT.unpack(data)
+    else:
+        values = data.split(",")
+        if len(values) != 3:
+            raise ValueError("command must be angle,throttle,max_speed")
+        angle, throttle, max_speed = (float(value) for value in values)
+
+    if not -1.0 <= angle <= 1.0:
+        raise ValueError("angle out of range")
+    if not -1.0 <= throttle <= 1.0:
+        raise ValueError("throttle out of range")
+    if not 0.0 <= max_speed <= 1.0:
+        raise ValueError("max_speed out of range")
+    return angle, throttle, max_speed
+
+
 @VEHICLE_CONTROL_BLUEPRINT.route("/api/manual_drive", methods=["PUT", "POST"])
 def api_manual_drive():
     """API that publishes control messages to control the angle and throttle in
@@ -182,18 +244,41 @@ def api_manual_drive():
     if throttle < -1.0 or throttle > 1.0:
         return api_fail("throttle out of range")
 
-    webserver_node.get_logger().info(f"Angle: {angle}  Throttle: {throttle}")
+    webserver_node.get_logger().debug(f"Angle: {angle}  Throttle: {throttle}")
 
     # Create the servo message.
-    msg = ServoCtrlMsg()
-    # bound the throttle value based on the categories defined
-    msg.angle = -1.0 * get_categorized_manual_angle(angle)
-    categorized_throttle = get_categorized_manual_throttle(throttle)
-    msg.throttle = -1.0 * get_rescaled_manual_speed(categorized_throttle, max_speed)
+    msg = get_manual_drive_servo_msg(angle, throttle, max_speed)
     webserver_node.pub_manual_drive.publish(msg)
     return jsonify({"success": True})
 
 
+if VEHICLE_CONTROL_SOCK is not None:
+    @VEHICLE_CONTROL_SOCK.route("/api/manual_drive_ws", bp=VEHICLE_CONTROL_BLUEPRINT)
+    def api_manual_drive_ws(ws):
+        """WebSocket API receiving the manual drive commands of the joystick. Every message
+           is a command parsed by parse_manual_drive_command; only malformed commands are
+           answered, with a text message starting with "error:". The commands are published
+           by the manual drive channel of the webserver node, which sets the throttle to
+           zero when the commands stop or the connection closes.
+
+        Args:
+            ws (simple_websocket.Server): The WebSocket connection.
+        """
+        webserver_node = webserver_publisher_node.get_webserver_node()
+        channel = webserver_node.manual_drive_channel
+        webserver_node.get_logger().info("Manual drive channel connected")
+        try:
+            while True:
+                data = ws.receive()
+                try:
+                    channel.submit(*parse_manual_drive_command(data))
+                except ValueError as ex:
+                    ws.send(f"error:{ex}")
+        finally:
+            channel.release()
+            webserver_node.get_logger().info("Manual drive channel disconnected")
+
+
 @VEHICLE_CONTROL_BLUEPRINT.route("/api/drive_mode", methods=["PUT", "POST"])
 def api_set_drive_mode():
     """API to toggle the drive mode between Autonomous/Manual mode.
@@ -22,10 +22,13 @@ to the UI.
 """
 
 from flask import (Blueprint,
-                   jsonify)
+                   jsonify,
+                   request)
 
 from webserver_pkg import constants
 from webserver_pkg import webserver_publisher_node
+from webserver_pkg.log_reader import (make_line_filter,
+                                      tail_lines)
 
 VEHICLE_LOGS_BLUEPRINT = Blueprint("vehicle_logs", __name__)
 
@@ -33,7 +36,13 @@ VEHICLE_LOGS_BLUEPRINT = Blueprint("vehicle_logs", __name__)
 @VEHICLE_LOGS_BLUEPRINT.route("/api/logs/<log_type>/<int:num_lines>", methods=["GET"])
 def api_get_logs(log_type, num_lines):
     """API to return the logs of appropriate type and logging window based on
-       user selection.
+       user selection. The lines are read backwards from the end of the log file, so
+       the cost does not depend on the size of the log.
+
+       Optional query parameters: since, the offset returned by a previous call to only
+       return the lines written after it; severity, the minimum severity level of the
+       lines (DEBUG, INFO, WARN, ERROR, FATAL); node, text contained in the logger name
+       of the lines.
 
     Args:
         log_type (str): Log type attribute name pointing to the log file location.
@@ -41,21 +50,34 @@ def api_get_logs(log_type, num_lines):
         num_lines (int): Number of latest log lines to return.
 
     Returns:
-        dict: Execution status if the API call was successful and the
-              log file read response.
+        dict: Execution status if the API call was successful, the log file read response,
+              the offset to pass as since on the next call, whether older lines were
+              skipped and whether the log file was rotated since the offset.
     """
     webserver_node = webserver_publisher_node.get_webserver_node()
-    num_lines = 1000 if num_lines > 1000 else num_lines
-    log_content = ""
-    try:
-        with VEHICLE_LOGS_BLUEPRINT.open_resource(getattr(constants, log_type)) as logfile:
-            lines = logfile.readlines()[-num_lines:]
-            for i in range(0, len(lines)):
-                log_content = log_content + lines[i].decode("utf-8")
-    except AttributeError:
+    num_lines = min(num_lines, constants.LOG_MAX_LINES)
+    log_path = getattr(constants, log_type, None)
+    if not isinstance(log_path, str):
         webserver_node.get_logger().error("Type of log does not exist!")
-        log_content = "Type of log does not exist!"
+        return jsonify({"success": True, "data": "Type of log does not exist!"})
+    try:
+        line_filter = make_line_filter(request.args.get("severity"),
+                                       request.args.get("node"))
+    except ValueError as ex:
+        return jsonify({"success": False, "reason": str(ex)})
+    since = max(request.args.get("since", 0, type=int), 0)
+    try:
+        result = tail_lines(log_path,
+                            num_lines,
+                            since,
+                            line_filter,
+                            constants.LOG_READ_BLOCK_SIZE,
+                            constants.LOG_MAX_SCAN_SIZE)
     except IOError:
         webserver_node.get_logger().error("File Not Found!")
-        log_content = "File Not Found!"
-    return jsonify({"success": True, "data": log_content})
+        return jsonify({"success": True, "data": "File Not Found!"})
+    return jsonify({"success": True,
+                    "data": result["data"].decode("utf-8", errors="replace"),
+                    "offset": result["offset"],
+                    "truncated": result["truncated"],
+                    "rotated": result["rotated"]})
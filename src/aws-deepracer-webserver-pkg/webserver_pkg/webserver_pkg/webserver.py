@@ -33,13 +33,16 @@ from webserver_pkg.calibration import CALIBRATION_BLUEPRINT
 from webserver_pkg.device_info_api import DEVICE_INFO_API_BLUEPRINT
 from webserver_pkg.login import LOGIN_BLUEPRINT
 from webserver_pkg.led_api import LED_API_BLUEPRINT
+from webserver_pkg.metrics_api import METRICS_API_BLUEPRINT
 from webserver_pkg.models import MODELS_BLUEPRINT
 from webserver_pkg.software_update import SOFTWARE_UPDATE_BLUEPRINT
 from webserver_pkg.ssh_api import SSH_API_BLUEPRINT
+from webserver_pkg.telemetry_api import TELEMETRY_API_BLUEPRINT
 from webserver_pkg.time_api import TIME_API_BLUEPRINT
 from webserver_pkg.vehicle_logs import VEHICLE_LOGS_BLUEPRINT
 from webserver_pkg.vehicle_control import VEHICLE_CONTROL_BLUEPRINT
 from webserver_pkg.wifi_settings import WIFI_SETTINGS_BLUEPRINT
+from webserver_pkg.constants import SERVER_WEBSOCKET_PING_INTERVAL
 
 template_dir = os.path.abspath('/opt/aws/deepracer/lib/device_console/templates')
 # Create the Flask application object.
@@ -60,9 +63,12 @@ app.register_blueprint(TIME_API_BLUEPRINT)
 app.register_blueprint(LED_API_BLUEPRINT)
 app.register_blueprint(DEVICE_INFO_API_BLUEPRINT)
 app.register_blueprint(MODELS_BLUEPRINT)
+app.register_blueprint(METRICS_API_BLUEPRINT)
+app.register_blueprint(TELEMETRY_API_BLUEPRINT)
 
 app.config.update(
     DEBUG=False,
     SECRET_KEY='secret_',
     SESSION_COOKIE_SECURE=True,
-    REMEMBER_COOKIE_SECURE=True)
+    REMEMBER_COOKIE_SECURE=True,
+    SOCK_SERVER_OPTIONS={"ping_interval": SERVER_WEBSOCKET_PING_INTERVAL})
@@ -34,6 +34,8 @@ from rclpy.callback_groups import (ReentrantCallbackGroup,
 from rclpy.qos import (QoSReliabilityPolicy,
                        QoSProfile,
                        QoSHistoryPolicy)
+from rcl_interfaces.msg import (ParameterDescriptor,
+                                ParameterType)
 
 # TODO: Figure out a way to avoid global variable for webserver node shared across Flask threads
 webserver_node = None
@@ -60,10 +62,19 @@ from deepracer_interfaces_pkg.srv import (ActiveStateSrv,
                                           OTGLinkStateSrv)
 from deepracer_interfaces_pkg.msg import (DeviceStatusMsg, 
                                           ServoCtrlMsg,
-                                          SoftwareUpdatePctMsg)
+                                          SoftwareUpdatePctMsg,
+                                          ModelInstallProgressMsg)
 from webserver_pkg.webserver import app
-from webserver_pkg.utility import DoubleBuffer
+from webserver_pkg.models import MODEL_CATALOG
+from webserver_pkg.login import TOKEN_STORE
+from webserver_pkg.telemetry_hub import TelemetryHub
+from webserver_pkg.progress_hub import ProgressHub
+from webserver_pkg.manual_drive_channel import ManualDriveChannel
+from webserver_pkg.vehicle_control import VEHICLE_CONTROL_SOCK
+from webserver_pkg.utility import ServiceMetrics
+from webserver_pkg.wsgi_server import PooledWSGIServer
 from webserver_pkg.constants import (DEVICE_STATUS_TOPIC, VEHICLE_STATE_SERVICE,
+                                     MODEL_INSTALL_PROGRESS_TOPIC,
                                      ENABLE_STATE_SERVICE,
                                      GET_CAR_CAL_SERVICE,
                                      SET_CAR_CAL_SERVICE,
@@ -85,7 +96,30 @@ from webserver_pkg.constants import (DEVICE_STATUS_TOPIC, VEHICLE_STATE_SERVICE,
                                      GET_OTG_LINK_STATE_SERVICE,
                                      CAL_DRIVE_TOPIC,
                                      MANUAL_DRIVE_TOPIC,
-                                     SOFTWARE_UPDATE_PCT_TOPIC)
+                                     SOFTWARE_UPDATE_PCT_TOPIC,
+                                     SERVICE_LATENCY_BUCKETS_MS,
+                                     SERVO_MSG_TOPIC,
+                                     TELEMETRY_CHANNELS,
+                                     TELEMETRY_DEVICE_STATUS,
+                                     TELEMETRY_BATTERY,
+                                     TELEMETRY_MODEL_LOADING,
+                                     TELEMETRY_SERVO,
+                                     TELEMETRY_INFERENCE,
+                                     TELEMETRY_POLL_PERIOD,
+                                     MANUAL_DRIVE_MAX_RATE,
+                                     MANUAL_DRIVE_DEADMAN_TIMEOUT,
+                                     SERVER_BACKEND_POOLED,
+                                     SERVER_BACKEND_DEVELOPMENT,
+                                     SERVER_WORKER_THREADS,
+                                     SERVER_STREAM_WORKER_THREADS,
+                                     SERVER_DRIVE_WORKER_THREADS,
+                                     SERVER_STREAM_PATHS,
+                                     SERVER_DRIVE_PATHS,
+                                     SERVER_REQUEST_TIMEOUT,
+                                     SERVER_STREAM_TIMEOUT,
+                                     SERVER_MAX_QUEUED_CONNECTIONS,
+                                     SERVER_QUEUE_TIMEOUT,
+                                     SERVER_SHUTDOWN_TIMEOUT)
 
 
 class WebServerNode(Node):
@@ -102,16 +136,53 @@ class WebServerNode(Node):
         PORT_DEFAULT = "5001"
         self.get_logger().info(f"Running the flask server on {HOST_DEFAULT}:{PORT_DEFAULT}")
 
+        # Latency histograms of the service calls made by the APIs, served on /api/metrics.
+        self.service_metrics = ServiceMetrics(SERVICE_LATENCY_BUCKETS_MS)
+        # Latest telemetry values streamed to the clients of /api/telemetry.
+        self.telemetry_hub = TelemetryHub(TELEMETRY_CHANNELS)
+
+        self.declare_parameter("server_backend", SERVER_BACKEND_POOLED, ParameterDescriptor(
+            type=ParameterType.PARAMETER_STRING))
+        self.declare_parameter("server_worker_threads", SERVER_WORKER_THREADS,
+                               ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter("server_stream_worker_threads", SERVER_STREAM_WORKER_THREADS,
+                               ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        self.declare_parameter("server_drive_worker_threads", SERVER_DRIVE_WORKER_THREADS,
+                               ParameterDescriptor(type=ParameterType.PARAMETER_INTEGER))
+        server_backend = self.get_parameter("server_backend").value
+        if server_backend not in [SERVER_BACKEND_POOLED, SERVER_BACKEND_DEVELOPMENT]:
+            self.get_logger().error(f"Server backend {server_backend} unknown, "
+                                    f"using {SERVER_BACKEND_POOLED}")
+            server_backend = SERVER_BACKEND_POOLED
+
         # Run the Flask webserver as a background thread.
-        self.get_logger().info("Running webserver")
-        self.server_thread = threading.Thread(target=app.run,
-                                              daemon=True,
-                                              kwargs={
-                                                  "host": HOST_DEFAULT,
-                                                  "port": PORT_DEFAULT,
-                                                  "use_reloader": False,
-                                                  "threaded": True}
-                                              )
+        self.get_logger().info(f"Running webserver with the {server_backend} backend")
+        self.server = None
+        if server_backend == SERVER_BACKEND_POOLED:
+            self.server = PooledWSGIServer(
+                HOST_DEFAULT,
+                int(PORT_DEFAULT),
+                app,
+                self.get_parameter("server_worker_threads").value,
+                self.get_parameter("server_stream_worker_threads").value,
+                self.get_parameter("server_drive_worker_threads").value,
+                SERVER_STREAM_PATHS,
+                SERVER_DRIVE_PATHS,
+                SERVER_REQUEST_TIMEOUT,
+                SERVER_STREAM_TIMEOUT,
+                SERVER_MAX_QUEUED_CONNECTIONS,
+                SERVER_QUEUE_TIMEOUT)
+            self.server_thread = threading.Thread(target=self.server.serve_forever,
+                                                  daemon=True)
+        else:
+            self.server_thread = threading.Thread(target=app.run,
+                                                  daemon=True,
+                                                  kwargs={
+                                                      "host": HOST_DEFAULT,
+                                                      "port": PORT_DEFAULT,
+                                                      "use_reloader": False,
+                                                      "threaded": True}
+                                                  )
         self.server_thread.start()
 
         # Create service clients.
@@ -296,6 +367,13 @@ class WebServerNode(Node):
                                                       MANUAL_DRIVE_TOPIC,
                                                       1,
                                                       callback_group=manual_pub_drive_msg_cb_group)
+        # Publisher of the commands received on the manual drive WebSocket.
+        self.manual_drive_channel = ManualDriveChannel(self.pub_manual_drive.publish,
+                                                       1.0 / MANUAL_DRIVE_MAX_RATE,
+                                                       MANUAL_DRIVE_DEADMAN_TIMEOUT)
+        if VEHICLE_CONTROL_SOCK is None:
+            self.get_logger().warn("flask-sock is not installed, the manual drive WebSocket "
+                                   "/api/manual_drive_ws is not available")
 
         # Create a reentrant callback group to publish calibration drive messages.
         cal_pub_drive_msg_cb_group = ReentrantCallbackGroup()
@@ -305,11 +383,10 @@ class WebServerNode(Node):
                                                            1,
                                                            callback_group=cal_pub_drive_msg_cb_group)
 
-        # Double buffer object to safely updat the latest status and installation percentage
-        # during software update setup.
-        self.pct_dict_db = DoubleBuffer(clear_data_on_get=False)
-        self.pct_dict_db.put({"status": "unknown",
-                              "update_pct": 0.0})
+        # Latest status and installation percentage of the software update, broadcast to
+        # the clients of /api/update_status.
+        self.sw_update_progress_hub = ProgressHub({"status": "unknown",
+                                                   "update_pct": 0})
 
         # Heartbeat timer.
         self.timer_count = 0
@@ -324,6 +401,57 @@ class WebServerNode(Node):
         )
         self.latest_device_status = None
 
+        # Telemetry sources not covered by the device status: the current servo command
+        # and the battery level and model loading state, which are only available as
+        # services and are polled while telemetry clients are connected.
+        self.get_logger().info(f"Create servo message subscriber: {SERVO_MSG_TOPIC}")
+        servo_msg_qos = QoSProfile(depth=1,
+                                   history=QoSHistoryPolicy.KEEP_LAST,
+                                   reliability=QoSReliabilityPolicy.BEST_EFFORT)
+        self.servo_msg_sub = self.create_subscription(ServoCtrlMsg,
+                                                      SERVO_MSG_TOPIC,
+                                                      self.servo_msg_cb,
+                                                      servo_msg_qos)
+        self.telemetry_futures = dict()
+        self.telemetry_timer = self.create_timer(TELEMETRY_POLL_PERIOD,
+                                                 self.telemetry_timer_cb,
+                                                 callback_group=ReentrantCallbackGroup())
+
+        # Latest stage reported for every model going through the model installation pipeline.
+        self.model_install_progress = dict()
+        self.model_install_progress_lock = threading.Lock()
+        self.model_install_progress_hub = ProgressHub(dict())
+        self.get_logger().info("Create model install progress subscriber: "
+                               f"{MODEL_INSTALL_PROGRESS_TOPIC}")
+        self.model_install_progress_sub = \
+            self.create_subscription(ModelInstallProgressMsg,
+                                     MODEL_INSTALL_PROGRESS_TOPIC,
+                                     self.model_install_progress_cb,
+                                     10,
+                                     callback_group=ReentrantCallbackGroup())
+
+    def destroy_node(self):
+        """Stop the webserver, letting the requests being served finish, write the login
+           tokens not yet persisted and destroy the node.
+        """
+        if self.server is not None:
+            self.get_logger().info("Stopping webserver")
+            self.server.stop(SERVER_SHUTDOWN_TIMEOUT)
+            self.server = None
+        if not TOKEN_STORE.flush():
+            self.get_logger().error("Unable to write the login tokens")
+        super().destroy_node()
+
+    def get_server_status(self):
+        """Helper method to get the load of the webserver worker pools.
+
+        Returns:
+            dict: Status of the control and stream worker pools, empty with the
+                  development backend.
+        """
+        server = self.server
+        return server.get_status() if server is not None else dict()
+
     def timer_callback(self):
         """Heartbeat function to keep the node alive.
         """
@@ -337,8 +465,35 @@ class WebServerNode(Node):
             pct_dict (SoftwareUpdatePctMsg): Message with the current software update
                                              progress percentage and the status.
         """
-        self.pct_dict_db.put({"status": pct_dict.status,
-                              "update_pct": int(pct_dict.update_pct)})
+        self.sw_update_progress_hub.publish({"status": pct_dict.status,
+                                             "update_pct": int(pct_dict.update_pct)})
+
+    def model_install_progress_cb(self, progress_msg):
+        """Callback for the model_install_progress topic.
+
+        Args:
+            progress_msg (ModelInstallProgressMsg): Message with the stage and status
+                                                    of a model being installed.
+        """
+        with self.model_install_progress_lock:
+            self.model_install_progress[progress_msg.model_name] = {
+                "stage": progress_msg.stage,
+                "status": progress_msg.status,
+                "elapsed": round(progress_msg.elapsed, 3)
+            }
+            self.model_install_progress_hub.publish(dict(self.model_install_progress))
+        if progress_msg.status in ("done", "failed"):
+            # The model folder was written outside of the upload API.
+            MODEL_CATALOG.invalidate(progress_msg.model_name)
+
+    def get_model_install_progress(self):
+        """Return a snapshot of the latest installation progress of the models.
+
+        Returns:
+            dict: Dictionary with the latest stage, status and elapsed time per model.
+        """
+        with self.model_install_progress_lock:
+            return dict(self.model_install_progress)
 
     def wait_for_service_availability(self, client):
         """Helper function to wait for the service to which the client subscribes to is alive.
@@ -356,6 +511,68 @@ class WebServerNode(Node):
             msg (DeviceStatusMsg): The device status message
         """
         self.latest_device_status = msg
+        self.telemetry_hub.update(TELEMETRY_DEVICE_STATUS, {
+            "cpu_percent": round(msg.cpu_percent, 1),
+            "cpu_core_percent": [round(percent, 1) for percent in msg.cpu_core_percent],
+            "cpu_temp": round(msg.cpu_temp, 1),
+            "cpu_throttled": msg.cpu_throttled,
+            "cpu_freq": round(msg.cpu_freq),
+            "memory_usage": round(msg.memory_usage, 1),
+            "free_disk": round(msg.free_disk, 1),
+            "latency_mean": round(msg.latency_mean, 1),
+            "latency_p95": round(msg.latency_p95, 1),
+            "inference_latency_mean": round(msg.inference_latency_mean, 1),
+            "inference_latency_p95": round(msg.inference_latency_p95, 1),
+            "pipeline_latency_p95": {stage: round(p95, 1) for stage, p95
+                                     in zip(msg.pipeline_stages, msg.pipeline_latency_p95)}
+        })
+        self.telemetry_hub.update(TELEMETRY_INFERENCE, {"fps": round(msg.fps_mean, 1)})
+
+    def servo_msg_cb(self, msg):
+        """Callback for the servo messages sent by the control node.
+
+        Args:
+            msg (ServoCtrlMsg): The current steering angle and throttle command.
+        """
+        if self.telemetry_hub.has_clients():
+            self.telemetry_hub.update(TELEMETRY_SERVO, {"angle": round(msg.angle, 2),
+                                                        "throttle": round(msg.throttle, 2)})
+
+    def telemetry_timer_cb(self):
+        """Timer callback polling the battery level and model loading services while
+           telemetry clients are connected. A service is not called again before its
+           previous call completed.
+        """
+        if not self.telemetry_hub.has_clients():
+            return
+        self.poll_telemetry_service(TELEMETRY_BATTERY, self.battery_level_cli,
+                                    BatteryLevelSrv.Request(),
+                                    lambda res: {"level": res.level})
+        self.poll_telemetry_service(TELEMETRY_MODEL_LOADING, self.is_model_loading_cli,
+                                    GetModelLoadingStatusSrv.Request(),
+                                    lambda res: {"status": res.model_loading_status}
+                                    if res.error == 0 else {"status": "error"})
+
+    def poll_telemetry_service(self, channel, client, req, to_telemetry):
+        """Helper function to call a service asynchronously and set the telemetry channel
+           from its response.
+
+        Args:
+            channel (str): Name of the telemetry channel.
+            client (rclpy.client.Client): Client object of the service.
+            req (Request): Service request object.
+            to_telemetry (function): Function converting the response to the channel value.
+        """
+        future = self.telemetry_futures.get(channel)
+        if (future is not None and not future.done()) or not client.service_is_ready():
+            return
+
+        def done_cb(done_future):
+            if done_future.exception() is None and done_future.result() is not None:
+                self.telemetry_hub.update(channel, to_telemetry(done_future.result()))
+        future = client.call_async(req)
+        future.add_done_callback(done_cb)
+        self.telemetry_futures[channel] = future
 
 
 def get_webserver_node():
@@ -381,15 +598,14 @@ def main(args=None):
         webserver_node = WebServerNode()
         executor = MultiThreadedExecutor()
         rclpy.spin(webserver_node, executor)
-        # Destroy the node explicitly
-        # (optional - otherwise it will be done automatically
-        # when the garbage collector destroys the node object)
-        webserver_node.destroy_node()
 
     except KeyboardInterrupt:
         pass
 
     finally:
+        # Destroy the node explicitly to stop the webserver gracefully.
+        if webserver_node is not None:
+            webserver_node.destroy_node()
         if rclpy.ok():
             rclpy.shutdown()
 
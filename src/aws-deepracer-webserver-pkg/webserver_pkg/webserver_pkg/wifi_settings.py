@@ -29,6 +29,7 @@ from flask import (Blueprint,
 from deepracer_interfaces_pkg.srv import OTGLinkStateSrv
 from webserver_pkg import utility
 from webserver_pkg.constants import REMOVE_IPS
+from webserver_pkg.system_info import SYSTEM_INFO
 from webserver_pkg import webserver_publisher_node
 
 
@@ -62,9 +63,8 @@ def get_static_ip_address():
     """
     webserver_node = webserver_publisher_node.get_webserver_node()
     try:
-        _, ips = utility.execute("hostname -I", shell=True)
         req_ips = list()
-        for ip_address in ips.split():
+        for ip_address in SYSTEM_INFO.get_ip_addresses():
             ip_norm = ip_address.strip()
             if ip_norm in REMOVE_IPS or not ip_norm:
                 continue
@@ -81,8 +81,7 @@ def get_connected_ssid():
     Returns:
         str: SSID details.
     """
-    cur_ssid = utility.execute("iwgetid -r", shell=True)[1]
-    return cur_ssid.strip() if cur_ssid.strip() and cur_ssid else ""
+    return SYSTEM_INFO.get_connected_ssid()
 
 
 @WIFI_SETTINGS_BLUEPRINT.route("/api/is_usb_connected", methods=["GET"])
@@ -170,6 +169,7 @@ def api_wifi_reset():
     wifi_name = form_data["wifi_name"]
     wifi_password = form_data["wifi_password"]
 
+    SYSTEM_INFO.invalidate_network()
     if utility.is_network_connected(wifi_name):
         ip_address = get_static_ip_address()
         return jsonify({"success": True, "ip_address": ip_address})
@@ -179,10 +179,12 @@ def api_wifi_reset():
 
     utility.execute(['sudo', '/usr/bin/nmcli', 'device', 'wifi', 'con', wifi_name,
                      'password', wifi_password, 'ifname', 'mlan0'])
+    SYSTEM_INFO.invalidate_network()
 
     if not utility.is_network_connected(wifi_name):
         webserver_node.get_logger().info("Wifi not changed successfully, clean up.")
         utility.execute(['sudo', '/usr/bin/nmcli', 'con', 'del', wifi_name])
+        SYSTEM_INFO.invalidate_network()
         return jsonify({"success": False,
                         "reason": "Could not connect to the Wi-Fi network.\
                          Check your network ID and password and try again."})
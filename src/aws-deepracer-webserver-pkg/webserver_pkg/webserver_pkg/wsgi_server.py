@@ -0,0 +1,406 @@
+#################################################################################
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.          #
+#                                                                               #
+#   Licensed under the Apache License, Version 2.0 (the "License").             #
+#   You may not use this file except in compliance with the License.            #
+#   You may obtain a copy of the License at                                     #
+#                                                                               #
+#       http://www.apache.org/licenses/LICENSE-2.0                              #
+#                                                                               #
+#   Unless required by applicable law or agreed to in writing, software         #
+#   distributed under the License is distributed on an "AS IS" BASIS,           #
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.    #
+#   See the License for the specific language governing permissions and         #
+#   limitations under the License.                                              #
+#################################################################################
+
+"""
+wsgi_server.py
+
+This module holds the WSGI server running the Flask application with bounded pools of
+worker threads, so that long-lived streams and uploads cannot starve the control APIs
+or the manual drive WebSocket.
+"""
+
+import json
+import queue
+import socket
+import threading
+import time
+
+from werkzeug.serving import (BaseWSGIServer,
+                              WSGIRequestHandler)
+
+# Response sent on the connections rejected because their pool is saturated.
+BUSY_RESPONSE_BODY = json.dumps({"success": False, "reason": "Server busy"}).encode()
+BUSY_RESPONSE = (b"HTTP/1.1 503 Service Unavailable\r\n"
+                 b"Content-Type: application/json\r\n"
+                 b"Retry-After: 1\r\n"
+                 b"Connection: close\r\n"
+                 b"Content-Length: " + str(len(BUSY_RESPONSE_BODY)).encode() + b"\r\n"
+                 b"\r\n" + BUSY_RESPONSE_BODY)
+# Seconds allowed to send the busy response.
+BUSY_RESPONSE_TIMEOUT = 1.0
+
+
+def get_request_path(data):
+    """Get the path of the request line at the start of data.
+
+    Args:
+        data (bytes): Beginning of a request.
+
+    Returns:
+        bytes: Request path, empty if the request line is incomplete.
+    """
+    parts = data.split(b"\r\n", 1)[0].split(b" ")
+    return parts[1] if len(parts) >= 2 else b""
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Request handler keeping the HTTP/1.1 connections open between requests, until the
+       client closes them or stays idle for the socket timeout.
+    """
+    protocol_version = "HTTP/1.1"
+
+
+class ControlRequestHandler(KeepAliveRequestHandler):
+    """Request handler of the connections served by the control pool.
+
+    A connection is assigned to a pool from its first request only. If a later request
+    on the same keep-alive connection targets a stream or drive path, it is answered with
+    a 307 redirect to its own path and the connection is closed, without reading the
+    request body, so that the client sends it again on a new connection, which is then
+    served by the right pool.
+    """
+    def setup(self):
+        """Set up the connection files and the request count.
+        """
+        super().setup()
+        self.requests_served = 0
+
+    def handle_one_request(self):
+        """Serve the next request of the connection, or redirect it to a new connection
+           if the request is to be served by another pool.
+        """
+        if self.requests_served > 0:
+            try:
+                data = self.rfile.peek(1024)
+            except (TimeoutError, OSError):
+                self.close_connection = True
+                return
+            if self.server.get_request_pool(get_request_path(data)) is not None:
+                self.redirect_to_new_connection()
+                return
+        self.requests_served += 1
+        super().handle_one_request()
+
+    def redirect_to_new_connection(self):
+        """Helper method to read the request line and headers of the next request and
+           answer it with a 307 redirect to its own path, closing the connection.
+        """
+        self.close_connection = True
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+            if not self.raw_requestline or not self.parse_request():
+                return
+            self.close_connection = True
+            self.send_response(307)
+            self.send_header("Location", self.path)
+            self.send_header("Content-Length", "0")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.flush()
+        except (TimeoutError, OSError):
+            pass
+
+
+class WorkerPool():
+    """Object type which runs the connections handed to it on a fixed number of daemon
+       worker threads. Connections wait in a bounded queue while all workers are busy,
+       and are rejected when the queue is full or when they waited too long.
+    """
+    def __init__(self, name, worker_count, handle_cb, max_queued, queue_timeout, reject_cb):
+        """Create a WorkerPool object and start its worker threads.
+
+        Args:
+            name (str): Name prefix of the worker threads.
+            worker_count (int): Number of worker threads.
+            handle_cb (function): Function called with a connection socket and the client
+                                  address to serve the connection.
+            max_queued (int): Maximum number of connections waiting for a worker.
+            queue_timeout (float): Maximum time in seconds a connection waits for a worker.
+            reject_cb (function): Function called with a connection socket to reject it.
+        """
+        self.name = name
+        self.handle_cb = handle_cb
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.reject_cb = reject_cb
+        self.pending = queue.Queue()
+        self.active = set()
+        self.rejected = 0
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.workers = [threading.Thread(target=self.worker_loop,
+                                         name=f"{name}_{index}",
+                                         daemon=True)
+                        for index in range(worker_count)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, connection, client_address):
+        """Helper method to queue a connection for the next free worker, or reject it if
+           the queue is full.
+
+        Args:
+            connection (socket.socket): Connection socket.
+            client_address (tuple): Address of the client.
+
+        Returns:
+            bool: True if the connection was queued.
+        """
+        with self.lock:
+            queued = self.pending.qsize() < self.max_queued
+            if queued:
+                self.pending.put((connection, client_address, time.monotonic()))
+        if not queued:
+            self.reject(connection)
+        return queued
+
+    def reject(self, connection):
+        """Helper method to reject a connection and count it.
+
+        Args:
+            connection (socket.socket): Connection socket.
+        """
+        with self.lock:
+            self.rejected += 1
+        self.reject_cb(connection)
+
+    def worker_loop(self):
+        """Body of the worker threads.
+        """
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            connection, client_address, queued_at = item
+            if time.monotonic() - queued_at > self.queue_timeout:
+                self.reject(connection)
+                continue
+            with self.lock:
+                self.active.add(connection)
+            try:
+                self.handle_cb(connection, client_address)
+            finally:
+                with self.lock:
+                    self.active.discard(connection)
+                    self.idle.notify_all()
+
+    def get_status(self):
+        """Helper method to get the load of the pool.
+
+        Returns:
+            dict: Number of workers, busy workers, queued and rejected connections.
+        """
+        with self.lock:
+            return {"workers": len(self.workers),
+                    "busy": len(self.active),
+                    "queued": self.pending.qsize(),
+                    "rejected": self.rejected}
+
+    def shutdown(self, timeout):
+        """Helper method to stop the workers, letting the connections being served finish
+           for at most timeout seconds before closing them. The queued connections are
+           closed without being served.
+
+        Args:
+            timeout (float): Grace period in seconds.
+        """
+        while True:
+            try:
+                item = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].close()
+        for _ in self.workers:
+            self.pending.put(None)
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while self.active and time.monotonic() < deadline:
+                self.idle.wait(deadline - time.monotonic())
+            for connection in self.active:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server serving every connection on one of three bounded pools of worker threads.
+
+    The first request line of a connection is read ahead by a control worker. If its path
+    is one of the drive paths (the manual drive WebSocket), the connection is handed over
+    to the drive pool; if it is one of the stream paths (event streams, uploads), to the
+    stream pool. Both serve it without socket timeout. Otherwise it is served by the
+    control worker with the request timeout, which also bounds the time an idle
+    keep-alive connection holds the worker. A connection that finds the queue of its pool
+    full, or waits longer than the queue timeout, gets a 503 response.
+    """
+    multithread = True
+
+    def __init__(self, host, port, app, worker_threads, stream_worker_threads,
+                 drive_worker_threads, stream_paths, drive_paths, request_timeout,
+                 stream_timeout, max_queued, queue_timeout):
+        """Create a PooledWSGIServer object listening on host:port.
+
+        Args:
+            host (str): Host address to listen on.
+            port (int): Port to listen on.
+            app (flask.Flask): WSGI application.
+            worker_threads (int): Number of workers serving the control requests.
+            stream_worker_threads (int): Number of workers serving the stream requests.
+            drive_worker_threads (int): Number of workers serving the drive requests.
+            stream_paths (tuple): Path prefixes of the long-lived requests.
+            drive_paths (tuple): Path prefixes of the manual drive requests.
+            request_timeout (float): Socket timeout in seconds of the control connections.
+            stream_timeout (float): Socket timeout in seconds of the stream and drive
+                                    connections, None to disable it.
+            max_queued (int): Maximum number of connections waiting for a worker per pool.
+            queue_timeout (float): Maximum time in seconds a connection waits for a worker.
+        """
+        super().__init__(host, port, app, handler=KeepAliveRequestHandler)
+        self.stream_paths = tuple(path.encode() for path in stream_paths)
+        self.drive_paths = tuple(path.encode() for path in drive_paths)
+        self.request_timeout = request_timeout
+        self.stream_timeout = stream_timeout
+        self.control_pool = WorkerPool("webserver_control", worker_threads,
+                                       self.dispatch_connection, max_queued, queue_timeout,
+                                       self.reject_connection)
+        self.stream_pool = WorkerPool("webserver_stream", stream_worker_threads,
+                                      self.serve_stream_connection, max_queued,
+                                      queue_timeout, self.reject_connection)
+        self.drive_pool = WorkerPool("webserver_drive", drive_worker_threads,
+                                     self.serve_stream_connection, max_queued,
+                                     queue_timeout, self.reject_connection)
+
+    def process_request(self, request, client_address):
+        """Queue an accepted connection on the control pool instead of serving it on the
+           thread accepting the connections.
+
+        Args:
+            request (socket.socket): Connection socket.
+            client_address (tuple): Address of the client.
+        """
+        self.control_pool.submit(request, client_address)
+
+    def get_request_pool(self, path):
+        """Helper method to get the pool serving the requests to a path other than the
+           control pool.
+
+        Args:
+            path (bytes): Request path.
+
+        Returns:
+            WorkerPool: Drive or stream pool, None for the control requests.
+        """
+        if path.startswith(self.drive_paths):
+            return self.drive_pool
+        if path.startswith(self.stream_paths):
+            return self.stream_pool
+        return None
+
+    def peek_request_path(self, connection):
+        """Helper method to get the path of the first request of a connection, without
+           consuming its data.
+
+        Args:
+            connection (socket.socket): Connection socket with the request timeout set.
+
+        Returns:
+            bytes: Request path, empty if it cannot be read.
+        """
+        try:
+            return get_request_path(connection.recv(1024, socket.MSG_PEEK))
+        except OSError:
+            return b""
+
+    def dispatch_connection(self, connection, client_address):
+        """Helper method called on the control pool to serve a connection or hand it over
+           to the drive or stream pool.
+
+        Args:
+            connection (socket.socket): Connection socket.
+            client_address (tuple): Address of the client.
+        """
+        connection.settimeout(self.request_timeout)
+        pool = self.get_request_pool(self.peek_request_path(connection))
+        if pool is not None:
+            pool.submit(connection, client_address)
+            return
+        self.serve_connection(connection, client_address, ControlRequestHandler)
+
+    def serve_stream_connection(self, connection, client_address):
+        """Helper method called on the stream and drive pools to serve a long-lived
+           connection.
+
+        Args:
+            connection (socket.socket): Connection socket.
+            client_address (tuple): Address of the client.
+        """
+        connection.settimeout(self.stream_timeout)
+        self.serve_connection(connection, client_address, KeepAliveRequestHandler)
+
+    def serve_connection(self, connection, client_address, handler_class):
+        """Helper method to serve all requests of a connection and close it.
+
+        Args:
+            connection (socket.socket): Connection socket.
+            client_address (tuple): Address of the client.
+            handler_class (type): Request handler class serving the connection.
+        """
+        try:
+            handler_class(connection, client_address, self)
+        except Exception:
+            self.handle_error(connection, client_address)
+        finally:
+            self.shutdown_request(connection)
+
+    def reject_connection(self, connection):
+        """Helper method to answer a connection with a 503 response and close it.
+
+        Args:
+            connection (socket.socket): Connection socket.
+        """
+        try:
+            connection.settimeout(BUSY_RESPONSE_TIMEOUT)
+            connection.sendall(BUSY_RESPONSE)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(connection)
+
+    def get_status(self):
+        """Helper method to get the load of the worker pools.
+
+        Returns:
+            dict: Status of the control, stream and drive pools.
+        """
+        return {"control": self.control_pool.get_status(),
+                "stream": self.stream_pool.get_status(),
+                "drive": self.drive_pool.get_status()}
+
+    def stop(self, timeout):
+        """Helper method to stop accepting connections and let the requests being served
+           finish for at most timeout seconds. Must be called from another thread than
+           serve_forever.
+
+        Args:
+            timeout (float): Grace period in seconds.
+        """
+        self.shutdown()
+        self.server_close()
+        self.control_pool.shutdown(timeout)
+        self.stream_pool.shutdown(0.0)
+        self.drive_pool.shutdown(0.0)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+Bag Exporter Benchmark
+
+Generates bags with servo and inference traffic like the bag_log_node records during a run
+and measures how fast the logging_pkg bag_exporter converts them. Every output format and
+frames mode is timed on one bag, then a directory of several bags is exported with one
+and with several worker processes.
+
+The inference messages carry one JPEG-sized compressed image each. The image content is
+random, which does not matter since the exporter writes the compressed frames as-is.
+
+The logging_pkg and deepracer_interfaces_pkg packages must be importable, e.g. after
+sourcing the workspace install/setup.bash. The parquet format needs pyarrow.
+
+Usage:
+    python3 benchmark_bag_exporter.py --messages 3000 --bags 4
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import rosbag2_py
+from rclpy.serialization import serialize_message
+from sensor_msgs.msg import CompressedImage
+
+from deepracer_interfaces_pkg.msg import InferResults, InferResultsArray, ServoCtrlMsg
+from logging_pkg import constants
+from logging_pkg.bag_exporter import export_bag, export_bags
+from logging_pkg.bag_storage import BagStorageConfig, create_storage_options, create_writer
+
+
+SERVO_TOPIC = "/ctrl_pkg/servo_msg"
+INFERENCE_TOPIC = "/inference_pkg/rl_results"
+
+
+def generate_bag(bag_path, message_count, image_kb, action_count, storage_id):
+    """Write a bag with message_count servo and inference messages at 15 FPS.
+    """
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, image_kb * 1024, dtype=np.uint8).tobytes() for _ in range(8)]
+    config = BagStorageConfig(storage_id=storage_id)
+    writer = create_writer(config)
+    writer.open(create_storage_options(bag_path, config),
+                rosbag2_py.ConverterOptions(input_serialization_format="cdr",
+                                            output_serialization_format="cdr"))
+    for topic_id, (name, topic_type) in enumerate([
+            (SERVO_TOPIC, "deepracer_interfaces_pkg/msg/ServoCtrlMsg"),
+            (INFERENCE_TOPIC, "deepracer_interfaces_pkg/msg/InferResultsArray")]):
+        if os.environ.get("ROS_DISTRO") == "jazzy":
+            topic = rosbag2_py.TopicMetadata(id=topic_id + 1, name=name, type=topic_type,
+                                             serialization_format="cdr")
+        else:
+            topic = rosbag2_py.TopicMetadata(name=name, type=topic_type,
+                                             serialization_format="cdr")
+        writer.create_topic(topic)
+
+    stamp = time.time_ns()
+    for index in range(message_count):
+        inference = InferResultsArray()
+        for label in range(action_count):
+            result = InferResults()
+            result.class_label = label
+            result.class_prob = float(rng.random())
+            inference.results.append(result)
+        image = CompressedImage()
+        image.format = "jpeg"
+        image.data = images[index % len(images)]
+        inference.images = [image]
+        writer.write(INFERENCE_TOPIC, serialize_message(inference), stamp)
+
+        servo = ServoCtrlMsg()
+        servo.angle = float(rng.uniform(-1.0, 1.0))
+        servo.throttle = float(rng.uniform(0.0, 1.0))
+        writer.write(SERVO_TOPIC, serialize_message(servo), stamp + 2000000)
+        stamp += 66666666
+    del writer
+
+
+def report(name, summary, wall_time):
+    print(f"  {name:<24} {wall_time:7.2f}s  {summary['messages'] / wall_time:9.0f} msg/s  "
+          f"{summary['bytes'] / wall_time / 1e6:7.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the logging_pkg bag exporter.")
+    parser.add_argument("--messages", type=int, default=3000,
+                        help="Number of servo and of inference messages per bag.")
+    parser.add_argument("--image-kb", type=int, default=12,
+                        help="Size of the compressed image of every inference message.")
+    parser.add_argument("--actions", type=int, default=7,
+                        help="Number of inference results per message.")
+    parser.add_argument("--bags", type=int, default=4,
+                        help="Number of bags for the process pool comparison.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="Number of worker processes for the process pool comparison.")
+    parser.add_argument("--storage", default="sqlite3", help="Storage provider of the bags.")
+    args = parser.parse_args()
+
+    work_directory = tempfile.mkdtemp(prefix="benchmark-bag-exporter-")
+    try:
+        bags_directory = os.path.join(work_directory, "bags")
+        os.makedirs(bags_directory)
+        print(f"Generating {args.bags} bags of {args.messages} servo and inference messages...")
+        for index in range(args.bags):
+            generate_bag(os.path.join(bags_directory, f"run-{index}"), args.messages,
+                         args.image_kb, args.actions, args.storage)
+        bag_paths = sorted(os.path.join(bags_directory, name)
+                           for name in os.listdir(bags_directory))
+
+        print("Single bag")
+        formats = [constants.EXPORT_FORMAT_NPZ]
+        try:
+            import pyarrow.parquet  # noqa: F401
+            formats.append(constants.EXPORT_FORMAT_PARQUET)
+        except ImportError:
+            print("  pyarrow not installed, skipping parquet")
+        for table_format in formats:
+            for frames_mode in (constants.EXPORT_FRAMES_JPEG, constants.EXPORT_FRAMES_FILE):
+                output = os.path.join(work_directory, f"out-{table_format}-{frames_mode}")
+                start = time.monotonic()
+                summary = export_bag(bag_paths[0], output, table_format, frames_mode)
+                report(f"{table_format}, {frames_mode} frames", summary,
+                       time.monotonic() - start)
+                shutil.rmtree(output)
+
+        print(f"{args.bags} bags, npz, frames file")
+        logger = logging.getLogger("benchmark_bag_exporter")
+        for jobs in sorted({1, args.jobs}):
+            output = os.path.join(work_directory, f"out-jobs-{jobs}")
+            start = time.monotonic()
+            summaries = export_bags(bag_paths, output, constants.EXPORT_FORMAT_NPZ,
+                                    constants.EXPORT_FRAMES_FILE, jobs, logger)
+            total = {"messages": sum(summary["messages"] for summary in summaries),
+                     "bytes": sum(summary["bytes"] for summary in summaries)}
+            report(f"{jobs} process(es)", total, time.monotonic() - start)
+            shutil.rmtree(output)
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
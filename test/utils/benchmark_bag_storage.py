@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""
+Bag Storage Benchmark
+
+Records synthetic camera and servo traffic with the storage settings of the bag_log_node
+and reports the sustained write throughput and the CPU usage for every storage provider
+and compression setting. The camera frames are sensor_msgs/Image messages with smooth
+content and a little noise, so that the compression does a realistic amount of work; the
+servo messages are deepracer_interfaces_pkg/ServoCtrlMsg messages sent at the frame rate.
+
+By default the messages are written back to back to measure the maximum throughput. With
+--pacing they are written at the frame rate, which shows the CPU share the recording takes
+on the car.
+
+The logging_pkg and deepracer_interfaces_pkg packages and the rosbag2 storage and
+compression plugins must be importable, e.g. after sourcing the workspace
+install/setup.bash.
+
+Usage:
+    python3 benchmark_bag_storage.py --duration 20
+    python3 benchmark_bag_storage.py --duration 60 --pacing --providers mcap
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import rosbag2_py
+from rclpy.serialization import serialize_message
+from sensor_msgs.msg import Image
+
+from deepracer_interfaces_pkg.msg import ServoCtrlMsg
+from logging_pkg.constants import CompressionMode
+from logging_pkg.bag_storage import BagStorageConfig, create_storage_options, create_writer
+
+
+CAMERA_TOPIC = "/camera_pkg/display_mjpeg"
+SERVO_TOPIC = "/ctrl_pkg/servo_msg"
+
+
+def make_camera_frames(width, height, count):
+    """Create serialized camera frames with gradients and sensor noise.
+
+    Args:
+        width (int): Width of the frames.
+        height (int): Height of the frames.
+        count (int): Number of distinct frames.
+
+    Returns:
+        list: Serialized sensor_msgs/Image messages.
+    """
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    frames = []
+    for index in range(count):
+        base = (x * 255 // width + y * 255 // height + index * 8) % 256
+        pixels = np.stack([base, np.roll(base, index, axis=1), 255 - base], axis=-1)
+        pixels = pixels + rng.integers(-4, 5, pixels.shape)
+        msg = Image()
+        msg.width = width
+        msg.height = height
+        msg.encoding = "bgr8"
+        msg.step = width * 3
+        msg.data = np.clip(pixels, 0, 255).astype(np.uint8).tobytes()
+        frames.append(serialize_message(msg))
+    return frames
+
+
+def make_servo_messages(count):
+    """Create serialized servo messages.
+
+    Args:
+        count (int): Number of distinct messages.
+
+    Returns:
+        list: Serialized ServoCtrlMsg messages.
+    """
+    rng = np.random.default_rng(1)
+    messages = []
+    for _ in range(count):
+        msg = ServoCtrlMsg()
+        msg.angle = float(rng.uniform(-1.0, 1.0))
+        msg.throttle = float(rng.uniform(0.0, 1.0))
+        messages.append(serialize_message(msg))
+    return messages
+
+
+def get_directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def record(config, work_directory, frames, servo_messages, args):
+    """Record the synthetic traffic with the storage settings.
+
+    Returns:
+        dict: Measurements of the recording or None if the settings are not available.
+    """
+    bag_path = os.path.join(work_directory, "bag")
+    shutil.rmtree(bag_path, ignore_errors=True)
+    writer = create_writer(config)
+    try:
+        writer.open(create_storage_options(bag_path, config),
+                    rosbag2_py.ConverterOptions(input_serialization_format="cdr",
+                                                output_serialization_format="cdr"))
+    except Exception as ex:
+        print(f"  {config.describe()}: not available ({ex})")
+        return None
+    for topic_id, (name, topic_type) in enumerate([(CAMERA_TOPIC, "sensor_msgs/msg/Image"),
+                                                   (SERVO_TOPIC,
+                                                    "deepracer_interfaces_pkg/msg/ServoCtrlMsg")]):
+        if os.environ.get("ROS_DISTRO") == "jazzy":
+            topic = rosbag2_py.TopicMetadata(id=topic_id + 1, name=name, type=topic_type,
+                                             serialization_format="cdr")
+        else:
+            topic = rosbag2_py.TopicMetadata(name=name, type=topic_type,
+                                             serialization_format="cdr")
+        writer.create_topic(topic)
+
+    frame_count = int(args.duration * args.fps)
+    period = 1.0 / args.fps
+    written = 0
+    stamp = time.time_ns()
+    cpu_start = time.process_time()
+    start = time.monotonic()
+    for index in range(frame_count):
+        if args.pacing:
+            delay = start + index * period - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        frame = frames[index % len(frames)]
+        servo = servo_messages[index % len(servo_messages)]
+        writer.write(CAMERA_TOPIC, frame, stamp)
+        writer.write(SERVO_TOPIC, servo, stamp + 1000)
+        written += len(frame) + len(servo)
+        stamp += int(period * 1e9)
+    # Closing flushes the cache and compresses the last file in file compression mode.
+    del writer
+    wall_time = time.monotonic() - start
+    cpu_time = time.process_time() - cpu_start
+
+    bag_files = [name for name in os.listdir(bag_path) if name != "metadata.yaml"]
+    return {
+        "written_mb": written / 1e6,
+        "disk_mb": get_directory_size(bag_path) / 1e6,
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "files": len(bag_files)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bag storage settings.")
+    parser.add_argument("--duration", type=float, default=20.0,
+                        help="Seconds of camera and servo traffic recorded per setting.")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="Camera frame and servo message rate.")
+    parser.add_argument("--width", type=int, default=640, help="Camera frame width.")
+    parser.add_argument("--height", type=int, default=480, help="Camera frame height.")
+    parser.add_argument("--providers", nargs="+", default=["sqlite3", "mcap"],
+                        help="Storage providers to benchmark.")
+    parser.add_argument("--compression", nargs="+", default=["none", "file", "message"],
+                        help="Compression modes to benchmark.")
+    parser.add_argument("--max-bagfile-size", type=int, default=256 * 1024 * 1024,
+                        help="Split size of the bag files in bytes.")
+    parser.add_argument("--max-cache-size", type=int, default=0,
+                        help="Write cache size in bytes, 0 for the provider default.")
+    parser.add_argument("--pacing", action="store_true",
+                        help="Write the messages at the frame rate instead of back to back.")
+    parser.add_argument("--output", default=None,
+                        help="Directory for the bags, defaults to a temporary directory. "
+                             "Use a directory on the SD card or USB drive to measure it.")
+    args = parser.parse_args()
+
+    print(f"Preparing {args.width}x{args.height} camera frames...")
+    frames = make_camera_frames(args.width, args.height, 16)
+    servo_messages = make_servo_messages(64)
+    configurations = []
+    for provider in args.providers:
+        presets = [""] if provider != "mcap" else ["", "fastwrite"]
+        for preset in presets:
+            for compression in args.compression:
+                configurations.append(BagStorageConfig(
+                    storage_id=provider,
+                    max_bagfile_size=args.max_bagfile_size,
+                    max_cache_size=args.max_cache_size,
+                    storage_preset_profile=preset,
+                    compression_mode=CompressionMode(compression)))
+
+    work_directory = tempfile.mkdtemp(prefix="benchmark-bag-storage-", dir=args.output)
+    try:
+        print(f"{args.duration:.0f}s of traffic at {args.fps:.0f} FPS"
+              f"{' (paced)' if args.pacing else ''}")
+        for config in configurations:
+            result = record(config, work_directory, frames, servo_messages, args)
+            if result is None:
+                continue
+            print(f"  {config.describe()}")
+            print(f"    {result['written_mb'] / result['wall_time']:8.1f} MB/s written, "
+                  f"{result['disk_mb']:8.1f} MB on disk "
+                  f"(ratio {result['written_mb'] / max(result['disk_mb'], 1e-9):.2f}), "
+                  f"{result['files']} file(s)")
+            print(f"    CPU {100.0 * result['cpu_time'] / result['wall_time']:6.1f}% of one core, "
+                  f"{result['cpu_time'] / result['written_mb'] * 1000.0:.2f} ms per MB")
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+Device Status Collector Benchmark
+
+Measures the time spent by one device status tick collecting the system metrics:
+
+    psutil      the previous update_metrics calls: cpu_percent(interval=0.2),
+                sensors_temperatures, cpu_freq, virtual_memory and disk_usage('/')
+                (skipped if psutil is not installed)
+    psutil nb   the same with cpu_percent(interval=None), i.e. without the 200 ms sleep
+    collector   SystemMetricsCollector.sample with the periods of the node, where memory
+                and disk are only read on some ticks
+    collector*  SystemMetricsCollector.sample with every group read on every tick
+
+The device_info_pkg package must be importable, e.g. after sourcing the workspace
+install/setup.bash.
+
+Usage:
+    python3 benchmark_device_status_collector.py --ticks 200
+"""
+
+import argparse
+import logging
+import statistics
+import time
+
+from device_info_pkg import constants
+from device_info_pkg.system_metrics import SystemMetricsCollector
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def psutil_tick(interval):
+    psutil.cpu_percent(interval=interval)
+    psutil.sensors_temperatures()
+    psutil.cpu_freq()
+    psutil.virtual_memory()
+    psutil.disk_usage("/")
+
+
+def measure(name, tick, ticks, period):
+    durations = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        tick()
+        durations.append((time.perf_counter() - start) * 1000.0)
+        time.sleep(period)
+    durations.sort()
+    print(f"  {name:11s} mean {statistics.mean(durations):9.3f} ms  "
+          f"p95 {durations[int(0.95 * (len(durations) - 1))]:9.3f} ms  "
+          f"max {durations[-1]:9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the system metrics collection.")
+    parser.add_argument("--ticks", type=int, default=200,
+                        help="Number of ticks measured per approach.")
+    parser.add_argument("--period", type=float, default=0.01,
+                        help="Time in seconds between two ticks.")
+    parser.add_argument("--psutil-ticks", type=int, default=10,
+                        help="Number of ticks measured with the blocking psutil call.")
+    args = parser.parse_args()
+    logger = logging.getLogger("collector")
+
+    print(f"Time per tick, {args.ticks} ticks")
+    if psutil is not None:
+        measure("psutil", lambda: psutil_tick(0.2), args.psutil_ticks, args.period)
+        measure("psutil nb", lambda: psutil_tick(None), args.ticks, args.period)
+    else:
+        print("  psutil not installed")
+
+    # The periods are scaled to the tick period of the benchmark.
+    scale = args.period / constants.DEVICE_STATUS_TIMING
+    collector = SystemMetricsCollector({group: period * scale for group, period
+                                        in constants.DEVICE_STATUS_METRIC_PERIODS.items()},
+                                       logger)
+    measure("collector", collector.sample, args.ticks, args.period)
+    collector.close()
+
+    collector = SystemMetricsCollector(dict(), logger)
+    measure("collector*", collector.sample, args.ticks, args.period)
+    print(f"  CPU {collector.cpu_percent:.1f}% cores {collector.cpu_core_percent} "
+          f"temp {collector.cpu_temp:.1f} freq {collector.cpu_freq:.0f}/"
+          f"{collector.cpu_freq_max:.0f} MHz throttled {collector.cpu_throttled} "
+          f"memory {collector.memory_usage:.1f}% free disk {collector.free_disk:.1f}%")
+    collector.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+"""
+Latency Statistics Benchmark
+
+Fills the device_status_node RingBuffer with 10k log-normal latency samples and compares:
+
+    sort        sorting the window on every call (the previous get_percentile)
+    window      get_percentile, reading the sorted window maintained on append
+    append      the cost of one append, which now maintains all statistics
+    stats       get_stats, all the statistics published in DeviceStatusMsg
+
+It also checks that the percentiles read from the sorted window are the ones of the
+sorted samples.
+
+The device_info_pkg package and rclpy must be importable, e.g. after sourcing the
+workspace install/setup.bash.
+
+Usage:
+    python3 benchmark_latency_stats.py --samples 10000
+"""
+
+import argparse
+import random
+import time
+
+from rclpy.time import Time
+
+from device_info_pkg.ring_buffer import RingBuffer
+
+
+def sorted_percentile(ring, percentile):
+    values = sorted(ring.latencies[:ring.size])
+    return values[min(int(percentile * len(values)), len(values) - 1)]
+
+
+def timed(function, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) * 1e6 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the latency statistics.")
+    parser.add_argument("--samples", type=int, default=10000,
+                        help="Number of samples kept in the ring buffer.")
+    parser.add_argument("--calls", type=int, default=200,
+                        help="Number of calls measured per approach.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    latencies = [rng.lognormvariate(2.0, 0.5) for _ in range(args.samples)]
+    timestamps = [Time(nanoseconds=i * 40_000_000) for i in range(args.samples)]
+    ring = RingBuffer(maxsize=args.samples)
+    start = time.perf_counter()
+    for latency, timestamp in zip(latencies, timestamps):
+        ring.append(latency, timestamp)
+    append_us = (time.perf_counter() - start) * 1e6 / args.samples
+
+    print(f"{args.samples} samples, time per call")
+    print(f"  append   {append_us:10.2f} us")
+    print(f"  sort     {timed(lambda: sorted_percentile(ring, 0.95), args.calls):10.2f} us")
+    print(f"  window   {timed(lambda: ring.get_percentile(0.95), args.calls * 100):10.2f} us")
+    print(f"  stats    {timed(ring.get_stats, args.calls):10.2f} us")
+
+    print("Window vs sorted")
+    for quantile in (0.5, 0.95, 0.99):
+        print(f"  p{round(quantile * 100):<3d} {ring.get_percentile(quantile):8.3f} ms vs "
+              f"{sorted_percentile(ring, quantile):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
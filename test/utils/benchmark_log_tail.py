@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+Log Tail Benchmark
+
+Generates syslog files of 10 MB, 100 MB and 1 GB with lines shaped like the ones the
+DeepRacer nodes log, and measures the time to return the last 1000 lines:
+
+    readlines   the previous /api/logs implementation, reading the whole file and
+                concatenating the lines one by one (skipped above --baseline-max-mb)
+    tail        reading blocks backwards from the end of the file
+    tail WARN   the same, keeping only the WARN and more severe lines
+    since       reading only the 50 lines appended after the offset of a previous call
+
+The webserver_pkg package must be importable, e.g. after sourcing the workspace
+install/setup.bash.
+
+Usage:
+    python3 benchmark_log_tail.py --sizes-mb 10 100 1000 --directory /tmp
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from webserver_pkg.log_reader import (make_line_filter,
+                                      tail_lines)
+
+
+NODES = ["ctrl_pkg.ctrl_node", "inference_pkg.inference_node",
+         "webserver_pkg.webserver_publisher_node", "camera_pkg.camera_node"]
+LEVELS = ["DEBUG"] * 4 + ["INFO"] * 14 + ["WARN"] + ["ERROR"]
+
+
+def make_lines(rng, count):
+    lines = []
+    for _ in range(count):
+        node = rng.choice(NODES)
+        lines.append(f"Oct 18 11:08:48 deepracer deepracer-core.sh[1234]: "
+                     f"[{node.split('.')[1]}-1] [{rng.choice(LEVELS)}] "
+                     f"[1697627328.{rng.randint(0, 999999):06d}] [{node}]: "
+                     f"{'x' * rng.randint(10, 120)}\n")
+    return "".join(lines).encode()
+
+
+def generate(path, size):
+    rng = random.Random(0)
+    written = 0
+    with open(path, "wb") as log_file:
+        while written < size:
+            chunk = make_lines(rng, 10000)
+            log_file.write(chunk)
+            written += len(chunk)
+
+
+def read_with_readlines(path, num_lines):
+    log_content = ""
+    with open(path, "rb") as logfile:
+        lines = logfile.readlines()[-num_lines:]
+        for i in range(0, len(lines)):
+            log_content = log_content + lines[i].decode("utf-8")
+    return log_content
+
+
+def timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the log tail reader.")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Sizes of the generated log files in MB.")
+    parser.add_argument("--lines", type=int, default=1000,
+                        help="Number of lines requested.")
+    parser.add_argument("--baseline-max-mb", type=int, default=100,
+                        help="Largest file read with readlines.")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per measurement, the best one is reported.")
+    parser.add_argument("--directory", default=None,
+                        help="Directory of the generated files.")
+    args = parser.parse_args()
+
+    warn_filter = make_line_filter("WARN")
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(directory, f"syslog-{size_mb}")
+            generate(path, size_mb * 1024 * 1024)
+            print(f"{size_mb} MB, last {args.lines} lines (best of {args.repeat})")
+
+            if size_mb <= args.baseline_max_mb:
+                elapsed = timed(lambda: read_with_readlines(path, args.lines), args.repeat)
+                print(f"  readlines  {elapsed:9.2f} ms")
+            elapsed = timed(lambda: tail_lines(path, args.lines), args.repeat)
+            print(f"  tail       {elapsed:9.2f} ms")
+            elapsed = timed(lambda: tail_lines(path, args.lines, line_filter=warn_filter),
+                            args.repeat)
+            print(f"  tail WARN  {elapsed:9.2f} ms")
+
+            offset = tail_lines(path, args.lines)["offset"]
+            with open(path, "ab") as log_file:
+                log_file.write(make_lines(random.Random(1), 50))
+            elapsed = timed(lambda: tail_lines(path, args.lines, offset), args.repeat)
+            print(f"  since      {elapsed:9.2f} ms")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""
+Manual Drive Latency Benchmark
+
+Sends manual drive commands to the webserver at the rate of the joystick, first as
+/api/manual_drive POST requests and then as messages on the /api/manual_drive_ws
+WebSocket, and reports the time from sending a command to receiving the servo message
+published by the webserver on /webserver_pkg/manual_drive, and its jitter.
+
+The webserver_publisher_node is started in this process against the stand-in services of
+load_test_webserver.py, with CSRF protection disabled so that the POST requests do not
+need a session. The throttle alternates between two values so that every command is
+published as a distinct message.
+
+The webserver_pkg and deepracer_interfaces_pkg packages, flask-sock and websocket-client
+(python3-websocket) must be importable, e.g. after sourcing the workspace
+install/setup.bash.
+
+Usage:
+    python3 benchmark_manual_drive.py --commands 500 --period 0.025
+"""
+
+import argparse
+import json
+import statistics
+import struct
+import threading
+import time
+import urllib.request
+
+import rclpy
+from rclpy.executors import MultiThreadedExecutor
+from rclpy.node import Node
+import websocket
+
+from deepracer_interfaces_pkg.msg import ServoCtrlMsg
+from load_test_webserver import (StandInServiceNode,
+                                 percentile,
+                                 wait_for_webserver)
+
+
+class ManualDriveListener(Node):
+    """Node signalling every servo message published by the webserver.
+    """
+    def __init__(self, topic_name):
+        super().__init__("manual_drive_benchmark_listener")
+        self.received = threading.Event()
+        self.receive_time = None
+        self.create_subscription(ServoCtrlMsg, topic_name, self.callback, 100)
+
+    def callback(self, msg):
+        self.receive_time = time.monotonic()
+        self.received.set()
+
+
+def send_http(url, angle, throttle, max_speed):
+    body = json.dumps({"angle": angle, "throttle": throttle, "max_speed": max_speed})
+    request = urllib.request.Request(url + "/api/manual_drive", data=body.encode(),
+                                     headers={"Content-Type": "application/json"},
+                                     method="POST")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        response.read()
+
+
+def run(listener, send_cb, args):
+    """Send args.commands commands every args.period seconds and return the latencies in
+       milliseconds of the ones published within a second.
+    """
+    latencies = []
+    lost = 0
+    next_time = time.monotonic()
+    for index in range(args.commands):
+        throttle = 0.5 if index % 2 else 0.8
+        listener.received.clear()
+        start = time.monotonic()
+        send_cb(0.0, throttle, 1.0)
+        if listener.received.wait(1.0):
+            latencies.append((listener.receive_time - start) * 1000.0)
+        else:
+            lost += 1
+        next_time += args.period
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    return latencies, lost
+
+
+def report(name, latencies, lost):
+    print(f"  {name:<10} mean {statistics.mean(latencies):6.2f}ms  "
+          f"p50 {percentile(latencies, 50):6.2f}ms  p95 {percentile(latencies, 95):6.2f}ms  "
+          f"p99 {percentile(latencies, 99):6.2f}ms  jitter {statistics.pstdev(latencies):6.2f}ms"
+          f"  lost {lost}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the manual drive latency.")
+    parser.add_argument("--url", default="http://127.0.0.1:5001",
+                        help="Base URL the in-process webserver listens on.")
+    parser.add_argument("--commands", type=int, default=500,
+                        help="Number of commands sent over each API.")
+    parser.add_argument("--period", type=float, default=0.025,
+                        help="Seconds between two commands.")
+    args = parser.parse_args()
+
+    rclpy.init()
+    executor = MultiThreadedExecutor()
+    executor.add_node(StandInServiceNode(0.0))
+    spin_thread = threading.Thread(target=executor.spin, daemon=True)
+    spin_thread.start()
+
+    from webserver_pkg import webserver_publisher_node
+    webserver_publisher_node.app.config["WTF_CSRF_ENABLED"] = False
+    webserver_publisher_node.webserver_node = webserver_publisher_node.WebServerNode()
+    executor.add_node(webserver_publisher_node.webserver_node)
+    listener = ManualDriveListener(webserver_publisher_node.webserver_node
+                                   .pub_manual_drive.topic_name)
+    executor.add_node(listener)
+
+    try:
+        if not wait_for_webserver(args.url, 30.0):
+            print(f"Webserver not reachable at {args.url}")
+            return
+        print(f"{args.commands} commands every {args.period * 1000.0:.0f}ms")
+
+        latencies, lost = run(listener,
+                              lambda *command: send_http(args.url, *command),
+                              args)
+        report("HTTP POST", latencies, lost)
+
+        ws = websocket.create_connection(args.url.replace("http", "ws", 1)
+                                         + "/api/manual_drive_ws")
+        try:
+            latencies, lost = run(listener,
+                                  lambda *command: ws.send_binary(struct.pack("<fff", *command)),
+                                  args)
+        finally:
+            ws.close()
+        report("WebSocket", latencies, lost)
+    finally:
+        executor.shutdown()
+        rclpy.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+Model Install Pipeline Benchmark
+
+Ingests a synthetic USB stick with N model archives through the model installation
+pipeline of the model_loader_node and reports the wall time and the time spent per
+stage. The model optimizer service is replaced by a fake client that answers after
+a fixed delay, so the benchmark runs without the rest of the DeepRacer stack.
+
+The deepracer_systems_pkg and deepracer_interfaces_pkg packages must be importable,
+e.g. after sourcing the workspace install/setup.bash.
+
+Usage:
+    python3 benchmark_model_install.py --models 20 --model-size-mb 10 --optimizer-delay 2.0
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+
+from deepracer_systems_pkg import constants
+from deepracer_systems_pkg.model_loader_module import model_loader_config
+from deepracer_systems_pkg.model_loader_module.model_loader_node import ModelLoaderNode
+from deepracer_systems_pkg.model_loader_module.model_install_pipeline import ModelInstallPipeline
+
+
+MODEL_METADATA = {
+    "action_space": [{"steering_angle": 0.0, "speed": 1.0, "index": 0}],
+    "sensor": ["FRONT_FACING_CAMERA"],
+    "neural_network": "DEEP_CONVOLUTIONAL_NETWORK_SHALLOW",
+    "training_algorithm": "clipped_ppo",
+    "action_space_type": "discrete",
+    "version": "5"
+}
+
+
+class FakeFuture:
+    """Minimal future completed by the fake optimizer client.
+    """
+    def __init__(self):
+        self._result = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def add_done_callback(self, callback):
+        with self._lock:
+            if self._result is None:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def set_result(self, result):
+        with self._lock:
+            self._result = result
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def result(self):
+        return self._result
+
+
+class FakeOptimizerResponse:
+    error = 0
+
+
+class FakeOptimizerClient:
+    """Stand-in for the model optimizer service client answering after a fixed delay.
+    """
+    srv_name = "fake_model_optimizer_server"
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def call_async(self, request):
+        future = FakeFuture()
+        threading.Timer(self.delay, future.set_result, args=(FakeOptimizerResponse(),)).start()
+        return future
+
+    def remove_pending_request(self, future):
+        pass
+
+
+class BenchmarkLoader:
+    """Runs the transfer and install logic of the ModelLoaderNode without the ROS services.
+    """
+    get_list_of_archives = ModelLoaderNode.get_list_of_archives
+    transfer_models = ModelLoaderNode.transfer_models
+    load_models = ModelLoaderNode.load_models
+    prepare_model = ModelLoaderNode.prepare_model
+    extract_archive = ModelLoaderNode.extract_archive
+
+    def __init__(self, optimizer_client, install_workers, optimizer_workers):
+        self.logger = logging.getLogger("benchmark_model_install")
+        self.models_in_progress = dict()
+        self.progress_guard = threading.Lock()
+        self.enable_model_wipe = False
+        self.model_optimizer_client = optimizer_client
+        self.install_pipeline = ModelInstallPipeline(self.logger,
+                                                     install_workers=install_workers,
+                                                     optimizer_workers=optimizer_workers)
+        self.supported_exts = (".pb", ".json", ".gz", ".tar")
+        self.model_file_extensions = (".pb",)
+
+    def get_logger(self):
+        return self.logger
+
+    def call_blink_led_service(self):
+        pass
+
+    def call_solid_led_service(self):
+        pass
+
+
+def create_stick(stick_directory, model_count, model_size_mb):
+    """Create the models folder of a synthetic USB stick.
+
+    Args:
+        stick_directory (str): Directory where the models folder is created.
+        model_count (int): Number of model archives.
+        model_size_mb (float): Size of the model.pb file in every archive.
+
+    Returns:
+        str: Path to the models folder.
+    """
+    models_directory = os.path.join(stick_directory,
+                                    model_loader_config.MODEL_SOURCE_LEAF_DIRECTORY)
+    staging_directory = os.path.join(stick_directory, "staging")
+    os.makedirs(models_directory)
+    os.makedirs(staging_directory)
+    with open(os.path.join(staging_directory, model_loader_config.MODEL_METADATA_NAME), "w") as f:
+        json.dump(MODEL_METADATA, f)
+    for index in range(model_count):
+        # Random content so that every model has its own checksum and does not compress away.
+        with open(os.path.join(staging_directory, "model.pb"), "wb") as f:
+            f.write(os.urandom(int(model_size_mb * 1024 * 1024)))
+        archive_path = os.path.join(models_directory, f"benchmark-model-{index}.tar.gz")
+        with tarfile.open(archive_path, "w:gz") as tar:
+            tar.add(os.path.join(staging_directory, "model.pb"), arcname="model.pb")
+            tar.add(os.path.join(staging_directory, model_loader_config.MODEL_METADATA_NAME),
+                    arcname=model_loader_config.MODEL_METADATA_NAME)
+    shutil.rmtree(staging_directory)
+    return models_directory
+
+
+def run_benchmark(args):
+    work_directory = tempfile.mkdtemp(prefix="benchmark-model-install-")
+    try:
+        # Keep the extracted and installed models inside the work directory.
+        constants.TEMP_DIRECTORY = os.path.join(work_directory, "tmp")
+        model_loader_config.MODEL_INSTALL_ROOT_DIRECTORY = os.path.join(work_directory,
+                                                                        "artifacts")
+        os.makedirs(constants.TEMP_DIRECTORY)
+        os.makedirs(model_loader_config.MODEL_INSTALL_ROOT_DIRECTORY)
+
+        print(f"Creating {args.models} archives of {args.model_size_mb} MB...")
+        models_directory = create_stick(work_directory, args.models, args.model_size_mb)
+
+        optimizer_client = None
+        if args.optimizer_delay >= 0:
+            optimizer_client = FakeOptimizerClient(args.optimizer_delay)
+        loader = BenchmarkLoader(optimizer_client, args.install_workers, args.optimizer_workers)
+
+        start = time.monotonic()
+        loader.load_models({"path": os.path.dirname(models_directory),
+                            "name": os.path.basename(models_directory)})
+        transfer_time = time.monotonic() - start
+        for state in loader.models_in_progress.values():
+            state.wait_complete()
+        wall_time = time.monotonic() - start
+        loader.install_pipeline.shutdown()
+
+        installed = sum(state.installed.is_set() for state in loader.models_in_progress.values())
+        print(f"Installed {installed}/{args.models} models with {args.install_workers} install "
+              f"and {args.optimizer_workers} optimizer workers")
+        print(f"  wall time:        {wall_time:8.3f}s")
+        print(f"  transfer:         {transfer_time:8.3f}s (wall)")
+        for stage, seconds in loader.install_pipeline.get_stage_times().items():
+            print(f"  {stage + ':':<17} {seconds:8.3f}s (summed over models)")
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the model installation pipeline.")
+    parser.add_argument("--models", type=int, default=20,
+                        help="Number of model archives on the synthetic stick.")
+    parser.add_argument("--model-size-mb", type=float, default=10.0,
+                        help="Size of the model.pb file in every archive.")
+    parser.add_argument("--optimizer-delay", type=float, default=2.0,
+                        help="Seconds the fake optimizer takes per model, negative disables it.")
+    parser.add_argument("--install-workers", type=int,
+                        default=model_loader_config.INSTALL_WORKER_COUNT,
+                        help="Size of the extraction/copy pool.")
+    parser.add_argument("--optimizer-workers", type=int,
+                        default=model_loader_config.OPTIMIZER_WORKER_COUNT,
+                        help="Size of the optimization pool.")
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    run_benchmark(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
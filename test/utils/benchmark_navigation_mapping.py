@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+"""
+Navigation Mapping Benchmark
+
+Measures the per-message latency of mapping inference results to servo angle and
+throttle in the deepracer_navigation_node. The compiled lookup tables of
+deepracer_navigation_pkg.action_space_table are compared with the previous per-message
+mapping, which scaled the action values of the selected action on every message.
+
+Messages are replayed at the camera frame rate (30 and 60 FPS by default) for discrete
+action spaces of 5 to 21 actions and for a continuous action space. The latency and the
+share of the frame period spent mapping are reported.
+
+Usage:
+    python3 benchmark_navigation_mapping.py --frames 600
+    python3 benchmark_navigation_mapping.py --frames 20000 --no-pacing
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src",
+                                "aws-deepracer-navigation-pkg", "deepracer_navigation_pkg"))
+
+from deepracer_navigation_pkg import constants  # noqa: E402
+from deepracer_navigation_pkg import action_space_table  # noqa: E402
+
+
+STEERING = constants.ModelMetadataKeys.STEERING
+SPEED = constants.ModelMetadataKeys.SPEED
+LOW = constants.ModelMetadataKeys.CONTINUOUS_LOW
+HIGH = constants.ModelMetadataKeys.CONTINUOUS_HIGH
+
+
+class PerMessageMapping:
+    """Previous mapping of the navigation node, scaling the action values on every message.
+    """
+    def __init__(self, action_space, continuous):
+        self.action_space = action_space
+        self.continuous = continuous
+        if continuous:
+            max_steering = action_space[STEERING][HIGH]
+            max_speed = action_space[SPEED][HIGH]
+        else:
+            max_steering = max(abs(action[STEERING]) for action in action_space)
+            max_speed = max(abs(action[SPEED]) for action in action_space)
+        self.max_action_space_values = {STEERING: max_steering, SPEED: max_speed}
+        a, b = action_space_table.get_speed_mapping_coefficients(max_speed)
+        self.speed_mapping_coeficients = {'a': a, 'b': b}
+
+    def get_max_scaled_value(self, action_value, action_key):
+        max_value = self.max_action_space_values[action_key]
+        if max_value <= 0.0:
+            return 0.0
+        return float(action_value) / float(max_value)
+
+    def get_non_linearly_mapped_speed(self, scaled_action_space_speed):
+        mapped_speed = self.speed_mapping_coeficients['a'] * scaled_action_space_speed**2 + \
+            self.speed_mapping_coeficients['b'] * scaled_action_space_speed
+        return max(min(mapped_speed, 1.0), -1.0)
+
+    def scale_continuous_value(self, action, min_old, max_old, min_new, max_new):
+        return ((max_new - min_new) / (max_old - min_old)) * (action - min_old) + min_new
+
+    def map_results(self, results):
+        if not self.continuous:
+            max_prob = max(results, key=lambda result: result.class_prob)
+            action_id = max_prob.class_label
+            angle = self.get_max_scaled_value(self.action_space[action_id][STEERING], STEERING)
+            throttle = self.get_non_linearly_mapped_speed(self.action_space[action_id][SPEED])
+            return angle, throttle
+        action_values = dict()
+        for result in results:
+            action_values[int(result.class_label)] = max(min(result.class_prob, 1.0), -1.0)
+        scaled_angle = self.scale_continuous_value(action_values[0], -1.0, 1.0,
+                                                   self.action_space[STEERING][LOW],
+                                                   self.action_space[STEERING][HIGH])
+        angle = self.get_max_scaled_value(scaled_angle, STEERING)
+        scaled_throttle = self.scale_continuous_value(action_values[1], -1.0, 1.0,
+                                                      self.action_space[SPEED][LOW],
+                                                      self.action_space[SPEED][HIGH])
+        return angle, self.get_non_linearly_mapped_speed(scaled_throttle)
+
+
+def make_discrete_action_space(action_count):
+    return [{STEERING: random.uniform(-30.0, 30.0), SPEED: random.uniform(0.5, 4.0)}
+            for _ in range(action_count)]
+
+
+def make_messages(action_count, frames, continuous):
+    messages = []
+    for _ in range(frames):
+        if continuous:
+            probs = [random.uniform(-1.2, 1.2), random.uniform(-1.2, 1.2)]
+        else:
+            probs = [random.random() for _ in range(action_count)]
+        messages.append([SimpleNamespace(class_label=label, class_prob=prob)
+                         for label, prob in enumerate(probs)])
+    return messages
+
+
+def replay(mapping, messages, fps, pacing):
+    """Map the messages at the frame rate and return the latency of every message in us.
+    """
+    period = 1.0 / fps
+    latencies = []
+    next_frame = time.perf_counter()
+    for results in messages:
+        if pacing:
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_frame += period
+        start = time.perf_counter_ns()
+        mapping.map_results(results)
+        latencies.append((time.perf_counter_ns() - start) / 1000.0)
+    return latencies
+
+
+def report(name, latencies, fps):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    mean = statistics.fmean(latencies)
+    busy = mean * 1e-6 * fps * 100.0
+    print(f"    {name:<12} mean {mean:7.2f} us  p50 {statistics.median(latencies):7.2f} us  "
+          f"p99 {p99:7.2f} us  frame budget {busy:.4f}%")
+
+
+def check_equivalence(baseline, table, messages):
+    for results in messages:
+        expected = baseline.map_results(results)
+        actual = table.map_results(results)
+        if any(abs(e - a) > 1e-9 for e, a in zip(expected, actual)):
+            raise SystemExit(f"Mapping mismatch: {expected} != {actual}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the navigation node action mapping.")
+    parser.add_argument("--frames", type=int, default=600,
+                        help="Number of inference messages replayed per configuration.")
+    parser.add_argument("--fps", type=int, nargs="+", default=[30, 60],
+                        help="Frame rates the messages are replayed at.")
+    parser.add_argument("--actions", type=int, nargs="+", default=[5, 7, 11, 15, 21],
+                        help="Sizes of the discrete action spaces.")
+    parser.add_argument("--no-pacing", action="store_true",
+                        help="Replay the messages back to back instead of at the frame rate.")
+    args = parser.parse_args()
+    random.seed(0)
+
+    configurations = [(f"discrete, {count} actions", make_discrete_action_space(count), False)
+                      for count in args.actions]
+    configurations.append(("continuous", {STEERING: {LOW: -25.0, HIGH: 25.0},
+                                          SPEED: {LOW: 0.5, HIGH: 3.0}}, True))
+    for fps in args.fps:
+        print(f"{fps} FPS, {args.frames} messages{'' if not args.no_pacing else ' (no pacing)'}")
+        for name, action_space, continuous in configurations:
+            messages = make_messages(len(action_space), args.frames, continuous)
+            baseline = PerMessageMapping(action_space, continuous)
+            table_class = action_space_table.ContinuousActionTable if continuous \
+                else action_space_table.DiscreteActionTable
+            table = table_class(action_space,
+                                baseline.max_action_space_values[STEERING],
+                                (baseline.speed_mapping_coeficients['a'],
+                                 baseline.speed_mapping_coeficients['b']))
+            check_equivalence(baseline, table, messages)
+            print(f"  {name}")
+            report("per-message", replay(baseline, messages, fps, not args.no_pacing), fps)
+            report("compiled", replay(table, messages, fps, not args.no_pacing), fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+"""
+Telemetry Fan-out Benchmark
+
+Feeds the webserver TelemetryHub with telemetry at the rates seen on the car and
+consumes its event stream from 0, 1 and 10 clients, reporting the CPU time of the process
+and the events and bytes received per client. The device status arrives every second,
+the servo command at 30 Hz with values that change about every other message, and the
+battery level and model loading state on the polling period of the webserver.
+
+Each value is serialized once by the hub and the clients only join the changed channels,
+so the CPU time should barely grow with the number of clients. The servo channel is
+coalesced to the client rate.
+
+With --http, the event streams are served by the PooledWSGIServer of the webserver, with
+its default pool sizes, on the /api/telemetry route, and every client reads its stream
+over its own HTTP connection. The CPU time then includes the server threads and the
+clients reading their sockets, and the clients rejected with a 503 response are reported.
+
+The webserver_pkg package must be importable, e.g. after sourcing the workspace
+install/setup.bash.
+
+Usage:
+    python3 benchmark_telemetry_fanout.py --duration 20 --clients 0 1 10 --rate 5
+    python3 benchmark_telemetry_fanout.py --duration 20 --clients 0 1 10 --http
+"""
+
+import argparse
+import random
+import socket
+import threading
+import time
+
+from flask import (Flask,
+                   request,
+                   Response)
+
+from webserver_pkg import constants
+from webserver_pkg.telemetry_hub import TelemetryHub
+from webserver_pkg.wsgi_server import PooledWSGIServer
+
+
+def produce(hub, stop_event):
+    """Update the telemetry channels at the rates of the car until stop_event is set.
+    """
+    rng = random.Random(0)
+    start = time.monotonic()
+    tick = 0
+    angle = 0.0
+    while not stop_event.is_set():
+        # 30 Hz servo commands, the steering changes every other frame.
+        if tick % 2 == 0:
+            angle = round(rng.uniform(-1.0, 1.0), 2)
+        hub.update(constants.TELEMETRY_SERVO, {"angle": angle, "throttle": 0.6})
+        if tick % 30 == 0:
+            hub.update(constants.TELEMETRY_DEVICE_STATUS, {
+                "cpu_percent": round(rng.uniform(20.0, 60.0), 1),
+                "cpu_temp": round(rng.uniform(50.0, 60.0), 1),
+                "cpu_freq": 1800,
+                "memory_usage": 41.3,
+                "free_disk": 72.0,
+                "latency_mean": round(rng.uniform(5.0, 8.0), 1),
+                "latency_p95": round(rng.uniform(8.0, 12.0), 1),
+                "inference_latency_mean": round(rng.uniform(30.0, 40.0), 1),
+                "inference_latency_p95": round(rng.uniform(40.0, 60.0), 1)
+            })
+            hub.update(constants.TELEMETRY_INFERENCE, {"fps": round(rng.uniform(14.0, 15.0), 1)})
+        if tick % int(30 * constants.TELEMETRY_POLL_PERIOD) == 0:
+            hub.update(constants.TELEMETRY_BATTERY, {"level": 9})
+            hub.update(constants.TELEMETRY_MODEL_LOADING, {"status": "loaded"})
+        tick += 1
+        delay = start + tick / 30.0 - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def consume(hub, rate, stop_event, stats, index):
+    """Read the event stream of one client until stop_event is set.
+    """
+    events = 0
+    received = 0
+    stream = hub.stream(1.0 / rate, 1.0)
+    for event in stream:
+        if stop_event.is_set():
+            break
+        if not event.startswith(":"):
+            events += 1
+        received += len(event)
+    stream.close()
+    stats[index] = (events, received)
+
+
+def consume_http(port, rate, stop_event, stats, index):
+    """Read the event stream of one client over HTTP until stop_event is set. Rejected
+       clients count -1 events.
+    """
+    events = 0
+    received = 0
+    pending = b""
+    with socket.create_connection(("127.0.0.1", port), timeout=1.0) as sock:
+        sock.sendall(f"GET /api/telemetry?rate={rate} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                     "Accept: text/event-stream\r\n\r\n".encode())
+        while not stop_event.is_set():
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            if received == 0 and data.split(b" ", 2)[1:2] == [b"503"]:
+                events = -1
+                break
+            received += len(data)
+            # Events are separated by a blank line and can span several reads.
+            *complete, pending = (pending + data).split(b"\n\n")
+            events += sum(1 for event in complete if b"data: " in event)
+    stats[index] = (events, received)
+
+
+def start_http_server(hub):
+    """Serve the event streams of the hub on /api/telemetry with the pooled server of the
+       webserver.
+
+    Returns:
+        PooledWSGIServer: Server listening on a free port of the loopback interface.
+    """
+    app = Flask(__name__)
+
+    @app.route("/api/telemetry")
+    def api_telemetry():
+        rate = request.args.get("rate", constants.TELEMETRY_DEFAULT_RATE, type=float)
+        return Response(hub.stream(1.0 / rate, 1.0),
+                        content_type="text/event-stream",
+                        headers={"Cache-Control": "no-cache",
+                                 "X-Accel-Buffering": "no"})
+
+    server = PooledWSGIServer("127.0.0.1", 0, app,
+                              constants.SERVER_WORKER_THREADS,
+                              constants.SERVER_STREAM_WORKER_THREADS,
+                              constants.SERVER_DRIVE_WORKER_THREADS,
+                              constants.SERVER_STREAM_PATHS,
+                              constants.SERVER_DRIVE_PATHS,
+                              constants.SERVER_REQUEST_TIMEOUT,
+                              constants.SERVER_STREAM_TIMEOUT,
+                              constants.SERVER_MAX_QUEUED_CONNECTIONS,
+                              constants.SERVER_QUEUE_TIMEOUT)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(client_count, args):
+    hub = TelemetryHub(constants.TELEMETRY_CHANNELS)
+    stop_event = threading.Event()
+    stats = [None] * client_count
+    server = None
+    if args.http:
+        server = start_http_server(hub)
+        threads = [threading.Thread(target=consume_http,
+                                    args=(server.server_address[1], args.rate, stop_event,
+                                          stats, index))
+                   for index in range(client_count)]
+    else:
+        threads = [threading.Thread(target=consume,
+                                    args=(hub, args.rate, stop_event, stats, index))
+                   for index in range(client_count)]
+    threads.append(threading.Thread(target=produce, args=(hub, stop_event)))
+    cpu_start = time.process_time()
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop_event.set()
+    for thread in threads:
+        thread.join()
+    wall_time = time.monotonic() - start
+    cpu_time = time.process_time() - cpu_start
+    if server is not None:
+        server.stop(1.0)
+
+    line = f"  {client_count:3d} clients  CPU {100.0 * cpu_time / wall_time:5.2f}% of one core"
+    served = [stat for stat in stats if stat[0] >= 0]
+    if served:
+        events = sum(stat[0] for stat in served) / len(served)
+        received = sum(stat[1] for stat in served) / len(served)
+        line += (f"  {events / wall_time:5.2f} events/s and "
+                 f"{received / wall_time / 1024.0:6.2f} KiB/s per client")
+    if len(served) < client_count:
+        line += f"  {client_count - len(served)} rejected"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the telemetry event stream fan-out.")
+    parser.add_argument("--duration", type=float, default=20.0,
+                        help="Seconds of telemetry per client count.")
+    parser.add_argument("--clients", type=int, nargs="+", default=[0, 1, 10],
+                        help="Numbers of connected clients to measure.")
+    parser.add_argument("--rate", type=float, default=constants.TELEMETRY_DEFAULT_RATE,
+                        help="Maximum events per second per client.")
+    parser.add_argument("--http", action="store_true",
+                        help="Read the event streams through the pooled HTTP server.")
+    args = parser.parse_args()
+
+    print(f"{args.duration:.0f}s of telemetry, at most {args.rate:.1f} events/s per client"
+          f"{' over HTTP' if args.http else ''}")
+    for client_count in args.clients:
+        run(client_count, args)
+
+
+if __name__ == "__main__":
+    main()
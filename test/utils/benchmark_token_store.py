@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""
+Token Store Benchmark
+
+Writes a token file holding 10k valid login tokens and measures the time of one
+authorization check, as done by nginx through /auth for every proxied request:
+
+    file    the previous check_authentication, parsing the token file and comparing
+            the cookie with every token
+    store   the TokenStore lookup, a dictionary lookup once the file is loaded
+
+It also measures a login, appending a token, with both approaches.
+
+The webserver_pkg package must be importable, e.g. after sourcing the workspace
+install/setup.bash.
+
+Usage:
+    python3 benchmark_token_store.py --tokens 10000
+"""
+
+import argparse
+import datetime
+import hmac
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from webserver_pkg.token_store import TokenStore
+
+
+def check_with_file(path, cookie_val):
+    with open(path, "r") as file_ptr:
+        tokens_data = json.load(file_ptr)
+    current_time = datetime.datetime.now()
+    status = False
+    for token_entry in tokens_data.get("tokens", []):
+        expiry_date = datetime.datetime.fromisoformat(token_entry.get("expires_at"))
+        if expiry_date > current_time and hmac.compare_digest(cookie_val,
+                                                              token_entry.get("token")):
+            status = True
+    return status
+
+
+def login_with_file(path, token, expires_at):
+    with open(path, "r") as token_file:
+        tokens_data = json.load(token_file)
+    tokens_data["tokens"].append({"token": token, "expires_at": expires_at})
+    with open(path, "w") as token_file:
+        json.dump(tokens_data, token_file)
+
+
+def timed(function, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) * 1e6 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the login token store.")
+    parser.add_argument("--tokens", type=int, default=10000,
+                        help="Number of tokens stored.")
+    parser.add_argument("--checks", type=int, default=200,
+                        help="Number of checks measured with the token file.")
+    parser.add_argument("--store-checks", type=int, default=100000,
+                        help="Number of checks measured with the token store.")
+    args = parser.parse_args()
+
+    expires_at = datetime.datetime.now() + datetime.timedelta(hours=12)
+    tokens = [str(uuid.uuid4()) for _ in range(args.tokens)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "token.txt")
+        with open(path, "w") as token_file:
+            json.dump({"tokens": [{"token": token, "expires_at": expires_at.isoformat()}
+                                  for token in tokens]}, token_file)
+        cookie_val = tokens[len(tokens) // 2]
+
+        print(f"{args.tokens} tokens, time per call")
+        assert check_with_file(path, cookie_val)
+        elapsed = timed(lambda: check_with_file(path, cookie_val), args.checks)
+        print(f"  /auth file   {elapsed:12.2f} us")
+
+        store = TokenStore(path, write_delay=1.0, reload_check_period=1.0)
+        start = time.perf_counter()
+        assert store.get_expiry(cookie_val) is not None
+        print(f"  store load   {(time.perf_counter() - start) * 1e6:12.2f} us")
+        elapsed = timed(lambda: store.get_expiry(cookie_val), args.store_checks)
+        print(f"  /auth store  {elapsed:12.2f} us")
+
+        elapsed = timed(lambda: login_with_file(path, str(uuid.uuid4()),
+                                                expires_at.isoformat()), args.checks)
+        print(f"  login file   {elapsed:12.2f} us")
+        elapsed = timed(lambda: store.add(str(uuid.uuid4()), expires_at.timestamp()),
+                        args.checks)
+        print(f"  login store  {elapsed:12.2f} us")
+        start = time.perf_counter()
+        store.flush()
+        print(f"  store flush  {(time.perf_counter() - start) * 1e6:12.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+"""
+Webserver Stream Starvation Load Test
+
+Measures the latency of the control APIs while long-lived requests occupy the webserver:
+event stream clients on /api/telemetry and /api/update_status, and slow model uploads
+trickling their body to /api/uploadModels. The control requests are first sent without
+load as a baseline, then with the long-lived requests open, and the p50, p95 and p99
+latencies of both runs are reported together with the number of threads of the process.
+The load includes a telemetry fan-out of --telemetry-clients event stream clients on
+/api/telemetry (10 by default), each of which must be served and receive events. Under load,
+the time to the 101 response of the manual drive WebSocket handshake is measured too, and
+the number of streams answered with a 503 response is reported.
+
+The script exits with status 1 when the control p99 latency under load exceeds
+--p99-budget-ms, when the drive handshake p99 exceeds --drive-budget-ms, when control
+requests or handshakes fail, or when a telemetry client is rejected or receives no event.
+The default telemetry clients, streams and uploads fit the stream pool.
+
+The webserver_publisher_node is started in this process against the stand-in services of
+load_test_webserver.py, with the serving backend given by --backend (the server_backend
+parameter of the node), so that both backends can be compared.
+
+The webserver_pkg and deepracer_interfaces_pkg packages must be importable, e.g. after
+sourcing the workspace install/setup.bash.
+
+Usage:
+    python3 load_test_streams.py --backend pooled --p99-budget-ms 100
+    python3 load_test_streams.py --backend development --streams 24 --uploads 8
+    python3 load_test_streams.py --backend pooled --telemetry-clients 20
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+import urllib.parse
+
+import rclpy
+from rclpy.executors import MultiThreadedExecutor
+
+from load_test_webserver import (StandInServiceNode,
+                                 percentile,
+                                 run_client,
+                                 wait_for_webserver)
+
+
+CONTROL_ENDPOINTS = ["/api/get_battery_level",
+                     "/api/get_device_status",
+                     "/api/server_ready"]
+TELEMETRY_ENDPOINT = "/api/telemetry"
+STREAM_ENDPOINTS = [TELEMETRY_ENDPOINT,
+                    "/api/update_status"]
+DRIVE_ENDPOINT = "/api/manual_drive_ws"
+
+
+def open_stream(host, port, endpoint, stop_event, rejected, receiving, lock):
+    """Keep an event stream open, reading its events, until stop_event is set. Streams
+       answered with a 503 response are appended to rejected, streams receiving an event
+       to receiving.
+    """
+    try:
+        with socket.create_connection((host, port), timeout=5) as sock:
+            sock.sendall(f"GET {endpoint} HTTP/1.1\r\nHost: {host}\r\n"
+                         "Accept: text/event-stream\r\n\r\n".encode())
+            first = True
+            received = False
+            while not stop_event.is_set():
+                try:
+                    data = sock.recv(4096)
+                except socket.timeout:
+                    continue
+                if not data:
+                    return
+                if first and data.split(b" ", 2)[1:2] == [b"503"]:
+                    with lock:
+                        rejected.append(endpoint)
+                    return
+                if not received and b"data:" in data:
+                    with lock:
+                        receiving.append(endpoint)
+                    received = True
+                first = False
+    except OSError:
+        pass
+
+
+def slow_upload(host, port, stop_event, chunk_period):
+    """Send a model upload whose body arrives one byte every chunk_period seconds, until
+       stop_event is set.
+    """
+    body_size = 1024 * 1024
+    try:
+        with socket.create_connection((host, port), timeout=5) as sock:
+            sock.sendall(f"POST /api/uploadModels HTTP/1.1\r\nHost: {host}\r\n"
+                         "Content-Type: multipart/form-data; boundary=x\r\n"
+                         f"Content-Length: {body_size}\r\n\r\n".encode())
+            while not stop_event.wait(chunk_period):
+                sock.sendall(b"x")
+    except OSError:
+        pass
+
+
+def drive_handshake(host, port):
+    """Open the manual drive WebSocket and close it once upgraded.
+
+    Returns:
+        float: Milliseconds to the 101 response, None if the upgrade failed.
+    """
+    start = time.monotonic()
+    try:
+        with socket.create_connection((host, port), timeout=5) as sock:
+            sock.sendall(f"GET {DRIVE_ENDPOINT} HTTP/1.1\r\nHost: {host}\r\n"
+                         "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                         "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n"
+                         "Sec-WebSocket-Version: 13\r\n\r\n".encode())
+            status = sock.recv(4096).split(b" ", 2)[1:2]
+    except OSError:
+        return None
+    return (time.monotonic() - start) * 1000.0 if status == [b"101"] else None
+
+
+def measure_drive(args, label):
+    """Open the manual drive WebSocket args.handshakes times and print the handshake
+       latencies.
+
+    Returns:
+        tuple: p99 latency in milliseconds (None if no handshake succeeded) and number of
+               failed handshakes.
+    """
+    url = urllib.parse.urlparse(args.url)
+    values = []
+    failed = 0
+    for _ in range(args.handshakes):
+        latency_ms = drive_handshake(url.hostname, url.port)
+        if latency_ms is None:
+            failed += 1
+        else:
+            values.append(latency_ms)
+    if not values:
+        print(f"  {label:<12} all {failed} handshakes failed")
+        return None, failed
+    p99 = percentile(values, 99)
+    print(f"  {label:<12} p50 {percentile(values, 50):7.1f}ms  "
+          f"p99 {p99:7.1f}ms  max {max(values):7.1f}ms  failed {failed}")
+    return p99, failed
+
+
+def measure(args, label):
+    """Send the control requests and print their latencies.
+
+    Returns:
+        tuple: p99 latency in milliseconds and number of failed requests.
+    """
+    latencies = {endpoint: [] for endpoint in CONTROL_ENDPOINTS}
+    failures = {endpoint: 0 for endpoint in CONTROL_ENDPOINTS}
+    lock = threading.Lock()
+    clients = [threading.Thread(target=run_client,
+                                args=(args.url, CONTROL_ENDPOINTS, args.requests,
+                                      latencies, failures, lock))
+               for _ in range(args.clients)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    values = [value for endpoint in CONTROL_ENDPOINTS for value in latencies[endpoint]]
+    p99 = percentile(values, 99)
+    print(f"  {label:<12} p50 {percentile(values, 50):7.1f}ms  "
+          f"p95 {percentile(values, 95):7.1f}ms  p99 {p99:7.1f}ms  "
+          f"max {max(values):7.1f}ms  failed {sum(failures.values())}  "
+          f"threads {threading.active_count()}")
+    return p99, sum(failures.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the control APIs under streams.")
+    parser.add_argument("--url", default="http://127.0.0.1:5001",
+                        help="Base URL the in-process webserver listens on.")
+    parser.add_argument("--backend", default="pooled", choices=["pooled", "development"],
+                        help="Serving backend of the webserver.")
+    parser.add_argument("--telemetry-clients", type=int, default=10,
+                        help="Number of telemetry event stream clients of the fan-out.")
+    parser.add_argument("--streams", type=int, default=2,
+                        help="Number of other open event stream clients.")
+    parser.add_argument("--uploads", type=int, default=2,
+                        help="Number of slow model uploads.")
+    parser.add_argument("--clients", type=int, default=4,
+                        help="Number of concurrent control clients.")
+    parser.add_argument("--requests", type=int, default=100,
+                        help="Number of control requests sent by every client.")
+    parser.add_argument("--handshakes", type=int, default=20,
+                        help="Number of manual drive WebSocket handshakes under load.")
+    parser.add_argument("--p99-budget-ms", type=float, default=200.0,
+                        help="Budget of the control p99 latency under load.")
+    parser.add_argument("--drive-budget-ms", type=float, default=200.0,
+                        help="Budget of the drive WebSocket handshake p99 latency under load.")
+    args = parser.parse_args()
+
+    rclpy.init(args=["--ros-args", "-p", f"server_backend:={args.backend}"])
+    executor = MultiThreadedExecutor()
+    executor.add_node(StandInServiceNode(0.0))
+    spin_thread = threading.Thread(target=executor.spin, daemon=True)
+    spin_thread.start()
+
+    from webserver_pkg import webserver_publisher_node
+    webserver_publisher_node.webserver_node = webserver_publisher_node.WebServerNode()
+    executor.add_node(webserver_publisher_node.webserver_node)
+
+    stop_event = threading.Event()
+    rejected = []
+    receiving = []
+    lock = threading.Lock()
+    try:
+        if not wait_for_webserver(args.url, 30.0):
+            print(f"Webserver not reachable at {args.url}")
+            return 1
+        print(f"{args.backend} backend, {args.clients} control clients x {args.requests} "
+              f"requests, {args.telemetry_clients} telemetry clients, {args.streams} streams "
+              f"and {args.uploads} slow uploads")
+        measure(args, "no load")
+
+        url = urllib.parse.urlparse(args.url)
+        endpoints = [TELEMETRY_ENDPOINT] * args.telemetry_clients
+        endpoints += [STREAM_ENDPOINTS[index % len(STREAM_ENDPOINTS)]
+                      for index in range(args.streams)]
+        loaders = [threading.Thread(target=open_stream,
+                                    args=(url.hostname, url.port, endpoint, stop_event,
+                                          rejected, receiving, lock),
+                                    daemon=True)
+                   for endpoint in endpoints]
+        loaders += [threading.Thread(target=slow_upload,
+                                     args=(url.hostname, url.port, stop_event, 1.0),
+                                     daemon=True)
+                    for _ in range(args.uploads)]
+        for loader in loaders:
+            loader.start()
+        time.sleep(2.0)
+        p99, failed = measure(args, "under load")
+        drive_p99, drive_failed = measure_drive(args, "drive ws")
+        with lock:
+            rejected_count = len(rejected)
+            telemetry_rejected = rejected.count(TELEMETRY_ENDPOINT)
+            telemetry_receiving = receiving.count(TELEMETRY_ENDPOINT)
+        print(f"  {rejected_count} of {len(endpoints)} streams rejected with 503")
+        print(f"  {telemetry_receiving} of {args.telemetry_clients} telemetry clients "
+              "receiving events")
+
+        exceeded = []
+        if p99 > args.p99_budget_ms:
+            exceeded.append(f"control p99 {p99:.1f}ms > {args.p99_budget_ms:.1f}ms")
+        if failed:
+            exceeded.append(f"{failed} control requests failed")
+        if drive_p99 is not None and drive_p99 > args.drive_budget_ms:
+            exceeded.append(f"drive ws p99 {drive_p99:.1f}ms > {args.drive_budget_ms:.1f}ms")
+        if drive_failed:
+            exceeded.append(f"{drive_failed} drive ws handshakes failed")
+        if telemetry_rejected:
+            exceeded.append(f"{telemetry_rejected} telemetry clients rejected")
+        if telemetry_receiving < args.telemetry_clients:
+            exceeded.append(f"{args.telemetry_clients - telemetry_receiving} telemetry "
+                            "clients received no event")
+        if exceeded:
+            print("FAILED: " + ", ".join(exceeded))
+            return 1
+        print("PASSED")
+        return 0
+    finally:
+        stop_event.set()
+        executor.shutdown()
+        webserver_publisher_node.webserver_node.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+"""
+Webserver Service Call Load Test
+
+Fires concurrent /api/get_battery_level and /api/models requests at the webserver and
+reports the request throughput and latency seen by the clients, followed by the service
+call latency histograms the webserver collects on /api/metrics.
+
+The services behind the APIs are provided by a stand-in node that answers every service
+the webserver_publisher_node connects to with a default response, after a configurable
+delay. With --start-webserver the webserver_publisher_node is started in the same process,
+so the load test runs without the rest of the DeepRacer stack. Otherwise the requests go
+to the webserver at --url, which must be connected to the stand-in services (stop the
+battery_node and sensor_fusion_node first) or to the real ones with --no-stand-in.
+
+The webserver_pkg and deepracer_interfaces_pkg packages must be importable, e.g. after
+sourcing the workspace install/setup.bash.
+
+Usage:
+    python3 load_test_webserver.py --start-webserver --clients 16 --requests 200
+    python3 load_test_webserver.py --url http://127.0.0.1:5001 --service-delay 0.02
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.request
+
+import rclpy
+from rclpy.callback_groups import ReentrantCallbackGroup
+from rclpy.executors import MultiThreadedExecutor
+from rclpy.node import Node
+
+from deepracer_interfaces_pkg.srv import (ActiveStateSrv,
+                                          BatteryLevelSrv,
+                                          BeginSoftwareUpdateSrv,
+                                          ConsoleModelActionSrv,
+                                          EnableStateSrv,
+                                          GetCalibrationSrv,
+                                          GetCtrlModesSrv,
+                                          GetDeviceInfoSrv,
+                                          GetLedCtrlSrv,
+                                          GetModelLoadingStatusSrv,
+                                          LidarConfigSrv,
+                                          ModelStateSrv,
+                                          NavThrottleSrv,
+                                          OTGLinkStateSrv,
+                                          SensorStatusCheckSrv,
+                                          SetCalibrationSrv,
+                                          SetLedCtrlSrv,
+                                          SoftwareUpdateCheckSrv,
+                                          SoftwareUpdateStateSrv,
+                                          VerifyModelReadySrv)
+from webserver_pkg import constants
+
+
+STAND_IN_SERVICES = [
+    (ActiveStateSrv, constants.VEHICLE_STATE_SERVICE),
+    (EnableStateSrv, constants.ENABLE_STATE_SERVICE),
+    (GetCalibrationSrv, constants.GET_CAR_CAL_SERVICE),
+    (SetCalibrationSrv, constants.SET_CAR_CAL_SERVICE),
+    (GetDeviceInfoSrv, constants.GET_DEVICE_INFO_SERVICE),
+    (BatteryLevelSrv, constants.BATTERY_LEVEL_SERVICE),
+    (SensorStatusCheckSrv, constants.SENSOR_DATA_STATUS_SERVICE),
+    (SetLedCtrlSrv, constants.SET_CAR_LED_SERVICE),
+    (GetLedCtrlSrv, constants.GET_CAR_LED_SERVICE),
+    (VerifyModelReadySrv, constants.VERIFY_MODEL_READY_SERVICE),
+    (LidarConfigSrv, constants.CONFIGURE_LIDAR_SERVICE),
+    (ModelStateSrv, constants.MODEL_STATE_SERVICE),
+    (GetModelLoadingStatusSrv, constants.IS_MODEL_LOADING_SERVICE),
+    (ConsoleModelActionSrv, constants.CONSOLE_MODEL_ACTION_SERVICE),
+    (SoftwareUpdateCheckSrv, constants.SOFTWARE_UPDATE_CHECK_SERVICE_NAME),
+    (BeginSoftwareUpdateSrv, constants.BEGIN_UPDATE_SERVICE),
+    (SoftwareUpdateStateSrv, constants.SOFTWARE_UPDATE_STATE_SERVICE),
+    (NavThrottleSrv, constants.AUTONOMOUS_THROTTLE_SERVICE),
+    (GetCtrlModesSrv, constants.GET_CTRL_MODES_SERVICE),
+    (OTGLinkStateSrv, constants.GET_OTG_LINK_STATE_SERVICE)
+]
+
+ENDPOINTS = ["/api/get_battery_level", "/api/models"]
+
+
+class StandInServiceNode(Node):
+    """Node answering the services used by the webserver with default responses.
+    """
+    def __init__(self, delay):
+        super().__init__("webserver_load_test_services")
+        self.delay = delay
+        self.battery_level = 0
+        self.services = []
+        callback_group = ReentrantCallbackGroup()
+        for srv_type, srv_name in STAND_IN_SERVICES:
+            self.services.append(self.create_service(srv_type, srv_name,
+                                                     self.make_callback(srv_name),
+                                                     callback_group=callback_group))
+
+    def make_callback(self, srv_name):
+        def callback(req, res):
+            if self.delay > 0:
+                time.sleep(self.delay)
+            if srv_name == constants.BATTERY_LEVEL_SERVICE:
+                self.battery_level = (self.battery_level + 1) % 11
+                res.level = self.battery_level
+            return res
+        return callback
+
+
+def run_client(url, endpoints, request_count, latencies, failures, lock):
+    """Send request_count GET requests cycling through the endpoints.
+    """
+    for index in range(request_count):
+        endpoint = endpoints[index % len(endpoints)]
+        start = time.monotonic()
+        try:
+            with urllib.request.urlopen(url + endpoint, timeout=30) as response:
+                body = json.loads(response.read())
+            ok = body.get("success", True) is not False
+        except Exception:
+            ok = False
+        latency_ms = (time.monotonic() - start) * 1000.0
+        with lock:
+            latencies[endpoint].append(latency_ms)
+            if not ok:
+                failures[endpoint] += 1
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+def wait_for_webserver(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/api/metrics", timeout=1):
+                return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the webserver service calls.")
+    parser.add_argument("--url", default="http://127.0.0.1:5001",
+                        help="Base URL of the webserver.")
+    parser.add_argument("--clients", type=int, default=16,
+                        help="Number of concurrent client threads.")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Number of requests sent by every client.")
+    parser.add_argument("--service-delay", type=float, default=0.0,
+                        help="Seconds the stand-in services take to answer.")
+    parser.add_argument("--start-webserver", action="store_true",
+                        help="Start the webserver_publisher_node in this process.")
+    parser.add_argument("--no-stand-in", action="store_true",
+                        help="Do not start the stand-in services, use the running ones.")
+    args = parser.parse_args()
+
+    rclpy.init()
+    executor = MultiThreadedExecutor()
+    if not args.no_stand_in:
+        executor.add_node(StandInServiceNode(args.service_delay))
+    spin_thread = threading.Thread(target=executor.spin, daemon=True)
+    spin_thread.start()
+
+    if args.start_webserver:
+        # The node waits for its services in the constructor, the stand-in node is already
+        # spinning. The Flask routes look the node up through the module global.
+        from webserver_pkg import webserver_publisher_node
+        webserver_publisher_node.webserver_node = webserver_publisher_node.WebServerNode()
+        executor.add_node(webserver_publisher_node.webserver_node)
+
+    try:
+        if not wait_for_webserver(args.url, 30.0):
+            print(f"Webserver not reachable at {args.url}")
+            return
+
+        latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        failures = {endpoint: 0 for endpoint in ENDPOINTS}
+        lock = threading.Lock()
+        clients = []
+        for index in range(args.clients):
+            # Rotate the endpoint order so that both APIs are called concurrently.
+            endpoints = ENDPOINTS[index % len(ENDPOINTS):] + ENDPOINTS[:index % len(ENDPOINTS)]
+            clients.append(threading.Thread(target=run_client,
+                                            args=(args.url, endpoints, args.requests,
+                                                  latencies, failures, lock)))
+        print(f"{args.clients} clients x {args.requests} requests, "
+              f"service delay {args.service_delay * 1000.0:.0f}ms")
+        start = time.monotonic()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        wall_time = time.monotonic() - start
+
+        total = sum(len(values) for values in latencies.values())
+        print(f"  {total / wall_time:.1f} requests/s over {wall_time:.2f}s")
+        for endpoint in ENDPOINTS:
+            values = latencies[endpoint]
+            print(f"  {endpoint:<24} p50 {percentile(values, 50):7.1f}ms  "
+                  f"p95 {percentile(values, 95):7.1f}ms  p99 {percentile(values, 99):7.1f}ms  "
+                  f"max {max(values):7.1f}ms  failed {failures[endpoint]}")
+
+        with urllib.request.urlopen(args.url + "/api/metrics", timeout=5) as response:
+            metrics = json.loads(response.read())
+        print("Service calls (/api/metrics)")
+        for srv_name, service in sorted(metrics.get("services", {}).items()):
+            print(f"  {srv_name:<40} {service['count']:6d} calls  "
+                  f"mean {service['mean_ms']:6.1f}ms  p95 {service['p95_ms']:6.1f}ms  "
+                  f"max {service['max_ms']:6.1f}ms  timeouts {service['timeouts']}  "
+                  f"errors {service['errors']}")
+    finally:
+        executor.shutdown()
+        rclpy.shutdown()
+
+
+if __name__ == "__main__":
+    main()